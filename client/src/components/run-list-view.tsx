@@ -550,6 +550,45 @@ const insertTextAtCaret = useCallback((rawText: string, isInterim: boolean, sess
     return String(finalTranscript || '').trim();
   };
 
+  // Helper: AI merge over SSE; onText receives the note so far while the model writes it
+  const generateAiNote = async (listPatientId: string, transcript: string, mode: string, onText: (text: string) => void): Promise<any> => {
+    const res = await fetch('/api/run-list/ai/generate', {
+      method: 'POST',
+      headers: { 'Content-Type': 'application/json', Accept: 'text/event-stream' },
+      body: JSON.stringify({ listPatientId, transcript, mode })
+    });
+    if (!res.ok) throw new Error('AI generation failed');
+    if (!res.body || !(res.headers.get('Content-Type') || '').includes('text/event-stream')) {
+      const json = await res.json();
+      return json?.note;
+    }
+    const reader = res.body.getReader();
+    const decoder = new TextDecoder();
+    let buffer = '';
+    let streamed = '';
+    for (;;) {
+      const { value, done } = await reader.read();
+      if (done) break;
+      buffer += decoder.decode(value, { stream: true });
+      let sep: number;
+      while ((sep = buffer.indexOf('\n\n')) >= 0) {
+        const frame = buffer.slice(0, sep);
+        buffer = buffer.slice(sep + 2);
+        const event = /^event: (.*)$/m.exec(frame)?.[1];
+        const data = JSON.parse(/^data: (.*)$/m.exec(frame)?.[1] || 'null');
+        if (event === 'delta') {
+          streamed += data?.text || '';
+          onText(streamed);
+        } else if (event === 'done') {
+          return data?.note;
+        } else if (event === 'error') {
+          throw new Error(data?.message || 'AI generation failed');
+        }
+      }
+    }
+    throw new Error('AI generation failed');
+  };
+
   const startAiRecording = async (patientId: string, mode: 'preround' | 'postround' | 'full') => {
     try {
       const stream = await navigator.mediaDevices.getUserMedia({ audio: { echoCancellation: true, noiseSuppression: true, sampleRate: 48000, channelCount: 1 } });
@@ -566,14 +605,15 @@ const insertTextAtCaret = useCallback((rawText: string, isInterim: boolean, sess
           const listPatientId = p.note?.listPatientId || p.id;
           setAiProcessingFor(patientId);
           const transcript = await transcribeBlob(blob);
-          const res = await fetch('/api/run-list/ai/generate', {
-            method: 'POST',
-            headers: { 'Content-Type': 'application/json' },
-            body: JSON.stringify({ listPatientId, transcript, mode })
-          });
-          if (!res.ok) throw new Error('AI generation failed');
-          const json = await res.json();
-          const updatedText = json?.note?.rawText || '';
+          const before = localNotesRef.current?.[listPatientId] ?? p.note?.rawText ?? '';
+          let streamedAny = false;
+          const note = await generateAiNote(listPatientId, transcript, mode, (text) => { streamedAny = true; setNoteValue(listPatientId, text); })
+            .catch((err) => {
+              // Drop the partial stream and put the note back as it was
+              if (streamedAny) setNoteValue(listPatientId, before);
+              throw err;
+            });
+          const updatedText = note?.rawText || '';
           if (updatedText) {
             setNoteValue(listPatientId, updatedText);
             const p2 = patients.find(x => (x.note?.listPatientId || x.id) === listPatientId);
@@ -57,6 +57,8 @@ export default function CommunityPage() {
   const [loading, setLoading] = useState(false);
   const [items, setItems] = useState<CommunityItem[]>([]);
   const [total, setTotal] = useState(0);
+  const [totalCapped, setTotalCapped] = useState(false);
+  const [hasMore, setHasMore] = useState(false);
 
   const fetchItems = async () => {
     setLoading(true);
@@ -73,6 +75,8 @@ export default function CommunityPage() {
       const data = await resp.json();
       setItems(data.items || []);
       setTotal(data.total || 0);
+      setTotalCapped(!!data.totalCapped);
+      setHasMore(!!data.hasMore);
     } catch (e) {
       console.error(e);
     } finally {
@@ -103,7 +107,10 @@ export default function CommunityPage() {
     }
   };
 
+  // Past the server's count cap the total reads "1000+" and the page count is open-ended.
   const totalPages = Math.max(1, Math.ceil(total / pageSize));
+  const totalLabel = totalCapped ? `${total}+` : String(total);
+  const pagesLabel = totalCapped ? `${totalPages}+` : String(Math.max(totalPages, page));
   const densityCls = 'text-[12px] leading-5';
   const padCls = 'p-2';
 
@@ -154,7 +161,7 @@ export default function CommunityPage() {
             </Select>
             <div className="ml-auto flex items-center gap-3">
               <LayoutDensityControls layout={layout} onLayoutChange={setLayout} />
-              <span className="text-xs text-muted-foreground">{loading ? 'Loading…' : `${total} items`}</span>
+              <span className="text-xs text-muted-foreground">{loading ? 'Loading…' : `${totalLabel} items`}</span>
             </div>
           </CardContent>
         </Card>
@@ -222,10 +229,10 @@ export default function CommunityPage() {
         )}
 
         <div className="mt-6 flex items-center justify-between">
-          <span className="text-xs text-muted-foreground">Page {page} of {totalPages}</span>
+          <span className="text-xs text-muted-foreground">Page {page} of {pagesLabel}</span>
           <div className="flex gap-2">
             <Button variant="outline" size="sm" disabled={page<=1} onClick={()=>setPage(p=>p-1)}>Previous</Button>
-            <Button variant="outline" size="sm" disabled={page>=totalPages} onClick={()=>setPage(p=>p+1)}>Next</Button>
+            <Button variant="outline" size="sm" disabled={!hasMore} onClick={()=>setPage(p=>p+1)}>Next</Button>
           </div>
         </div>
       </div>
@@ -0,0 +1,9 @@
+-- Shared cache of Nova completions (server/ai/nova-cache.ts). Rows hold only
+-- a SHA-256 of the request and the AES-GCM encrypted completion. The cache
+-- also creates this table on first use when NOVA_CACHE_SHARED=1.
+CREATE TABLE IF NOT EXISTS ai_response_cache (
+  key_hash CHAR(64) PRIMARY KEY,
+  payload TEXT NOT NULL,
+  expires_at TIMESTAMPTZ NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_ai_response_cache_expires_at ON ai_response_cache(expires_at);
@@ -0,0 +1,19 @@
+-- Community browse (GET /api/community) pages in SQL. Partial indexes on the
+-- public rows serve each source's ORDER BY ... LIMIT, and trigram indexes
+-- serve the ILIKE '%q%' search on title and description.
+CREATE INDEX IF NOT EXISTS idx_note_templates_public_newest ON note_templates (created_at DESC NULLS LAST, id) WHERE is_public = true;
+CREATE INDEX IF NOT EXISTS idx_note_templates_public_downloads ON note_templates (download_count DESC NULLS LAST, created_at DESC NULLS LAST, id) WHERE is_public = true;
+CREATE INDEX IF NOT EXISTS idx_smart_phrases_public_newest ON smart_phrases (created_at DESC NULLS LAST, id) WHERE is_public = true;
+CREATE INDEX IF NOT EXISTS idx_smart_phrases_public_downloads ON smart_phrases (download_count DESC NULLS LAST, created_at DESC NULLS LAST, id) WHERE is_public = true;
+CREATE INDEX IF NOT EXISTS idx_smart_phrases_public_category ON smart_phrases (category, created_at DESC NULLS LAST, id) WHERE is_public = true;
+CREATE INDEX IF NOT EXISTS idx_autocomplete_items_public_newest ON autocomplete_items (created_at DESC NULLS LAST, id) WHERE is_public = true;
+CREATE INDEX IF NOT EXISTS idx_autocomplete_items_public_downloads ON autocomplete_items (download_count DESC NULLS LAST, created_at DESC NULLS LAST, id) WHERE is_public = true;
+CREATE INDEX IF NOT EXISTS idx_autocomplete_items_public_category ON autocomplete_items (category, created_at DESC NULLS LAST, id) WHERE is_public = true;
+
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+CREATE INDEX IF NOT EXISTS idx_note_templates_public_name_trgm ON note_templates USING gin (name gin_trgm_ops) WHERE is_public = true;
+CREATE INDEX IF NOT EXISTS idx_note_templates_public_description_trgm ON note_templates USING gin (description gin_trgm_ops) WHERE is_public = true;
+CREATE INDEX IF NOT EXISTS idx_smart_phrases_public_trigger_trgm ON smart_phrases USING gin (trigger gin_trgm_ops) WHERE is_public = true;
+CREATE INDEX IF NOT EXISTS idx_smart_phrases_public_description_trgm ON smart_phrases USING gin (description gin_trgm_ops) WHERE is_public = true;
+CREATE INDEX IF NOT EXISTS idx_autocomplete_items_public_text_trgm ON autocomplete_items USING gin (text gin_trgm_ops) WHERE is_public = true;
+CREATE INDEX IF NOT EXISTS idx_autocomplete_items_public_description_trgm ON autocomplete_items USING gin (description gin_trgm_ops) WHERE is_public = true;
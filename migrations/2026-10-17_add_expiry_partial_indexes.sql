@@ -0,0 +1,10 @@
+-- Batched expiry cleanup (storage.deleteInBatches) only ever looks at rows
+-- with an expiry, so index just those and drop the full-column indexes they
+-- replace.
+CREATE INDEX IF NOT EXISTS idx_run_list_notes_expires_at_partial
+  ON run_list_notes (expires_at) WHERE expires_at IS NOT NULL;
+DROP INDEX IF EXISTS idx_run_list_notes_expires;
+
+CREATE INDEX IF NOT EXISTS idx_notes_expires_at_partial
+  ON notes (expires_at) WHERE expires_at IS NOT NULL;
+DROP INDEX IF EXISTS idx_notes_expires_at;
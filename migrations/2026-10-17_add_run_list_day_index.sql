@@ -0,0 +1,3 @@
+-- Day-range scan used by the background job that creates each active user's
+-- empty run list row before the morning rush (server/run-list-precreate.ts).
+CREATE INDEX IF NOT EXISTS idx_run_lists_day ON run_lists (day);
@@ -0,0 +1,17 @@
+-- Lease-based maintenance job schedule shared by all server instances
+-- (server/jobs.ts). The scheduler also creates this table on boot.
+CREATE TABLE IF NOT EXISTS scheduled_jobs (
+  name VARCHAR(100) PRIMARY KEY,
+  next_run_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+  locked_by VARCHAR(100),
+  locked_until TIMESTAMPTZ,
+  consecutive_failures INTEGER NOT NULL DEFAULT 0,
+  last_started_at TIMESTAMPTZ,
+  last_finished_at TIMESTAMPTZ,
+  last_status VARCHAR(10),
+  last_error TEXT,
+  last_duration_ms INTEGER,
+  last_result JSONB,
+  runs INTEGER NOT NULL DEFAULT 0,
+  failures INTEGER NOT NULL DEFAULT 0
+);
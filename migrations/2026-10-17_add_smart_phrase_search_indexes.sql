@@ -0,0 +1,8 @@
+-- Smart phrase search (GET /api/smart-phrases?q=). Most lookups are served
+-- from the server's in-memory trigger index; these back the initial per-user
+-- load and the SQL fallback for users with very large phrase sets.
+CREATE INDEX IF NOT EXISTS idx_smart_phrases_user_id ON smart_phrases (user_id);
+
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+CREATE INDEX IF NOT EXISTS idx_smart_phrases_trigger_trgm ON smart_phrases USING gin (trigger gin_trgm_ops);
+CREATE INDEX IF NOT EXISTS idx_smart_phrases_description_trgm ON smart_phrases USING gin (description gin_trgm_ops);
@@ -0,0 +1,50 @@
+/// <reference types="vitest" />
+import { describe, it, expect } from 'vitest'
+import { NovaResponseCache, novaCacheKeys, sealCompletion, openCompletion, type NovaCacheStore } from './nova-cache'
+
+const req = { systemPrompt: 'Extract meds', userMessage: 'metoprolol 25 bid', temperature: 0, maxTokens: 4096 }
+
+function memoryStore() {
+  const rows = new Map<string, string>()
+  const store: NovaCacheStore = {
+    async get(keyHash) { return rows.get(keyHash) },
+    async set(keyHash, payload) { rows.set(keyHash, payload) },
+  }
+  return { rows, store }
+}
+
+describe('NovaResponseCache', () => {
+  it('keys on every request field', () => {
+    const base = novaCacheKeys(req).keyHash
+    expect(novaCacheKeys({ ...req }).keyHash).toBe(base)
+    expect(novaCacheKeys({ ...req, temperature: 0.2 }).keyHash).not.toBe(base)
+    expect(novaCacheKeys({ ...req, maxTokens: 100 }).keyHash).not.toBe(base)
+    expect(novaCacheKeys({ ...req, userMessage: 'metoprolol 50 bid' }).keyHash).not.toBe(base)
+  })
+
+  it('counts hits and misses', async () => {
+    const cache = new NovaResponseCache(10, 60_000)
+    expect(await cache.get(req)).toBeUndefined()
+    await cache.set(req, '{"medications":[]}')
+    expect(await cache.get(req)).toBe('{"medications":[]}')
+    expect(cache.metrics).toMatchObject({ hits: 1, misses: 1, stores: 1 })
+  })
+
+  it('gives the shared store only the hash and ciphertext', async () => {
+    const { rows, store } = memoryStore()
+    await new NovaResponseCache(10, 60_000, store).set(req, 'metoprolol tartrate 25 mg')
+    const [[keyHash, payload]] = Array.from(rows.entries())
+    expect(keyHash).toMatch(/^[0-9a-f]{64}$/)
+    expect(payload).not.toContain('metoprolol')
+
+    const other = new NovaResponseCache(10, 60_000, store)
+    expect(await other.get(req)).toBe('metoprolol tartrate 25 mg')
+    expect(other.metrics.storeHits).toBe(1)
+  })
+
+  it('cannot open a payload without the originating request', () => {
+    const payload = sealCompletion('secret', novaCacheKeys(req).encKey)
+    expect(openCompletion(payload, novaCacheKeys(req).encKey)).toBe('secret')
+    expect(() => openCompletion(payload, novaCacheKeys({ ...req, userMessage: 'x' }).encKey)).toThrow()
+  })
+})
@@ -0,0 +1,146 @@
+import { createCipheriv, createDecipheriv, createHash, randomBytes } from 'crypto';
+import { LruCache } from '../lru-cache.js';
+
+// Content-addressed cache for Nova completions. Re-clicks and retries on the
+// same dictation return the earlier completion instead of a new Bedrock call.
+//
+// PHI: the request never leaves this module in the clear. Entries are keyed
+// by a SHA-256 of (system prompt, user message, temperature, maxTokens). The
+// optional shared store (Postgres) only ever sees that hash and the
+// completion encrypted with a second key derived from the same request, so a
+// stored row can only be read by someone who already has the dictation.
+// Every entry expires after `ttlMs`, in memory and in the store.
+
+export type NovaCacheRequest = {
+  systemPrompt: string;
+  userMessage: string;
+  temperature: number;
+  maxTokens: number;
+};
+
+// Shared backing store; sees only hashes and ciphertext.
+export interface NovaCacheStore {
+  get(keyHash: string): Promise<string | undefined>;
+  set(keyHash: string, payload: string, expiresAt: Date): Promise<void>;
+}
+
+export type NovaCacheMetrics = {
+  hits: number;
+  storeHits: number;
+  misses: number;
+  stores: number;
+  storeErrors: number;
+};
+
+type CacheKeys = { keyHash: string; encKey: Buffer };
+
+export function novaCacheKeys(req: NovaCacheRequest): CacheKeys {
+  const material = JSON.stringify([req.systemPrompt, req.userMessage, req.temperature, req.maxTokens]);
+  return {
+    keyHash: createHash('sha256').update('nova-cache:key\0').update(material).digest('hex'),
+    encKey: createHash('sha256').update('nova-cache:enc\0').update(material).digest(),
+  };
+}
+
+export function sealCompletion(text: string, encKey: Buffer): string {
+  const iv = randomBytes(12);
+  const cipher = createCipheriv('aes-256-gcm', encKey, iv);
+  const body = Buffer.concat([cipher.update(text, 'utf8'), cipher.final()]);
+  return Buffer.concat([iv, cipher.getAuthTag(), body]).toString('base64');
+}
+
+export function openCompletion(payload: string, encKey: Buffer): string {
+  const raw = Buffer.from(payload, 'base64');
+  const decipher = createDecipheriv('aes-256-gcm', encKey, raw.subarray(0, 12));
+  decipher.setAuthTag(raw.subarray(12, 28));
+  return Buffer.concat([decipher.update(raw.subarray(28)), decipher.final()]).toString('utf8');
+}
+
+export class NovaResponseCache {
+  readonly metrics: NovaCacheMetrics = { hits: 0, storeHits: 0, misses: 0, stores: 0, storeErrors: 0 };
+  private memory: LruCache<string, string>;
+
+  constructor(maxEntries: number, private ttlMs: number, private store?: NovaCacheStore) {
+    this.memory = new LruCache(maxEntries, ttlMs);
+  }
+
+  async get(req: NovaCacheRequest): Promise<string | undefined> {
+    const { keyHash, encKey } = novaCacheKeys(req);
+    const local = this.memory.get(keyHash);
+    if (local !== undefined) {
+      this.metrics.hits++;
+      return local;
+    }
+    if (this.store) {
+      try {
+        const payload = await this.store.get(keyHash);
+        if (payload) {
+          const text = openCompletion(payload, encKey);
+          this.memory.set(keyHash, text);
+          this.metrics.storeHits++;
+          return text;
+        }
+      } catch (err) {
+        this.metrics.storeErrors++;
+        console.warn('[nova-cache] Store read failed:', (err as any)?.message || err);
+      }
+    }
+    this.metrics.misses++;
+    return undefined;
+  }
+
+  async set(req: NovaCacheRequest, text: string): Promise<void> {
+    const { keyHash, encKey } = novaCacheKeys(req);
+    this.memory.set(keyHash, text);
+    this.metrics.stores++;
+    if (!this.store) return;
+    try {
+      await this.store.set(keyHash, sealCompletion(text, encKey), new Date(Date.now() + this.ttlMs));
+    } catch (err) {
+      this.metrics.storeErrors++;
+      console.warn('[nova-cache] Store write failed:', (err as any)?.message || err);
+    }
+  }
+}
+
+// Postgres-backed store shared by all instances. db is imported lazily so the
+// cache (and its tests) load without a database.
+export function postgresNovaCacheStore(): NovaCacheStore {
+  let ready: Promise<any> | null = null;
+  const getDb = () => {
+    ready ??= (async () => {
+      const { db } = await import('../db.js');
+      await db.execute(`
+        CREATE TABLE IF NOT EXISTS ai_response_cache (
+          key_hash CHAR(64) PRIMARY KEY,
+          payload TEXT NOT NULL,
+          expires_at TIMESTAMPTZ NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS idx_ai_response_cache_expires_at ON ai_response_cache(expires_at);
+      ` as any);
+      return db;
+    })().catch((err) => {
+      ready = null;
+      throw err;
+    });
+    return ready;
+  };
+  return {
+    async get(keyHash) {
+      const db = await getDb();
+      const { sql } = await import('drizzle-orm');
+      const result: any = await db.execute(sql`
+        SELECT payload FROM ai_response_cache WHERE key_hash = ${keyHash} AND expires_at > NOW()`);
+      const [row] = Array.isArray(result) ? result : (result?.rows ?? []);
+      return row?.payload;
+    },
+    async set(keyHash, payload, expiresAt) {
+      const db = await getDb();
+      const { sql } = await import('drizzle-orm');
+      await db.execute(sql`
+        INSERT INTO ai_response_cache (key_hash, payload, expires_at)
+        VALUES (${keyHash}, ${payload}, ${expiresAt})
+        ON CONFLICT (key_hash) DO UPDATE SET payload = EXCLUDED.payload, expires_at = EXCLUDED.expires_at`);
+    },
+  };
+}
@@ -1,99 +1,232 @@
-import { BedrockRuntimeClient, InvokeModelCommand } from '@aws-sdk/client-bedrock-runtime';
+import { BedrockRuntimeClient, InvokeModelCommand, InvokeModelWithResponseStreamCommand } from '@aws-sdk/client-bedrock-runtime';
+import http from 'http';
+import https from 'https';
+import { NovaResponseCache, novaCacheKeys, postgresNovaCacheStore } from './nova-cache.js';
+import { AiBusyError, AiScheduler } from './scheduler.js';
 
 // Amazon Nova Micro model identifier - use inference profile for us-east-2
 const NOVA_MICRO_MODEL_ID = process.env.AWS_REGION === 'us-east-2' 
   ? 'us.amazon.nova-micro-v1:0' // Inference profile format for us-east-2
   : 'amazon.nova-micro-v1:0';   // Direct model for other regions
 
-// Initialize Bedrock client
+// One Bedrock client per process: credentials are resolved once and
+// keep-alive agents reuse TLS connections across calls.
+let bedrockClient: BedrockRuntimeClient | null = null;
 const getBedrockClient = () => {
+  if (bedrockClient) return bedrockClient;
   const region = process.env.AWS_REGION || 'us-east-1';
   
   // AWS SDK will automatically pick up credentials from:
   // 1. Environment variables (AWS_ACCESS_KEY_ID, AWS_SECRET_ACCESS_KEY)
   // 2. IAM roles (if running on AWS)
   // 3. AWS credentials file
-  return new BedrockRuntimeClient({ region });
+  // BEDROCK_ENDPOINT_URL points the client at a local stand-in (testsprite_tests/harness ai-stub).
+  const endpoint = process.env.BEDROCK_ENDPOINT_URL;
+  const maxSockets = parseInt(process.env.BEDROCK_MAX_SOCKETS || '50', 10);
+  bedrockClient = new BedrockRuntimeClient({
+    region,
+    ...(endpoint ? { endpoint } : {}),
+    // novaScheduler retries throttling with its own backoff; SDK retries on
+    // top would multiply attempts and hold the slot past that backoff.
+    maxAttempts: 1,
+    requestHandler: {
+      httpAgent: new http.Agent({ keepAlive: true, maxSockets }),
+      httpsAgent: new https.Agent({ keepAlive: true, maxSockets }),
+    },
+  });
+  return bedrockClient;
 };
 
+// Completions for identical requests, keyed by hash only (see nova-cache.ts).
+// NOVA_CACHE_TTL_MS=0 disables it; NOVA_CACHE_SHARED=1 adds the Postgres
+// store shared by all instances.
+const NOVA_CACHE_TTL_MS = parseInt(process.env.NOVA_CACHE_TTL_MS || String(10 * 60 * 1000), 10);
+export const novaCache = NOVA_CACHE_TTL_MS > 0
+  ? new NovaResponseCache(
+      parseInt(process.env.NOVA_CACHE_MAX_ENTRIES || '500', 10),
+      NOVA_CACHE_TTL_MS,
+      process.env.NOVA_CACHE_SHARED === '1' ? postgresNovaCacheStore() : undefined,
+    )
+  : null;
+
+// Every Bedrock call goes through this scheduler (see scheduler.ts).
+const envInt = (name: string, fallback: number) => parseInt(process.env[name] || String(fallback), 10);
+export const novaScheduler = new AiScheduler({
+  maxConcurrent: envInt('AI_MAX_CONCURRENT', 8),
+  maxPerUser: envInt('AI_MAX_CONCURRENT_PER_USER', 2),
+  maxQueue: envInt('AI_MAX_QUEUE', 100),
+  maxQueuedPerUser: envInt('AI_MAX_QUEUED_PER_USER', 20),
+  queueTimeoutMs: envInt('AI_QUEUE_TIMEOUT_MS', 20_000),
+  maxRetries: envInt('AI_THROTTLE_RETRIES', 3),
+  retryBaseMs: 250,
+  retryMaxMs: 4_000,
+});
+
 export interface NovaRequest {
   systemPrompt: string;
   userMessage: string;
   temperature?: number;
   maxTokens?: number;
+  // Set false for calls that must always reach the model.
+  cache?: boolean;
+  // Whose queue the call waits in (per-user limits and fairness).
+  userId: string;
+  // Overrides AI_MAX_CONCURRENT_PER_USER for this call (whole-list batches).
+  userConcurrency?: number;
 }
 
 export interface NovaResponse {
   text: string;
 }
 
+// Amazon Nova Micro expects a specific message format
+const novaRequestBody = (systemPrompt: string, userMessage: string, temperature: number, maxTokens: number) => JSON.stringify({
+  messages: [
+    {
+      role: 'user',
+      content: [
+        {
+          text: `${systemPrompt}\n\nUser request: ${userMessage}`
+        }
+      ]
+    }
+  ],
+  inferenceConfig: {
+    temperature,
+    max_new_tokens: maxTokens
+  }
+});
+
+// Provide more specific error messages
+const toNovaError = (error: any): Error => {
+  // Busy/throttled: the route turns this into 429/503 with Retry-After.
+  if (error instanceof AiBusyError) return error;
+  console.error('Error calling Nova Micro:', error);
+  if (error.name === 'ValidationException') {
+    return new Error('Invalid request format for Nova Micro');
+  } else if (error.name === 'ResourceNotFoundException') {
+    return new Error('Nova Micro model not found or not available in this region');
+  } else if (error.name === 'AccessDeniedException') {
+    return new Error('Access denied to Nova Micro. Check AWS credentials and permissions.');
+  }
+  return new Error(`Nova Micro API error: ${error.message}`);
+};
+
+const invokeNovaMicro = async (systemPrompt: string, userMessage: string, temperature: number, maxTokens: number): Promise<string> => {
+  const client = getBedrockClient();
+
+  const command = new InvokeModelCommand({
+    modelId: NOVA_MICRO_MODEL_ID,
+    contentType: 'application/json',
+    accept: 'application/json',
+    body: novaRequestBody(systemPrompt, userMessage, temperature, maxTokens)
+  });
+
+  const response = await client.send(command);
+  
+  if (!response.body) {
+    throw new Error('No response body from Nova Micro');
+  }
+
+  // Parse the response
+  const responseBody = JSON.parse(new TextDecoder().decode(response.body));
+  
+  // Extract text content from Nova response
+  const text = responseBody?.output?.message?.content?.[0]?.text || '';
+  
+  if (!text) {
+    console.warn('Nova Micro response structure:', JSON.stringify(responseBody, null, 2));
+    throw new Error('No text content in Nova Micro response');
+  }
+  return text;
+};
+
 export const callNovaMicro = async ({
   systemPrompt,
   userMessage,
   temperature = 0,
-  maxTokens = 4096
+  maxTokens = 4096,
+  cache = true,
+  userId,
+  userConcurrency
 }: NovaRequest): Promise<NovaResponse> => {
-  const client = getBedrockClient();
-
-  // Amazon Nova Micro expects a specific message format
-  const requestBody = {
-    messages: [
-      {
-        role: 'user',
-        content: [
-          {
-            text: `${systemPrompt}\n\nUser request: ${userMessage}`
-          }
-        ]
-      }
-    ],
-    inferenceConfig: {
-      temperature,
-      max_new_tokens: maxTokens
-    }
-  };
+  const cacheKey = { systemPrompt, userMessage, temperature, maxTokens };
+  if (cache && novaCache) {
+    const cached = await novaCache.get(cacheKey);
+    if (cached !== undefined) return { text: cached };
+  }
 
   try {
-    const command = new InvokeModelCommand({
-      modelId: NOVA_MICRO_MODEL_ID,
-      contentType: 'application/json',
-      accept: 'application/json',
-      body: JSON.stringify(requestBody)
-    });
+    const text = await novaScheduler.run(userId, async () => {
+      const text = await invokeNovaMicro(systemPrompt, userMessage, temperature, maxTokens);
+      if (cache && novaCache) await novaCache.set(cacheKey, text);
+      return text;
+    }, { coalesceKey: cache ? novaCacheKeys(cacheKey).keyHash : undefined, maxPerUser: userConcurrency });
+    return { text };
+  } catch (error: any) {
+    throw toNovaError(error);
+  }
+};
 
-    const response = await client.send(command);
-    
-    if (!response.body) {
-      throw new Error('No response body from Nova Micro');
-    }
+export interface NovaStreamRequest extends NovaRequest {
+  // Called with each text delta as Bedrock produces it.
+  onText: (delta: string) => void;
+}
 
-    // Parse the response
-    const responseBody = JSON.parse(new TextDecoder().decode(response.body));
-    
-    // Extract text content from Nova response
-    const text = responseBody?.output?.message?.content?.[0]?.text || '';
-    
-    if (!text) {
-      console.warn('Nova Micro response structure:', JSON.stringify(responseBody, null, 2));
-      throw new Error('No text content in Nova Micro response');
+// callNovaMicro over Bedrock's response stream. Resolves with the full
+// completion; a cache hit is replayed as a single delta. Streamed calls are
+// scheduled like any other but never coalesced, since each caller needs its
+// own deltas.
+export const streamNovaMicro = async ({
+  systemPrompt,
+  userMessage,
+  temperature = 0,
+  maxTokens = 4096,
+  cache = true,
+  userId,
+  onText
+}: NovaStreamRequest): Promise<NovaResponse> => {
+  const cacheKey = { systemPrompt, userMessage, temperature, maxTokens };
+  if (cache && novaCache) {
+    const cached = await novaCache.get(cacheKey);
+    if (cached !== undefined) {
+      onText(cached);
+      return { text: cached };
     }
+  }
 
+  try {
+    const text = await novaScheduler.run(userId, async () => {
+      const response = await getBedrockClient().send(new InvokeModelWithResponseStreamCommand({
+        modelId: NOVA_MICRO_MODEL_ID,
+        contentType: 'application/json',
+        accept: 'application/json',
+        body: novaRequestBody(systemPrompt, userMessage, temperature, maxTokens)
+      }));
+      const decoder = new TextDecoder();
+      let text = '';
+      try {
+        for await (const event of response.body ?? []) {
+          if (!event.chunk?.bytes) continue;
+          const payload = JSON.parse(decoder.decode(event.chunk.bytes));
+          const delta = payload?.contentBlockDelta?.delta?.text;
+          if (delta) {
+            text += delta;
+            onText(delta);
+          }
+        }
+      } catch (error: any) {
+        // Deltas already went out, so a retry would repeat them.
+        if (text) throw new Error(`stream interrupted: ${error?.message || error}`);
+        throw error;
+      }
+      if (!text) throw new Error('No text content in Nova Micro response');
+      if (cache && novaCache) await novaCache.set(cacheKey, text);
+      return text;
+    });
     return { text };
   } catch (error: any) {
-    console.error('Error calling Nova Micro:', error);
-    
-    // Provide more specific error messages
-    if (error.name === 'ValidationException') {
-      throw new Error('Invalid request format for Nova Micro');
-    } else if (error.name === 'ResourceNotFoundException') {
-      throw new Error('Nova Micro model not found or not available in this region');
-    } else if (error.name === 'AccessDeniedException') {
-      throw new Error('Access denied to Nova Micro. Check AWS credentials and permissions.');
-    } else if (error.name === 'ThrottlingException') {
-      throw new Error('Request throttled by Nova Micro. Please try again later.');
-    }
-    
-    throw new Error(`Nova Micro API error: ${error.message}`);
+    throw toNovaError(error);
   }
 };
 
@@ -0,0 +1,152 @@
+/// <reference types="vitest" />
+import { describe, it, expect } from 'vitest'
+import { AiBusyError, AiScheduler, forEachLimit, type AiSchedulerOptions } from './scheduler'
+
+const defaults: AiSchedulerOptions = {
+  maxConcurrent: 2,
+  maxPerUser: 1,
+  maxQueue: 10,
+  maxQueuedPerUser: 5,
+  queueTimeoutMs: 1_000,
+  maxRetries: 2,
+  retryBaseMs: 1,
+  retryMaxMs: 2,
+}
+
+function deferred<T = string>() {
+  let resolve!: (v: T) => void
+  const promise = new Promise<T>((r) => { resolve = r })
+  return { promise, resolve }
+}
+
+const tick = () => new Promise((r) => setTimeout(r, 0))
+
+describe('AiScheduler', () => {
+  it('limits concurrency per user and serves users round-robin', async () => {
+    const s = new AiScheduler(defaults)
+    const order: string[] = []
+    const gates = new Map<string, ReturnType<typeof deferred>>()
+    const job = (id: string) => () => {
+      order.push(id)
+      const d = deferred()
+      gates.set(id, d)
+      return d.promise
+    }
+    const all = [
+      s.run('alice', job('a1')),
+      s.run('alice', job('a2')),
+      s.run('alice', job('a3')),
+      s.run('bob', job('b1')),
+      s.run('bob', job('b2')),
+    ]
+    await tick()
+    expect(order).toEqual(['a1', 'b1'])
+    expect(s.metrics.queueDepth).toBe(3)
+
+    gates.get('a1')!.resolve('ok')
+    await tick()
+    gates.get('b1')!.resolve('ok')
+    await tick()
+    expect(order).toEqual(['a1', 'b1', 'a2', 'b2'])
+
+    gates.get('a2')!.resolve('ok')
+    gates.get('b2')!.resolve('ok')
+    await tick()
+    gates.get('a3')!.resolve('ok')
+    await Promise.all(all)
+    expect(s.metrics).toMatchObject({ active: 0, queueDepth: 0, completed: 5 })
+  })
+
+  it('coalesces identical in-flight requests', async () => {
+    const s = new AiScheduler(defaults)
+    let calls = 0
+    const d = deferred()
+    const task = () => { calls++; return d.promise }
+    const first = s.run('alice', task, { coalesceKey: 'k' })
+    const second = s.run('bob', task, { coalesceKey: 'k' })
+    d.resolve('merged')
+    expect(await Promise.all([first, second])).toEqual(['merged', 'merged'])
+    expect(calls).toBe(1)
+    expect(s.metrics.coalesced).toBe(1)
+  })
+
+  it('rejects with Retry-After when the queue is full', async () => {
+    const s = new AiScheduler({ ...defaults, maxConcurrent: 1, maxQueue: 1 })
+    const d = deferred()
+    const running = s.run('alice', () => d.promise)
+    const queued = s.run('bob', () => Promise.resolve('ok'))
+    const err = await s.run('carol', () => Promise.resolve('ok')).catch((e) => e)
+    expect(err).toBeInstanceOf(AiBusyError)
+    expect(err.status).toBe(503)
+    expect(err.retryAfterSec).toBeGreaterThanOrEqual(1)
+    d.resolve('ok')
+    await Promise.all([running, queued])
+  })
+
+  it('fails queued calls past their deadline', async () => {
+    const s = new AiScheduler({ ...defaults, maxConcurrent: 1, queueTimeoutMs: 10 })
+    const d = deferred()
+    const running = s.run('alice', () => d.promise)
+    const err = await s.run('bob', () => Promise.resolve('ok')).catch((e) => e)
+    expect(err).toBeInstanceOf(AiBusyError)
+    expect(s.metrics.timedOut).toBe(1)
+    d.resolve('ok')
+    await running
+  })
+
+  it('retries throttling and gives up as 503', async () => {
+    const s = new AiScheduler(defaults)
+    const throttle = Object.assign(new Error('slow down'), { name: 'ThrottlingException' })
+    let attempts = 0
+    expect(await s.run('alice', async () => {
+      if (++attempts < 3) throw throttle
+      return 'ok'
+    })).toBe('ok')
+    expect(s.metrics.retries).toBe(2)
+
+    const err = await s.run('alice', async () => { throw throttle }).catch((e) => e)
+    expect(err).toBeInstanceOf(AiBusyError)
+    expect(err.status).toBe(503)
+  })
+})
+
+describe('forEachLimit', () => {
+  it('keeps at most `limit` calls in flight and visits every item', async () => {
+    let inFlight = 0
+    let peak = 0
+    const seen: number[] = []
+    await forEachLimit([1, 2, 3, 4, 5, 6, 7], 3, async (n) => {
+      peak = Math.max(peak, ++inFlight)
+      await new Promise((r) => setTimeout(r, 1))
+      seen.push(n)
+      inFlight--
+    })
+    expect(peak).toBe(3)
+    expect(seen.sort()).toEqual([1, 2, 3, 4, 5, 6, 7])
+  })
+})
+
+describe('AiScheduler per-call user limit', () => {
+  it('lets a batch run more than the default per-user limit', async () => {
+    const s = new AiScheduler({ ...defaults, maxConcurrent: 8, maxPerUser: 1 })
+    const gates = [deferred(), deferred(), deferred()]
+    const runs = gates.map((g) => s.run('alice', () => g.promise, { maxPerUser: 3 }))
+    await tick()
+    expect(s.metrics.active).toBe(3)
+    gates.forEach((g) => g.resolve('ok'))
+    await Promise.all(runs)
+  })
+
+  it('caps the override at half the global slots', async () => {
+    const s = new AiScheduler({ ...defaults, maxConcurrent: 8, maxPerUser: 2 })
+    expect(s.userLimit(6)).toBe(4)
+    expect(s.userLimit(1)).toBe(2)
+    const gates = Array.from({ length: 6 }, () => deferred())
+    const runs = gates.map((g) => s.run('alice', () => g.promise, { maxPerUser: 6 }))
+    await tick()
+    expect(s.metrics.active).toBe(4)
+    expect(s.metrics.queueDepth).toBe(2)
+    gates.forEach((g) => g.resolve('ok'))
+    await Promise.all(runs)
+  })
+})
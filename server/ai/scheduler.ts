@@ -0,0 +1,270 @@
+// Admission control in front of the AI provider. During rounds dozens of
+// generate calls arrive at once; instead of sending them all to Bedrock (and
+// turning its throttling into 500s) the scheduler:
+// - runs at most `maxConcurrent` calls, and `maxPerUser` per user;
+// - queues the rest per user and serves users round-robin, so one user
+//   dictating a whole list cannot starve everyone else;
+// - fails a queued call once it has waited `queueTimeoutMs`;
+// - shares one call between identical in-flight requests (`coalesceKey`);
+// - retries throttled calls with full-jitter exponential backoff;
+// - rejects immediately with AiBusyError (status + Retry-After) once the
+//   queue is full, rather than letting requests pile up.
+
+export class AiBusyError extends Error {
+  constructor(public status: 429 | 503, message: string, public retryAfterSec: number) {
+    super(message);
+    this.name = 'AiBusyError';
+  }
+}
+
+export type AiSchedulerOptions = {
+  maxConcurrent: number;
+  maxPerUser: number;
+  maxQueue: number;
+  maxQueuedPerUser: number;
+  queueTimeoutMs: number;
+  maxRetries: number;
+  retryBaseMs: number;
+  retryMaxMs: number;
+  isThrottle?: (err: any) => boolean;
+};
+
+export type AiSchedulerMetrics = {
+  active: number;
+  queueDepth: number;
+  maxQueueDepth: number;
+  started: number;
+  completed: number;
+  failed: number;
+  coalesced: number;
+  rejectedFull: number;
+  timedOut: number;
+  throttled: number;
+  retries: number;
+  waitMsP50: number;
+  waitMsP95: number;
+  waitMsMax: number;
+  avgRunMs: number;
+};
+
+export type AiRunOptions = {
+  // Identical requests with the same key share one call while it is in flight.
+  coalesceKey?: string;
+  queueTimeoutMs?: number;
+  // Per-user limit for this call, e.g. a whole-list batch the user asked
+  // for; capped by userLimit().
+  maxPerUser?: number;
+};
+
+type Waiter = {
+  enqueuedAt: number;
+  maxPerUser: number;
+  timer: NodeJS.Timeout;
+  start: (release: () => void) => void;
+};
+
+const WAIT_SAMPLES = 200;
+
+export function isThrottleError(err: any): boolean {
+  const name = err?.name || err?.code;
+  return name === 'ThrottlingException'
+    || name === 'TooManyRequestsException'
+    || name === 'ServiceUnavailableException'
+    || err?.$metadata?.httpStatusCode === 429;
+}
+
+const sleep = (ms: number) => new Promise((resolve) => setTimeout(resolve, ms));
+
+export class AiScheduler {
+  private active = 0;
+  private activeByUser = new Map<string, number>();
+  // Map iteration order is the round-robin order; a served user moves to the back.
+  private queues = new Map<string, Waiter[]>();
+  private queued = 0;
+  private inflight = new Map<string, Promise<any>>();
+  private waits: number[] = [];
+  private counters = {
+    maxQueueDepth: 0, started: 0, completed: 0, failed: 0, coalesced: 0,
+    rejectedFull: 0, timedOut: 0, throttled: 0, retries: 0,
+  };
+  private avgRunMs = 0;
+
+  constructor(private opts: AiSchedulerOptions) {}
+
+  get metrics(): AiSchedulerMetrics {
+    const sorted = [...this.waits].sort((a, b) => a - b);
+    const pct = (p: number) => (sorted.length ? sorted[Math.min(sorted.length - 1, Math.floor(sorted.length * p))] : 0);
+    return {
+      active: this.active,
+      queueDepth: this.queued,
+      ...this.counters,
+      waitMsP50: pct(0.5),
+      waitMsP95: pct(0.95),
+      waitMsMax: sorted.length ? sorted[sorted.length - 1] : 0,
+      avgRunMs: Math.round(this.avgRunMs),
+    };
+  }
+
+  run<T>(userId: string, task: () => Promise<T>, options: AiRunOptions = {}): Promise<T> {
+    const { coalesceKey } = options;
+    if (coalesceKey) {
+      const existing = this.inflight.get(coalesceKey);
+      if (existing) {
+        this.counters.coalesced++;
+        return existing;
+      }
+    }
+    const maxPerUser = options.maxPerUser !== undefined ? this.userLimit(options.maxPerUser) : this.opts.maxPerUser;
+    const promise = this.acquire(userId, maxPerUser, options.queueTimeoutMs ?? this.opts.queueTimeoutMs)
+      .then(async (release) => {
+        try {
+          return await this.withRetries(task);
+        } finally {
+          release();
+        }
+      });
+    if (coalesceKey) {
+      this.inflight.set(coalesceKey, promise);
+      const forget = () => {
+        if (this.inflight.get(coalesceKey) === promise) this.inflight.delete(coalesceKey);
+      };
+      promise.then(forget, forget);
+    }
+    return promise;
+  }
+
+  // Per-user limit a caller may ask for (e.g. a whole-list batch), capped at
+  // half the global slots so one user's batch cannot crowd everyone out.
+  userLimit(requested: number): number {
+    return Math.max(this.opts.maxPerUser, Math.min(requested, Math.floor(this.opts.maxConcurrent / 2)));
+  }
+
+  // Seconds until a slot is likely free, from queue length and recent call time.
+  retryAfterSec(): number {
+    const perCallSec = (this.avgRunMs || 2_000) / 1000;
+    const ahead = (this.queued + this.active) / Math.max(1, this.opts.maxConcurrent);
+    return Math.min(60, Math.max(1, Math.ceil(ahead * perCallSec)));
+  }
+
+  private acquire(userId: string, maxPerUser: number, queueTimeoutMs: number): Promise<() => void> {
+    // A user with waiters is at their limit, so a new call queues behind them.
+    if (!this.queues.has(userId) && this.canStart(userId, maxPerUser)) {
+      this.recordWait(0);
+      return Promise.resolve(this.occupy(userId));
+    }
+    const queue = this.queues.get(userId) ?? [];
+    if (this.queued >= this.opts.maxQueue) {
+      this.counters.rejectedFull++;
+      return Promise.reject(new AiBusyError(503, 'AI service is busy. Please try again shortly.', this.retryAfterSec()));
+    }
+    if (queue.length >= this.opts.maxQueuedPerUser) {
+      this.counters.rejectedFull++;
+      return Promise.reject(new AiBusyError(429, 'Too many AI requests in progress. Please wait for some to finish.', this.retryAfterSec()));
+    }
+
+    return new Promise((resolve, reject) => {
+      const waiter: Waiter = {
+        enqueuedAt: Date.now(),
+        maxPerUser,
+        start: resolve,
+        timer: setTimeout(() => {
+          const q = this.queues.get(userId);
+          const i = q ? q.indexOf(waiter) : -1;
+          if (!q || i < 0) return;
+          q.splice(i, 1);
+          if (q.length === 0) this.queues.delete(userId);
+          this.queued--;
+          this.counters.timedOut++;
+          this.recordWait(Date.now() - waiter.enqueuedAt);
+          reject(new AiBusyError(503, 'Timed out waiting for the AI service. Please try again.', this.retryAfterSec()));
+        }, queueTimeoutMs),
+      };
+      waiter.timer.unref?.();
+      queue.push(waiter);
+      this.queues.set(userId, queue);
+      this.queued++;
+      this.counters.maxQueueDepth = Math.max(this.counters.maxQueueDepth, this.queued);
+    });
+  }
+
+  private canStart(userId: string, maxPerUser: number): boolean {
+    return this.active < this.opts.maxConcurrent
+      && (this.activeByUser.get(userId) ?? 0) < maxPerUser;
+  }
+
+  private occupy(userId: string): () => void {
+    this.active++;
+    this.activeByUser.set(userId, (this.activeByUser.get(userId) ?? 0) + 1);
+    this.counters.started++;
+    let released = false;
+    return () => {
+      if (released) return;
+      released = true;
+      this.active--;
+      const n = (this.activeByUser.get(userId) ?? 1) - 1;
+      if (n > 0) this.activeByUser.set(userId, n);
+      else this.activeByUser.delete(userId);
+      this.drain();
+    };
+  }
+
+  // Hand free slots to waiting users, one call per user per pass.
+  private drain() {
+    let progressed = true;
+    while (progressed && this.active < this.opts.maxConcurrent) {
+      progressed = false;
+      for (const [userId, queue] of Array.from(this.queues)) {
+        if (this.active >= this.opts.maxConcurrent) break;
+        if (!this.canStart(userId, queue[0].maxPerUser)) continue;
+        const waiter = queue.shift()!;
+        this.queues.delete(userId);
+        if (queue.length) this.queues.set(userId, queue);
+        this.queued--;
+        clearTimeout(waiter.timer);
+        this.recordWait(Date.now() - waiter.enqueuedAt);
+        waiter.start(this.occupy(userId));
+        progressed = true;
+      }
+    }
+  }
+
+  // The slot is held across backoff so retries do not add load.
+  private async withRetries<T>(task: () => Promise<T>): Promise<T> {
+    const isThrottle = this.opts.isThrottle ?? isThrottleError;
+    for (let attempt = 0; ; attempt++) {
+      const started = Date.now();
+      try {
+        const result = await task();
+        this.avgRunMs = this.avgRunMs ? this.avgRunMs * 0.9 + (Date.now() - started) * 0.1 : Date.now() - started;
+        this.counters.completed++;
+        return result;
+      } catch (err) {
+        if (!isThrottle(err)) {
+          this.counters.failed++;
+          throw err;
+        }
+        this.counters.throttled++;
+        if (attempt >= this.opts.maxRetries) {
+          this.counters.failed++;
+          throw new AiBusyError(503, 'Request throttled by Nova Micro. Please try again later.', this.retryAfterSec());
+        }
+        this.counters.retries++;
+        await sleep(Math.random() * Math.min(this.opts.retryMaxMs, this.opts.retryBaseMs * 2 ** attempt));
+      }
+    }
+  }
+
+  private recordWait(ms: number) {
+    this.waits.push(ms);
+    if (this.waits.length > WAIT_SAMPLES) this.waits.shift();
+  }
+}
+
+// Run fn over items with at most `limit` in flight; resolves when all settle.
+export async function forEachLimit<T>(items: T[], limit: number, fn: (item: T) => Promise<void>): Promise<void> {
+  let next = 0;
+  const worker = async () => {
+    while (next < items.length) await fn(items[next++]);
+  };
+  await Promise.all(Array.from({ length: Math.max(1, Math.min(limit, items.length)) }, worker));
+}
@@ -1,5 +1,6 @@
 import type { RequestHandler } from "express";
 import { isAuth0Authenticated, getAuth0UserId } from './auth0.js';
+import { storage } from './storage.js';
 
 function extractAuth0UserFromCookie(req: any): { sub: string; email?: string; name?: string; picture?: string } | null {
   try {
@@ -218,3 +219,19 @@ export const getCurrentUserId = (req: any): string => {
   
   throw new Error("User not authenticated");
 };
+
+// Makes sure the requesting user has a users row before handlers write rows
+// that reference it. Run after requireAuth/optionalAuth; known ids are cached
+// in storage, so steady-state requests do no user queries at all.
+export const ensureUser = (
+  resolveUserId: (req: any) => string = getCurrentUserId,
+  profile?: Record<string, any>,
+): RequestHandler => async (req: any, res, next) => {
+  try {
+    await storage.ensureUser(resolveUserId(req), profile);
+    next();
+  } catch (error) {
+    console.error("Error ensuring user:", error);
+    res.status(500).json({ message: "Failed to initialize user" });
+  }
+};
@@ -3,6 +3,7 @@ import express, { type Request, Response, NextFunction } from "express";
 import { createServer, type Server } from "http";
 import session from "express-session";
 import { storage } from "./storage.ts";
+import { ensureUser } from "./auth.ts";
 import { setupVite, serveStatic, log } from "./vite.ts";
 import { applyDevelopmentSecurity } from "./security.js";
 import { 
@@ -114,6 +115,7 @@ app.use((req, res, next) => {
 
 // Apply mock authentication to all routes
 app.use(mockAuth);
+app.use('/api', ensureUser(getMockUserId, DEV_USER));
 
 // Auth routes (mock responses)
 app.get('/api/auth/user', async (req: any, res) => {
@@ -421,7 +423,8 @@ app.post("/api/ai/medications", async (req, res) => {
     const response = await callNovaMicro({
       systemPrompt,
       userMessage: dictation,
-      temperature: 0
+      temperature: 0,
+      userId: getMockUserId()
     });
 
     const sanitize = (t: string) => (
@@ -461,7 +464,8 @@ app.post("/api/ai/labs", async (req, res) => {
     const response = await callNovaMicro({
       systemPrompt,
       userMessage: dictation,
-      temperature: 0
+      temperature: 0,
+      userId: getMockUserId()
     });
 
     const sanitize = (t: string) => (
@@ -498,7 +502,8 @@ app.post("/api/ai/pmh", async (req, res) => {
     const response = await callNovaMicro({
       systemPrompt,
       userMessage: dictation,
-      temperature: 0
+      temperature: 0,
+      userId: getMockUserId()
     });
 
     const sanitize = (t: string) => (
@@ -523,18 +528,6 @@ app.get("/api/smart-phrases", async (req, res) => {
   try {
     const userId = getMockUserId();
     
-    // Ensure user exists
-    let user = await storage.getUser(userId);
-    if (!user) {
-      user = await storage.createUser({
-        id: userId,
-        email: "doctor@hospital.com",
-        firstName: "Dr. Sarah",
-        lastName: "Mitchell",
-        specialty: "Emergency Medicine"
-      });
-    }
-    
     const query = req.query.q as string;
     
     // Helper to project DB elements into client-friendly type/options
@@ -577,18 +570,6 @@ app.post("/api/smart-phrases", async (req, res) => {
   try {
     const userId = getMockUserId();
     
-    // Ensure user exists
-    let user = await storage.getUser(userId);
-    if (!user) {
-      user = await storage.createUser({
-        id: userId,
-        email: "doctor@hospital.com",
-        firstName: "Dr. Sarah",
-        lastName: "Mitchell",
-        specialty: "Emergency Medicine"
-      });
-    }
-    
     // Accept client payload with type/options and convert to elements
     const body = { ...req.body } as any;
     if (!body.trigger && typeof body.name === 'string') {
@@ -647,18 +628,6 @@ app.put("/api/smart-phrases/:id", async (req, res) => {
   try {
     const userId = getMockUserId();
     
-    // Ensure user exists
-    let user = await storage.getUser(userId);
-    if (!user) {
-      user = await storage.createUser({
-        id: userId,
-        email: "doctor@hospital.com",
-        firstName: "Dr. Sarah",
-        lastName: "Mitchell",
-        specialty: "Emergency Medicine"
-      });
-    }
-    
     const { id } = req.params;
     // Accept client payload with type/options and convert to elements when present
     const body = { ...req.body } as any;
@@ -717,18 +686,6 @@ app.delete("/api/smart-phrases/:id", async (req, res) => {
   try {
     const userId = getMockUserId();
     
-    // Ensure user exists
-    let user = await storage.getUser(userId);
-    if (!user) {
-      user = await storage.createUser({
-        id: userId,
-        email: "doctor@hospital.com",
-        firstName: "Dr. Sarah",
-        lastName: "Mitchell",
-        specialty: "Emergency Medicine"
-      });
-    }
-    
     const { id } = req.params;
     await storage.deleteSmartPhrase(id);
     res.json({ message: "Smart phrase deleted successfully" });
@@ -742,18 +699,6 @@ app.post("/api/smart-phrases/import/:shareableId", async (req: any, res) => {
   try {
     const userId = getMockUserId();
     
-    // Ensure user exists
-    let user = await storage.getUser(userId);
-    if (!user) {
-      user = await storage.createUser({
-        id: userId,
-        email: "doctor@hospital.com",
-        firstName: "Dr. Sarah",
-        lastName: "Mitchell",
-        specialty: "Emergency Medicine"
-      });
-    }
-    
     const { shareableId } = req.params;
 
     if (!shareableId || !shareableId.trim()) {
@@ -788,18 +733,6 @@ app.get("/api/teams", async (req, res) => {
 app.post("/api/teams/create", async (req, res) => {
   try {
     const userId = getMockUserId();
-    try {
-      let user = await storage.getUser(userId);
-      if (!user) {
-        await storage.createUser({
-          id: userId,
-          email: DEV_USER.email,
-          firstName: DEV_USER.firstName,
-          lastName: DEV_USER.lastName,
-          specialty: DEV_USER.specialty
-        } as any);
-      }
-    } catch {}
     const { name, description } = req.body;
 
     if (!name || !name.trim()) {
@@ -945,10 +878,6 @@ app.get('/api/autocomplete-items', async (req, res) => {
 app.post('/api/autocomplete-items', async (req, res) => {
   try {
     const userId = getMockUserId();
-    try {
-      let user = await storage.getUser(userId);
-      if (!user) await storage.createUser({ id: userId } as any);
-    } catch {}
     const body = req.body || {};
     const text = body.term || body.text || '';
     const category = body.category || 'general';
@@ -1039,18 +968,6 @@ app.delete("/api/calendar/:id", async (req, res) => {
 app.post("/api/init", async (req, res) => {
   try {
     const userId = getMockUserId();
-    // Ensure user exists before creating default content that references the user
-    let user = await storage.getUser(userId);
-    if (!user) {
-      user = await storage.createUser({
-        id: userId,
-        email: "doctor@hospital.com",
-        firstName: "Dr. Sarah",
-        lastName: "Mitchell",
-        specialty: "Emergency Medicine",
-      });
-    }
-    
     // Check if default templates already exist
     const existingDefaultTemplates = await storage.getNoteTemplates();
     const currentDefaultTemplates = existingDefaultTemplates.filter(t => t.isDefault);
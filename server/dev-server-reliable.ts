@@ -405,7 +405,8 @@ app.post("/api/ai/medications", async (req, res) => {
     const response = await callNovaMicro({
       systemPrompt: MEDICATIONS_SYSTEM_PROMPT,
       userMessage: dictation,
-      temperature: 0
+      temperature: 0,
+      userId: getDevUserId()
     });
 
     const sanitize = (t: string) => (
@@ -0,0 +1,63 @@
+import type { Express } from "express";
+import { monitorEventLoopDelay } from "perf_hooks";
+import { sql } from "drizzle-orm";
+import { db } from "./db.js";
+import { runListPrecreateMetrics } from "./run-list-precreate.js";
+import { jobMetrics } from "./jobs.js";
+import { novaCache, novaScheduler } from "./ai/nova.js";
+import { transcribeMetrics } from "./transcribe.js";
+
+// Process diagnostics for soak tests (testsprite_tests/harness soak).
+// Only mounted when ENABLE_DIAGNOSTICS=1; never enable it on a public deployment.
+export function registerDiagnostics(app: Express) {
+  if (process.env.ENABLE_DIAGNOSTICS !== '1') return;
+
+  const loopDelay = monitorEventLoopDelay({ resolution: 20 });
+  loopDelay.enable();
+
+  app.get('/api/__diagnostics', async (_req, res) => {
+    const mem = process.memoryUsage();
+    // Histogram values are in nanoseconds; report ms since the previous sample.
+    const toMs = (ns: number) => Math.round(ns / 1e4) / 100;
+    const eventLoopDelayMs = {
+      mean: toMs(loopDelay.mean || 0),
+      p50: toMs(loopDelay.percentile(50)),
+      p99: toMs(loopDelay.percentile(99)),
+      max: toMs(loopDelay.max),
+    };
+    loopDelay.reset();
+
+    let dbConnections: Record<string, number> | null = null;
+    try {
+      const result: any = await db.execute(sql`
+        SELECT coalesce(state, 'unknown') AS state, count(*)::int AS count
+        FROM pg_stat_activity
+        WHERE datname = current_database()
+        GROUP BY 1`);
+      const rows: any[] = Array.isArray(result) ? result : (result?.rows ?? []);
+      dbConnections = Object.fromEntries(rows.map((r) => [r.state, Number(r.count)]));
+    } catch {}
+
+    res.json({
+      pid: process.pid,
+      uptimeSec: Math.round(process.uptime()),
+      memory: {
+        rss: mem.rss,
+        heapUsed: mem.heapUsed,
+        heapTotal: mem.heapTotal,
+        external: mem.external,
+        arrayBuffers: mem.arrayBuffers,
+      },
+      eventLoopDelayMs,
+      activeResources: typeof (process as any).getActiveResourcesInfo === 'function'
+        ? (process as any).getActiveResourcesInfo().length
+        : null,
+      dbConnections,
+      runListPrecreate: runListPrecreateMetrics,
+      jobs: jobMetrics,
+      novaCache: novaCache?.metrics ?? null,
+      aiScheduler: novaScheduler.metrics,
+      transcribe: transcribeMetrics,
+    });
+  });
+}
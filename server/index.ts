@@ -3,6 +3,9 @@ import express, { type Request, Response, NextFunction } from "express";
 import { registerRoutes } from "./routes.js";
 import { storage } from "./storage.js";
 import { setupVite, serveStatic, log } from "./vite.js";
+import { registerDiagnostics } from "./diagnostics.js";
+import { JobScheduler } from "./jobs.js";
+import { precreateRunLists } from "./run-list-precreate.js";
 
 const app = express();
 app.use(express.json());
@@ -39,20 +42,57 @@ app.use((req, res, next) => {
 });
 
 (async () => {
+registerDiagnostics(app);
 const server = await registerRoutes(app);
 
-// Schedule periodic cleanup for expired run list data (every 6 hours)
-try {
-  const { storage } = await import('./storage.js');
-  setInterval(async () => { try { await (storage as any).cleanupExpiredRunListData?.(); } catch {} }, 6 * 60 * 60 * 1000);
-} catch {}
-  // Periodic cleanup of expired notes (every hour)
-  setInterval(async () => {
-    try {
-      const n = await storage.purgeExpiredNotes();
-      if (n > 0) log(`purged ${n} expired notes`);
-    } catch {}
-  }, 60 * 60 * 1000);
+  // Maintenance jobs: one instance runs each, via leases in scheduled_jobs.
+  const jobs = new JobScheduler(30_000, log);
+  const HOUR = 60 * 60 * 1000;
+  jobs.register({
+    name: 'run-list-cleanup',
+    intervalMs: 6 * HOUR,
+    jitterMs: 10 * 60 * 1000,
+    run: () => storage.cleanupExpiredRunListData(),
+  });
+  jobs.register({
+    name: 'purge-expired-notes',
+    intervalMs: HOUR,
+    jitterMs: 5 * 60 * 1000,
+    run: () => storage.purgeExpiredNotes(),
+  });
+  jobs.register({
+    name: 'delete-expired-teams',
+    intervalMs: HOUR,
+    jitterMs: 5 * 60 * 1000,
+    run: async () => ({ deleted: await storage.deleteExpiredTeams() }),
+  });
+  jobs.register({
+    name: 'purge-ai-cache',
+    intervalMs: HOUR,
+    jitterMs: 5 * 60 * 1000,
+    run: () => storage.purgeExpiredAiResponses(),
+  });
+  // Create the day's (empty) run list rows before the morning rush; the
+  // carry-forward clone stays on demand. Runs once a day at
+  // RUN_LIST_PRECREATE_HOUR (server local time, default 4). RUN_LIST_PRECREATE=0
+  // disables it.
+  if (process.env.RUN_LIST_PRECREATE !== '0') {
+    const precreateHour = parseInt(process.env.RUN_LIST_PRECREATE_HOUR || '4', 10);
+    jobs.register({
+      name: 'run-list-precreate',
+      intervalMs: 24 * HOUR,
+      jitterMs: 5 * 60 * 1000,
+      retryBaseMs: 5 * 60 * 1000,
+      maxBackoffMs: HOUR,
+      nextRunAt: (now) => {
+        const next = new Date(now.getFullYear(), now.getMonth(), now.getDate(), precreateHour);
+        if (next <= now) next.setDate(next.getDate() + 1);
+        return next;
+      },
+      run: () => precreateRunLists(new Date()),
+    });
+  }
+  await jobs.start();
 
   app.use((err: any, _req: Request, res: Response, _next: NextFunction) => {
     const status = err.status || err.statusCode || 500;
@@ -0,0 +1,233 @@
+import { randomUUID } from "crypto";
+import { sql } from "drizzle-orm";
+import { db } from "./db.js";
+
+// Durable maintenance jobs shared by every server instance. Each job has a
+// row in scheduled_jobs holding its next due time and a lease. An instance
+// claims a due job with FOR UPDATE SKIP LOCKED and a lease, renews the lease
+// while the job runs (heartbeat), and on completion sets the next due time:
+// the regular schedule plus jitter on success, exponential backoff on
+// failure. Exactly one instance runs each due job, and schedules survive
+// restarts. A crashed instance's lease simply expires and another takes over.
+
+export type JobDefinition = {
+  name: string;
+  intervalMs: number;
+  // Random delay added to every next run so instances and jobs spread out.
+  jitterMs?: number;
+  // How long a claim is valid without a heartbeat.
+  leaseMs?: number;
+  // First retry delay after a failure; doubles per consecutive failure.
+  retryBaseMs?: number;
+  maxBackoffMs?: number;
+  // Override the regular schedule (e.g. daily at a fixed hour).
+  nextRunAt?: (now: Date) => Date;
+  run: () => Promise<unknown>;
+};
+
+export type JobMetrics = {
+  runs: number;
+  failures: number;
+  consecutiveFailures: number;
+  running: boolean;
+  lastStartedAt: string | null;
+  lastDurationMs: number | null;
+  lastStatus: 'ok' | 'error' | null;
+  lastError: string | null;
+  lastResult: unknown;
+};
+
+// Per-job metrics for runs on this instance; the table has the cluster view.
+export const jobMetrics: Record<string, JobMetrics> = {};
+
+export const JOBS_TABLE_SQL = `
+  CREATE TABLE IF NOT EXISTS scheduled_jobs (
+    name VARCHAR(100) PRIMARY KEY,
+    next_run_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+    locked_by VARCHAR(100),
+    locked_until TIMESTAMPTZ,
+    consecutive_failures INTEGER NOT NULL DEFAULT 0,
+    last_started_at TIMESTAMPTZ,
+    last_finished_at TIMESTAMPTZ,
+    last_status VARCHAR(10),
+    last_error TEXT,
+    last_duration_ms INTEGER,
+    last_result JSONB,
+    runs INTEGER NOT NULL DEFAULT 0,
+    failures INTEGER NOT NULL DEFAULT 0
+  );
+`;
+
+const rowsOf = (result: any): any[] => (Array.isArray(result) ? result : (result?.rows ?? []));
+const leaseOf = (def: JobDefinition) => def.leaseMs ?? 5 * 60_000;
+
+export function backoffMs(def: JobDefinition, consecutiveFailures: number): number {
+  const base = def.retryBaseMs ?? 60_000;
+  const max = def.maxBackoffMs ?? def.intervalMs;
+  return Math.min(max, base * 2 ** Math.max(0, consecutiveFailures - 1));
+}
+
+export class JobScheduler {
+  readonly instanceId = `${process.pid}-${randomUUID().slice(0, 8)}`;
+  private jobs = new Map<string, JobDefinition>();
+  // Replaceable in tests, like storage.db.
+  public db: { execute: (query: any) => Promise<any> } = db;
+  private timer: NodeJS.Timeout | null = null;
+  private ticking = false;
+  // Set once the table and job rows exist; until then every tick retries.
+  private ready = false;
+
+  constructor(private pollMs = 30_000, private log: (msg: string) => void = console.log) {}
+
+  register(def: JobDefinition) {
+    this.jobs.set(def.name, def);
+    jobMetrics[def.name] ??= {
+      runs: 0, failures: 0, consecutiveFailures: 0, running: false,
+      lastStartedAt: null, lastDurationMs: null, lastStatus: null, lastError: null, lastResult: null,
+    };
+  }
+
+  // The poll loop is scheduled even when setup fails (e.g. the database is
+  // briefly down at boot), so the jobs come up as soon as it is reachable.
+  async start() {
+    try {
+      await this.setup();
+    } catch (err) {
+      console.error('[jobs] Scheduler setup failed; retrying on the next poll:', err);
+    }
+    const loop = () => {
+      this.timer = setTimeout(async () => {
+        await this.tick();
+        loop();
+      }, this.pollMs + Math.random() * this.pollMs * 0.2);
+      this.timer.unref?.();
+    };
+    loop();
+  }
+
+  private async setup() {
+    await this.db.execute(sql.raw(JOBS_TABLE_SQL));
+    for (const def of Array.from(this.jobs.values())) {
+      // New jobs start after one jittered interval rather than all at boot.
+      await this.db.execute(sql`
+        INSERT INTO scheduled_jobs (name, next_run_at)
+        VALUES (${def.name}, ${this.scheduleNext(def, new Date())})
+        ON CONFLICT (name) DO NOTHING`);
+    }
+    this.ready = true;
+  }
+
+  stop() {
+    if (this.timer) clearTimeout(this.timer);
+    this.timer = null;
+  }
+
+  // Claim and run every due job this instance knows about, one at a time.
+  async tick() {
+    if (this.ticking) return;
+    this.ticking = true;
+    try {
+      if (!this.ready) await this.setup();
+      for (const def of Array.from(this.jobs.values())) {
+        const claimed = await this.claim(def);
+        if (claimed) await this.runClaimed(def, claimed.consecutiveFailures);
+      }
+    } catch (err) {
+      console.error('[jobs] Scheduler tick failed:', err);
+    } finally {
+      this.ticking = false;
+    }
+  }
+
+  private scheduleNext(def: JobDefinition, now: Date): Date {
+    const next = def.nextRunAt ? def.nextRunAt(now) : new Date(now.getTime() + def.intervalMs);
+    return new Date(next.getTime() + Math.random() * (def.jitterMs ?? 0));
+  }
+
+  // Take the job's lease if it is due and nobody holds it. SKIP LOCKED means
+  // instances polling at the same moment never queue behind each other.
+  private async claim(def: JobDefinition): Promise<{ consecutiveFailures: number } | null> {
+    const result = await this.db.execute(sql`
+      UPDATE scheduled_jobs SET
+        locked_by = ${this.instanceId},
+        locked_until = NOW() + (${leaseOf(def)}::int * INTERVAL '1 millisecond'),
+        last_started_at = NOW()
+      WHERE name = (
+        SELECT name FROM scheduled_jobs
+        WHERE name = ${def.name}
+          AND next_run_at <= NOW()
+          AND (locked_until IS NULL OR locked_until < NOW())
+        FOR UPDATE SKIP LOCKED
+      )
+      RETURNING consecutive_failures`);
+    const [row] = rowsOf(result);
+    return row ? { consecutiveFailures: Number(row.consecutive_failures) || 0 } : null;
+  }
+
+  private async runClaimed(def: JobDefinition, previousFailures: number) {
+    const m = jobMetrics[def.name];
+    const leaseMs = leaseOf(def);
+    const heartbeat = async () => {
+      try {
+        await this.db.execute(sql`
+          UPDATE scheduled_jobs SET locked_until = NOW() + (${leaseMs}::int * INTERVAL '1 millisecond')
+          WHERE name = ${def.name} AND locked_by = ${this.instanceId}`);
+      } catch {}
+    };
+    const beat = setInterval(heartbeat, Math.max(1_000, Math.floor(leaseMs / 3)));
+    beat.unref?.();
+
+    const started = Date.now();
+    m.running = true;
+    m.lastStartedAt = new Date(started).toISOString();
+    let status: 'ok' | 'error' = 'ok';
+    let error: string | null = null;
+    let result: unknown = null;
+    try {
+      result = await def.run();
+    } catch (err: any) {
+      status = 'error';
+      error = String(err?.message || err);
+      console.error(`[jobs] ${def.name} failed:`, err);
+    } finally {
+      clearInterval(beat);
+      m.running = false;
+    }
+
+    const durationMs = Date.now() - started;
+    m.runs++;
+    m.lastDurationMs = durationMs;
+    m.lastStatus = status;
+    m.lastError = error;
+    m.lastResult = result ?? null;
+    // Consecutive failures are tracked in the table, so backoff holds even
+    // when successive attempts land on different instances.
+    m.consecutiveFailures = status === 'ok' ? 0 : previousFailures + 1;
+    if (status === 'error') m.failures++;
+
+    const now = new Date();
+    const nextRunAt = status === 'ok'
+      ? this.scheduleNext(def, now)
+      : new Date(now.getTime() + backoffMs(def, m.consecutiveFailures) * (1 + Math.random() * 0.2));
+    try {
+      await this.db.execute(sql`
+        UPDATE scheduled_jobs SET
+          next_run_at = ${nextRunAt},
+          locked_by = NULL,
+          locked_until = NULL,
+          last_finished_at = NOW(),
+          last_status = ${status},
+          last_error = ${error},
+          last_duration_ms = ${durationMs},
+          last_result = ${JSON.stringify(result ?? null)}::jsonb,
+          runs = runs + 1,
+          failures = failures + ${status === 'ok' ? 0 : 1},
+          consecutive_failures = ${m.consecutiveFailures}
+        WHERE name = ${def.name} AND locked_by = ${this.instanceId}`);
+    } catch (err) {
+      // The lease expires on its own; another instance will pick the job up.
+      console.error(`[jobs] Failed to record ${def.name} run:`, err);
+    }
+    this.log(`job ${def.name} ${status} in ${durationMs}ms`);
+  }
+}
@@ -0,0 +1,58 @@
+/// <reference types="vitest" />
+import { describe, it, expect } from 'vitest'
+import { LruCache, WriteClock } from './lru-cache'
+
+describe('LruCache', () => {
+  it('evicts the least recently used key beyond maxEntries', () => {
+    const cache = new LruCache<string, number>(2)
+    cache.set('a', 1)
+    cache.set('b', 2)
+    expect(cache.get('a')).toBe(1)
+    cache.set('c', 3)
+    expect(cache.get('b')).toBeUndefined()
+    expect(cache.get('a')).toBe(1)
+    expect(cache.get('c')).toBe(3)
+    expect(cache.size).toBe(2)
+  })
+
+  it('expires entries after the TTL', () => {
+    const cache = new LruCache<string, number>(10, 1000)
+    cache.set('a', 1, 0)
+    expect(cache.get('a', 500)).toBe(1)
+    expect(cache.get('a', 1500)).toBeUndefined()
+    expect(cache.size).toBe(0)
+  })
+
+  it('deletes and clears', () => {
+    const cache = new LruCache<string, number>(10)
+    cache.set('a', 1)
+    cache.set('b', 2)
+    cache.delete('a')
+    expect(cache.get('a')).toBeUndefined()
+    cache.clear()
+    expect(cache.size).toBe(0)
+  })
+})
+
+describe('WriteClock', () => {
+  it('flags writes made after a snapshot', () => {
+    const writes = new WriteClock<string>(10)
+    const before = writes.snapshot()
+    writes.bump('a')
+    expect(writes.changedSince('a', before)).toBe(true)
+    expect(writes.changedSince('b', before)).toBe(false)
+    expect(writes.changedSince('a', writes.snapshot())).toBe(false)
+  })
+
+  it('stays bounded and treats forgotten keys as possibly changed', () => {
+    const writes = new WriteClock<string>(2)
+    const before = writes.snapshot()
+    for (const key of ['a', 'b', 'c', 'd']) writes.bump(key)
+    expect(writes.size).toBe(2)
+    expect(writes.changedSince('a', before)).toBe(true)
+    writes.forget('d')
+    expect(writes.size).toBe(1)
+    expect(writes.changedSince('d', before)).toBe(true)
+    expect(writes.changedSince('d', writes.snapshot())).toBe(false)
+  })
+})
@@ -0,0 +1,79 @@
+// Small in-process LRU with an optional TTL. Map iteration order is insertion
+// order, so re-inserting on read keeps the least recently used key first.
+export class LruCache<K, V> {
+  private entries = new Map<K, { value: V; expiresAt: number }>();
+
+  constructor(private maxEntries: number, private ttlMs = Infinity) {}
+
+  get size() {
+    return this.entries.size;
+  }
+
+  get(key: K, now = Date.now()): V | undefined {
+    const entry = this.entries.get(key);
+    if (!entry) return undefined;
+    this.entries.delete(key);
+    if (entry.expiresAt <= now) return undefined;
+    this.entries.set(key, entry);
+    return entry.value;
+  }
+
+  set(key: K, value: V, now = Date.now()) {
+    this.entries.delete(key);
+    this.entries.set(key, { value, expiresAt: now + this.ttlMs });
+    while (this.entries.size > this.maxEntries) {
+      const oldest = this.entries.keys().next().value as K;
+      this.entries.delete(oldest);
+    }
+  }
+
+  delete(key: K) {
+    this.entries.delete(key);
+  }
+
+  clear() {
+    this.entries.clear();
+  }
+}
+
+// Tells a cache whether a key was written while a value for it was being
+// loaded, in bounded memory. Take snapshot() before loading and ask
+// changedSince() before caching the result. Only the last `maxKeys` written
+// keys are remembered exactly; forgetting a key raises a floor that every
+// older snapshot fails against, so forgetting can only make a load look stale
+// (it is then not cached), never fresh.
+export class WriteClock<K> {
+  private clock = 0;
+  private floor = 0;
+  private writes = new Map<K, number>();
+
+  constructor(private maxKeys: number) {}
+
+  get size() {
+    return this.writes.size;
+  }
+
+  snapshot(): number {
+    return this.clock;
+  }
+
+  bump(key: K) {
+    this.writes.delete(key);
+    this.writes.set(key, ++this.clock);
+    while (this.writes.size > this.maxKeys) {
+      this.forget(this.writes.keys().next().value as K);
+    }
+  }
+
+  // Call when the cached value for `key` is dropped.
+  forget(key: K) {
+    const at = this.writes.get(key);
+    if (at === undefined) return;
+    this.writes.delete(key);
+    if (at > this.floor) this.floor = at;
+  }
+
+  changedSince(key: K, snapshot: number): boolean {
+    return (this.writes.get(key) ?? this.floor) > snapshot;
+  }
+}
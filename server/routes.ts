@@ -1,8 +1,9 @@
 import type { Express } from "express";
-import express from "express";
 import { createServer, type Server } from "http";
 import { storage } from "./storage.js";
-import { requireAuth, optionalAuth, getCurrentUserId } from "./auth.js";
+import type { UserLoader } from "./user-loader.js";
+import type { GeneratedRunListNote } from "./storage.js";
+import { requireAuth, optionalAuth, getCurrentUserId, ensureUser } from "./auth.js";
 import { verifyClerkToken, syncClerkUser, getClerkUserId } from "./clerkAuth.js";
 import { applySecurity, configureAuthRateLimit } from "./security.js";
 import session from "express-session";
@@ -25,10 +26,31 @@ import session from "express-session";
   runListNoteVersions
 } from "../shared/schema.js";
 import { z } from "zod";
-import { eq, or, and, lt, desc } from "drizzle-orm";
-import { MEDICATIONS_SYSTEM_PROMPT, LABS_SYSTEM_PROMPT, PMH_SYSTEM_PROMPT, RUNLIST_SOAP_SYSTEM_PROMPT, RUNLIST_PREROUND_SYSTEM_PROMPT, RUNLIST_POSTROUND_SYSTEM_PROMPT, RUNLIST_PROGRESS_SYSTEM_PROMPT } from "./ai/prompts.js";
-import { canonicalizeLab, canonicalizeVital, canonicalizeImagingType } from "./ai/canonical.js";
-import { callNovaMicro, isNovaConfigured } from "./ai/nova.js";
+import { eq, or, and, lt, desc, inArray } from "drizzle-orm";
+import { MEDICATIONS_SYSTEM_PROMPT, LABS_SYSTEM_PROMPT, PMH_SYSTEM_PROMPT } from "./ai/prompts.js";
+import { callNovaMicro, streamNovaMicro, isNovaConfigured, novaScheduler } from "./ai/nova.js";
+import { AiBusyError, forEachLimit } from "./ai/scheduler.js";
+import { beginUpload, streamTranscription, transcribeMetrics, TRANSCRIBE_MAX_BYTES, UploadError } from "./transcribe.js";
+import { buildClonedNote, coerceCarryForwardDefaults, type CloneStrategy } from "./run-list-clone.js";
+import { buildNotePrompt, mergeStructuredFacts, MergedNoteExtractor, nextNoteStatus, parseGeneratedNote, previousStructured } from "./run-list-ai.js";
+
+// Routes behind optionalAuth fall back to a shared default user.
+const defaultUserId = (req: any): string => req.user?.claims?.sub || 'default-user';
+
+// AI scheduler rejections (queue full, queue timeout, throttled) tell the
+// client when to come back instead of surfacing as a 500.
+const sendAiBusy = (res: any, error: AiBusyError) => {
+  res.set('Retry-After', String(error.retryAfterSec));
+  return res.status(error.status).json({ message: error.message, retryAfter: error.retryAfterSec });
+};
+
+// Nova calls in flight per whole-list generate request (at most half of
+// AI_MAX_CONCURRENT, see AiScheduler.userLimit).
+const AI_BATCH_CONCURRENCY = parseInt(process.env.AI_BATCH_CONCURRENCY || '6', 10);
+
+const sendSse = (res: any, event: string, data: unknown) => {
+  res.write(`event: ${event}\ndata: ${JSON.stringify(data)}\n\n`);
+};
 
 export async function registerRoutes(app: Express): Promise<Server> {
   // Apply security middleware first
@@ -198,20 +220,9 @@ export async function registerRoutes(app: Express): Promise<Server> {
   });
 
   // Initialize user endpoint
-  app.post("/api/init-user", requireAuth, async (req, res) => {
+  app.post("/api/init-user", requireAuth, ensureUser(), async (req, res) => {
     try {
-      const userId = getCurrentUserId(req);
-      // Ensure user exists
-      let user = await storage.getUser(userId);
-      if (!user) {
-        user = await storage.createUser({
-          id: userId,
-          email: "doctor@hospital.com",
-          firstName: "Dr. Sarah",
-          lastName: "Mitchell",
-          specialty: "Emergency Medicine"
-        });
-      }
+      const user = await storage.getUser(getCurrentUserId(req));
       res.json({ message: "User initialized", user });
     } catch (error) {
       console.error("Error initializing user:", error);
@@ -298,7 +309,7 @@ export async function registerRoutes(app: Express): Promise<Server> {
     }
   });
 
-  app.post("/api/note-templates", requireAuth, async (req, res) => {
+  app.post("/api/note-templates", requireAuth, ensureUser(), async (req, res) => {
     const startTime = Date.now();
     console.log("[POST /api/note-templates] Starting request handler");
     
@@ -318,28 +329,6 @@ export async function registerRoutes(app: Express): Promise<Server> {
       const userId = getCurrentUserId(req);
       console.log("[POST /api/note-templates] User ID extracted:", userId);
       
-      // Ensure user exists for FK constraints with timeout
-      console.log("[POST /api/note-templates] Checking user existence...");
-      let user = await Promise.race([
-        storage.getUser(userId),
-        new Promise((_, reject) => setTimeout(() => reject(new Error("Database timeout")), 5000))
-      ]) as any;
-      
-      if (!user) {
-        console.log("[POST /api/note-templates] User not found, creating new user");
-        user = await Promise.race([
-          storage.createUser({
-            id: userId,
-            email: "doctor@hospital.com",
-            firstName: "Dr. Sarah",
-            lastName: "Mitchell",
-            specialty: "Emergency Medicine",
-          }),
-          new Promise((_, reject) => setTimeout(() => reject(new Error("Create user timeout")), 5000))
-        ]);
-      }
-      console.log("[POST /api/note-templates] User verified", { userId });
-      
       console.log("[POST /api/note-templates] Parsing request body...");
       const templateData = insertNoteTemplateSchema.parse({ ...req.body, userId });
       console.log("[POST /api/note-templates] Schema validation passed");
@@ -452,20 +441,9 @@ export async function registerRoutes(app: Express): Promise<Server> {
     }
   });
 
-  app.post("/api/note-templates/import", requireAuth, async (req, res) => {
+  app.post("/api/note-templates/import", requireAuth, ensureUser(), async (req, res) => {
     try {
       const userId = getCurrentUserId(req);
-      // Ensure user exists for FK constraints
-      let user = await storage.getUser(userId);
-      if (!user) {
-        user = await storage.createUser({
-          id: userId,
-          email: "doctor@hospital.com",
-          firstName: "Dr. Sarah",
-          lastName: "Mitchell",
-          specialty: "Emergency Medicine",
-        });
-      }
       const { shareableId } = req.body;
 
       if (!shareableId || !shareableId.trim()) {
@@ -576,16 +554,28 @@ export async function registerRoutes(app: Express): Promise<Server> {
   });
 
   // File-based transcription endpoint (Soniox batch)
-  app.post('/api/transcribe', requireAuth, express.raw({ type: '*/*', limit: '50mb' }), async (req, res) => {
+  // The audio body is streamed through to Soniox (see transcribe.ts), never
+  // buffered, so concurrent long dictations cannot exhaust memory.
+  app.post('/api/transcribe', requireAuth, async (req, res) => {
+    let release: (() => void) | null = null;
     try {
       const apiKey = process.env.SONIOX_API_KEY;
       if (!apiKey) {
         return res.status(501).json({ message: 'SONIOX_API_KEY not configured' });
       }
-      const buf: Buffer = Buffer.isBuffer(req.body) ? req.body as Buffer : Buffer.from(req.body as any);
-      if (!buf || buf.length === 0) {
+      const declared = req.headers['content-length'] !== undefined ? Number(req.headers['content-length']) : null;
+      if (declared === 0) {
         return res.status(400).json({ message: 'Empty audio body' });
       }
+      if (declared !== null && declared > TRANSCRIBE_MAX_BYTES) {
+        transcribeMetrics.rejectedTooLarge++;
+        return res.status(413).json({ message: 'Audio exceeds upload limit' });
+      }
+      release = beginUpload();
+      if (!release) {
+        res.set('Retry-After', '5');
+        return res.status(503).json({ message: 'Too many transcriptions in progress. Please try again shortly.' });
+      }
       const mime = (req.query?.mime as string) || (req.headers['content-type'] as string) || 'application/octet-stream';
 
       // Map MIME to Soniox audio_format names
@@ -603,23 +593,16 @@ export async function registerRoutes(app: Express): Promise<Server> {
 
       // Soniox batch transcription API
       const endpoint = process.env.SONIOX_API_URL || 'https://api.soniox.com/speech-recognition/v2/recognize';
-      const audio_b64 = buf.toString('base64');
-      const reqBody = {
-        audio: audio_b64,
-        audio_format,
-        language: 'en',
-        enable_punctuation: true,
-        enable_inverse_text_normalization: true,
-        diarize: false
-      };
-
-      const r = await fetch(endpoint, {
-        method: 'POST',
-        headers: {
-          'Authorization': `Bearer ${apiKey}`,
-          'Content-Type': 'application/json'
-        },
-        body: JSON.stringify(reqBody)
+      const r = await streamTranscription(req, {
+        endpoint,
+        apiKey,
+        fields: {
+          audio_format,
+          language: 'en',
+          enable_punctuation: true,
+          enable_inverse_text_normalization: true,
+          diarize: false
+        }
       });
 
       if (!r.ok) {
@@ -638,8 +621,13 @@ export async function registerRoutes(app: Express): Promise<Server> {
 
       return res.json({ text });
     } catch (error) {
+      if (error instanceof UploadError) return res.status(error.status).json({ message: error.message });
       console.error('Error in /api/transcribe:', error);
       return res.status(500).json({ message: 'Failed to transcribe audio' });
+    } finally {
+      release?.();
+      // Discard whatever the client is still sending after an early reply
+      if (!req.complete) req.resume();
     }
   });
 
@@ -658,7 +646,8 @@ export async function registerRoutes(app: Express): Promise<Server> {
       const response = await callNovaMicro({
         systemPrompt,
         userMessage: dictation,
-        temperature: 0
+        temperature: 0,
+        userId: getCurrentUserId(req)
       });
 
       // Sanitize to ensure strict format and compatibility with reordering
@@ -676,6 +665,7 @@ export async function registerRoutes(app: Express): Promise<Server> {
       const text = sanitize(response.text);
       return res.json({ text });
     } catch (error: any) {
+      if (error instanceof AiBusyError) return sendAiBusy(res, error);
       console.error("Error in /api/ai/medications:", error);
       const message = error?.message || "Failed to process dictation";
       res.status(500).json({ message });
@@ -697,7 +687,8 @@ export async function registerRoutes(app: Express): Promise<Server> {
       const response = await callNovaMicro({
         systemPrompt,
         userMessage: dictation,
-        temperature: 0
+        temperature: 0,
+        userId: getCurrentUserId(req)
       });
 
       // Minimal sanitize: normalize CR, trim lines, keep punctuation/arrows
@@ -712,6 +703,7 @@ export async function registerRoutes(app: Express): Promise<Server> {
       const text = sanitize(response.text);
       return res.json({ text });
     } catch (error: any) {
+      if (error instanceof AiBusyError) return sendAiBusy(res, error);
       console.error("Error in /api/ai/labs:", error);
       const message = error?.message || "Failed to process dictation";
       res.status(500).json({ message });
@@ -733,7 +725,8 @@ export async function registerRoutes(app: Express): Promise<Server> {
       const response = await callNovaMicro({
         systemPrompt,
         userMessage: dictation,
-        temperature: 0
+        temperature: 0,
+        userId: getCurrentUserId(req)
       });
 
       // Minimal sanitize: normalize CR, trim trailing spaces; keep exact formatting otherwise
@@ -748,6 +741,7 @@ export async function registerRoutes(app: Express): Promise<Server> {
       const text = sanitize(response.text);
       return res.json({ text });
     } catch (error: any) {
+      if (error instanceof AiBusyError) return sendAiBusy(res, error);
       console.error("Error in /api/ai/pmh:", error);
       const message = error?.message || "Failed to process dictation";
       res.status(500).json({ message });
@@ -755,22 +749,10 @@ export async function registerRoutes(app: Express): Promise<Server> {
   });
 
   // Smart phrase routes
-  app.get("/api/smart-phrases", optionalAuth, async (req, res) => {
+  app.get("/api/smart-phrases", optionalAuth, ensureUser(defaultUserId), async (req, res) => {
     try {
       const userId = (req as any).user?.claims?.sub || 'default-user';
       
-      // Ensure user exists
-      let user = await storage.getUser(userId);
-      if (!user) {
-        user = await storage.createUser({
-          id: userId,
-          email: "doctor@hospital.com",
-          firstName: "Dr. Sarah",
-          lastName: "Mitchell",
-          specialty: "Emergency Medicine"
-        });
-      }
-      
       const query = req.query.q as string;
       
       // Helper to project DB elements into client-friendly type/options
@@ -809,22 +791,10 @@ export async function registerRoutes(app: Express): Promise<Server> {
     }
   });
 
-  app.post("/api/smart-phrases", optionalAuth, async (req, res) => {
+  app.post("/api/smart-phrases", optionalAuth, ensureUser(defaultUserId), async (req, res) => {
     try {
       const userId = (req as any).user?.claims?.sub || 'default-user';
       
-      // Ensure user exists
-      let user = await storage.getUser(userId);
-      if (!user) {
-        user = await storage.createUser({
-          id: userId,
-          email: "doctor@hospital.com",
-          firstName: "Dr. Sarah",
-          lastName: "Mitchell",
-          specialty: "Emergency Medicine"
-        });
-      }
-      
       // Accept client payload with type/options and convert to elements
       const body = { ...req.body } as any;
       if (!body.elements && body.type) {
@@ -887,9 +857,7 @@ export async function registerRoutes(app: Express): Promise<Server> {
           let code = r.shortCode;
           if (!code) {
             // Generate and persist
-            const gen = await (storage as any).generateUniqueShortCodeFor('smartPhrases');
-            await storage.updateSmartPhrase(r.id, { shortCode: gen } as any);
-            code = gen;
+            code = await storage.assignShortCode('smartPhrases', r.id);
           }
           codes.push(code as string);
         }
@@ -900,9 +868,7 @@ export async function registerRoutes(app: Express): Promise<Server> {
         for (const r of rows) {
           let code = (r as any).shortCode as string | null;
           if (!code) {
-            const gen = await (storage as any).generateUniqueShortCodeFor('noteTemplates');
-            await storage.updateNoteTemplate(r.id, { shortCode: gen } as any);
-            code = gen;
+            code = await storage.assignShortCode('noteTemplates', r.id);
           }
           codes.push(code as string);
         }
@@ -913,9 +879,7 @@ export async function registerRoutes(app: Express): Promise<Server> {
         for (const r of rows) {
           let code = (r as any).shortCode as string | null;
           if (!code) {
-            const gen = await (storage as any).generateUniqueShortCodeFor('autocompleteItems');
-            await storage.updateAutocompleteItem(r.id, { shortCode: gen } as any);
-            code = gen;
+            code = await storage.assignShortCode('autocompleteItems', r.id);
           }
           codes.push(code as string);
         }
@@ -928,23 +892,10 @@ export async function registerRoutes(app: Express): Promise<Server> {
     }
   });
 
-  app.post('/api/share/:type/import', requireAuth, async (req: any, res) => {
+  app.post('/api/share/:type/import', requireAuth, ensureUser(), async (req: any, res) => {
     // Ensure schema resiliency (cold starts / fresh envs)
     try { await storage.ensureCoreSchema(); } catch {}
     const userId = getCurrentUserId(req);
-    // Ensure user exists to satisfy FK constraints
-    try {
-      let user = await storage.getUser(userId);
-      if (!user) {
-        user = await storage.createUser({
-          id: userId,
-          email: "doctor@hospital.com",
-          firstName: "Dr. Sarah",
-          lastName: "Mitchell",
-          specialty: "Emergency Medicine"
-        });
-      }
-    } catch {}
     const { type } = req.params;
     const { codes } = req.body as { codes: string[] };
     if (!Array.isArray(codes) || codes.length === 0) return res.status(400).json({ error: 'codes required' });
@@ -973,22 +924,10 @@ export async function registerRoutes(app: Express): Promise<Server> {
     return res.json({ type, results });
   });
 
-  app.put("/api/smart-phrases/:id", requireAuth, async (req, res) => {
+  app.put("/api/smart-phrases/:id", requireAuth, ensureUser(), async (req, res) => {
     try {
       const userId = getCurrentUserId(req);
       
-      // Ensure user exists
-      let user = await storage.getUser(userId);
-      if (!user) {
-        user = await storage.createUser({
-          id: userId,
-          email: "doctor@hospital.com",
-          firstName: "Dr. Sarah",
-          lastName: "Mitchell",
-          specialty: "Emergency Medicine"
-        });
-      }
-      
       const { id } = req.params;
       // Accept client payload with type/options and convert to elements when present
       const body = { ...req.body } as any;
@@ -1038,22 +977,8 @@ export async function registerRoutes(app: Express): Promise<Server> {
     }
   });
 
-  app.delete("/api/smart-phrases/:id", requireAuth, async (req, res) => {
+  app.delete("/api/smart-phrases/:id", requireAuth, ensureUser(), async (req, res) => {
     try {
-      const userId = getCurrentUserId(req);
-      
-      // Ensure user exists
-      let user = await storage.getUser(userId);
-      if (!user) {
-        user = await storage.createUser({
-          id: userId,
-          email: "doctor@hospital.com",
-          firstName: "Dr. Sarah",
-          lastName: "Mitchell",
-          specialty: "Emergency Medicine"
-        });
-      }
-      
       const { id } = req.params;
       await storage.deleteSmartPhrase(id);
       res.json({ message: "Smart phrase deleted successfully" });
@@ -1063,22 +988,10 @@ export async function registerRoutes(app: Express): Promise<Server> {
     }
   });
 
-  app.post("/api/smart-phrases/import/:shareableId", requireAuth, async (req: any, res) => {
+  app.post("/api/smart-phrases/import/:shareableId", requireAuth, ensureUser(), async (req: any, res) => {
     try {
       const userId = getCurrentUserId(req);
       
-      // Ensure user exists
-      let user = await storage.getUser(userId);
-      if (!user) {
-        user = await storage.createUser({
-          id: userId,
-          email: "doctor@hospital.com",
-          firstName: "Dr. Sarah",
-          lastName: "Mitchell",
-          specialty: "Emergency Medicine"
-        });
-      }
-      
       const { shareableId } = req.params;
 
       if (!shareableId || !shareableId.trim()) {
@@ -1102,8 +1015,8 @@ export async function registerRoutes(app: Express): Promise<Server> {
   // Simple per-user rate limiter for joins
   const joinRate: Map<string, { count: number; resetAt: number }> = new Map();
 
-  async function ensureTeamMember(userId: string, teamId: string) {
-    const members = await storage.getTeamMembers(teamId);
+  async function ensureTeamMember(userId: string, teamId: string, loader?: UserLoader) {
+    const members = await storage.getTeamMembers(teamId, loader);
     const isMember = members.some(m => m.userId === userId);
     if (!isMember) {
       const err: any = new Error('Forbidden');
@@ -1116,8 +1029,6 @@ export async function registerRoutes(app: Express): Promise<Server> {
   app.get("/api/teams", requireAuth, async (req, res) => {
     try {
       const userId = getCurrentUserId(req);
-      // Cleanup expired teams on access
-      try { await storage.deleteExpiredTeams(); } catch {}
       const userTeams = await storage.getUserTeams(userId);
       res.json(userTeams);
     } catch (error) {
@@ -1129,7 +1040,6 @@ export async function registerRoutes(app: Express): Promise<Server> {
   app.post("/api/teams/create", requireAuth, async (req, res) => {
     try {
       const userId = getCurrentUserId(req);
-      try { await storage.deleteExpiredTeams(); } catch {}
       const { name, description } = req.body;
 
       if (!name || !name.trim()) {
@@ -1155,7 +1065,6 @@ export async function registerRoutes(app: Express): Promise<Server> {
   app.post("/api/teams/join", requireAuth, async (req, res) => {
     try {
       const userId = getCurrentUserId(req);
-      try { await storage.deleteExpiredTeams(); } catch {}
       const { groupCode } = req.body;
 
       if (!groupCode || !groupCode.trim()) {
@@ -1210,8 +1119,7 @@ export async function registerRoutes(app: Express): Promise<Server> {
     try {
       const { teamId } = req.params;
       const userId = getCurrentUserId(req);
-      await ensureTeamMember(userId, teamId);
-      const members = await storage.getTeamMembers(teamId);
+      const members = await ensureTeamMember(userId, teamId);
       res.json(members);
     } catch (error) {
       console.error("Error fetching team members:", error);
@@ -1224,8 +1132,9 @@ export async function registerRoutes(app: Express): Promise<Server> {
     try {
       const { teamId } = req.params;
       const userId = getCurrentUserId(req);
-      await ensureTeamMember(userId, teamId);
-      const todos = await storage.getTeamTodos(teamId);
+      const loader = storage.userLoader();
+      await ensureTeamMember(userId, teamId, loader);
+      const todos = await storage.getTeamTodos(teamId, loader);
       res.json(todos);
     } catch (error) {
       console.error("Error fetching team todos:", error);
@@ -1335,8 +1244,9 @@ export async function registerRoutes(app: Express): Promise<Server> {
   app.get("/api/teams/:teamId/calendar", requireAuth, async (req, res) => {
     try {
       const { teamId } = req.params;
-      await ensureTeamMember(getCurrentUserId(req), teamId);
-      const events = await storage.getTeamCalendarEvents(teamId);
+      const loader = storage.userLoader();
+      await ensureTeamMember(getCurrentUserId(req), teamId, loader);
+      const events = await storage.getTeamCalendarEvents(teamId, loader);
       res.json(events);
     } catch (error) {
       console.error("Error fetching calendar events:", error);
@@ -1493,8 +1403,9 @@ export async function registerRoutes(app: Express): Promise<Server> {
   app.get("/api/teams/:teamId/bulletin", requireAuth, async (req, res) => {
     try {
       const { teamId } = req.params;
-      await ensureTeamMember(getCurrentUserId(req), teamId);
-      const posts = await storage.getTeamBulletinPosts(teamId);
+      const loader = storage.userLoader();
+      await ensureTeamMember(getCurrentUserId(req), teamId, loader);
+      const posts = await storage.getTeamBulletinPosts(teamId, loader);
       res.json(posts);
     } catch (error) {
       console.error('Error fetching bulletin:', error);
@@ -1555,28 +1466,23 @@ export async function registerRoutes(app: Express): Promise<Server> {
   });
 
   // Autocomplete items routes
-  app.get("/api/autocomplete-items", requireAuth, async (req, res) => {
+  app.get("/api/autocomplete-items", requireAuth, ensureUser(), async (req, res) => {
     try {
       const userId = getCurrentUserId(req);
       const category = req.query.category as string | undefined;
 
-      // Ensure user exists (FK constraints)
-      let user = await storage.getUser(userId);
-      if (!user) {
-        user = await storage.createUser({
-          id: userId,
-          email: "doctor@hospital.com",
-          firstName: "Dr. Sarah",
-          lastName: "Mitchell",
-          specialty: "Emergency Medicine",
-        });
-      }
-
-      const items = category
-        ? await storage.getAutocompleteItemsByCategory(userId, category)
-        : await storage.getAutocompleteItems(userId);
+      const list = storage.getCachedAutocompleteList(userId, category)
+        ?? await storage.loadAutocompleteList(userId, category);
 
-      res.json(items);
+      // Strong ETag over the serialized list; the browser revalidates on every
+      // fetch and gets an empty 304 while the list is unchanged.
+      res.set('ETag', list.etag);
+      res.set('Cache-Control', 'private, no-cache');
+      const ifNoneMatch = String(req.headers['if-none-match'] || '');
+      if (ifNoneMatch.split(',').some((tag) => tag.trim().replace(/^W\//, '') === list.etag || tag.trim() === '*')) {
+        return res.status(304).end();
+      }
+      res.type('application/json').send(list.body);
     } catch (error) {
       console.error("Error fetching autocomplete items:", error);
       res.status(500).json({ message: "Failed to fetch autocomplete items" });
@@ -1591,145 +1497,28 @@ export async function registerRoutes(app: Express): Promise<Server> {
       const category = req.query.category ? String(req.query.category) : undefined;
       const q = req.query.q ? String(req.query.q) : undefined;
       const sort = String(req.query.sort || (tab === 'popular' ? 'downloads' : 'newest')); // 'downloads' | 'newest'
-      const page = Math.max(1, parseInt(String(req.query.page || '1')));
-      const pageSize = Math.min(50, Math.max(1, parseInt(String(req.query.pageSize || '20'))));
-      const popularThreshold = 5;
-
-      // Helper to build LIKE value
-      const likeExpr = (val: string) => `%${val}%`;
-
-      // Fetchers per type (join with users for publisher identity)
-      const fetchTemplates = async () => {
-        // note_templates are public-only
-        let rows = await storage.db
-          .select({
-            id: noteTemplates.id,
-            title: noteTemplates.name,
-            description: noteTemplates.description,
-            shortCode: noteTemplates.shortCode,
-            downloadCount: noteTemplates.downloadCount,
-            createdAt: noteTemplates.createdAt,
-            userId: noteTemplates.userId,
-            userFirstName: users.firstName,
-            userLastName: users.lastName,
-            userEmail: users.email,
-          })
-          .from(noteTemplates)
-          .leftJoin(users, eq(noteTemplates.userId, users.id))
-          .where(eq(noteTemplates.isPublic, true));
-        if (q) {
-          rows = rows.filter(r =>
-            (r.title?.toLowerCase().includes(q.toLowerCase()) ||
-             (r.description || '').toLowerCase().includes(q.toLowerCase()))
-          );
-        }
-        if (tab === 'popular') rows = rows.filter(r => (r.downloadCount || 0) >= popularThreshold);
-        return rows.map(r => ({ ...r, kind: 'template', category: null }));
-      };
-
-      const fetchSmartPhrases = async () => {
-        let rows = await storage.db
-          .select({
-            id: smartPhrases.id,
-            title: smartPhrases.trigger,
-            description: smartPhrases.description,
-            category: smartPhrases.category,
-            shortCode: smartPhrases.shortCode,
-            downloadCount: smartPhrases.downloadCount,
-            createdAt: smartPhrases.createdAt,
-            userId: smartPhrases.userId,
-            userFirstName: users.firstName,
-            userLastName: users.lastName,
-            userEmail: users.email,
-          })
-          .from(smartPhrases)
-          .leftJoin(users, eq(smartPhrases.userId, users.id))
-          .where(eq(smartPhrases.isPublic, true));
-        if (category) rows = rows.filter(r => r.category === category);
-        if (q) {
-          const ql = q.toLowerCase();
-          rows = rows.filter(r =>
-            (r.title?.toLowerCase().includes(ql) ||
-             (r.description || '').toLowerCase().includes(ql))
-          );
-        }
-        if (tab === 'popular') rows = rows.filter(r => (r.downloadCount || 0) >= popularThreshold);
-        return rows.map(r => ({ ...r, kind: 'smart-phrase' as const }));
-      };
-
-      const fetchAutocomplete = async () => {
-        let rows = await storage.db
-          .select({
-            id: autocompleteItems.id,
-            title: autocompleteItems.text,
-            description: autocompleteItems.description,
-            category: autocompleteItems.category,
-            shortCode: autocompleteItems.shortCode,
-            downloadCount: autocompleteItems.downloadCount,
-            createdAt: autocompleteItems.createdAt,
-            userId: autocompleteItems.userId,
-            userFirstName: users.firstName,
-            userLastName: users.lastName,
-            userEmail: users.email,
-          })
-          .from(autocompleteItems)
-          .leftJoin(users, eq(autocompleteItems.userId, users.id))
-          .where(eq(autocompleteItems.isPublic, true));
-        if (category) rows = rows.filter(r => r.category === category);
-        if (q) {
-          const ql = q.toLowerCase();
-          rows = rows.filter(r =>
-            (r.title?.toLowerCase().includes(ql) ||
-             (r.description || '').toLowerCase().includes(ql))
-          );
-        }
-        if (tab === 'popular') rows = rows.filter(r => (r.downloadCount || 0) >= popularThreshold);
-        return rows.map(r => ({ ...r, kind: 'autocomplete' as const }));
-      };
-
-      let items: any[] = [];
-      if (type === 'templates') items = await fetchTemplates();
-      else if (type === 'smart-phrases') items = await fetchSmartPhrases();
-      else if (type === 'autocomplete') items = await fetchAutocomplete();
-      else {
-        const [t, s, a] = await Promise.all([fetchTemplates(), fetchSmartPhrases(), fetchAutocomplete()]);
-        items = [...t, ...s, ...a];
-      }
-
-      // Sorting
-      if (sort === 'downloads') {
-        items.sort((a, b) => (b.downloadCount || 0) - (a.downloadCount || 0));
-      } else {
-        items.sort((a, b) => new Date(b.createdAt || 0).getTime() - new Date(a.createdAt || 0).getTime());
-      }
-
-      const total = items.length;
-      const start = (page - 1) * pageSize;
-      const paged = items.slice(start, start + pageSize);
-
-      res.json({ items: paged, total, page, pageSize });
+      const page = Math.max(1, parseInt(String(req.query.page || '1')) || 1);
+      const pageSize = Math.min(50, Math.max(1, parseInt(String(req.query.pageSize || '20')) || 20));
+      const { items, total, totalCapped, hasMore } = await storage.getCommunityPage({
+        type: (['templates', 'smart-phrases', 'autocomplete'].includes(type) ? type : 'all') as any,
+        sort: sort === 'downloads' ? 'downloads' : 'newest',
+        popularOnly: tab === 'popular',
+        category,
+        q,
+        page,
+        pageSize,
+      });
+      res.json({ items, total, totalCapped, hasMore, page, pageSize });
     } catch (err) {
       console.error('Error in /api/community:', err);
       res.status(500).json({ error: 'Failed to fetch community items' });
     }
   });
 
-  app.post("/api/autocomplete-items", requireAuth, async (req, res) => {
+  app.post("/api/autocomplete-items", requireAuth, ensureUser(), async (req, res) => {
     try {
       const userId = getCurrentUserId(req);
 
-      // Ensure user exists
-      let user = await storage.getUser(userId);
-      if (!user) {
-        user = await storage.createUser({
-          id: userId,
-          email: "doctor@hospital.com",
-          firstName: "Dr. Sarah",
-          lastName: "Mitchell",
-          specialty: "Emergency Medicine",
-        });
-      }
-
       const itemData = insertAutocompleteItemSchema.parse({ ...req.body, userId });
       try {
         const item = await storage.createAutocompleteItem(itemData);
@@ -1832,21 +1621,9 @@ export async function registerRoutes(app: Express): Promise<Server> {
   });
 
   // Initialize default templates
-  app.post("/api/init", optionalAuth, async (req, res) => {
+  app.post("/api/init", optionalAuth, ensureUser(defaultUserId), async (req, res) => {
     try {
       const userId = (req as any).user?.claims?.sub || 'default-user';
-      // Ensure user exists before creating default content that references the user
-      let user = await storage.getUser(userId);
-      if (!user) {
-        user = await storage.createUser({
-          id: userId,
-          email: "doctor@hospital.com",
-          firstName: "Dr. Sarah",
-          lastName: "Mitchell",
-          specialty: "Emergency Medicine",
-        });
-      }
-      
       // Check if default templates already exist
       const existingDefaultTemplates = await storage.getNoteTemplates();
       const currentDefaultTemplates = existingDefaultTemplates.filter(t => t.isDefault);
@@ -2286,45 +2063,33 @@ export async function registerRoutes(app: Express): Promise<Server> {
 
       const prev = previous[0] || null;
 
-      // Create new run list (clone mode/carry_forward_defaults from previous if present)
-      const [created] = await db.insert(runLists).values({
-        userId,
-        day,
-        mode: prev?.mode || 'prepost',
-        carryForwardDefaults: prev?.carryForwardDefaults || {},
-      }).returning();
-
-      // Clone patients from previous (if any). If none, create empty list.
-      if (autoclone && prev) {
-        // Fetch prev patients + notes
-        const prevRows = await db
-          .select({
-            patient: listPatients,
-            note: runListNotes,
-          })
-          .from(listPatients)
-          .leftJoin(runListNotes, eq(runListNotes.listPatientId, listPatients.id))
-          .where(eq(listPatients.runListId, prev.id))
-          .orderBy(listPatients.position);
-
-        // Insert patients into new list and notes per patient
-        for (const r of prevRows) {
-          const [p] = await db.insert(listPatients).values({
-            runListId: created.id,
-            position: r.patient.position,
-            alias: r.patient.alias,
-            active: true,
-          }).returning();
-
-          const newNote = {
-            listPatientId: p.id,
-            rawText: carryForward && r.note ? (r.note.rawText || '') : '',
-            structuredSections: carryForward && r.note ? (r.note.structuredSections || {}) : {},
-            status: 'draft',
-            expiresAt: new Date(Date.now() + FORTY_EIGHT_HOURS_MS),
-          } as any;
-          await db.insert(runListNotes).values(newNote);
+      // Create the new list (mode/carry_forward_defaults from previous if
+      // present) and clone its patients and notes in one transaction, so a
+      // failure never leaves a half-copied list behind.
+      const created = await storage.transaction(async (tx) => {
+        const [rl] = await tx.insert(runLists).values({
+          userId,
+          day,
+          mode: prev?.mode || 'prepost',
+          carryForwardDefaults: prev?.carryForwardDefaults || {},
+        }).onConflictDoNothing().returning();
+        // A concurrent first load already created today's list
+        if (!rl) return null;
+
+        if (autoclone && prev) {
+          await storage.cloneRunListPatients(prev.id, rl.id, (_patient, note) => ({
+            rawText: carryForward && note ? (note.rawText || '') : '',
+            structuredSections: (carryForward && note ? (note.structuredSections || {}) : {}) as any,
+          }), tx);
         }
+        return rl;
+      });
+
+      if (!created) {
+        const [winner] = await db.select().from(runLists)
+          .where(and(eq(runLists.userId, userId), eq(runLists.day, day)));
+        const patients = await fetchRunListPayload(db, winner.id);
+        return res.json({ runList: winner, patients });
       }
 
       const patients = await fetchRunListPayload(db, created.id);
@@ -2576,12 +2341,6 @@ export async function registerRoutes(app: Express): Promise<Server> {
       if (!todayRL) return res.status(404).json({ message: 'Run list not found' });
       const todayDay = new Date((todayRL as any).day);
 
-      // Ensure list is empty (no patients) to avoid duplication
-      const existingTodayPatients = await storage.db.select().from(listPatients).where(eq(listPatients.runListId, runListId)).limit(1);
-      if (existingTodayPatients.length > 0) {
-        return res.status(409).json({ message: 'Run list already has patients' });
-      }
-
       // Find previous run list by same user and day < today
       const prevListRows = await storage.db
         .select()
@@ -2593,165 +2352,26 @@ export async function registerRoutes(app: Express): Promise<Server> {
       if (!prevRL) return res.status(404).json({ message: 'No previous run list found' });
 
       // Determine carry-forward defaults: prefer body -> today's rl -> previous rl -> empty
-      const allowedKeys = ['assessment','active_orders','allergies','labs','medications','objective','subjective','imaging','plan','physical_exam'];
-      const coerceDefaults = (src: any): Record<string, boolean> => {
-        const out: Record<string, boolean> = {};
-        for (const k of allowedKeys) out[k] = Boolean(src?.[k]);
-        return out;
-      };
-      const bodyDefaults = coerceDefaults((req.body || {}).carryForwardDefaults || {});
-      const todayDefaults = coerceDefaults((todayRL as any).carryForwardDefaults || {});
-      const prevDefaults = coerceDefaults((prevRL as any).carryForwardDefaults || {});
+      const bodyDefaults = coerceCarryForwardDefaults((req.body || {}).carryForwardDefaults || {});
+      const todayDefaults = coerceCarryForwardDefaults((todayRL as any).carryForwardDefaults || {});
+      const prevDefaults = coerceCarryForwardDefaults((prevRL as any).carryForwardDefaults || {});
       const defaults = Object.values(bodyDefaults).some(Boolean) ? bodyDefaults : (Object.values(todayDefaults).some(Boolean) ? todayDefaults : prevDefaults);
 
-      // Fetch previous patients + notes
-      const prevRows = await storage.db
-        .select({ patient: listPatients, note: runListNotes })
-        .from(listPatients)
-        .leftJoin(runListNotes, eq(runListNotes.listPatientId, listPatients.id))
-        .where(eq(listPatients.runListId, (prevRL as any).id))
-        .orderBy(listPatients.position);
-
-      // Helpers to rebuild minimal raw text for selected strategy
-      const buildLabsLine = (labs: any): string => {
-        try {
-          if (!labs || typeof labs !== 'object') return '';
-          const parts: string[] = [];
-          const entries = Object.entries(labs);
-          for (let i = 0; i < Math.min(entries.length, 8); i++) {
-            const [name, vals] = entries[i] as [string, any];
-            const arr = Array.isArray((vals as any)?.values) ? (vals as any).values : Array.isArray(vals) ? vals : [];
-            const latest = arr && arr.length > 0 ? String(arr[0]) : '';
-            if (latest) parts.push(`${name}: ${latest}`);
-          }
-          return parts.length ? `Labs: ${parts.join(', ')}` : '';
-        } catch { return ''; }
-      };
-      const buildVitalsLine = (vitals: any): string => {
-        try {
-          if (!vitals || typeof vitals !== 'object') return '';
-          const parts: string[] = [];
-          const entries = Object.entries(vitals);
-          for (let i = 0; i < Math.min(entries.length, 8); i++) {
-            const [name, v] = entries[i] as [string, any];
-            const latest = typeof v === 'string' ? v : (Array.isArray(v?.values) ? String(v.values[0] || '') : (v?.value || v?.current));
-            if (latest) parts.push(`${name}: ${latest}`);
-          }
-          return parts.length ? `Vitals: ${parts.join(', ')}` : '';
-        } catch { return ''; }
-      };
-      const buildImagingLine = (imaging: any): string => {
-        try {
-          if (!imaging || typeof imaging !== 'object') return '';
-          const parts: string[] = [];
-          const entries = Object.entries(imaging);
-          for (let i = 0; i < Math.min(entries.length, 4); i++) {
-            const [type, arr] = entries[i] as [string, any];
-            let latestText = '';
-            if (Array.isArray(arr) && arr.length > 0) {
-              const first = arr[0];
-              latestText = first?.impression || first?.text || '';
-            } else if (typeof arr === 'object' && arr) {
-              latestText = arr?.impression || arr?.text || '';
-            }
-            if (latestText) parts.push(`${type}: ${latestText}`);
-          }
-          return parts.length ? `Imaging: ${parts.join(' | ')}` : '';
-        } catch { return ''; }
-      };
-
-      // Perform cloning
-      const createdPatients: any[] = [];
-      for (const r of prevRows as any[]) {
-        const [p] = await storage.db.insert(listPatients).values({
-          runListId,
-          position: r.patient.position,
-          alias: r.patient.alias,
-          active: true,
-          carryForwardOverrides: (r.patient as any).carryForwardOverrides || null,
-        } as any).returning();
-        createdPatients.push(p);
-
-        const prevNote = r.note;
-        let rawText = '';
-        let sections: any = {};
-        let structured: any = {};
-
-        if (strategy === 'all') {
-          rawText = prevNote?.rawText || '';
-          const ss = (prevNote as any)?.structuredSections;
-          if (ss && typeof ss === 'object') {
-            sections = ss.sections || {};
-            structured = ss.structured || {};
-          }
-        } else if (strategy === 'none') {
-          rawText = '';
-          sections = {};
-          structured = {};
-        } else {
-          // selected
-          const ss = (prevNote as any)?.structuredSections || {};
-          const prevSections = (ss.sections || {}) as Record<string, string>;
-          const prevStructured = (ss.structured || {}) as Record<string, any>;
-
-          // Apply per-patient overrides from previous day when present
-          const prevOverrides = ((r.patient as any).carryForwardOverrides || {}) as Record<string, boolean>;
-          const eff = { ...defaults } as Record<string, boolean>;
-          for (const k of Object.keys(prevOverrides)) {
-            if (typeof prevOverrides[k] === 'boolean') eff[k] = prevOverrides[k];
-          }
-
-          // Filter structured by effective defaults
-          structured = {};
-          if (eff.labs && prevStructured.labs) (structured as any).labs = prevStructured.labs;
-          if (defaults.imaging && prevStructured.imaging) (structured as any).imaging = prevStructured.imaging;
-          if (defaults.objective && prevStructured.vitals) (structured as any).vitals = prevStructured.vitals;
-          if (defaults.medications && prevStructured.medications) (structured as any).medications = prevStructured.medications;
-          if (defaults.allergies && prevStructured.allergies) (structured as any).allergies = prevStructured.allergies;
-
-          // Filter sections by defaults (SOAP + optional physical exam)
-          const pushIf = (key: string, cond: boolean) => { if (cond && prevSections[key]) sections[key] = prevSections[key]; };
-          pushIf('Subjective', defaults.subjective);
-          pushIf('Objective', defaults.objective);
-          pushIf('Assessment', defaults.assessment);
-          pushIf('Plan', defaults.plan);
-          pushIf('Physical Exam', defaults.physical_exam);
-
-          // Build minimal raw text with headings
-          const parts: string[] = [];
-          if (sections['Subjective']) parts.push(`Subjective:\n${sections['Subjective'].trim()}`);
-
-          const objLines: string[] = [];
-          if (sections['Objective']) objLines.push(sections['Objective'].trim());
-          if (eff.objective && structured.vitals) {
-            const line = buildVitalsLine(structured.vitals);
-            if (line) objLines.push(line);
-          }
-          if (eff.labs && structured.labs) {
-            const line = buildLabsLine(structured.labs);
-            if (line) objLines.push(line);
-          }
-          if (eff.imaging && structured.imaging) {
-            const line = buildImagingLine(structured.imaging);
-            if (line) objLines.push(line);
-          }
-          if (objLines.length) parts.push(`Objective:\n${objLines.join('\n')}`);
-
-          if (eff.physical_exam && sections['Physical Exam']) parts.push(`Physical Exam:\n${sections['Physical Exam'].trim()}`);
-          if (eff.assessment && sections['Assessment']) parts.push(`Assessment:\n${sections['Assessment'].trim()}`);
-          if (eff.plan && sections['Plan']) parts.push(`Plan:\n${sections['Plan'].trim()}`);
-
-          rawText = parts.join('\n\n');
-        }
-
-        // Create note for patient
-        await storage.db.insert(runListNotes).values({
-          listPatientId: p.id,
-          rawText,
-          structuredSections: { sections, structured },
-          status: 'draft',
-          expiresAt: new Date(Date.now() + 48 * 60 * 60 * 1000),
-        } as any);
+      // Perform cloning. The list row is locked so two concurrent clones can't
+      // both pass the emptiness check, and all inserts commit together.
+      const cloned = await storage.transaction(async (tx) => {
+        await tx.select({ id: runLists.id }).from(runLists).where(eq(runLists.id, runListId)).for('update');
+        // Ensure list is empty (no patients) to avoid duplication
+        const existingTodayPatients = await tx.select({ id: listPatients.id }).from(listPatients).where(eq(listPatients.runListId, runListId)).limit(1);
+        if (existingTodayPatients.length > 0) return false;
+        await storage.cloneRunListPatients((prevRL as any).id, runListId, (patient, note) => ({
+          carryForwardOverrides: (patient as any).carryForwardOverrides || null,
+          ...buildClonedNote(patient, note, strategy as CloneStrategy, defaults),
+        }), tx);
+        return true;
+      });
+      if (!cloned) {
+        return res.status(409).json({ message: 'Run list already has patients' });
       }
 
       // Return today payload
@@ -2764,7 +2384,21 @@ export async function registerRoutes(app: Express): Promise<Server> {
   });
 
   // POST /api/run-list/ai/generate { listPatientId, transcript, mode?: 'prepost'|'full'|'preround'|'postround'|'progress' }
+  // With `Accept: text/event-stream` the reply is SSE: `delta` events carry
+  // merged_note text as the model writes it, then one `done` event with the
+  // saved note (or `error`). The note is saved even if the client goes away.
   app.post('/api/run-list/ai/generate', requireAuth, async (req: any, res) => {
+    const wantsStream = String(req.headers.accept || '').includes('text/event-stream');
+    // Headers go out with the first delta, so a busy scheduler can still answer 429/503.
+    const openStream = () => {
+      if (res.headersSent) return;
+      res.status(200).set({
+        'Content-Type': 'text/event-stream',
+        'Cache-Control': 'no-cache, no-transform',
+        'X-Accel-Buffering': 'no',
+      });
+      res.flushHeaders();
+    };
     try {
       const schema = z.object({
         listPatientId: z.string().uuid(),
@@ -2791,219 +2425,40 @@ export async function registerRoutes(app: Express): Promise<Server> {
 
       const previousText = row.n?.rawText || '';
       const workflow = (mode || row.rl.mode || 'prepost');
-
-      // Include previous structured facts to aid trending (best-effort)
-      let prevStructured: any = {};
-      try {
-        const ss = (row.n as any)?.structuredSections;
-        if (ss && typeof ss === 'object') prevStructured = ss.structured || {};
-      } catch {}
-
-      // Compose user message for the LLM
-      const userMessage = [
-        `Workflow mode: ${workflow}`,
-        `\nPrevious note (may be empty):\n---\n${previousText}\n---`,
-        `\nPrevious structured facts (JSON, may be empty):\n---\n${JSON.stringify(prevStructured).slice(0, 4000)}\n---`,
-        `\nNew dictation to merge:\n---\n${transcript}\n---`,
-        `\nReturn strict JSON with {"merged_note": string, "sections": {"Subjective"?: string, "Objective"?: string, "Assessment"?: string, "Plan"?: string}, "structured"?: {"vitals"?: any, "labs"?: any, "imaging"?: any}}`
-      ].join('\n');
-
-      // Select specialized system prompt (treat 'full' like complete progress note)
-      const systemPrompt = (
-        workflow === 'preround' ? RUNLIST_PREROUND_SYSTEM_PROMPT :
-        workflow === 'postround' ? RUNLIST_POSTROUND_SYSTEM_PROMPT :
-        (workflow === 'progress' || workflow === 'full') ? RUNLIST_PROGRESS_SYSTEM_PROMPT :
-        RUNLIST_SOAP_SYSTEM_PROMPT
-      );
-
-      const { text } = await callNovaMicro({
-        systemPrompt,
-        userMessage,
-        temperature: 0
-      });
-
-      let merged_note = '';
-      let sections: any = {};
-      let structured: any = {};
-      try {
-        const parsed = JSON.parse(text);
-        merged_note = String(parsed?.merged_note || '').trim();
-        sections = parsed?.sections && typeof parsed.sections === 'object' ? parsed.sections : {};
-        structured = parsed?.structured && typeof parsed.structured === 'object' ? parsed.structured : {};
-      } catch (e) {
-        // Fallback: treat entire output as note text
-        merged_note = text.trim();
-        sections = {};
-        structured = {};
-      }
-      if (!merged_note) merged_note = previousText; // last resort
-
-      // Merge structured facts for trending (labs)
-      const normalizeLabs = (labs: any): Record<string, string[]> => {
-        const out: Record<string, string[]> = {};
-        if (!labs) return out;
-        const addVals = (name: string, vals: any) => {
-          const key = canonicalizeLab(String(name || '').trim());
-          if (!key) return;
-          const arr: string[] = [];
-          if (Array.isArray(vals)) {
-            for (const v of vals) {
-              if (v == null) continue;
-              if (typeof v === 'string' || typeof v === 'number') arr.push(String(v));
-              else if (typeof v === 'object') {
-                if (v.value != null) arr.push(String(v.value));
-                else if (v.current != null) arr.push(String(v.current));
-              }
-            }
-          } else if (typeof vals === 'object') {
-            if (Array.isArray(vals.values)) addVals(name, vals.values);
-            if (vals.current != null) arr.unshift(String(vals.current));
-            if (Array.isArray(vals.trends)) addVals(name, vals.trends);
-          } else if (typeof vals === 'string' || typeof vals === 'number') {
-            arr.push(String(vals));
-          }
-          if (!out[key]) out[key] = [];
-          out[key].push(...arr);
-        };
-        if (Array.isArray(labs)) {
-          for (const item of labs) {
-            if (item && typeof item === 'object') addVals(item.name || item.test || item.id || 'Unknown', item.values ?? item);
+      const prevStructured = previousStructured(row.n);
+      const { systemPrompt, userMessage } = buildNotePrompt(workflow, previousText, prevStructured, transcript);
+
+      let text: string;
+      if (wantsStream) {
+        const extractor = new MergedNoteExtractor();
+        ({ text } = await streamNovaMicro({
+          systemPrompt,
+          userMessage,
+          temperature: 0,
+          userId,
+          onText: (delta) => {
+            const noteText = extractor.push(delta);
+            if (!noteText) return;
+            openStream();
+            sendSse(res, 'delta', { text: noteText });
           }
-        } else if (typeof labs === 'object') {
-          for (const [k, v] of Object.entries(labs)) addVals(k, v);
-        }
-        // Dedup while preserving order
-        for (const k of Object.keys(out)) {
-          const seen = new Set<string>();
-          out[k] = out[k].filter((x) => { const s = String(x).trim(); if (!s || seen.has(s)) return false; seen.add(s); return true; });
-        }
-        return out;
-      };
+        }));
+      } else {
+        ({ text } = await callNovaMicro({
+          systemPrompt,
+          userMessage,
+          temperature: 0,
+          userId
+        }));
+      }
 
-      const prevLabs = normalizeLabs(prevStructured?.labs);
-      const newLabs = normalizeLabs(structured?.labs);
-      const mergedLabs: Record<string, string[]> = {};
-      const labsKeys = Array.from(new Set([...Object.keys(newLabs), ...Object.keys(prevLabs)]));
-      for (const name of labsKeys) {
-        const combined = [...(newLabs[name] || []), ...(prevLabs[name] || [])];
-        // Limit history to last 6 for brevity
-        mergedLabs[name] = combined.slice(0, 6);
-      }
-
-      // Vitals merge (similar shape as labs: name -> { values: [] })
-      const normalizeVitals = (vitals: any): Record<string, string[]> => {
-        const out: Record<string, string[]> = {};
-        if (!vitals) return out;
-        const addVals = (name: string, vals: any) => {
-          const key = canonicalizeVital(String(name || '').trim());
-          if (!key) return;
-          const arr: string[] = [];
-          if (Array.isArray(vals)) {
-            for (const v of vals) {
-              if (v == null) continue;
-              if (typeof v === 'string' || typeof v === 'number') arr.push(String(v));
-              else if (typeof v === 'object') {
-                if (v.value != null) arr.push(String(v.value));
-                else if (v.current != null) arr.push(String(v.current));
-              }
-            }
-          } else if (typeof vals === 'object') {
-            if (Array.isArray(vals.values)) addVals(name, vals.values);
-            if (vals.current != null) arr.unshift(String(vals.current));
-            if (Array.isArray(vals.trends)) addVals(name, vals.trends);
-            if (vals.value != null) arr.unshift(String(vals.value));
-          } else if (typeof vals === 'string' || typeof vals === 'number') {
-            arr.push(String(vals));
-          }
-          if (!out[key]) out[key] = [];
-          out[key].push(...arr);
-        };
-        if (Array.isArray(vitals)) {
-          for (const item of vitals) {
-            if (item && typeof item === 'object') addVals(item.name || item.id || 'Unknown', item.values ?? item);
-          }
-        } else if (typeof vitals === 'object') {
-          for (const [k, v] of Object.entries(vitals)) addVals(k, v);
-        }
-        // Dedup while preserving order
-        for (const k of Object.keys(out)) {
-          const seen = new Set<string>();
-          out[k] = out[k].filter((x) => { const s = String(x).trim(); if (!s || seen.has(s)) return false; seen.add(s); return true; });
-        }
-        return out;
-      };
-      const prevVitals = normalizeVitals(prevStructured?.vitals);
-      const newVitals = normalizeVitals(structured?.vitals);
-      const mergedVitals: Record<string, string[]> = {};
-      const vitalsKeys = Array.from(new Set([...Object.keys(newVitals), ...Object.keys(prevVitals)]));
-      for (const name of vitalsKeys) {
-        const combined = [...(newVitals[name] || []), ...(prevVitals[name] || [])];
-        mergedVitals[name] = combined.slice(0, 6);
-      }
-
-      // Imaging merge: map type -> array of { impression, when? }, latest first, dedup by impression+when
-      const normalizeImaging = (im: any): Record<string, { impression: string; when?: string }[]> => {
-        const out: Record<string, { impression: string; when?: string }[]> = {};
-        if (!im) return out;
-        const add = (type: string, entry: any) => {
-          const t = canonicalizeImagingType(String(type || '').trim() || 'Imaging');
-          const imp = String(entry?.impression || entry?.text || '').trim();
-          const when = entry?.when ? String(entry.when) : (entry?.date ? String(entry.date) : undefined);
-          if (!imp) return;
-          if (!out[t]) out[t] = [];
-          out[t].push({ impression: imp, when });
-        };
-        if (Array.isArray(im)) {
-          for (const item of im) {
-            if (item && typeof item === 'object') add(item.type || item.modality || 'Imaging', item);
-          }
-        } else if (typeof im === 'object') {
-          for (const [k, v] of Object.entries(im)) {
-            if (Array.isArray(v)) { for (const e of v) add(k, e); }
-            else if (typeof v === 'object') add(k, v);
-            else if (typeof v === 'string') add(k, { impression: v });
-          }
-        }
-        // Dedup per type
-        for (const k of Object.keys(out)) {
-          const seen = new Set<string>();
-          out[k] = out[k].filter((e) => {
-            const key = e.impression + '|' + (e.when || '');
-            if (seen.has(key)) return false;
-            seen.add(key);
-            return true;
-          });
-        }
-        return out;
-      };
-      const prevImaging = normalizeImaging(prevStructured?.imaging);
-      const newImaging = normalizeImaging(structured?.imaging);
-      const mergedImaging: Record<string, { impression: string; when?: string }[]> = {};
-      const imagingKeys = Array.from(new Set([...Object.keys(newImaging), ...Object.keys(prevImaging)]));
-      for (const type of imagingKeys) {
-        const combined = [...(newImaging[type] || []), ...(prevImaging[type] || [])];
-        mergedImaging[type] = combined.slice(0, 6);
-      }
-
-      // Rebuild structured with merges
-      const mergedStructured = {
-        ...prevStructured,
-        ...structured,
-        labs: Object.fromEntries(Object.entries(mergedLabs).map(([k, v]) => [k, { values: v }])),
-        vitals: Object.fromEntries(Object.entries(mergedVitals).map(([k, v]) => [k, { values: v }])),
-        imaging: mergedImaging,
-      };
+      const { merged_note, sections, structured } = parseGeneratedNote(text, previousText);
 
       // Update note and version
       const payload: any = {
         rawText: merged_note,
-        structuredSections: { sections, structured: mergedStructured },
-        status: (
-          workflow === 'prepost' ? (row.n?.status === 'preround' ? 'postround' : 'preround') :
-          workflow === 'preround' ? 'preround' :
-          workflow === 'postround' ? 'postround' :
-          'complete'
-        ),
+        structuredSections: { sections, structured: mergeStructuredFacts(prevStructured, structured) },
+        status: nextNoteStatus(workflow, row.n?.status),
         updatedAt: new Date(),
         expiresAt: new Date(Date.now() + 48 * 60 * 60 * 1000)
       };
@@ -3025,13 +2480,122 @@ export async function registerRoutes(app: Express): Promise<Server> {
         } as any);
       } catch {}
 
+      if (wantsStream) {
+        openStream();
+        sendSse(res, 'done', { note: noteRow });
+        return res.end();
+      }
       return res.json({ note: noteRow });
     } catch (error) {
+      if (res.headersSent) {
+        console.error('Error in POST /api/run-list/ai/generate (stream):', error);
+        sendSse(res, 'error', { message: error instanceof AiBusyError ? error.message : 'Failed to generate AI note' });
+        return res.end();
+      }
+      if (error instanceof AiBusyError) return sendAiBusy(res, error);
       console.error('Error in POST /api/run-list/ai/generate:', error);
       return res.status(500).json({ message: 'Failed to generate AI note' });
     }
   });
 
+  // POST /api/run-list/:id/ai/generate-batch { transcripts: { [listPatientId]: transcript }, mode? }
+  // Generates a whole list's notes in one request: one query loads every
+  // note, Nova calls fan out AI_BATCH_CONCURRENCY at a time, and all merged
+  // notes and version rows are saved in one bulk write. A note edited while
+  // the batch ran is not overwritten; its patient is listed in `conflicts`.
+  // With `Accept: text/event-stream`, a `patient` event reports each patient
+  // as its generation finishes, then `done` carries the saved notes.
+  app.post('/api/run-list/:id/ai/generate-batch', requireAuth, async (req: any, res) => {
+    const wantsStream = String(req.headers.accept || '').includes('text/event-stream');
+    try {
+      const schema = z.object({
+        transcripts: z.record(z.string().uuid(), z.string().min(1))
+          .refine((t) => Object.keys(t).length > 0 && Object.keys(t).length <= 100, 'Provide 1-100 transcripts'),
+        mode: z.enum(['prepost','full','preround','postround','progress']).optional()
+      });
+      const { transcripts, mode } = schema.parse(req.body || {});
+
+      if (!isNovaConfigured()) {
+        return res.status(500).json({ message: "Amazon Nova Micro not configured. Please check AWS credentials and region." });
+      }
+
+      const userId = getCurrentUserId(req);
+      const [rl] = await storage.db.select().from(runLists).where(and(eq(runLists.id, req.params.id), eq(runLists.userId, userId)));
+      if (!rl) return res.status(404).json({ message: 'Run list not found' });
+
+      const ids = Object.keys(transcripts);
+      const rows = await storage.db
+        .select({ p: listPatients, n: runListNotes })
+        .from(listPatients)
+        .leftJoin(runListNotes, eq(runListNotes.listPatientId, listPatients.id))
+        .where(and(eq(listPatients.runListId, rl.id), inArray(listPatients.id, ids)))
+        .orderBy(listPatients.position);
+      if (rows.length !== ids.length) {
+        const found = new Set(rows.map((r: any) => r.p.id));
+        return res.status(404).json({ message: 'List patient not found', missing: ids.filter((id) => !found.has(id)) });
+      }
+      const workflow = (mode || rl.mode || 'prepost');
+
+      if (wantsStream) {
+        res.status(200).set({
+          'Content-Type': 'text/event-stream',
+          'Cache-Control': 'no-cache, no-transform',
+          'X-Accel-Buffering': 'no',
+        });
+        res.flushHeaders();
+      }
+
+      // Capped at half the scheduler's slots so one batch cannot crowd out other users.
+      const concurrency = novaScheduler.userLimit(AI_BATCH_CONCURRENCY);
+      const generated: GeneratedRunListNote[] = [];
+      const failed: { listPatientId: string; message: string }[] = [];
+      await forEachLimit(rows, concurrency, async ({ p, n }: any) => {
+        const previousText = n?.rawText || '';
+        const prevStructured = previousStructured(n);
+        const { systemPrompt, userMessage } = buildNotePrompt(workflow, previousText, prevStructured, transcripts[p.id]);
+        try {
+          const { text } = await callNovaMicro({
+            systemPrompt,
+            userMessage,
+            temperature: 0,
+            userId,
+            userConcurrency: concurrency
+          });
+          const { merged_note, sections, structured } = parseGeneratedNote(text, previousText);
+          generated.push({
+            listPatientId: p.id,
+            rawText: merged_note,
+            structuredSections: { sections, structured: mergeStructuredFacts(prevStructured, structured) },
+            status: nextNoteStatus(workflow, n?.status),
+            expectedUpdatedAt: n ? n.updatedAt : undefined,
+          });
+          if (wantsStream) sendSse(res, 'patient', { listPatientId: p.id, status: 'generated' });
+        } catch (error) {
+          console.error('Error generating AI note for', p.id, error);
+          const message = error instanceof AiBusyError ? error.message : 'Failed to generate AI note';
+          failed.push({ listPatientId: p.id, message });
+          if (wantsStream) sendSse(res, 'patient', { listPatientId: p.id, status: 'failed', message });
+        }
+      });
+
+      const { saved: notes, conflicts: conflicted } = await storage.saveGeneratedRunListNotes(generated);
+      const conflicts = conflicted.map((listPatientId) => ({ listPatientId, message: 'Conflict: note was updated by another source' }));
+      if (wantsStream) {
+        for (const conflict of conflicts) sendSse(res, 'patient', { ...conflict, status: 'conflict' });
+        sendSse(res, 'done', { notes, failed, conflicts });
+        return res.end();
+      }
+      return res.json({ notes, failed, conflicts });
+    } catch (error) {
+      console.error('Error in POST /api/run-list/:id/ai/generate-batch:', error);
+      if (res.headersSent) {
+        sendSse(res, 'error', { message: 'Failed to generate AI notes' });
+        return res.end();
+      }
+      return res.status(500).json({ message: 'Failed to generate AI notes' });
+    }
+  });
+
   const httpServer = createServer(app);
   return httpServer;
 }
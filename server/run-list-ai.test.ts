@@ -0,0 +1,45 @@
+/// <reference types="vitest" />
+import { describe, it, expect } from 'vitest'
+import { MergedNoteExtractor, mergeStructuredFacts, nextNoteStatus, parseGeneratedNote } from './run-list-ai'
+
+function streamThrough(chunks: string[]) {
+  const x = new MergedNoteExtractor()
+  return chunks.map((c) => x.push(c)).join('')
+}
+
+describe('MergedNoteExtractor', () => {
+  const json = JSON.stringify({ merged_note: 'Subjective:\n"better" °C ok', sections: { Plan: 'x' } })
+
+  it('decodes merged_note regardless of chunk boundaries', () => {
+    const expected = 'Subjective:\n"better" °C ok'
+    expect(streamThrough([json])).toBe(expected)
+    expect(streamThrough(json.split(''))).toBe(expected)
+    expect(streamThrough(['{"merged_', 'note" : "a\\', 'u00', 'b0b\\', 'nc", "sections": {}}'])).toBe('a°b\nc')
+  })
+
+  it('ignores text after the note and non-JSON output', () => {
+    expect(streamThrough(['{"sections": {"Plan": "merged_note"}, "merged_note": "x"', ', "y": "z"}'])).toBe('x')
+    expect(streamThrough(['plain text reply'])).toBe('')
+  })
+})
+
+describe('run-list AI note helpers', () => {
+  it('falls back to the raw output, then the previous note', () => {
+    expect(parseGeneratedNote('not json', 'prev').merged_note).toBe('not json')
+    expect(parseGeneratedNote('{"merged_note": ""}', 'prev').merged_note).toBe('prev')
+  })
+
+  it('puts new lab values ahead of previous ones', () => {
+    const merged = mergeStructuredFacts(
+      { labs: { Na: { values: ['135'] } } },
+      { labs: { sodium: ['138'] } },
+    )
+    expect(merged.labs.Sodium.values).toEqual(['138', '135'])
+  })
+
+  it('alternates pre/post round in prepost mode', () => {
+    expect(nextNoteStatus('prepost', null)).toBe('preround')
+    expect(nextNoteStatus('prepost', 'preround')).toBe('postround')
+    expect(nextNoteStatus('full', 'preround')).toBe('complete')
+  })
+})
@@ -0,0 +1,287 @@
+import { RUNLIST_SOAP_SYSTEM_PROMPT, RUNLIST_PREROUND_SYSTEM_PROMPT, RUNLIST_POSTROUND_SYSTEM_PROMPT, RUNLIST_PROGRESS_SYSTEM_PROMPT } from "./ai/prompts.js";
+import { canonicalizeLab, canonicalizeVital, canonicalizeImagingType } from "./ai/canonical.js";
+
+// Run-list AI note generation, minus the I/O: building the Nova prompt from
+// the previous note and a new dictation, reading the model's JSON back, and
+// merging the structured facts (labs/vitals/imaging trends) into the note.
+// Shared by the buffered, streaming and whole-list generate routes.
+
+export type GenerateMode = 'prepost' | 'full' | 'preround' | 'postround' | 'progress';
+
+export type GeneratedNote = {
+  merged_note: string;
+  sections: Record<string, any>;
+  structured: Record<string, any>;
+};
+
+// Previous structured facts, to aid trending (best-effort).
+export function previousStructured(note: any): Record<string, any> {
+  try {
+    const ss = note?.structuredSections;
+    if (ss && typeof ss === 'object') return ss.structured || {};
+  } catch {}
+  return {};
+}
+
+export function buildNotePrompt(workflow: string, previousText: string, prevStructured: any, transcript: string) {
+  // Compose user message for the LLM
+  const userMessage = [
+    `Workflow mode: ${workflow}`,
+    `\nPrevious note (may be empty):\n---\n${previousText}\n---`,
+    `\nPrevious structured facts (JSON, may be empty):\n---\n${JSON.stringify(prevStructured).slice(0, 4000)}\n---`,
+    `\nNew dictation to merge:\n---\n${transcript}\n---`,
+    `\nReturn strict JSON with {"merged_note": string, "sections": {"Subjective"?: string, "Objective"?: string, "Assessment"?: string, "Plan"?: string}, "structured"?: {"vitals"?: any, "labs"?: any, "imaging"?: any}}`
+  ].join('\n');
+
+  // Select specialized system prompt (treat 'full' like complete progress note)
+  const systemPrompt = (
+    workflow === 'preround' ? RUNLIST_PREROUND_SYSTEM_PROMPT :
+    workflow === 'postround' ? RUNLIST_POSTROUND_SYSTEM_PROMPT :
+    (workflow === 'progress' || workflow === 'full') ? RUNLIST_PROGRESS_SYSTEM_PROMPT :
+    RUNLIST_SOAP_SYSTEM_PROMPT
+  );
+  return { systemPrompt, userMessage };
+}
+
+export function parseGeneratedNote(text: string, previousText: string): GeneratedNote {
+  let merged_note = '';
+  let sections: any = {};
+  let structured: any = {};
+  try {
+    const parsed = JSON.parse(text);
+    merged_note = String(parsed?.merged_note || '').trim();
+    sections = parsed?.sections && typeof parsed.sections === 'object' ? parsed.sections : {};
+    structured = parsed?.structured && typeof parsed.structured === 'object' ? parsed.structured : {};
+  } catch (e) {
+    // Fallback: treat entire output as note text
+    merged_note = text.trim();
+    sections = {};
+    structured = {};
+  }
+  if (!merged_note) merged_note = previousText; // last resort
+  return { merged_note, sections, structured };
+}
+
+// Note status after a generate in `workflow`.
+export function nextNoteStatus(workflow: string, previousStatus?: string | null): string {
+  return (
+    workflow === 'prepost' ? (previousStatus === 'preround' ? 'postround' : 'preround') :
+    workflow === 'preround' ? 'preround' :
+    workflow === 'postround' ? 'postround' :
+    'complete'
+  );
+}
+
+// Merge structured facts for trending (labs)
+function normalizeLabs(labs: any): Record<string, string[]> {
+  const out: Record<string, string[]> = {};
+  if (!labs) return out;
+  const addVals = (name: string, vals: any) => {
+    const key = canonicalizeLab(String(name || '').trim());
+    if (!key) return;
+    const arr: string[] = [];
+    if (Array.isArray(vals)) {
+      for (const v of vals) {
+        if (v == null) continue;
+        if (typeof v === 'string' || typeof v === 'number') arr.push(String(v));
+        else if (typeof v === 'object') {
+          if (v.value != null) arr.push(String(v.value));
+          else if (v.current != null) arr.push(String(v.current));
+        }
+      }
+    } else if (typeof vals === 'object') {
+      if (Array.isArray(vals.values)) addVals(name, vals.values);
+      if (vals.current != null) arr.unshift(String(vals.current));
+      if (Array.isArray(vals.trends)) addVals(name, vals.trends);
+    } else if (typeof vals === 'string' || typeof vals === 'number') {
+      arr.push(String(vals));
+    }
+    if (!out[key]) out[key] = [];
+    out[key].push(...arr);
+  };
+  if (Array.isArray(labs)) {
+    for (const item of labs) {
+      if (item && typeof item === 'object') addVals(item.name || item.test || item.id || 'Unknown', item.values ?? item);
+    }
+  } else if (typeof labs === 'object') {
+    for (const [k, v] of Object.entries(labs)) addVals(k, v);
+  }
+  // Dedup while preserving order
+  for (const k of Object.keys(out)) {
+    const seen = new Set<string>();
+    out[k] = out[k].filter((x) => { const s = String(x).trim(); if (!s || seen.has(s)) return false; seen.add(s); return true; });
+  }
+  return out;
+}
+
+// Vitals merge (similar shape as labs: name -> { values: [] })
+function normalizeVitals(vitals: any): Record<string, string[]> {
+  const out: Record<string, string[]> = {};
+  if (!vitals) return out;
+  const addVals = (name: string, vals: any) => {
+    const key = canonicalizeVital(String(name || '').trim());
+    if (!key) return;
+    const arr: string[] = [];
+    if (Array.isArray(vals)) {
+      for (const v of vals) {
+        if (v == null) continue;
+        if (typeof v === 'string' || typeof v === 'number') arr.push(String(v));
+        else if (typeof v === 'object') {
+          if (v.value != null) arr.push(String(v.value));
+          else if (v.current != null) arr.push(String(v.current));
+        }
+      }
+    } else if (typeof vals === 'object') {
+      if (Array.isArray(vals.values)) addVals(name, vals.values);
+      if (vals.current != null) arr.unshift(String(vals.current));
+      if (Array.isArray(vals.trends)) addVals(name, vals.trends);
+      if (vals.value != null) arr.unshift(String(vals.value));
+    } else if (typeof vals === 'string' || typeof vals === 'number') {
+      arr.push(String(vals));
+    }
+    if (!out[key]) out[key] = [];
+    out[key].push(...arr);
+  };
+  if (Array.isArray(vitals)) {
+    for (const item of vitals) {
+      if (item && typeof item === 'object') addVals(item.name || item.id || 'Unknown', item.values ?? item);
+    }
+  } else if (typeof vitals === 'object') {
+    for (const [k, v] of Object.entries(vitals)) addVals(k, v);
+  }
+  // Dedup while preserving order
+  for (const k of Object.keys(out)) {
+    const seen = new Set<string>();
+    out[k] = out[k].filter((x) => { const s = String(x).trim(); if (!s || seen.has(s)) return false; seen.add(s); return true; });
+  }
+  return out;
+}
+
+// Imaging merge: map type -> array of { impression, when? }, latest first, dedup by impression+when
+function normalizeImaging(im: any): Record<string, { impression: string; when?: string }[]> {
+  const out: Record<string, { impression: string; when?: string }[]> = {};
+  if (!im) return out;
+  const add = (type: string, entry: any) => {
+    const t = canonicalizeImagingType(String(type || '').trim() || 'Imaging');
+    const imp = String(entry?.impression || entry?.text || '').trim();
+    const when = entry?.when ? String(entry.when) : (entry?.date ? String(entry.date) : undefined);
+    if (!imp) return;
+    if (!out[t]) out[t] = [];
+    out[t].push({ impression: imp, when });
+  };
+  if (Array.isArray(im)) {
+    for (const item of im) {
+      if (item && typeof item === 'object') add(item.type || item.modality || 'Imaging', item);
+    }
+  } else if (typeof im === 'object') {
+    for (const [k, v] of Object.entries(im)) {
+      if (Array.isArray(v)) { for (const e of v) add(k, e); }
+      else if (typeof v === 'object') add(k, v);
+      else if (typeof v === 'string') add(k, { impression: v });
+    }
+  }
+  // Dedup per type
+  for (const k of Object.keys(out)) {
+    const seen = new Set<string>();
+    out[k] = out[k].filter((e) => {
+      const key = e.impression + '|' + (e.when || '');
+      if (seen.has(key)) return false;
+      seen.add(key);
+      return true;
+    });
+  }
+  return out;
+}
+
+// New facts first, then previous ones; history capped at 6 entries each.
+export function mergeStructuredFacts(prevStructured: any, structured: any): Record<string, any> {
+  const prevLabs = normalizeLabs(prevStructured?.labs);
+  const newLabs = normalizeLabs(structured?.labs);
+  const mergedLabs: Record<string, string[]> = {};
+  const labsKeys = Array.from(new Set([...Object.keys(newLabs), ...Object.keys(prevLabs)]));
+  for (const name of labsKeys) {
+    const combined = [...(newLabs[name] || []), ...(prevLabs[name] || [])];
+    // Limit history to last 6 for brevity
+    mergedLabs[name] = combined.slice(0, 6);
+  }
+
+  const prevVitals = normalizeVitals(prevStructured?.vitals);
+  const newVitals = normalizeVitals(structured?.vitals);
+  const mergedVitals: Record<string, string[]> = {};
+  const vitalsKeys = Array.from(new Set([...Object.keys(newVitals), ...Object.keys(prevVitals)]));
+  for (const name of vitalsKeys) {
+    const combined = [...(newVitals[name] || []), ...(prevVitals[name] || [])];
+    mergedVitals[name] = combined.slice(0, 6);
+  }
+
+  const prevImaging = normalizeImaging(prevStructured?.imaging);
+  const newImaging = normalizeImaging(structured?.imaging);
+  const mergedImaging: Record<string, { impression: string; when?: string }[]> = {};
+  const imagingKeys = Array.from(new Set([...Object.keys(newImaging), ...Object.keys(prevImaging)]));
+  for (const type of imagingKeys) {
+    const combined = [...(newImaging[type] || []), ...(prevImaging[type] || [])];
+    mergedImaging[type] = combined.slice(0, 6);
+  }
+
+  // Rebuild structured with merges
+  return {
+    ...prevStructured,
+    ...structured,
+    labs: Object.fromEntries(Object.entries(mergedLabs).map(([k, v]) => [k, { values: v }])),
+    vitals: Object.fromEntries(Object.entries(mergedVitals).map(([k, v]) => [k, { values: v }])),
+    imaging: mergedImaging,
+  };
+}
+
+const JSON_ESCAPES: Record<string, string> = { n: '\n', r: '\r', t: '\t', b: '\b', f: '\f' };
+
+// Pulls the merged_note string out of the model's JSON while it streams, so
+// the note can be shown before the rest of the object (sections, structured)
+// arrives. push() returns the newly decoded note text for each chunk; escape
+// sequences split across chunks are held back until complete. Output that is
+// not JSON yields nothing here; the final parse still handles it.
+export class MergedNoteExtractor {
+  private buffer = '';
+  private state: 'seek' | 'value' | 'done' = 'seek';
+
+  push(chunk: string): string {
+    if (this.state === 'done') return '';
+    this.buffer += chunk;
+    if (this.state === 'seek') {
+      const m = /"merged_note"\s*:\s*"/.exec(this.buffer);
+      if (!m) {
+        this.buffer = this.buffer.slice(-32);
+        return '';
+      }
+      this.buffer = this.buffer.slice(m.index + m[0].length);
+      this.state = 'value';
+    }
+
+    let out = '';
+    let i = 0;
+    while (i < this.buffer.length) {
+      const c = this.buffer[i];
+      if (c === '"') {
+        this.state = 'done';
+        break;
+      }
+      if (c !== '\\') {
+        out += c;
+        i++;
+        continue;
+      }
+      const e = this.buffer[i + 1];
+      if (e === undefined) break;
+      if (e === 'u') {
+        if (i + 6 > this.buffer.length) break;
+        out += String.fromCharCode(parseInt(this.buffer.slice(i + 2, i + 6), 16));
+        i += 6;
+        continue;
+      }
+      out += JSON_ESCAPES[e] ?? e;
+      i += 2;
+    }
+    this.buffer = this.state === 'done' ? '' : this.buffer.slice(i);
+    return out;
+  }
+}
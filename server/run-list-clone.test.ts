@@ -0,0 +1,40 @@
+/// <reference types="vitest" />
+import { describe, it, expect } from 'vitest'
+import { buildClonedNote, coerceCarryForwardDefaults } from './run-list-clone'
+
+const note = {
+  rawText: 'previous note',
+  structuredSections: {
+    sections: { Subjective: ' feels better ', Plan: 'continue abx', Assessment: 'CAP' },
+    structured: { labs: { Na: { values: [138, 135] } }, vitals: { HR: '88' }, medications: ['ceftriaxone'] },
+  },
+}
+
+describe('buildClonedNote', () => {
+  it('copies the previous note verbatim for the all strategy', () => {
+    const out = buildClonedNote({}, note, 'all', coerceCarryForwardDefaults({}))
+    expect(out.rawText).toBe('previous note')
+    expect(out.structuredSections).toEqual(note.structuredSections)
+  })
+
+  it('starts empty for the none strategy and when there was no note', () => {
+    const empty = { rawText: '', structuredSections: { sections: {}, structured: {} } }
+    expect(buildClonedNote({}, note, 'none', coerceCarryForwardDefaults({ plan: true }))).toEqual(empty)
+    expect(buildClonedNote({}, null, 'selected', coerceCarryForwardDefaults({ plan: true }))).toEqual(empty)
+  })
+
+  it('keeps only the selected sections and rebuilds headed raw text', () => {
+    const defaults = coerceCarryForwardDefaults({ subjective: true, plan: true, labs: true })
+    const out = buildClonedNote({}, note, 'selected', defaults)
+    expect(out.structuredSections.sections).toEqual({ Subjective: ' feels better ', Plan: 'continue abx' })
+    expect(out.structuredSections.structured).toEqual({ labs: note.structuredSections.structured.labs })
+    expect(out.rawText).toBe('Subjective:\nfeels better\n\nObjective:\nLabs: Na: 138\n\nPlan:\ncontinue abx')
+  })
+
+  it('lets per-patient overrides switch labs off', () => {
+    const defaults = coerceCarryForwardDefaults({ labs: true })
+    const out = buildClonedNote({ carryForwardOverrides: { labs: false } }, note, 'selected', defaults)
+    expect(out.structuredSections.structured).toEqual({})
+    expect(out.rawText).toBe('')
+  })
+})
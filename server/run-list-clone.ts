@@ -0,0 +1,145 @@
+// Carry-forward rules used when a new day's run list is cloned from the
+// previous one. Pure functions: the route loads the previous rows, these
+// decide what each patient's new draft note starts with, and storage writes
+// everything in one transaction.
+
+export const CARRY_FORWARD_KEYS = [
+  'assessment', 'active_orders', 'allergies', 'labs', 'medications',
+  'objective', 'subjective', 'imaging', 'plan', 'physical_exam',
+] as const;
+
+export type CarryForwardDefaults = Record<string, boolean>;
+export type CloneStrategy = 'all' | 'selected' | 'none';
+
+export type ClonedNote = {
+  rawText: string;
+  structuredSections: { sections: Record<string, string>; structured: Record<string, any> };
+};
+
+export function coerceCarryForwardDefaults(src: any): CarryForwardDefaults {
+  const out: CarryForwardDefaults = {};
+  for (const k of CARRY_FORWARD_KEYS) out[k] = Boolean(src?.[k]);
+  return out;
+}
+
+// Helpers to rebuild minimal raw text for the selected strategy
+function buildLabsLine(labs: any): string {
+  try {
+    if (!labs || typeof labs !== 'object') return '';
+    const parts: string[] = [];
+    const entries = Object.entries(labs);
+    for (let i = 0; i < Math.min(entries.length, 8); i++) {
+      const [name, vals] = entries[i] as [string, any];
+      const arr = Array.isArray((vals as any)?.values) ? (vals as any).values : Array.isArray(vals) ? vals : [];
+      const latest = arr && arr.length > 0 ? String(arr[0]) : '';
+      if (latest) parts.push(`${name}: ${latest}`);
+    }
+    return parts.length ? `Labs: ${parts.join(', ')}` : '';
+  } catch { return ''; }
+}
+
+function buildVitalsLine(vitals: any): string {
+  try {
+    if (!vitals || typeof vitals !== 'object') return '';
+    const parts: string[] = [];
+    const entries = Object.entries(vitals);
+    for (let i = 0; i < Math.min(entries.length, 8); i++) {
+      const [name, v] = entries[i] as [string, any];
+      const latest = typeof v === 'string' ? v : (Array.isArray(v?.values) ? String(v.values[0] || '') : (v?.value || v?.current));
+      if (latest) parts.push(`${name}: ${latest}`);
+    }
+    return parts.length ? `Vitals: ${parts.join(', ')}` : '';
+  } catch { return ''; }
+}
+
+function buildImagingLine(imaging: any): string {
+  try {
+    if (!imaging || typeof imaging !== 'object') return '';
+    const parts: string[] = [];
+    const entries = Object.entries(imaging);
+    for (let i = 0; i < Math.min(entries.length, 4); i++) {
+      const [type, arr] = entries[i] as [string, any];
+      let latestText = '';
+      if (Array.isArray(arr) && arr.length > 0) {
+        const first = arr[0];
+        latestText = first?.impression || first?.text || '';
+      } else if (typeof arr === 'object' && arr) {
+        latestText = arr?.impression || arr?.text || '';
+      }
+      if (latestText) parts.push(`${type}: ${latestText}`);
+    }
+    return parts.length ? `Imaging: ${parts.join(' | ')}` : '';
+  } catch { return ''; }
+}
+
+// New draft note for one patient, given the previous day's patient row and
+// note (if any).
+export function buildClonedNote(patient: any, note: any, strategy: CloneStrategy, defaults: CarryForwardDefaults): ClonedNote {
+  if (strategy === 'none') {
+    return { rawText: '', structuredSections: { sections: {}, structured: {} } };
+  }
+  if (strategy === 'all') {
+    const ss = note?.structuredSections;
+    return {
+      rawText: note?.rawText || '',
+      structuredSections: {
+        sections: (ss && typeof ss === 'object' && ss.sections) || {},
+        structured: (ss && typeof ss === 'object' && ss.structured) || {},
+      },
+    };
+  }
+
+  const ss = note?.structuredSections || {};
+  const prevSections = (ss.sections || {}) as Record<string, string>;
+  const prevStructured = (ss.structured || {}) as Record<string, any>;
+
+  // Apply per-patient overrides from previous day when present
+  const prevOverrides = (patient?.carryForwardOverrides || {}) as Record<string, boolean>;
+  const eff = { ...defaults } as Record<string, boolean>;
+  for (const k of Object.keys(prevOverrides)) {
+    if (typeof prevOverrides[k] === 'boolean') eff[k] = prevOverrides[k];
+  }
+
+  // Filter structured by effective defaults
+  const structured: Record<string, any> = {};
+  if (eff.labs && prevStructured.labs) structured.labs = prevStructured.labs;
+  if (defaults.imaging && prevStructured.imaging) structured.imaging = prevStructured.imaging;
+  if (defaults.objective && prevStructured.vitals) structured.vitals = prevStructured.vitals;
+  if (defaults.medications && prevStructured.medications) structured.medications = prevStructured.medications;
+  if (defaults.allergies && prevStructured.allergies) structured.allergies = prevStructured.allergies;
+
+  // Filter sections by defaults (SOAP + optional physical exam)
+  const sections: Record<string, string> = {};
+  const pushIf = (key: string, cond: boolean) => { if (cond && prevSections[key]) sections[key] = prevSections[key]; };
+  pushIf('Subjective', defaults.subjective);
+  pushIf('Objective', defaults.objective);
+  pushIf('Assessment', defaults.assessment);
+  pushIf('Plan', defaults.plan);
+  pushIf('Physical Exam', defaults.physical_exam);
+
+  // Build minimal raw text with headings
+  const parts: string[] = [];
+  if (sections['Subjective']) parts.push(`Subjective:\n${sections['Subjective'].trim()}`);
+
+  const objLines: string[] = [];
+  if (sections['Objective']) objLines.push(sections['Objective'].trim());
+  if (eff.objective && structured.vitals) {
+    const line = buildVitalsLine(structured.vitals);
+    if (line) objLines.push(line);
+  }
+  if (eff.labs && structured.labs) {
+    const line = buildLabsLine(structured.labs);
+    if (line) objLines.push(line);
+  }
+  if (eff.imaging && structured.imaging) {
+    const line = buildImagingLine(structured.imaging);
+    if (line) objLines.push(line);
+  }
+  if (objLines.length) parts.push(`Objective:\n${objLines.join('\n')}`);
+
+  if (eff.physical_exam && sections['Physical Exam']) parts.push(`Physical Exam:\n${sections['Physical Exam'].trim()}`);
+  if (eff.assessment && sections['Assessment']) parts.push(`Assessment:\n${sections['Assessment'].trim()}`);
+  if (eff.plan && sections['Plan']) parts.push(`Plan:\n${sections['Plan'].trim()}`);
+
+  return { rawText: parts.join('\n\n'), structuredSections: { sections, structured } };
+}
@@ -114,7 +114,7 @@ beforeAll(async () => {
   // Inject fake db and no-op schema into storage singleton
   storageRef.db = makeFakeDb()
   storageRef.ensureCoreSchema = async () => {}
-  storageRef.purgeExpiredNotes = async () => 0
+  storageRef.purgeExpiredNotes = async () => ({ deleted: 0, batches: 0, durationMs: 0, timedOut: false })
 
   // Register full routes (uses our injected storage)
   const { registerRoutes } = await import('./routes')
@@ -0,0 +1,116 @@
+import { sql } from "drizzle-orm";
+import { runLists } from "../shared/schema.js";
+import { storage } from "./storage.js";
+
+// Creates each active user's empty run list row for `day` ahead of time, so
+// the 6am GET /api/run-list/today finds an existing list instead of racing
+// to insert one. Only the row is precreated, not its patients or notes. A
+// user is active when their latest list in the last `lookbackDays` has
+// patients; the new list copies that list's mode and carry-forward
+// defaults, exactly as the on-demand path would.
+//
+// The carry-forward clone stays on demand on purpose: the client shows its
+// day-start modal for an empty list, and the user's all/selected/none choice
+// (which is not stored anywhere the job could read) then drives
+// clone-from-previous as usual.
+//
+// Idempotent with the on-demand path: the insert is ON CONFLICT DO NOTHING
+// on (user_id, day), and users who already have a list for `day` are
+// skipped, so re-runs and concurrent first loads never duplicate.
+
+export type RunListPrecreateMetrics = {
+  running: boolean;
+  day: string | null;
+  startedAt: string | null;
+  finishedAt: string | null;
+  durationMs: number | null;
+  usersScanned: number;
+  listsCreated: number;
+  errors: number;
+};
+
+export const runListPrecreateMetrics: RunListPrecreateMetrics = {
+  running: false,
+  day: null,
+  startedAt: null,
+  finishedAt: null,
+  durationMs: null,
+  usersScanned: 0,
+  listsCreated: 0,
+  errors: 0,
+};
+
+export type RunListPrecreateOptions = {
+  batchSize?: number;
+  lookbackDays?: number;
+};
+
+// Start of `date`'s day in server local time, matching the run list routes.
+export function startOfDay(date: Date): Date {
+  return new Date(date.getFullYear(), date.getMonth(), date.getDate());
+}
+
+export async function precreateRunLists(day: Date, options: RunListPrecreateOptions = {}): Promise<RunListPrecreateMetrics> {
+  const { batchSize = 100, lookbackDays = 3 } = options;
+  const m = runListPrecreateMetrics;
+  if (m.running) return m;
+
+  const target = startOfDay(day);
+  const since = new Date(target);
+  since.setDate(since.getDate() - lookbackDays);
+  const started = Date.now();
+  Object.assign(m, {
+    running: true,
+    day: target.toISOString(),
+    startedAt: new Date(started).toISOString(),
+    finishedAt: null,
+    durationMs: null,
+    usersScanned: 0,
+    listsCreated: 0,
+    errors: 0,
+  });
+
+  try {
+    // Keyset-paginate users by id; each row is the user's latest list before
+    // `target`, empty or not, matching what the on-demand path would pick.
+    let cursor = '';
+    for (;;) {
+      const result: any = await storage.db.execute(sql`
+        SELECT DISTINCT ON (rl.user_id) rl.user_id, rl.mode, rl.carry_forward_defaults,
+          EXISTS (SELECT 1 FROM list_patients p WHERE p.run_list_id = rl.id) AS has_patients
+        FROM run_lists rl
+        WHERE rl.day >= ${since} AND rl.day < ${target}
+          AND rl.user_id > ${cursor}
+          AND NOT EXISTS (SELECT 1 FROM run_lists t WHERE t.user_id = rl.user_id AND t.day = ${target})
+        ORDER BY rl.user_id, rl.day DESC
+        LIMIT ${batchSize}`);
+      const rows: any[] = Array.isArray(result) ? result : (result?.rows ?? []);
+      if (rows.length === 0) break;
+      m.usersScanned += rows.length;
+
+      // A user who emptied their latest list is not carried forward.
+      const active = rows.filter((prev) => prev.has_patients);
+      if (active.length > 0) {
+        try {
+          const created = await storage.db.insert(runLists).values(active.map((prev) => ({
+            userId: prev.user_id,
+            day: target,
+            mode: prev.mode || 'prepost',
+            carryForwardDefaults: prev.carry_forward_defaults || {},
+          }))).onConflictDoNothing().returning({ id: runLists.id });
+          m.listsCreated += created.length;
+        } catch (err) {
+          m.errors++;
+          console.error('[run-list-precreate] Failed for users', active.map((prev) => prev.user_id), err);
+        }
+      }
+      cursor = rows[rows.length - 1].user_id;
+      if (rows.length < batchSize) break;
+    }
+  } finally {
+    m.running = false;
+    m.finishedAt = new Date().toISOString();
+    m.durationMs = Date.now() - started;
+  }
+  return m;
+}
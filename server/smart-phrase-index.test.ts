@@ -0,0 +1,75 @@
+/// <reference types="vitest" />
+import { describe, it, expect } from 'vitest'
+import { SmartPhraseIndex } from './smart-phrase-index'
+
+let seq = 0
+function phrase(trigger: string, description: string | null = null): any {
+  seq++
+  return { id: `p${seq}`, trigger, description, userId: 'u1', createdAt: new Date(2025, 0, seq) }
+}
+
+describe('SmartPhraseIndex', () => {
+  const phrases = [
+    phrase('hpi'),
+    phrase('hpiext'),
+    phrase('HP'),
+    phrase('chpx'),
+    phrase('ros', 'review of systems incl. hp'),
+    phrase('plan'),
+  ]
+
+  function indexed() {
+    const index = new SmartPhraseIndex()
+    index.set('u1', phrases, index.version())
+    return index
+  }
+
+  it('ranks exact, then prefix (shortest first), then trigger and description substrings', () => {
+    const hits = indexed().search('u1', 'hp', 10)!
+    expect(hits.map((p) => p.trigger)).toEqual(['HP', 'hpi', 'hpiext', 'chpx', 'ros'])
+  })
+
+  it('honours the limit', () => {
+    expect(indexed().search('u1', 'hp', 2)!.map((p) => p.trigger)).toEqual(['HP', 'hpi'])
+  })
+
+  it('returns null for users that are not loaded or were invalidated', () => {
+    const index = indexed()
+    expect(index.search('u2', 'hp', 10)).toBeNull()
+    index.invalidate('u1')
+    expect(index.has('u1')).toBe(false)
+    expect(index.search('u1', 'hp', 10)).toBeNull()
+  })
+
+  it('drops a load that raced with a write', () => {
+    const index = new SmartPhraseIndex()
+    const version = index.version()
+    index.invalidate('u1')
+    index.set('u1', phrases, version)
+    expect(index.has('u1')).toBe(false)
+  })
+
+  it('expires entries after the TTL', () => {
+    const index = new SmartPhraseIndex({ ttlMs: 1000 })
+    index.set('u1', phrases, 0, 0)
+    expect(index.has('u1', 500)).toBe(true)
+    expect(index.has('u1', 1500)).toBe(false)
+  })
+
+  it('leaves users over the size cap to the database', () => {
+    const index = new SmartPhraseIndex({ maxPhrasesPerUser: 3 })
+    index.set('u1', phrases, 0)
+    expect(index.has('u1')).toBe(true)
+    expect(index.search('u1', 'hp', 10)).toBeNull()
+  })
+
+  it('evicts the oldest user beyond maxUsers', () => {
+    const index = new SmartPhraseIndex({ maxUsers: 2 })
+    index.set('a', phrases, 0)
+    index.set('b', phrases, 0)
+    index.set('c', phrases, 0)
+    expect(index.has('a')).toBe(false)
+    expect(index.has('b')).toBe(true)
+    expect(index.has('c')).toBe(true)
+  })
+})
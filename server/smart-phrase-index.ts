@@ -0,0 +1,142 @@
+import type { SmartPhrase } from "../shared/schema.js";
+import { WriteClock } from "./lru-cache.js";
+
+// In-process trigger index for smart phrase search. The editor calls
+// GET /api/smart-phrases?q= on nearly every keystroke, so each user's phrases
+// are held in memory sorted by lower-cased trigger: exact and prefix hits come
+// from a binary search, substring hits on trigger and description from one
+// pass over the user's (bounded) phrase list.
+//
+// Storage invalidates a user's entry on every create/update/delete/import.
+// Other server instances only see those writes after `ttlMs`, which bounds how
+// stale a suggestion list can be on a multi-instance deployment.
+
+type Entry = {
+  loadedAt: number;
+  // null when the user has more phrases than we are willing to hold; search
+  // then goes to Postgres (trigram indexes on trigger and description).
+  keys: string[] | null;
+  phrases: SmartPhrase[];
+};
+
+export type SmartPhraseIndexOptions = {
+  ttlMs: number;
+  maxUsers: number;
+  maxPhrasesPerUser: number;
+};
+
+const DEFAULTS: SmartPhraseIndexOptions = {
+  ttlMs: 30_000,
+  maxUsers: 2_000,
+  maxPhrasesPerUser: 5_000,
+};
+
+export class SmartPhraseIndex {
+  private entries = new Map<string, Entry>();
+  // Bounded like the entries: a user's write stamp goes when their entry does.
+  private writes: WriteClock<string>;
+  readonly options: SmartPhraseIndexOptions;
+
+  constructor(options: Partial<SmartPhraseIndexOptions> = {}) {
+    this.options = { ...DEFAULTS, ...options };
+    this.writes = new WriteClock(this.options.maxUsers);
+  }
+
+  // Snapshot before loading any user; `set` drops the load if that user
+  // wrote meanwhile. One clock covers every user, so it takes no user id.
+  version(): number {
+    return this.writes.snapshot();
+  }
+
+  has(userId: string, now = Date.now()): boolean {
+    const entry = this.entries.get(userId);
+    if (!entry) return false;
+    if (now - entry.loadedAt > this.options.ttlMs) {
+      this.evict(userId);
+      return false;
+    }
+    return true;
+  }
+
+  // `phrases` may hold up to maxPhrasesPerUser + 1 rows; one over the cap marks
+  // the user as too large to index.
+  set(userId: string, phrases: SmartPhrase[], version: number, now = Date.now()) {
+    if (this.writes.changedSince(userId, version)) return;
+    if (this.entries.size >= this.options.maxUsers && !this.entries.has(userId)) {
+      // Map iteration order is insertion order: drop the oldest load.
+      const oldest = this.entries.keys().next().value;
+      if (oldest !== undefined) this.evict(oldest);
+    }
+    this.entries.delete(userId);
+    if (phrases.length > this.options.maxPhrasesPerUser) {
+      this.entries.set(userId, { loadedAt: now, keys: null, phrases: [] });
+      return;
+    }
+    const sorted = [...phrases].sort((a, b) => compare(a.trigger.toLowerCase(), b.trigger.toLowerCase()));
+    this.entries.set(userId, { loadedAt: now, keys: sorted.map((p) => p.trigger.toLowerCase()), phrases: sorted });
+  }
+
+  invalidate(userId: string) {
+    this.writes.bump(userId);
+    this.entries.delete(userId);
+  }
+
+  private evict(userId: string) {
+    this.entries.delete(userId);
+    this.writes.forget(userId);
+  }
+
+  // Ranked matches, or null when the user is not indexed in memory.
+  search(userId: string, query: string, limit: number): SmartPhrase[] | null {
+    const entry = this.entries.get(userId);
+    if (!entry || !entry.keys) return null;
+    return rankPhrases(entry.keys, entry.phrases, query, limit);
+  }
+}
+
+function compare(a: string, b: string) {
+  return a < b ? -1 : a > b ? 1 : 0;
+}
+
+function lowerBound(keys: string[], q: string) {
+  let lo = 0;
+  let hi = keys.length;
+  while (lo < hi) {
+    const mid = (lo + hi) >>> 1;
+    if (keys[mid] < q) lo = mid + 1;
+    else hi = mid;
+  }
+  return lo;
+}
+
+const newestFirst = (a: SmartPhrase, b: SmartPhrase) =>
+  new Date(b.createdAt || 0).getTime() - new Date(a.createdAt || 0).getTime();
+
+// Exact trigger, then trigger prefix (shortest first), then trigger substring,
+// then description substring; newest first within each group.
+export function rankPhrases(keys: string[], phrases: SmartPhrase[], query: string, limit: number): SmartPhrase[] {
+  const q = query.toLowerCase();
+  if (!q) return [];
+  const start = lowerBound(keys, q);
+  let end = start;
+  while (end < keys.length && keys[end].startsWith(q)) end++;
+
+  const exact: SmartPhrase[] = [];
+  const prefix: SmartPhrase[] = [];
+  for (let i = start; i < end; i++) (keys[i] === q ? exact : prefix).push(phrases[i]);
+  exact.sort(newestFirst);
+  prefix.sort((a, b) => a.trigger.length - b.trigger.length || newestFirst(a, b));
+  const out = exact.concat(prefix);
+  if (out.length >= limit) return out.slice(0, limit);
+
+  const inTrigger: SmartPhrase[] = [];
+  const inDescription: SmartPhrase[] = [];
+  for (let i = 0; i < keys.length; i++) {
+    if (i >= start && i < end) continue;
+    if (keys[i].includes(q)) inTrigger.push(phrases[i]);
+    else if (phrases[i].description?.toLowerCase().includes(q)) inDescription.push(phrases[i]);
+  }
+  inTrigger.sort(newestFirst);
+  inDescription.sort(newestFirst);
+  return out.concat(inTrigger, inDescription).slice(0, limit);
+}
@@ -12,6 +12,9 @@ import {
   pertinentNegativePresets,
   userLabSettings,
   autocompleteItems,
+  listPatients,
+  runListNotes,
+  runListNoteVersions,
   type User,
   type InsertUser,
   type UpsertUser,
@@ -36,21 +39,31 @@ import {
   type InsertUserLabSetting,
   type AutocompleteItem,
   type InsertAutocompleteItem,
+  type ListPatient,
+  type RunListNote,
 } from "../shared/schema.js";
 import { db } from "./db.js";
-import { eq, and, desc, like, or, sql, gt, isNull } from "drizzle-orm";
+import { eq, and, desc, or, sql, gt, isNull, inArray, type SQL } from "drizzle-orm";
+import { UserLoader } from "./user-loader.js";
+import { SmartPhraseIndex } from "./smart-phrase-index.js";
+import { LruCache, WriteClock } from "./lru-cache.js";
+import { createHash, randomUUID } from "crypto";
+import type { ClonedNote } from "./run-list-clone.js";
 
 export interface IStorage {
   // User operations (required for Replit Auth)
   getUser(id: string): Promise<User | undefined>;
+  getUsersByIds(ids: string[]): Promise<User[]>;
+  userLoader(): UserLoader;
   upsertUser(user: UpsertUser): Promise<User>;
   getUserByUsername(username: string): Promise<User | undefined>;
   createUser(user: InsertUser): Promise<User>;
+  ensureUser(userId: string, profile?: Partial<InsertUser>): Promise<void>;
 
   // Team operations
   getTeam(id: string): Promise<Team | undefined>;
   getTeamByGroupCode(groupCode: string): Promise<Team | undefined>;
-  getTeamMembers(teamId: string): Promise<(TeamMember & { user: User })[]>;
+  getTeamMembers(teamId: string, loader?: UserLoader): Promise<(TeamMember & { user: User })[]>;
   getUserTeams(userId: string): Promise<(TeamMember & { team: Team })[]>;
   getUserActiveTeam(userId: string): Promise<(TeamMember & { team: Team }) | undefined>;
   createTeam(team: InsertTeam): Promise<Team>;
@@ -74,7 +87,8 @@ export interface IStorage {
   createNote(note: InsertNote): Promise<Note>;
   updateNote(id: string, note: Partial<InsertNote>): Promise<Note>;
   deleteNote(id: string): Promise<void>;
-  purgeExpiredNotes(): Promise<number>;
+  purgeExpiredNotes(budget?: CleanupBudget): Promise<CleanupStats>;
+  purgeExpiredAiResponses(budget?: CleanupBudget): Promise<CleanupStats>;
 
   // Smart phrase operations
   getSmartPhrases(userId: string): Promise<SmartPhrase[]>;
@@ -85,19 +99,19 @@ export interface IStorage {
   importSmartPhrase(shareableId: string, userId: string): Promise<{ success: boolean; message: string; phrase?: SmartPhrase }>;
 
   // Team todo operations
-  getTeamTodos(teamId: string): Promise<(TeamTodo & { assignedTo?: User; createdBy: User })[]>;
+  getTeamTodos(teamId: string, loader?: UserLoader): Promise<(TeamTodo & { assignedTo?: User; assignees?: User[]; createdBy: User })[]>;
   createTeamTodo(todo: InsertTeamTodo): Promise<TeamTodo>;
   updateTeamTodo(id: string, todo: Partial<InsertTeamTodo>): Promise<TeamTodo>;
   deleteTeamTodo(id: string): Promise<void>;
 
   // Team calendar operations
-  getTeamCalendarEvents(teamId: string): Promise<(TeamCalendarEvent & { createdBy: User })[]>;
+  getTeamCalendarEvents(teamId: string, loader?: UserLoader): Promise<(TeamCalendarEvent & { createdBy: User })[]>;
   createTeamCalendarEvent(event: InsertTeamCalendarEvent): Promise<TeamCalendarEvent>;
   updateTeamCalendarEvent(id: string, event: Partial<InsertTeamCalendarEvent>): Promise<TeamCalendarEvent>;
   deleteTeamCalendarEvent(id: string): Promise<void>;
 
   // Bulletin operations
-  getTeamBulletinPosts(teamId: string): Promise<(TeamBulletinPost & { createdBy: User })[]>;
+  getTeamBulletinPosts(teamId: string, loader?: UserLoader): Promise<(TeamBulletinPost & { createdBy: User })[]>;
   createTeamBulletinPost(post: InsertTeamBulletinPost, creatorRole: string): Promise<TeamBulletinPost>;
   updateTeamBulletinPost(id: string, post: Partial<InsertTeamBulletinPost>): Promise<TeamBulletinPost>;
   deleteTeamBulletinPost(id: string): Promise<void>;
@@ -120,8 +134,47 @@ export interface IStorage {
   deleteAutocompleteItem(id: string): Promise<void>;
 }
 
+// Expired teams are deleted by the delete-expired-teams job; until it runs,
+// hide them from listings and joins.
+const notExpired = () => gt(teams.expiresAt, new Date());
+
+const SHORT_CODE_TABLES: Record<ShortCodeTable, string> = {
+  smartPhrases: 'smart_phrases',
+  noteTemplates: 'note_templates',
+  autocompleteItems: 'autocomplete_items',
+};
+const SHORT_CODE_CHARS = 'ABCDEFGHJKLMNPQRSTUVWXYZ23456789';
+// Enough that a batch with no free code is unlikely until the 32^4 space is
+// ~90% used (0.9^64 < 0.2%).
+const SHORT_CODE_BATCH = 64;
+
+function randomShortCode(): string {
+  let code = '';
+  for (let i = 0; i < 4; i++) code += SHORT_CODE_CHARS.charAt(Math.floor(Math.random() * SHORT_CODE_CHARS.length));
+  return code;
+}
+
+// Profile used when a user is first seen without one (dev sessions, tests).
+export const DEFAULT_USER_PROFILE = {
+  email: "doctor@hospital.com",
+  firstName: "Dr. Sarah",
+  lastName: "Mitchell",
+  specialty: "Emergency Medicine",
+};
+
 export class DatabaseStorage implements IStorage {
   public db = db;
+  public smartPhraseIndex = new SmartPhraseIndex();
+  // User ids known to have a row. Users are never deleted by the app; the TTL
+  // re-checks now and then in case one was removed out from under us.
+  private knownUsers = new LruCache<string, true>(10_000, 10 * 60_000);
+  // Serialized autocomplete lists per user, then per category ('' = all).
+  // The TTL bounds staleness across server instances; writes on this
+  // instance drop the user's entry immediately.
+  public autocompleteCache = new LruCache<string, Map<string, AutocompleteList>>(5_000, 60_000);
+  // Capped like the cache; a user's stamp is also dropped on the next load
+  // after their cached lists are gone.
+  private autocompleteWrites = new WriteClock<string>(5_000);
   /**
    * Ensure core tables and columns exist in production. This provides
    * resilience on fresh deployments where migrations may not have run.
@@ -232,6 +285,8 @@ export class DatabaseStorage implements IStorage {
           CREATE UNIQUE INDEX ux_run_lists_user_day ON run_lists(user_id, day);
         END IF;
       END $$;
+      -- day-range scans (next-day list precreate)
+      CREATE INDEX IF NOT EXISTS idx_run_lists_day ON run_lists(day);
 
       -- list_patients: ordered patients within a run_list
       CREATE TABLE IF NOT EXISTS list_patients (
@@ -283,13 +338,8 @@ export class DatabaseStorage implements IStorage {
         ADD COLUMN IF NOT EXISTS created_at TIMESTAMP DEFAULT NOW(),
         ADD COLUMN IF NOT EXISTS updated_at TIMESTAMP DEFAULT NOW(),
         ADD COLUMN IF NOT EXISTS expires_at TIMESTAMP;
-      DO $$ BEGIN
-        IF NOT EXISTS (
-          SELECT 1 FROM pg_indexes WHERE schemaname = 'public' AND indexname = 'idx_run_list_notes_expires'
-        ) THEN
-          CREATE INDEX idx_run_list_notes_expires ON run_list_notes(expires_at);
-        END IF;
-      END $$;
+      -- partial: only rows the expiry cleanup can ever delete
+      CREATE INDEX IF NOT EXISTS idx_run_list_notes_expires_at_partial ON run_list_notes(expires_at) WHERE expires_at IS NOT NULL;
 
       -- run_list_note_versions: version history per note
       CREATE TABLE IF NOT EXISTS run_list_note_versions (
@@ -315,11 +365,6 @@ export class DatabaseStorage implements IStorage {
       END $$;
     `);
 
-    // Background cleanup job: delete expired run list notes and prune empty old lists
-    (async () => {
-      try { await (this as any).cleanupExpiredRunListData?.(); } catch {}
-    })();
-
     // Seed a system user for public samples (if not present) and a few sample smart phrases with fixed short codes
     try {
       await this.db.execute(`
@@ -416,7 +461,7 @@ export class DatabaseStorage implements IStorage {
     await this.db.execute(`
       ALTER TABLE IF EXISTS notes
         ADD COLUMN IF NOT EXISTS expires_at TIMESTAMP;
-      CREATE INDEX IF NOT EXISTS idx_notes_expires_at ON public.notes(expires_at);
+      CREATE INDEX IF NOT EXISTS idx_notes_expires_at_partial ON public.notes(expires_at) WHERE expires_at IS NOT NULL;
     `);
 
     // Ensure notes has tags column for TestSprite compatibility
@@ -424,64 +469,237 @@ export class DatabaseStorage implements IStorage {
       ALTER TABLE IF EXISTS notes
         ADD COLUMN IF NOT EXISTS tags JSONB DEFAULT '[]'::jsonb;
     `);
-  }
 
-  async cleanupExpiredRunListData() {
-    // Delete expired notes first (versions cascade on note delete)
+    // Community browse and smart phrase search: ordering indexes over public
+    // rows, plus trigram indexes for search (pg_trgm may be unavailable;
+    // search then scans).
+    await this.db.execute(`
+      CREATE INDEX IF NOT EXISTS idx_note_templates_public_newest ON note_templates (created_at DESC NULLS LAST, id) WHERE is_public = true;
+      CREATE INDEX IF NOT EXISTS idx_note_templates_public_downloads ON note_templates (download_count DESC NULLS LAST, created_at DESC NULLS LAST, id) WHERE is_public = true;
+      CREATE INDEX IF NOT EXISTS idx_smart_phrases_public_newest ON smart_phrases (created_at DESC NULLS LAST, id) WHERE is_public = true;
+      CREATE INDEX IF NOT EXISTS idx_smart_phrases_public_downloads ON smart_phrases (download_count DESC NULLS LAST, created_at DESC NULLS LAST, id) WHERE is_public = true;
+      CREATE INDEX IF NOT EXISTS idx_smart_phrases_public_category ON smart_phrases (category, created_at DESC NULLS LAST, id) WHERE is_public = true;
+      CREATE INDEX IF NOT EXISTS idx_autocomplete_items_public_newest ON autocomplete_items (created_at DESC NULLS LAST, id) WHERE is_public = true;
+      CREATE INDEX IF NOT EXISTS idx_autocomplete_items_public_downloads ON autocomplete_items (download_count DESC NULLS LAST, created_at DESC NULLS LAST, id) WHERE is_public = true;
+      CREATE INDEX IF NOT EXISTS idx_autocomplete_items_public_category ON autocomplete_items (category, created_at DESC NULLS LAST, id) WHERE is_public = true;
+      CREATE INDEX IF NOT EXISTS idx_smart_phrases_user_id ON smart_phrases (user_id);
+    `);
     try {
-      const now = new Date();
-      await this.db.delete((await import('../shared/schema.js')).runListNotes)
-        .where((await import('drizzle-orm')).lt((await import('../shared/schema.js')).runListNotes.expiresAt as any, now as any));
-    } catch (e) {
-      // non-fatal
+      await this.db.execute(`
+        CREATE EXTENSION IF NOT EXISTS pg_trgm;
+        CREATE INDEX IF NOT EXISTS idx_note_templates_public_name_trgm ON note_templates USING gin (name gin_trgm_ops) WHERE is_public = true;
+        CREATE INDEX IF NOT EXISTS idx_note_templates_public_description_trgm ON note_templates USING gin (description gin_trgm_ops) WHERE is_public = true;
+        CREATE INDEX IF NOT EXISTS idx_smart_phrases_public_trigger_trgm ON smart_phrases USING gin (trigger gin_trgm_ops) WHERE is_public = true;
+        CREATE INDEX IF NOT EXISTS idx_smart_phrases_public_description_trgm ON smart_phrases USING gin (description gin_trgm_ops) WHERE is_public = true;
+        CREATE INDEX IF NOT EXISTS idx_autocomplete_items_public_text_trgm ON autocomplete_items USING gin (text gin_trgm_ops) WHERE is_public = true;
+        CREATE INDEX IF NOT EXISTS idx_autocomplete_items_public_description_trgm ON autocomplete_items USING gin (description gin_trgm_ops) WHERE is_public = true;
+        CREATE INDEX IF NOT EXISTS idx_smart_phrases_trigger_trgm ON smart_phrases USING gin (trigger gin_trgm_ops);
+        CREATE INDEX IF NOT EXISTS idx_smart_phrases_description_trgm ON smart_phrases USING gin (description gin_trgm_ops);
+      `);
+    } catch (err) {
+      console.warn('[Storage] Trigram search indexes not created:', (err as any)?.message || err);
     }
-    // Prune run lists older than 4 days that have no patients
-    try {
-      const { runLists, listPatients } = await import('../shared/schema.js');
-      const { lt, and } = await import('drizzle-orm');
-      const threshold = new Date();
-      threshold.setDate(threshold.getDate() - 4);
-      // Fetch candidates
-      const rows: any[] = await this.db.select().from(runLists).where(lt(runLists.day as any, threshold as any));
-      for (const rl of rows) {
-        const [anyPatient] = await this.db.select().from(listPatients).where((await import('drizzle-orm')).eq(listPatients.runListId, rl.id)).limit(1);
-        if (!anyPatient) {
-          await this.db.delete(runLists).where((await import('drizzle-orm')).eq(runLists.id, rl.id));
-        }
+  }
+
+  // Expired run list notes (versions cascade), then run lists older than
+  // four days that have no patients left.
+  async cleanupExpiredRunListData(budget: CleanupBudget = {}): Promise<{ notes: CleanupStats; runLists: CleanupStats }> {
+    const now = new Date();
+    const threshold = new Date(now);
+    threshold.setDate(threshold.getDate() - 4);
+    // One deadline for both deletes, so the whole run stays within budgetMs.
+    const { batchSize = 1000, budgetMs = 10_000 } = budget;
+    const deadline = now.getTime() + budgetMs;
+    const notes = await this.deleteInBatches('run_list_notes', sql`expires_at IS NOT NULL AND expires_at < ${now}`, batchSize, deadline);
+    const lists = await this.deleteInBatches('run_lists', sql`day < ${threshold}
+      AND NOT EXISTS (SELECT 1 FROM list_patients p WHERE p.run_list_id = run_lists.id)`, batchSize, deadline);
+    return { notes, runLists: lists };
+  }
+
+  // Delete rows matching `where` a batch at a time, so no statement holds
+  // locks on more than `batchSize` rows, until none are left or `deadline`
+  // (epoch ms) passes; the next run picks up the rest. SKIP LOCKED leaves
+  // rows that a request is touching for a later pass instead of waiting on them.
+  private async deleteInBatches(table: 'notes' | 'run_list_notes' | 'run_lists' | 'ai_response_cache', where: SQL, batchSize: number, deadline: number): Promise<CleanupStats> {
+    const started = Date.now();
+    const stats: CleanupStats = { deleted: 0, batches: 0, durationMs: 0, timedOut: false };
+    const t = sql.raw(table);
+    const key = sql.raw(table === 'ai_response_cache' ? 'key_hash' : 'id');
+    for (;;) {
+      if (Date.now() >= deadline) {
+        stats.timedOut = true;
+        break;
       }
-    } catch (e) {
-      // non-fatal
+      const result: any = await db.execute(sql`
+        DELETE FROM ${t} WHERE ${key} IN (
+          SELECT ${key} FROM ${t} WHERE ${where} LIMIT ${batchSize} FOR UPDATE SKIP LOCKED
+        ) RETURNING 1`);
+      const rows: any[] = Array.isArray(result) ? result : (result?.rows ?? []);
+      stats.batches++;
+      stats.deleted += rows.length;
+      if (rows.length < batchSize) break;
     }
+    stats.durationMs = Date.now() - started;
+    return stats;
+  }
+
+  // Run `fn` in one transaction on whichever driver db.ts configured.
+  transaction<T>(fn: (tx: any) => Promise<T>): Promise<T> {
+    return (this.db as any).transaction(fn);
+  }
+
+  // Copy a previous list's patients into `toRunListId`, each with a new draft
+  // note built by `carry`. Ids are assigned up front so both tables are written
+  // with one multi-row INSERT each, whatever the list size. Pass a transaction
+  // to make the copy part of a larger unit of work.
+  async cloneRunListPatients(
+    fromRunListId: string,
+    toRunListId: string,
+    carry: (patient: ListPatient, note: RunListNote | null) => ClonedNote & { carryForwardOverrides?: Record<string, any> | null },
+    executor: any = db,
+  ): Promise<number> {
+    const prevRows = await executor
+      .select({ patient: listPatients, note: runListNotes })
+      .from(listPatients)
+      .leftJoin(runListNotes, eq(runListNotes.listPatientId, listPatients.id))
+      .where(eq(listPatients.runListId, fromRunListId))
+      .orderBy(listPatients.position);
+    if (prevRows.length === 0) return 0;
+
+    const expiresAt = new Date(Date.now() + 48 * 60 * 60 * 1000);
+    const patientRows: any[] = [];
+    const noteRows: any[] = [];
+    for (const { patient, note } of prevRows) {
+      const id = randomUUID();
+      const { carryForwardOverrides = null, ...cloned } = carry(patient, note);
+      patientRows.push({ id, runListId: toRunListId, position: patient.position, alias: patient.alias, active: true, carryForwardOverrides });
+      noteRows.push({ listPatientId: id, ...cloned, status: 'draft', expiresAt });
+    }
+    await executor.insert(listPatients).values(patientRows);
+    await executor.insert(runListNotes).values(noteRows);
+    return prevRows.length;
+  }
+
+  // Save AI-generated notes for many patients at once, in one transaction.
+  // The patients' notes are locked and each is checked against the
+  // updatedAt it was generated from, like the single-note save's
+  // expectedUpdatedAt: a note edited (or first created) meanwhile is left
+  // alone and its patient returned in `conflicts`. The rest are written with
+  // one insert for new notes, one upsert on the list_patient_id unique key for
+  // existing ones, and one insert for their ai_merge version rows.
+  async saveGeneratedRunListNotes(notes: GeneratedRunListNote[]): Promise<{ saved: RunListNote[]; conflicts: string[] }> {
+    if (notes.length === 0) return { saved: [], conflicts: [] };
+    const now = new Date();
+    const expiresAt = new Date(now.getTime() + 48 * 60 * 60 * 1000);
+    const timeOf = (d: Date | string | null | undefined) => (d ? new Date(d).getTime() : null);
+    return this.transaction(async (tx) => {
+      const current: { listPatientId: string; updatedAt: Date | null }[] = await tx
+        .select({ listPatientId: runListNotes.listPatientId, updatedAt: runListNotes.updatedAt })
+        .from(runListNotes)
+        .where(inArray(runListNotes.listPatientId, notes.map((n) => n.listPatientId)))
+        .for('update');
+      const currentAt = new Map(current.map((row) => [row.listPatientId, timeOf(row.updatedAt)]));
+
+      const conflicts: string[] = [];
+      const inserts: any[] = [];
+      const updates: any[] = [];
+      for (const { expectedUpdatedAt, ...note } of notes) {
+        const row = { ...note, updatedAt: now, expiresAt };
+        if (!currentAt.has(note.listPatientId)) {
+          if (expectedUpdatedAt === undefined) inserts.push(row);
+          else conflicts.push(note.listPatientId);
+        } else if (expectedUpdatedAt !== undefined && timeOf(expectedUpdatedAt) === currentAt.get(note.listPatientId)) {
+          updates.push(row);
+        } else {
+          conflicts.push(note.listPatientId);
+        }
+      }
+
+      const saved: RunListNote[] = [];
+      if (inserts.length > 0) {
+        // A note created since the lock was taken is a conflict too.
+        const created: RunListNote[] = await tx.insert(runListNotes)
+          .values(inserts)
+          .onConflictDoNothing({ target: runListNotes.listPatientId })
+          .returning();
+        const createdFor = new Set(created.map((note) => note.listPatientId));
+        conflicts.push(...inserts.filter((row) => !createdFor.has(row.listPatientId)).map((row) => row.listPatientId));
+        saved.push(...created);
+      }
+      if (updates.length > 0) {
+        saved.push(...await tx.insert(runListNotes)
+          .values(updates)
+          .onConflictDoUpdate({
+            target: runListNotes.listPatientId,
+            set: {
+              rawText: sql`excluded.raw_text`,
+              structuredSections: sql`excluded.structured_sections`,
+              status: sql`excluded.status`,
+              updatedAt: sql`excluded.updated_at`,
+              expiresAt: sql`excluded.expires_at`,
+            },
+          })
+          .returning());
+      }
+      if (saved.length > 0) {
+        await tx.insert(runListNoteVersions).values(saved.map((note) => ({
+          noteId: note.id,
+          rawText: note.rawText,
+          structuredSections: note.structuredSections,
+          source: 'ai_merge',
+        })));
+      }
+      return { saved, conflicts };
+    });
   }
-  private async generateUniqueShortCodeFor(table: 'smartPhrases' | 'noteTemplates' | 'autocompleteItems'): Promise<string> {
-    const chars = 'ABCDEFGHJKLMNPQRSTUVWXYZ23456789';
-    let attempts = 0;
-    while (attempts < 200) {
-      let code = '';
-      for (let i = 0; i < 4; i++) code += chars.charAt(Math.floor(Math.random() * chars.length));
-      let exists = false;
-      if (table === 'smartPhrases') {
-        const [row] = await db.select().from(smartPhrases).where(eq(smartPhrases.shortCode, code));
-        exists = !!row;
-      } else if (table === 'noteTemplates') {
-        const [row] = await db.select().from(noteTemplates).where(eq(noteTemplates.shortCode, code));
-        exists = !!row;
-      } else {
-        const [row] = await db.select().from(autocompleteItems).where(eq(autocompleteItems.shortCode, code));
-        exists = !!row;
+
+  // Give row `id` a free 4-char short code in one round trip: the UPDATE
+  // draws a batch of random candidates and takes the first one no row uses.
+  // The unique index is the final guard; losing a race to another writer
+  // (23505) or a fully taken batch just retries with fresh candidates.
+  // Returns the row's code (an existing one is kept).
+  async assignShortCode(table: ShortCodeTable, id: string): Promise<string> {
+    const t = sql.raw(SHORT_CODE_TABLES[table]);
+    for (let attempt = 0; attempt < 5; attempt++) {
+      const candidates = Array.from({ length: SHORT_CODE_BATCH }, randomShortCode);
+      try {
+        const result: any = await db.execute(sql`
+          UPDATE ${t} SET short_code = coalesce(${t}.short_code, (
+            SELECT c.code FROM (VALUES ${sql.join(candidates.map((c) => sql`(${c})`), sql`, `)}) AS c(code)
+            WHERE NOT EXISTS (SELECT 1 FROM ${t} x WHERE x.short_code = c.code)
+            LIMIT 1
+          ))
+          WHERE id = ${id}
+          RETURNING short_code, user_id`);
+        const [row] = Array.isArray(result) ? result : (result?.rows ?? []);
+        if (!row) throw new Error(`No ${table} row ${id}`);
+        // Cached lists and the phrase index hold whole rows, short code included
+        if (table === 'autocompleteItems') this.invalidateAutocompleteItems(row.user_id);
+        if (table === 'smartPhrases') this.smartPhraseIndex.invalidate(row.user_id);
+        if (row.short_code) return row.short_code;
+      } catch (e: any) {
+        if (e?.code !== '23505') throw e;
       }
-      if (!exists) return code;
-      attempts++;
     }
     throw new Error('Failed to generate unique short code');
   }
-  
+
   // User operations
   async getUser(id: string): Promise<User | undefined> {
     const [user] = await db.select().from(users).where(eq(users.id, id));
     return user;
   }
 
+  async getUsersByIds(ids: string[]): Promise<User[]> {
+    if (ids.length === 0) return [];
+    return db.select().from(users).where(inArray(users.id, ids));
+  }
+
+  // One per request: batches and dedupes the user lookups behind team views.
+  userLoader(): UserLoader {
+    return new UserLoader((ids) => this.getUsersByIds(ids));
+  }
+
   async upsertUser(userData: UpsertUser): Promise<User> {
     const [user] = await db
       .insert(users)
@@ -494,6 +712,7 @@ export class DatabaseStorage implements IStorage {
         },
       })
       .returning();
+    if (user) this.knownUsers.set(user.id, true);
     return user;
   }
 
@@ -504,16 +723,28 @@ export class DatabaseStorage implements IStorage {
 
   async createUser(userData: InsertUser): Promise<User> {
     const [user] = await db.insert(users).values(userData).returning();
+    if (user) this.knownUsers.set(user.id, true);
     return user;
   }
 
+  // Insert-if-missing for the row everything a user owns points at. Ids this
+  // instance has already seen cost no query; the first sight is a single
+  // INSERT ... ON CONFLICT DO NOTHING, which is safe under concurrent requests.
+  async ensureUser(userId: string, profile: Partial<InsertUser> = {}): Promise<void> {
+    if (this.knownUsers.get(userId)) return;
+    await db.insert(users)
+      .values({ ...DEFAULT_USER_PROFILE, ...profile, id: userId })
+      .onConflictDoNothing({ target: users.id });
+    this.knownUsers.set(userId, true);
+  }
+
   // Team operations
   async getTeam(id: string): Promise<Team | undefined> {
     const [team] = await db.select().from(teams).where(eq(teams.id, id));
     return team;
   }
 
-  async getTeamMembers(teamId: string): Promise<(TeamMember & { user: User })[]> {
+  async getTeamMembers(teamId: string, loader?: UserLoader): Promise<(TeamMember & { user: User })[]> {
     const members = await db
       .select({
         id: teamMembers.id,
@@ -526,7 +757,10 @@ export class DatabaseStorage implements IStorage {
       .from(teamMembers)
       .innerJoin(users, eq(teamMembers.userId, users.id))
       .where(eq(teamMembers.teamId, teamId));
-    
+
+    // Members are who create and get assigned team content, so priming the
+    // request's loader here usually makes later user lookups free.
+    members.forEach((m) => loader?.prime(m.user));
     return members;
   }
 
@@ -560,6 +794,13 @@ export class DatabaseStorage implements IStorage {
   }
 
   async getTeamByGroupCode(groupCode: string): Promise<Team | undefined> {
+    const [team] = await db.select().from(teams).where(and(eq(teams.groupCode, groupCode.toUpperCase()), notExpired()));
+    return team;
+  }
+
+  // Includes expired teams: they keep their group code until the cleanup job
+  // deletes them.
+  private async findTeamByGroupCode(groupCode: string): Promise<Team | undefined> {
     const [team] = await db.select().from(teams).where(eq(teams.groupCode, groupCode.toUpperCase()));
     return team;
   }
@@ -576,7 +817,7 @@ export class DatabaseStorage implements IStorage {
       })
       .from(teamMembers)
       .innerJoin(teams, eq(teamMembers.teamId, teams.id))
-      .where(eq(teamMembers.userId, userId));
+      .where(and(eq(teamMembers.userId, userId), notExpired()));
 
     return userTeams;
   }
@@ -592,8 +833,8 @@ export class DatabaseStorage implements IStorage {
         code += chars.charAt(Math.floor(Math.random() * chars.length));
       }
 
-      // Check if code already exists
-      const existing = await this.getTeamByGroupCode(code);
+      // Check if code already exists (expired teams still hold theirs)
+      const existing = await this.findTeamByGroupCode(code);
       if (!existing) {
         return code;
       }
@@ -611,7 +852,7 @@ export class DatabaseStorage implements IStorage {
   }
 
   async joinTeamByGroupCode(groupCode: string, userId: string): Promise<{ success: boolean; message: string; team?: Team }> {
-    const team = await this.getTeamByGroupCode(groupCode);
+    const team = await this.findTeamByGroupCode(groupCode);
     
     if (!team) {
       return { success: false, message: 'Team not found with that group code' };
@@ -704,8 +945,7 @@ export class DatabaseStorage implements IStorage {
       // Try to backfill shortCode (ignore if column doesn't exist yet)
       try {
         if (!(template as any).shortCode) {
-          const code = await this.generateUniqueShortCodeFor('noteTemplates');
-          await db.update(noteTemplates).set({ shortCode: code as any }).where(eq(noteTemplates.id, template.id));
+          const code = await this.assignShortCode('noteTemplates', template.id);
           (template as any).shortCode = code;
         }
       } catch {}
@@ -789,8 +1029,7 @@ export class DatabaseStorage implements IStorage {
         .where(eq(noteTemplates.id, sourceTemplate.id));
     } catch {}
     try {
-      const code = await this.generateUniqueShortCodeFor('noteTemplates');
-      await db.update(noteTemplates).set({ shortCode: code as any }).where(eq(noteTemplates.id, newTemplate.id));
+      const code = await this.assignShortCode('noteTemplates', newTemplate.id);
       (newTemplate as any).shortCode = code;
     } catch {}
     return { success: true, message: 'Template imported successfully', template: newTemplate };
@@ -812,8 +1051,7 @@ export class DatabaseStorage implements IStorage {
       userId,
     } as any).returning();
     try {
-      const code = await this.generateUniqueShortCodeFor('noteTemplates');
-      await db.update(noteTemplates).set({ shortCode: code as any }).where(eq(noteTemplates.id, newTemplate.id));
+      const code = await this.assignShortCode('noteTemplates', newTemplate.id);
       (newTemplate as any).shortCode = code;
     } catch {}
     // Increment source download counter
@@ -863,13 +1101,21 @@ export class DatabaseStorage implements IStorage {
     await db.delete(notes).where(eq(notes.id, id));
   }
 
-  async purgeExpiredNotes(): Promise<number> {
+  async purgeExpiredNotes(budget: CleanupBudget = {}): Promise<CleanupStats> {
+    const now = new Date();
+    const { batchSize = 1000, budgetMs = 10_000 } = budget;
+    return this.deleteInBatches('notes', sql`expires_at IS NOT NULL AND expires_at <= ${now}`, batchSize, Date.now() + budgetMs);
+  }
+
+  // Expired rows of the shared Nova response cache (server/ai/nova-cache.ts).
+  // The table is created lazily by the first cache write, so it may not exist.
+  async purgeExpiredAiResponses(budget: CleanupBudget = {}): Promise<CleanupStats> {
     const now = new Date();
-    const result = await db.execute(sql`DELETE FROM notes WHERE expires_at IS NOT NULL AND expires_at <= ${now}`);
-    // drizzle execute returns object; try to parse rowCount if available; fallback 0
-    const rc: any = result as any;
-    const deleted = typeof rc.rowCount === 'number' ? rc.rowCount : 0;
-    return deleted;
+    const { batchSize = 1000, budgetMs = 10_000 } = budget;
+    const result: any = await db.execute(sql`SELECT to_regclass('public.ai_response_cache') IS NOT NULL AS present`);
+    const [table] = Array.isArray(result) ? result : (result?.rows ?? []);
+    if (!table?.present) return { deleted: 0, batches: 0, durationMs: 0, timedOut: false };
+    return this.deleteInBatches('ai_response_cache', sql`expires_at <= ${now}`, batchSize, Date.now() + budgetMs);
   }
 
   // Smart phrase operations
@@ -881,7 +1127,27 @@ export class DatabaseStorage implements IStorage {
       .orderBy(desc(smartPhrases.createdAt));
   }
 
+  // Keystroke search: served from the in-memory trigger index, loading the
+  // user's phrases once per TTL. Users with too many phrases to hold go to SQL.
   async searchSmartPhrases(userId: string, query: string): Promise<SmartPhrase[]> {
+    const index = this.smartPhraseIndex;
+    if (!index.has(userId)) {
+      const version = index.version();
+      const rows = await db
+        .select()
+        .from(smartPhrases)
+        .where(eq(smartPhrases.userId, userId))
+        .limit(index.options.maxPhrasesPerUser + 1);
+      index.set(userId, rows, version);
+    }
+    return index.search(userId, query, 10) ?? this.searchSmartPhrasesInDb(userId, query, 10);
+  }
+
+  // Same ranking as the in-memory index, backed by the trigram indexes on
+  // trigger and description.
+  async searchSmartPhrasesInDb(userId: string, query: string, limit: number): Promise<SmartPhrase[]> {
+    const escaped = query.toLowerCase().replace(/[\\%_]/g, '\\$&');
+    const contains = `%${escaped}%`;
     return await db
       .select()
       .from(smartPhrases)
@@ -889,21 +1155,29 @@ export class DatabaseStorage implements IStorage {
         and(
           eq(smartPhrases.userId, userId),
           or(
-            like(smartPhrases.trigger, `%${query}%`),
-            like(smartPhrases.description, `%${query}%`)
+            sql`${smartPhrases.trigger} ILIKE ${contains}`,
+            sql`${smartPhrases.description} ILIKE ${contains}`
           )
         )
       )
-      .orderBy(desc(smartPhrases.createdAt))
-      .limit(10);
+      .orderBy(
+        sql`CASE
+          WHEN lower(${smartPhrases.trigger}) = ${query.toLowerCase()} THEN 0
+          WHEN ${smartPhrases.trigger} ILIKE ${`${escaped}%`} THEN 1
+          WHEN ${smartPhrases.trigger} ILIKE ${contains} THEN 2
+          ELSE 3 END`,
+        sql`CASE WHEN ${smartPhrases.trigger} ILIKE ${`${escaped}%`} THEN length(${smartPhrases.trigger}) ELSE 0 END`,
+        desc(smartPhrases.createdAt)
+      )
+      .limit(limit);
   }
 
   async createSmartPhrase(phraseData: InsertSmartPhrase): Promise<SmartPhrase> {
     const [phrase] = await db.insert(smartPhrases).values(phraseData).returning();
+    this.smartPhraseIndex.invalidate(phrase.userId);
     try {
       if (!(phrase as any).shortCode) {
-        const code = await this.generateUniqueShortCodeFor('smartPhrases');
-        await db.update(smartPhrases).set({ shortCode: code as any }).where(eq(smartPhrases.id, phrase.id));
+        const code = await this.assignShortCode('smartPhrases', phrase.id);
         (phrase as any).shortCode = code;
       }
     } catch {}
@@ -916,11 +1190,13 @@ export class DatabaseStorage implements IStorage {
       .set({ ...phraseData, updatedAt: new Date() })
       .where(eq(smartPhrases.id, id))
       .returning();
+    if (phrase) this.smartPhraseIndex.invalidate(phrase.userId);
     return phrase;
   }
 
   async deleteSmartPhrase(id: string): Promise<void> {
-    await db.delete(smartPhrases).where(eq(smartPhrases.id, id));
+    const deleted = await db.delete(smartPhrases).where(eq(smartPhrases.id, id)).returning({ userId: smartPhrases.userId });
+    deleted.forEach((row) => this.smartPhraseIndex.invalidate(row.userId));
   }
 
   async importSmartPhrase(shareableId: string, userId: string): Promise<{ success: boolean; message: string; phrase?: SmartPhrase }> {
@@ -964,10 +1240,10 @@ export class DatabaseStorage implements IStorage {
     let newPhrase: SmartPhrase;
     try {
       [newPhrase] = await db.insert(smartPhrases).values(phraseCopy as any).returning();
+      this.smartPhraseIndex.invalidate(userId);
       // then try to set code
       try {
-        const code = await this.generateUniqueShortCodeFor('smartPhrases');
-        await db.update(smartPhrases).set({ shortCode: code as any }).where(eq(smartPhrases.id, (newPhrase as any).id));
+        const code = await this.assignShortCode('smartPhrases', (newPhrase as any).id);
         (newPhrase as any).shortCode = code;
       } catch {}
     } catch (e) {
@@ -996,8 +1272,11 @@ export class DatabaseStorage implements IStorage {
       elements: sourcePhrase.elements,
       isPublic: false,
       userId,
-      shortCode: await this.generateUniqueShortCodeFor('smartPhrases'),
     }).returning();
+    this.smartPhraseIndex.invalidate(userId);
+    try {
+      (newPhrase as any).shortCode = await this.assignShortCode('smartPhrases', newPhrase.id);
+    } catch {}
     // Increment source download counter
     try {
       await db.update(smartPhrases)
@@ -1008,7 +1287,7 @@ export class DatabaseStorage implements IStorage {
   }
 
   // Team todo operations
-  async getTeamTodos(teamId: string): Promise<(TeamTodo & { assignedTo?: User; assignees?: User[]; createdBy: User })[]> {
+  async getTeamTodos(teamId: string, loader = this.userLoader()): Promise<(TeamTodo & { assignedTo?: User; assignees?: User[]; createdBy: User })[]> {
     const todos = await db
       .select({
         id: teamTodos.id,
@@ -1024,38 +1303,39 @@ export class DatabaseStorage implements IStorage {
         createdById: teamTodos.createdById,
         createdAt: teamTodos.createdAt,
         updatedAt: teamTodos.updatedAt,
-        createdBy: users,
       })
       .from(teamTodos)
-      .innerJoin(users, eq(teamTodos.createdById, users.id))
       .where(eq(teamTodos.teamId, teamId))
       .orderBy(desc(teamTodos.createdAt));
+    if (todos.length === 0) return [];
 
-    // Get assigned users separately to avoid complex joins
-    const { teamTodoAssignees } = await import("../shared/schema.js");
-    const todosWithAssignedUsers = await Promise.all(
+    // All assignee links for the team in one query, then every user the todos
+    // mention (creators, legacy assignee, linked assignees) in one batch.
+    const assigneeIds = new Map<string, string[]>();
+    try {
+      const links = await db
+        .select({ todoId: teamTodoAssignees.todoId, userId: teamTodoAssignees.userId })
+        .from(teamTodoAssignees)
+        .where(inArray(teamTodoAssignees.todoId, todos.map((t) => t.id)));
+      for (const l of links) {
+        const ids = assigneeIds.get(l.todoId);
+        if (ids) ids.push(l.userId);
+        else assigneeIds.set(l.todoId, [l.userId]);
+      }
+    } catch {}
+
+    const rows = await Promise.all(
       todos.map(async (todo) => {
-        let assignedTo: User | undefined;
-        let assignees: User[] | undefined;
-        if (todo.assignedToId) {
-          assignedTo = await this.getUser(todo.assignedToId);
-        }
-        try {
-          const links = await db.select().from(teamTodoAssignees).where(eq(teamTodoAssignees.todoId, todo.id));
-          if (links.length > 0) {
-            const usersList: User[] = [] as any;
-            for (const l of links) {
-              const u = await this.getUser(l.userId);
-              if (u) usersList.push(u as any);
-            }
-            assignees = usersList;
-          }
-        } catch {}
-        return { ...todo, assignedTo, assignees };
+        const ids = assigneeIds.get(todo.id);
+        const [createdBy, assignedTo, assignees] = await Promise.all([
+          loader.load(todo.createdById),
+          todo.assignedToId ? loader.load(todo.assignedToId) : undefined,
+          ids ? loader.loadMany(ids) : undefined,
+        ]);
+        return { ...todo, createdBy, assignedTo, assignees: assignees?.filter((u): u is User => !!u) };
       })
     );
-
-    return todosWithAssignedUsers;
+    return rows.filter((row): row is typeof row & { createdBy: User } => !!row.createdBy);
   }
 
   async createTeamTodo(todoData: InsertTeamTodo): Promise<TeamTodo> {
@@ -1077,7 +1357,7 @@ export class DatabaseStorage implements IStorage {
   }
 
   // Team calendar operations
-  async getTeamCalendarEvents(teamId: string): Promise<(TeamCalendarEvent & { createdBy: User })[]> {
+  async getTeamCalendarEvents(teamId: string, loader = this.userLoader()): Promise<(TeamCalendarEvent & { createdBy: User })[]> {
     const events = await db
       .select({
         id: teamCalendarEvents.id,
@@ -1091,14 +1371,12 @@ export class DatabaseStorage implements IStorage {
         createdById: teamCalendarEvents.createdById,
         createdAt: teamCalendarEvents.createdAt,
         updatedAt: teamCalendarEvents.updatedAt,
-        createdBy: users,
       })
       .from(teamCalendarEvents)
-      .innerJoin(users, eq(teamCalendarEvents.createdById, users.id))
       .where(eq(teamCalendarEvents.teamId, teamId))
       .orderBy(teamCalendarEvents.startDate);
 
-    return events;
+    return this.withCreators(events, loader);
   }
 
   async createTeamCalendarEvent(eventData: InsertTeamCalendarEvent): Promise<TeamCalendarEvent> {
@@ -1120,7 +1398,7 @@ export class DatabaseStorage implements IStorage {
   }
 
   // Bulletin operations
-  async getTeamBulletinPosts(teamId: string): Promise<(TeamBulletinPost & { createdBy: User })[]> {
+  async getTeamBulletinPosts(teamId: string, loader = this.userLoader()): Promise<(TeamBulletinPost & { createdBy: User })[]> {
     const rows = await db
       .select({
         id: teamBulletinPosts.id,
@@ -1132,13 +1410,23 @@ export class DatabaseStorage implements IStorage {
         isAdminPost: teamBulletinPosts.isAdminPost,
         createdAt: teamBulletinPosts.createdAt,
         updatedAt: teamBulletinPosts.updatedAt,
-        createdBy: users,
       })
       .from(teamBulletinPosts)
-      .innerJoin(users, eq(teamBulletinPosts.createdById, users.id))
       .where(eq(teamBulletinPosts.teamId, teamId))
       .orderBy(desc(teamBulletinPosts.pinned as any), desc(teamBulletinPosts.createdAt));
-    return rows as any;
+    return this.withCreators(rows, loader) as any;
+  }
+
+  // Attach `createdBy` through the request's loader; rows whose creator is gone
+  // are dropped, as the inner join on users used to do.
+  private async withCreators<T extends { createdById: string }>(rows: T[], loader: UserLoader): Promise<(T & { createdBy: User })[]> {
+    const creators = await loader.loadMany(rows.map((r) => r.createdById));
+    const out: (T & { createdBy: User })[] = [];
+    rows.forEach((row, i) => {
+      const createdBy = creators[i];
+      if (createdBy) out.push({ ...row, createdBy });
+    });
+    return out;
   }
 
   async createTeamBulletinPost(post: InsertTeamBulletinPost, creatorRole: string): Promise<TeamBulletinPost> {
@@ -1252,15 +1540,42 @@ export class DatabaseStorage implements IStorage {
       .orderBy(desc(autocompleteItems.isPriority), autocompleteItems.text);
   }
 
+  getCachedAutocompleteList(userId: string, category?: string): AutocompleteList | undefined {
+    return this.autocompleteCache.get(userId)?.get(category ?? '');
+  }
+
+  // Load, serialize once and cache; the ETag is a hash of the body, so it is
+  // stable across instances and restarts.
+  async loadAutocompleteList(userId: string, category?: string): Promise<AutocompleteList> {
+    if (!this.autocompleteCache.get(userId)) this.autocompleteWrites.forget(userId);
+    const version = this.autocompleteWrites.snapshot();
+    const items = category
+      ? await this.getAutocompleteItemsByCategory(userId, category)
+      : await this.getAutocompleteItems(userId);
+    const body = JSON.stringify(items);
+    const list = { body, etag: `"${createHash('sha1').update(body).digest('base64url')}"` };
+    if (!this.autocompleteWrites.changedSince(userId, version)) {
+      const lists = this.autocompleteCache.get(userId) ?? new Map<string, AutocompleteList>();
+      lists.set(category ?? '', list);
+      this.autocompleteCache.set(userId, lists);
+    }
+    return list;
+  }
+
+  invalidateAutocompleteItems(userId: string) {
+    this.autocompleteWrites.bump(userId);
+    this.autocompleteCache.delete(userId);
+  }
+
   async createAutocompleteItem(item: InsertAutocompleteItem): Promise<AutocompleteItem> {
     const [newItem] = await db.insert(autocompleteItems).values(item as any).returning();
     try {
       if (!(newItem as any).shortCode) {
-        const code = await this.generateUniqueShortCodeFor('autocompleteItems');
-        await db.update(autocompleteItems).set({ shortCode: code as any }).where(eq(autocompleteItems.id, newItem.id));
+        const code = await this.assignShortCode('autocompleteItems', newItem.id);
         (newItem as any).shortCode = code;
       }
     } catch {}
+    this.invalidateAutocompleteItems(newItem.userId);
     return newItem;
   }
 
@@ -1270,11 +1585,13 @@ export class DatabaseStorage implements IStorage {
       .set(item as any)
       .where(eq(autocompleteItems.id, id))
       .returning();
+    if (updated) this.invalidateAutocompleteItems(updated.userId);
     return updated;
   }
 
   async deleteAutocompleteItem(id: string): Promise<void> {
-    await db.delete(autocompleteItems).where(eq(autocompleteItems.id, id));
+    const deleted = await db.delete(autocompleteItems).where(eq(autocompleteItems.id, id)).returning({ userId: autocompleteItems.userId });
+    deleted.forEach((row) => this.invalidateAutocompleteItems(row.userId));
   }
 
   async getUserPreferences(userId: string) {
@@ -1306,10 +1623,10 @@ export class DatabaseStorage implements IStorage {
       description: src.description,
     } as any).returning();
     try {
-      const code = await this.generateUniqueShortCodeFor('autocompleteItems');
-      await db.update(autocompleteItems).set({ shortCode: code as any }).where(eq(autocompleteItems.id, row.id));
+      const code = await this.assignShortCode('autocompleteItems', row.id);
       (row as any).shortCode = code;
     } catch {}
+    this.invalidateAutocompleteItems(userId);
     // Increment source download counter
     try {
       await db.update(autocompleteItems)
@@ -1339,6 +1656,128 @@ export class DatabaseStorage implements IStorage {
     const { labPresets } = await import("../shared/schema.js");
     await db.delete(labPresets).where(eq(labPresets.id, id));
   }
+
+  // Community browse: one page of public templates, smart phrases and
+  // autocomplete items. Each source returns at most offset + pageSize + 1 rows
+  // in the requested order (served from the partial is_public indexes), the
+  // union is sorted and cut to the page plus one row to tell whether another
+  // page exists, and only the page's publishers are joined. The total is
+  // counted only up to COMMUNITY_COUNT_CAP, so no request scans every row.
+  async getCommunityPage(query: CommunityQuery): Promise<CommunityPage> {
+    const offset = (query.page - 1) * query.pageSize;
+    const pattern = query.q ? `%${query.q.replace(/[\\%_]/g, '\\$&')}%` : undefined;
+    const orderBy = (prefix = '') => sql.raw(query.sort === 'downloads'
+      ? `${prefix}download_count DESC NULLS LAST, ${prefix}created_at DESC NULLS LAST, ${prefix}id`
+      : `${prefix}created_at DESC NULLS LAST, ${prefix}id`);
+
+    const sources = COMMUNITY_SOURCES.filter((src) => query.type === 'all' || query.type === src.type);
+    if (sources.length === 0) return { items: [], total: 0, totalCapped: false, hasMore: false };
+    const filters = sources.map((src) => {
+      const where = [sql`is_public = true`];
+      if (query.category && src.category) where.push(sql`category = ${query.category}`);
+      if (pattern) where.push(sql`(${sql.raw(src.title)} ILIKE ${pattern} OR description ILIKE ${pattern})`);
+      if (query.popularOnly) where.push(sql`download_count >= ${COMMUNITY_POPULAR_THRESHOLD}`);
+      return sql.join(where, sql` AND `);
+    });
+
+    const branches = sources.map((src, i) => sql`(
+      SELECT ${src.kind}::text AS kind, id, ${sql.raw(src.title)} AS title, description,
+        ${sql.raw(src.category ? 'category' : 'NULL::varchar')} AS category, short_code, download_count, created_at, user_id
+      FROM ${sql.raw(src.table)}
+      WHERE ${filters[i]}
+      ORDER BY ${orderBy()}
+      LIMIT ${offset + query.pageSize + 1}
+    )`);
+    const counts = sources.map((src, i) => sql`(
+      SELECT count(*) FROM (SELECT 1 FROM ${sql.raw(src.table)} WHERE ${filters[i]} LIMIT ${COMMUNITY_COUNT_CAP + 1}) capped
+    )`);
+
+    const [pageResult, countResult]: any[] = await Promise.all([
+      db.execute(sql`
+        SELECT c.id, c.kind, c.title, c.description, c.category,
+          c.short_code AS "shortCode", coalesce(c.download_count, 0)::int AS "downloadCount",
+          c.created_at AS "createdAt", c.user_id AS "userId",
+          u.first_name AS "userFirstName", u.last_name AS "userLastName", u.email AS "userEmail"
+        FROM (
+          SELECT * FROM (${sql.join(branches, sql` UNION ALL `)}) merged
+          ORDER BY ${orderBy()}
+          LIMIT ${query.pageSize + 1} OFFSET ${offset}
+        ) c
+        LEFT JOIN users u ON u.id = c.user_id
+        ORDER BY ${orderBy('c.')}`),
+      db.execute(sql`SELECT (${sql.join(counts, sql` + `)})::int AS total`),
+    ]);
+    const rows = (r: any): any[] => (Array.isArray(r) ? r : (r?.rows ?? []));
+    const items = rows(pageResult);
+    const counted = Number(rows(countResult)[0]?.total ?? 0);
+    return {
+      items: items.slice(0, query.pageSize),
+      total: Math.min(counted, COMMUNITY_COUNT_CAP),
+      totalCapped: counted > COMMUNITY_COUNT_CAP,
+      hasMore: items.length > query.pageSize,
+    };
+  }
 }
 
+export type AutocompleteList = { body: string; etag: string };
+
+export type GeneratedRunListNote = {
+  listPatientId: string;
+  rawText: string;
+  structuredSections: Record<string, any>;
+  status: string;
+  // updatedAt of the note the text was generated from; undefined when the
+  // patient had no note yet.
+  expectedUpdatedAt?: Date | null;
+};
+
+export type ShortCodeTable = 'smartPhrases' | 'noteTemplates' | 'autocompleteItems';
+
+export type CleanupBudget = { batchSize?: number; budgetMs?: number };
+export type CleanupStats = { deleted: number; batches: number; durationMs: number; timedOut: boolean };
+
+export type CommunityQuery = {
+  type: 'all' | 'templates' | 'smart-phrases' | 'autocomplete';
+  sort: 'downloads' | 'newest';
+  popularOnly: boolean;
+  category?: string;
+  q?: string;
+  page: number;
+  pageSize: number;
+};
+
+export type CommunityItem = {
+  id: string;
+  kind: 'template' | 'smart-phrase' | 'autocomplete';
+  title: string;
+  description: string | null;
+  category: string | null;
+  shortCode: string | null;
+  downloadCount: number;
+  createdAt: Date | null;
+  userId: string | null;
+  userFirstName: string | null;
+  userLastName: string | null;
+  userEmail: string | null;
+};
+
+// A page reports whether another page follows (hasMore); the total is exact
+// up to COMMUNITY_COUNT_CAP and shown as "cap+" beyond it (totalCapped).
+export type CommunityPage = {
+  items: CommunityItem[];
+  total: number;
+  totalCapped: boolean;
+  hasMore: boolean;
+};
+
+const COMMUNITY_POPULAR_THRESHOLD = 5;
+const COMMUNITY_COUNT_CAP = 1000;
+
+// Templates have no category, so a category filter never excludes them.
+const COMMUNITY_SOURCES = [
+  { type: 'templates', kind: 'template', table: 'note_templates', title: 'name', category: false },
+  { type: 'smart-phrases', kind: 'smart-phrase', table: 'smart_phrases', title: 'trigger', category: true },
+  { type: 'autocomplete', kind: 'autocomplete', table: 'autocomplete_items', title: 'text', category: true },
+] as const;
+
 export const storage = new DatabaseStorage();
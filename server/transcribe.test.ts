@@ -0,0 +1,45 @@
+/// <reference types="vitest" />
+import { describe, it, expect } from 'vitest'
+import { base64JsonBody, beginUpload, transcribeMetrics } from './transcribe'
+
+async function collect(chunks: Buffer[], fields: Record<string, unknown> = {}, onBytes?: (n: number) => void) {
+  async function* source() { yield* chunks }
+  const out: Buffer[] = []
+  for await (const part of base64JsonBody(source(), fields, onBytes)) out.push(part)
+  return Buffer.concat(out).toString('utf8')
+}
+
+describe('base64JsonBody', () => {
+  const audio = Buffer.from(Array.from({ length: 1000 }, (_, i) => (i * 37) % 256))
+
+  it('matches one-shot encoding for any chunking', async () => {
+    for (const size of [1, 2, 3, 7, 64, 1000]) {
+      const chunks: Buffer[] = []
+      for (let i = 0; i < audio.length; i += size) chunks.push(audio.subarray(i, i + size))
+      const body = JSON.parse(await collect(chunks, { audio_format: 'WEBM_OPUS', diarize: false }))
+      expect(body).toEqual({ audio: audio.toString('base64'), audio_format: 'WEBM_OPUS', diarize: false })
+    }
+  })
+
+  it('stops when onBytes throws', async () => {
+    let seen = 0
+    const limit = (n: number) => { seen += n; if (seen > 10) throw new Error('too large') }
+    await expect(collect([Buffer.alloc(8), Buffer.alloc(8), Buffer.alloc(8)], {}, limit)).rejects.toThrow('too large')
+    expect(seen).toBe(16)
+  })
+})
+
+describe('beginUpload', () => {
+  it('caps concurrent uploads and frees slots once', () => {
+    const slots = [] as (() => void)[]
+    let slot
+    while ((slot = beginUpload())) slots.push(slot)
+    expect(slots.length).toBe(4)
+    expect(transcribeMetrics.rejectedBusy).toBe(1)
+    slots[0]()
+    slots[0]()
+    expect(transcribeMetrics.active).toBe(3)
+    slots.slice(1).forEach((release) => release())
+    expect(transcribeMetrics.active).toBe(0)
+  })
+})
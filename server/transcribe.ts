@@ -0,0 +1,143 @@
+import { Readable } from "stream";
+
+// Streaming upload path for /api/transcribe. The recording is never held in
+// memory: request chunks are base64-encoded as they arrive and written
+// straight into the upstream JSON body ({"audio":"...", ...fields}), so an
+// upload costs a few socket buffers however long the dictation is. Uploads
+// are capped in size (TRANSCRIBE_MAX_BYTES) and in number
+// (TRANSCRIBE_MAX_CONCURRENT) per instance.
+
+export const TRANSCRIBE_MAX_BYTES = parseInt(process.env.TRANSCRIBE_MAX_BYTES || String(50 * 1024 * 1024), 10);
+const TRANSCRIBE_MAX_CONCURRENT = parseInt(process.env.TRANSCRIBE_MAX_CONCURRENT || '4', 10);
+const TRANSCRIBE_UPSTREAM_TIMEOUT_MS = parseInt(process.env.TRANSCRIBE_UPSTREAM_TIMEOUT_MS || '120000', 10);
+
+export class UploadError extends Error {
+  constructor(public status: number, message: string) {
+    super(message);
+    this.name = 'UploadError';
+  }
+}
+
+export type TranscribeMetrics = {
+  active: number;
+  completed: number;
+  failed: number;
+  rejectedBusy: number;
+  rejectedTooLarge: number;
+  bytesIn: number;
+  lastBytes: number;
+  lastBytesPerSec: number;
+  avgBytesPerSec: number;
+  // From the last audio byte sent to the upstream's response headers.
+  lastUpstreamMs: number;
+  avgUpstreamMs: number;
+};
+
+export const transcribeMetrics: TranscribeMetrics = {
+  active: 0,
+  completed: 0,
+  failed: 0,
+  rejectedBusy: 0,
+  rejectedTooLarge: 0,
+  bytesIn: 0,
+  lastBytes: 0,
+  lastBytesPerSec: 0,
+  avgBytesPerSec: 0,
+  lastUpstreamMs: 0,
+  avgUpstreamMs: 0,
+};
+
+const ewma = (avg: number, sample: number) => (avg ? Math.round(avg * 0.9 + sample * 0.1) : Math.round(sample));
+
+// Take an upload slot; null when TRANSCRIBE_MAX_CONCURRENT uploads are running.
+export function beginUpload(): (() => void) | null {
+  if (transcribeMetrics.active >= TRANSCRIBE_MAX_CONCURRENT) {
+    transcribeMetrics.rejectedBusy++;
+    return null;
+  }
+  transcribeMetrics.active++;
+  let done = false;
+  return () => {
+    if (done) return;
+    done = true;
+    transcribeMetrics.active--;
+  };
+}
+
+// Yields `{"audio":"<base64 of source>", ...fields}`. Bytes are encoded in
+// multiples of three so chunk boundaries never produce padding mid-string.
+// onBytes sees every source chunk and may throw to abort the upload.
+export async function* base64JsonBody(
+  source: AsyncIterable<Buffer>,
+  fields: Record<string, unknown>,
+  onBytes: (n: number) => void = () => {},
+): AsyncGenerator<Buffer> {
+  yield Buffer.from('{"audio":"');
+  let carry: Buffer = Buffer.alloc(0);
+  for await (const chunk of source) {
+    onBytes(chunk.length);
+    const buf = carry.length ? Buffer.concat([carry, chunk]) : chunk;
+    const usable = buf.length - (buf.length % 3);
+    carry = buf.subarray(usable);
+    if (usable) yield Buffer.from(buf.subarray(0, usable).toString('base64'));
+  }
+  if (carry.length) yield Buffer.from(carry.toString('base64'));
+  yield Buffer.from(`"${Object.keys(fields).length ? ',' + JSON.stringify(fields).slice(1) : '}'}`);
+}
+
+// POST the audio in `source` to a JSON transcription endpoint while it is
+// still arriving. Throws UploadError for empty or oversized audio.
+export async function streamTranscription(
+  source: AsyncIterable<Buffer>,
+  { endpoint, apiKey, fields }: { endpoint: string; apiKey: string; fields: Record<string, unknown> },
+): Promise<Response> {
+  let bytes = 0;
+  let firstByteAt = 0;
+  let lastByteAt = 0;
+  let uploadError: UploadError | null = null;
+  const countBytes = (n: number) => {
+    if (!firstByteAt) firstByteAt = Date.now();
+    bytes += n;
+    if (bytes > TRANSCRIBE_MAX_BYTES) {
+      transcribeMetrics.rejectedTooLarge++;
+      throw (uploadError = new UploadError(413, 'Audio exceeds upload limit'));
+    }
+  };
+  async function* body() {
+    yield* base64JsonBody(source, fields, countBytes);
+    lastByteAt = Date.now();
+    if (bytes === 0) throw (uploadError = new UploadError(400, 'Empty audio body'));
+  }
+
+  const abort = new AbortController();
+  const timer = setTimeout(() => abort.abort(), TRANSCRIBE_UPSTREAM_TIMEOUT_MS);
+  try {
+    const response = await fetch(endpoint, {
+      method: 'POST',
+      headers: {
+        'Authorization': `Bearer ${apiKey}`,
+        'Content-Type': 'application/json'
+      },
+      body: Readable.toWeb(Readable.from(body())) as any,
+      duplex: 'half',
+      signal: abort.signal,
+    } as any);
+    const now = Date.now();
+    const uploadMs = Math.max(1, (lastByteAt || now) - (firstByteAt || now));
+    transcribeMetrics.bytesIn += bytes;
+    transcribeMetrics.lastBytes = bytes;
+    transcribeMetrics.lastBytesPerSec = Math.round(bytes / (uploadMs / 1000));
+    transcribeMetrics.avgBytesPerSec = ewma(transcribeMetrics.avgBytesPerSec, transcribeMetrics.lastBytesPerSec);
+    transcribeMetrics.lastUpstreamMs = now - (lastByteAt || now);
+    transcribeMetrics.avgUpstreamMs = ewma(transcribeMetrics.avgUpstreamMs, transcribeMetrics.lastUpstreamMs);
+    if (response.ok) transcribeMetrics.completed++;
+    else transcribeMetrics.failed++;
+    return response;
+  } catch (error) {
+    transcribeMetrics.failed++;
+    // fetch wraps errors thrown by the body; report ours as-is.
+    throw uploadError ?? error;
+  } finally {
+    clearTimeout(timer);
+  }
+}
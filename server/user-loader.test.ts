@@ -0,0 +1,68 @@
+/// <reference types="vitest" />
+import { describe, it, expect } from 'vitest'
+import { UserLoader } from './user-loader'
+
+function user(id: string): any {
+  return { id, email: `${id}@example.com`, firstName: id, lastName: 'Test' }
+}
+
+function recordingFetch(known: string[]) {
+  const calls: string[][] = []
+  const fetch = async (ids: string[]) => {
+    calls.push([...ids])
+    return ids.filter((id) => known.includes(id)).map(user)
+  }
+  return { calls, fetch }
+}
+
+describe('UserLoader', () => {
+  it('batches lookups made in the same tick into one query and dedupes ids', async () => {
+    const { calls, fetch } = recordingFetch(['a', 'b', 'c'])
+    const loader = new UserLoader(fetch)
+
+    const [a, b, again, many] = await Promise.all([
+      loader.load('a'),
+      loader.load('b'),
+      loader.load('a'),
+      loader.loadMany(['c', 'b']),
+    ])
+
+    expect(calls).toEqual([['a', 'b', 'c']])
+    expect(a?.id).toBe('a')
+    expect(b?.id).toBe('b')
+    expect(again).toBe(a)
+    expect(many.map((u) => u?.id)).toEqual(['c', 'b'])
+  })
+
+  it('caches across ticks and resolves unknown ids to undefined', async () => {
+    const { calls, fetch } = recordingFetch(['a'])
+    const loader = new UserLoader(fetch)
+
+    expect(await loader.load('missing')).toBeUndefined()
+    await loader.load('a')
+    await loader.load('a')
+
+    expect(calls).toEqual([['missing'], ['a']])
+  })
+
+  it('serves primed users without querying', async () => {
+    const { calls, fetch } = recordingFetch([])
+    const loader = new UserLoader(fetch)
+    loader.prime(user('member'))
+
+    expect((await loader.load('member'))?.id).toBe('member')
+    expect(calls).toEqual([])
+  })
+
+  it('rejects the whole batch on failure and retries on the next load', async () => {
+    let fail = true
+    const loader = new UserLoader(async (ids) => {
+      if (fail) throw new Error('pool exhausted')
+      return ids.map(user)
+    })
+
+    await expect(Promise.all([loader.load('a'), loader.load('b')])).rejects.toThrow('pool exhausted')
+    fail = false
+    expect((await loader.load('a'))?.id).toBe('a')
+  })
+})
@@ -0,0 +1,54 @@
+import type { User } from "../shared/schema.js";
+
+type Pending = {
+  resolve: (user: User | undefined) => void;
+  reject: (error: unknown) => void;
+};
+
+// Request-scoped user lookups. Every id asked for in the same tick goes out as
+// one `WHERE id IN (...)` query, and each id is fetched at most once per
+// loader, so rendering a team's todos, events or posts costs one users query
+// no matter how many rows point at the same people. Create one per request;
+// it never invalidates, so do not keep it around across requests.
+export class UserLoader {
+  private cache = new Map<string, Promise<User | undefined>>();
+  private pending = new Map<string, Pending>();
+
+  constructor(private fetchUsers: (ids: string[]) => Promise<User[]>) {}
+
+  load(id: string): Promise<User | undefined> {
+    let user = this.cache.get(id);
+    if (!user) {
+      user = new Promise<User | undefined>((resolve, reject) => {
+        if (this.pending.size === 0) process.nextTick(() => this.dispatch());
+        this.pending.set(id, { resolve, reject });
+      });
+      this.cache.set(id, user);
+    }
+    return user;
+  }
+
+  loadMany(ids: string[]): Promise<(User | undefined)[]> {
+    return Promise.all(ids.map((id) => this.load(id)));
+  }
+
+  // Seed the cache with users that came back from a join anyway (e.g. team members).
+  prime(user: User) {
+    if (!this.cache.has(user.id)) this.cache.set(user.id, Promise.resolve(user));
+  }
+
+  private async dispatch() {
+    const batch = this.pending;
+    this.pending = new Map();
+    try {
+      const rows = await this.fetchUsers(Array.from(batch.keys()));
+      const byId = new Map(rows.map((u) => [u.id, u]));
+      batch.forEach((p, id) => p.resolve(byId.get(id)));
+    } catch (error) {
+      batch.forEach((p, id) => {
+        this.cache.delete(id);
+        p.reject(error);
+      });
+    }
+  }
+}
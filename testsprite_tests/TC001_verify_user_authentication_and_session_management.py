@@ -1,10 +1,8 @@
-import requests
+from harness import BASE_URL, TIMEOUT, get_client
 
-BASE_URL = "http://localhost:5002"
-TIMEOUT = 30
 
 def test_verify_user_authentication_and_session_management():
-    session = requests.Session()
+    session = get_client().isolated()
     try:
         # 1. Attempt to get current user info before login (expecting no user or error)
         response_user_before = session.get(f"{BASE_URL}/api/auth/user", timeout=TIMEOUT)
@@ -38,4 +36,5 @@ def test_verify_user_authentication_and_session_management():
     finally:
         session.close()
 
-test_verify_user_authentication_and_session_management()
\ No newline at end of file
+if __name__ == "__main__":
+    test_verify_user_authentication_and_session_management()
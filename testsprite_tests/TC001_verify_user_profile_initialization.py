@@ -1,7 +1,7 @@
-import requests
+from harness import BASE_URL, TIMEOUT, get_client
+
+http = get_client()
 
-BASE_URL = "http://localhost:5002"
-TIMEOUT = 30
 
 def test_verify_user_profile_initialization():
     url = f"{BASE_URL}/api/init-user"
@@ -14,14 +14,14 @@ def test_verify_user_profile_initialization():
 
     # Test unauthorized access (no token)
     try:
-        response = requests.post(url, timeout=TIMEOUT)
+        response = http.post(url, timeout=TIMEOUT)
     except Exception as e:
         assert False, f"Request to {url} failed without auth: {e}"
     assert response.status_code in (200, 401, 403), f"Expected 401, 403 or 200 without auth, got {response.status_code}"
 
     # Test authorized access
     try:
-        response = requests.post(url, headers=headers_with_auth, timeout=TIMEOUT)
+        response = http.post(url, headers=headers_with_auth, timeout=TIMEOUT)
     except Exception as e:
         assert False, f"Request to {url} failed with auth: {e}"
     assert response.status_code == 200, f"Expected 200 OK with auth, got {response.status_code}"
@@ -34,4 +34,5 @@ def test_verify_user_profile_initialization():
         assert isinstance(data, dict), "Response JSON is not a dictionary"
 
 
-test_verify_user_profile_initialization()
+if __name__ == "__main__":
+    test_verify_user_profile_initialization()
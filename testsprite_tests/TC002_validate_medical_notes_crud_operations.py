@@ -1,9 +1,8 @@
-import requests
 import uuid
 
-BASE_URL = "http://localhost:5002"
-TIMEOUT = 30
-HEADERS = {"Content-Type": "application/json"}
+from harness import BASE_URL, HEADERS, TIMEOUT, get_client
+
+http = get_client()
 
 
 def test_validate_medical_notes_crud_operations():
@@ -20,7 +19,7 @@ def test_validate_medical_notes_crud_operations():
     note_id = None
     try:
         note_payload = create_note_payload()
-        response = requests.post(
+        response = http.post(
             f"{BASE_URL}/api/notes", json=note_payload, headers=HEADERS, timeout=TIMEOUT
         )
         assert response.status_code == 200, f"Create note failed: {response.text}"
@@ -29,7 +28,7 @@ def test_validate_medical_notes_crud_operations():
         note_id = note["id"]
 
         # Retrieve the created note
-        resp_get = requests.get(
+        resp_get = http.get(
             f"{BASE_URL}/api/notes/{note_id}", headers=HEADERS, timeout=TIMEOUT
         )
         assert resp_get.status_code == 200, f"Get note failed: {resp_get.text}"
@@ -47,13 +46,13 @@ def test_validate_medical_notes_crud_operations():
             "content": updated_content,
             "tags": retrieved_note.get("tags", []) + ["updated"]
         }
-        resp_update = requests.put(
+        resp_update = http.put(
             f"{BASE_URL}/api/notes/{note_id}", json=update_payload, headers=HEADERS, timeout=TIMEOUT
         )
         assert resp_update.status_code == 200, f"Update note failed: {resp_update.text}"
 
         # Retrieve again to verify updates
-        resp_get_updated = requests.get(
+        resp_get_updated = http.get(
             f"{BASE_URL}/api/notes/{note_id}", headers=HEADERS, timeout=TIMEOUT
         )
         assert resp_get_updated.status_code == 200, f"Get updated note failed: {resp_get_updated.text}"
@@ -63,7 +62,7 @@ def test_validate_medical_notes_crud_operations():
         assert "updated" in updated_note.get("tags", []), "Updated tags missing"
 
         # Get user notes to verify note is listed
-        resp_search = requests.get(
+        resp_search = http.get(
             f"{BASE_URL}/api/notes",
             headers=HEADERS,
             timeout=TIMEOUT,
@@ -76,10 +75,11 @@ def test_validate_medical_notes_crud_operations():
     finally:
         # Cleanup: delete created note if exists
         if note_id:
-            resp_del = requests.delete(
+            resp_del = http.delete(
                 f"{BASE_URL}/api/notes/{note_id}", headers=HEADERS, timeout=TIMEOUT
             )
             assert resp_del.status_code == 200, f"Delete note failed: {resp_del.text}"
 
 
-test_validate_medical_notes_crud_operations()
+if __name__ == "__main__":
+    test_validate_medical_notes_crud_operations()
@@ -1,20 +1,12 @@
-import requests
 import uuid
 
-BASE_URL = "http://localhost:5002"
-TIMEOUT = 30
+from harness import BASE_URL, HEADERS, TIMEOUT, get_client
+
+http = get_client()
 
-# Simulated helper function for obtaining an auth token (adjust as needed)
-def get_auth_token():
-    # For testing purposes, assume an environment variable or a fixed token is used
-    # Replace this with actual auth flow if available
-    return "Bearer testauthtoken1234567890abcdef"
 
 def test_verify_medical_notes_crud_operations():
-    headers = {
-        "Authorization": get_auth_token(),
-        "Content-Type": "application/json"
-    }
+    headers = HEADERS
 
     note_id = None
     try:
@@ -29,7 +21,7 @@ def test_verify_medical_notes_crud_operations():
                 "plan": "Rest and hydration."
             }
         }
-        create_response = requests.post(
+        create_response = http.post(
             f"{BASE_URL}/api/notes",
             json=create_payload,
             headers=headers,
@@ -41,7 +33,7 @@ def test_verify_medical_notes_crud_operations():
         note_id = create_data["id"]
 
         # 2. Retrieve the created note by ID
-        get_response = requests.get(
+        get_response = http.get(
             f"{BASE_URL}/api/notes/{note_id}",
             headers=headers,
             timeout=TIMEOUT
@@ -63,7 +55,7 @@ def test_verify_medical_notes_crud_operations():
                 "plan": "Continue rest and hydration, monitor."
             }
         }
-        update_response = requests.put(
+        update_response = http.put(
             f"{BASE_URL}/api/notes/{note_id}",
             json=update_payload,
             headers=headers,
@@ -72,7 +64,7 @@ def test_verify_medical_notes_crud_operations():
         assert update_response.status_code == 200, f"Update note failed: {update_response.text}"
 
         # 4. Retrieve again to verify update
-        get_updated_response = requests.get(
+        get_updated_response = http.get(
             f"{BASE_URL}/api/notes/{note_id}",
             headers=headers,
             timeout=TIMEOUT
@@ -84,7 +76,7 @@ def test_verify_medical_notes_crud_operations():
         assert updated_data.get("content").get("subjective") == update_payload["content"]["subjective"]
 
         # 5. List all notes - confirm the note is present
-        list_response = requests.get(
+        list_response = http.get(
             f"{BASE_URL}/api/notes",
             headers=headers,
             timeout=TIMEOUT
@@ -95,7 +87,7 @@ def test_verify_medical_notes_crud_operations():
 
     finally:
         if note_id:
-            delete_response = requests.delete(
+            delete_response = http.delete(
                 f"{BASE_URL}/api/notes/{note_id}",
                 headers=headers,
                 timeout=TIMEOUT
@@ -103,4 +95,5 @@ def test_verify_medical_notes_crud_operations():
             # Accept 200 or 204 as successful deletion
             assert delete_response.status_code in (200, 204), f"Delete note failed: {delete_response.text}"
 
-test_verify_medical_notes_crud_operations()
\ No newline at end of file
+if __name__ == "__main__":
+    test_verify_medical_notes_crud_operations()
@@ -1,9 +1,8 @@
-import requests
 import uuid
 
-BASE_URL = "http://localhost:5002"
-HEADERS = {"Content-Type": "application/json"}
-TIMEOUT = 30
+from harness import BASE_URL, HEADERS, TIMEOUT, get_client
+
+http = get_client()
 
 
 def test_note_templates_crud_and_import_functionality():
@@ -16,7 +15,7 @@ def test_note_templates_crud_and_import_functionality():
         "description": "Template created for automated test TC003"
     }
     try:
-        create_resp = requests.post(
+        create_resp = http.post(
             f"{BASE_URL}/api/note-templates",
             json=create_payload,
             headers=HEADERS,
@@ -35,7 +34,7 @@ def test_note_templates_crud_and_import_functionality():
             "content": {"text": "Updated template content."},
             "description": "Template updated as part of test TC003"
         }
-        update_resp = requests.put(
+        update_resp = http.put(
             f"{BASE_URL}/api/note-templates/{created_template_id}",
             json=update_payload,
             headers=HEADERS,
@@ -49,7 +48,7 @@ def test_note_templates_crud_and_import_functionality():
         assert isinstance(updated_template.get("content"), dict) and updated_template["content"].get("text") == update_payload["content"]["text"], "Content not updated correctly"
 
         # Step 3: Get list of note templates with optional category filtering
-        get_resp = requests.get(
+        get_resp = http.get(
             f"{BASE_URL}/api/note-templates",
             headers=HEADERS,
             timeout=TIMEOUT,
@@ -63,7 +62,7 @@ def test_note_templates_crud_and_import_functionality():
         # Step 4: Import template by shareable ID
         # Use the created template's id as shareableId to import it (assuming shareableId equals id)
         import_payload = {"shareableId": created_template_id}
-        import_resp = requests.post(
+        import_resp = http.post(
             f"{BASE_URL}/api/note-templates/import",
             json=import_payload,
             headers=HEADERS,
@@ -78,7 +77,7 @@ def test_note_templates_crud_and_import_functionality():
     finally:
         # Step 5: Clean up: delete the created template
         if created_template_id:
-            delete_resp = requests.delete(
+            delete_resp = http.delete(
                 f"{BASE_URL}/api/note-templates/{created_template_id}",
                 headers=HEADERS,
                 timeout=TIMEOUT,
@@ -87,4 +86,5 @@ def test_note_templates_crud_and_import_functionality():
             assert delete_resp.status_code in (200, 204), f"Failed to delete template: {delete_resp.text}"
 
 
-test_note_templates_crud_and_import_functionality()
+if __name__ == "__main__":
+    test_note_templates_crud_and_import_functionality()
@@ -1,16 +1,9 @@
 import requests
 
-BASE_URL = "http://localhost:5002"
-TIMEOUT = 30
+from harness import BASE_URL, HEADERS, TIMEOUT, get_client
 
-# Assume an environment variable or fixed token for auth; replace with actual token retrieval if needed
-AUTH_TOKEN = "Bearer eyJhbGciOiJIUzI1NiIsInR5cCI6IkpXVCJ9.fake.token"  # Placeholder token
+http = get_client()
 
-HEADERS = {
-    "Authorization": AUTH_TOKEN,
-    "Content-Type": "application/json",
-    "Accept": "application/json",
-}
 
 def verify_smart_phrases_system_functionality():
     # 1. Create a new smart phrase
@@ -24,7 +17,7 @@ def verify_smart_phrases_system_functionality():
     }
     created_id = None
     try:
-        create_resp = requests.post(
+        create_resp = http.post(
             f"{BASE_URL}/api/smart-phrases",
             headers=HEADERS,
             json=create_payload,
@@ -36,7 +29,7 @@ def verify_smart_phrases_system_functionality():
         created_id = created_data["id"]
 
         # 2. Retrieve list of smart phrases and check created phrase presence
-        get_resp = requests.get(
+        get_resp = http.get(
             f"{BASE_URL}/api/smart-phrases",
             headers=HEADERS,
             timeout=TIMEOUT
@@ -53,7 +46,7 @@ def verify_smart_phrases_system_functionality():
                 {"type": "text", "value": "Updated history of present illness "}
             ]
         }
-        update_resp = requests.put(
+        update_resp = http.put(
             f"{BASE_URL}/api/smart-phrases/{created_id}",
             headers=HEADERS,
             json=update_payload,
@@ -62,7 +55,7 @@ def verify_smart_phrases_system_functionality():
         assert update_resp.status_code == 200, f"Failed to update smart phrase: {update_resp.text}"
 
         # 4. Retrieve the updated smart phrase by getting list and filtering
-        get_updated_resp = requests.get(
+        get_updated_resp = http.get(
             f"{BASE_URL}/api/smart-phrases",
             headers=HEADERS,
             timeout=TIMEOUT
@@ -75,7 +68,7 @@ def verify_smart_phrases_system_functionality():
         assert updated_phrase.get("content") == "Updated history of present illness", "Content not updated correctly"
 
         # 5. Import smart phrase by shareable ID (simulate by using created_id)
-        import_resp = requests.post(
+        import_resp = http.post(
             f"{BASE_URL}/api/smart-phrases/import/{created_id}",
             headers=HEADERS,
             timeout=TIMEOUT
@@ -92,7 +85,7 @@ def verify_smart_phrases_system_functionality():
             assert "error" in error_resp and error_resp["error"] == "Smart phrase not found or not public", f"Unexpected error message: {error_resp}"
 
         # 6. Delete the created smart phrase
-        delete_resp = requests.delete(
+        delete_resp = http.delete(
             f"{BASE_URL}/api/smart-phrases/{created_id}",
             headers=HEADERS,
             timeout=TIMEOUT
@@ -100,7 +93,7 @@ def verify_smart_phrases_system_functionality():
         assert delete_resp.status_code == 200 or delete_resp.status_code == 204, f"Failed to delete smart phrase: {delete_resp.text}"
 
         # 7. Confirm deletion by attempting to get the phrase in list
-        get_final_resp = requests.get(
+        get_final_resp = http.get(
             f"{BASE_URL}/api/smart-phrases",
             headers=HEADERS,
             timeout=TIMEOUT
@@ -116,4 +109,5 @@ def verify_smart_phrases_system_functionality():
     except Exception as e:
         assert False, f"Unexpected error: {str(e)}"
 
-verify_smart_phrases_system_functionality()
+if __name__ == "__main__":
+    verify_smart_phrases_system_functionality()
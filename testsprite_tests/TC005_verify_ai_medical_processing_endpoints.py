@@ -1,15 +1,11 @@
 import requests
 
-BASE_URL = "http://localhost:5002"
-TIMEOUT_SECONDS = 30
+from harness import BASE_URL, HEADERS, TIMEOUT, get_client
 
+http = get_client()
 
-def test_verify_ai_medical_processing_endpoints():
-    headers = {
-        "Content-Type": "application/json",
-        "Authorization": "Bearer test-token"
-    }
 
+def test_verify_ai_medical_processing_endpoints():
     endpoints = [
         "/api/ai/medications",
         "/api/ai/labs",
@@ -20,7 +16,7 @@ def test_verify_ai_medical_processing_endpoints():
 
     for endpoint in endpoints:
         url = f"{BASE_URL}{endpoint}"
-        response = requests.post(url, json={"dictation": test_text}, headers=headers, timeout=TIMEOUT_SECONDS)
+        response = http.post(url, json={"dictation": test_text}, headers=HEADERS, timeout=TIMEOUT)
         try:
             response.raise_for_status()
         except requests.exceptions.RequestException as e:
@@ -34,4 +30,5 @@ def test_verify_ai_medical_processing_endpoints():
         assert len(json_response) > 0, f"Response from {endpoint} is empty."
 
 
-test_verify_ai_medical_processing_endpoints()
+if __name__ == "__main__":
+    test_verify_ai_medical_processing_endpoints()
@@ -1,8 +1,9 @@
 import requests
 
-BASE_URL = "http://localhost:5002"
-TIMEOUT = 30
-HEADERS = {"Content-Type": "application/json"}
+from harness import BASE_URL, HEADERS, TIMEOUT, get_client
+
+http = get_client()
+
 
 def test_verify_ai_processing_for_medications_labs_and_pmh():
     dictation_medications = (
@@ -20,7 +21,7 @@ def test_verify_ai_processing_for_medications_labs_and_pmh():
 
     try:
         # POST to /api/ai/medications
-        resp_med = requests.post(
+        resp_med = http.post(
             BASE_URL + medications_path,
             json={"dictation": dictation_medications},
             headers=HEADERS,
@@ -32,7 +33,7 @@ def test_verify_ai_processing_for_medications_labs_and_pmh():
         assert isinstance(resp_med_json, dict), "Medications response is not a JSON object"
 
         # POST to /api/ai/labs
-        resp_labs = requests.post(
+        resp_labs = http.post(
             BASE_URL + labs_path,
             json={"dictation": dictation_labs},
             headers=HEADERS,
@@ -43,7 +44,7 @@ def test_verify_ai_processing_for_medications_labs_and_pmh():
         assert isinstance(resp_labs_json, dict), "Labs response is not a JSON object"
 
         # POST to /api/ai/pmh
-        resp_pmh = requests.post(
+        resp_pmh = http.post(
             BASE_URL + pmh_path,
             json={"dictation": dictation_pmh},
             headers=HEADERS,
@@ -57,4 +58,5 @@ def test_verify_ai_processing_for_medications_labs_and_pmh():
         assert False, f"Request failed: {e}"
 
 
-test_verify_ai_processing_for_medications_labs_and_pmh()
+if __name__ == "__main__":
+    test_verify_ai_processing_for_medications_labs_and_pmh()
@@ -1,23 +1,15 @@
-import requests
 import uuid
 
-BASE_URL = "http://localhost:5002"
-TIMEOUT = 30
-AUTH_TOKEN = "test-token"  # Mock token for testing
+from harness import BASE_URL, HEADERS, TIMEOUT, get_client
+
+http = get_client()
 
 
 def get_headers():
-    headers = {
-        "Content-Type": "application/json",
-    }
-    if AUTH_TOKEN:
-        headers["Authorization"] = f"Bearer {AUTH_TOKEN}"
-    return headers
+    return dict(HEADERS)
 
 
 def test_verify_team_collaboration_features():
-    assert AUTH_TOKEN, "AUTH_TOKEN must be set to run this test"
-
     # We'll create a team, join it by code, create todo and calendar event, then clean up.
     team_id = None
     joined_team_id = None
@@ -28,7 +20,7 @@ def test_verify_team_collaboration_features():
         # 1. Create a new team
         team_name = f"Test Team {uuid.uuid4()}"
         team_desc = "Test team description"
-        resp = requests.post(
+        resp = http.post(
             f"{BASE_URL}/api/teams",
             headers=get_headers(),
             json={"name": team_name, "description": team_desc},
@@ -42,7 +34,7 @@ def test_verify_team_collaboration_features():
         assert group_code and isinstance(group_code, str), "Group code missing or invalid"
 
         # 2. Join the team by code
-        join_resp = requests.post(
+        join_resp = http.post(
             f"{BASE_URL}/api/teams/join",
             headers=get_headers(),
             json={"groupCode": group_code},
@@ -58,7 +50,7 @@ def test_verify_team_collaboration_features():
             "title": "Test Todo",
             "description": "This is a test todo item for team collaboration"
         }
-        todo_resp = requests.post(
+        todo_resp = http.post(
             f"{BASE_URL}/api/teams/{team_id}/todos",
             headers=get_headers(),
             json=todo_payload,
@@ -72,7 +64,7 @@ def test_verify_team_collaboration_features():
         assert todo_data.get("description") == todo_payload["description"], "Todo description mismatch"
 
         # 4. Retrieve team todos and verify new todo is listed
-        get_todos_resp = requests.get(
+        get_todos_resp = http.get(
             f"{BASE_URL}/api/teams/{team_id}/todos",
             headers=get_headers(),
             timeout=TIMEOUT,
@@ -88,7 +80,7 @@ def test_verify_team_collaboration_features():
             "startTime": "2025-12-01T10:00:00Z",
             "endTime": "2025-12-01T11:00:00Z"
         }
-        calendar_resp = requests.post(
+        calendar_resp = http.post(
             f"{BASE_URL}/api/teams/{team_id}/calendar",
             headers=get_headers(),
             json=calendar_payload,
@@ -102,7 +94,7 @@ def test_verify_team_collaboration_features():
         assert calendar_data.get("description") == calendar_payload["description"], "Calendar event description mismatch"
 
         # 6. Retrieve calendar events and verify new event is listed
-        get_calendar_resp = requests.get(
+        get_calendar_resp = http.get(
             f"{BASE_URL}/api/teams/{team_id}/calendar",
             headers=get_headers(),
             timeout=TIMEOUT,
@@ -116,7 +108,7 @@ def test_verify_team_collaboration_features():
         if todo_id:
             try:
                 # Assuming DELETE endpoint /api/teams/{teamId}/todos/{todoId} exists
-                requests.delete(
+                http.delete(
                     f"{BASE_URL}/api/teams/{team_id}/todos/{todo_id}",
                     headers=get_headers(),
                     timeout=TIMEOUT,
@@ -126,7 +118,7 @@ def test_verify_team_collaboration_features():
         if calendar_event_id:
             try:
                 # Assuming DELETE endpoint /api/teams/{teamId}/calendar/{eventId} exists
-                requests.delete(
+                http.delete(
                     f"{BASE_URL}/api/teams/{team_id}/calendar/{calendar_event_id}",
                     headers=get_headers(),
                     timeout=TIMEOUT,
@@ -136,7 +128,7 @@ def test_verify_team_collaboration_features():
         if team_id:
             try:
                 # Assuming DELETE endpoint /api/teams/{teamId} exists
-                requests.delete(
+                http.delete(
                     f"{BASE_URL}/api/teams/{team_id}",
                     headers=get_headers(),
                     timeout=TIMEOUT,
@@ -145,4 +137,5 @@ def test_verify_team_collaboration_features():
                 pass
 
 
-test_verify_team_collaboration_features()
+if __name__ == "__main__":
+    test_verify_team_collaboration_features()
@@ -1,9 +1,8 @@
-import requests
 import uuid
 
-BASE_URL = "http://localhost:5002"
-TIMEOUT = 30
-HEADERS = {"Content-Type": "application/json"}
+from harness import BASE_URL, HEADERS, TIMEOUT, get_client
+
+http = get_client()
 
 
 def test_validate_autocomplete_api_for_medical_terms():
@@ -14,7 +13,7 @@ def test_validate_autocomplete_api_for_medical_terms():
             "category": category,
             "term": term
         }
-        resp = requests.post(f"{BASE_URL}/api/autocomplete-items", json=payload, headers=HEADERS, timeout=TIMEOUT)
+        resp = http.post(f"{BASE_URL}/api/autocomplete-items", json=payload, headers=HEADERS, timeout=TIMEOUT)
         assert resp.status_code == 200, f"Create failed for {category} with status {resp.status_code}"
         data = resp.json()
         assert "id" in data, f"No id returned for created {category} item"
@@ -22,18 +21,18 @@ def test_validate_autocomplete_api_for_medical_terms():
 
     def get_autocomplete_items(category):
         params = {"category": category}
-        resp = requests.get(f"{BASE_URL}/api/autocomplete-items", params=params, headers=HEADERS, timeout=TIMEOUT)
+        resp = http.get(f"{BASE_URL}/api/autocomplete-items", params=params, headers=HEADERS, timeout=TIMEOUT)
         assert resp.status_code == 200, f"Get failed for {category} with status {resp.status_code}"
         items = resp.json()
         assert isinstance(items, list), f"Expected list for {category} get, got {type(items)}"
         return items
 
     def update_autocomplete_item(item_id, updated_term):
-        resp = requests.put(f"{BASE_URL}/api/autocomplete-items/{item_id}", json={"term": updated_term}, headers=HEADERS, timeout=TIMEOUT)
+        resp = http.put(f"{BASE_URL}/api/autocomplete-items/{item_id}", json={"term": updated_term}, headers=HEADERS, timeout=TIMEOUT)
         assert resp.status_code == 200, f"Update failed for item {item_id} with status {resp.status_code}"
 
     def delete_autocomplete_item(item_id):
-        resp = requests.delete(f"{BASE_URL}/api/autocomplete-items/{item_id}", headers=HEADERS, timeout=TIMEOUT)
+        resp = http.delete(f"{BASE_URL}/api/autocomplete-items/{item_id}", headers=HEADERS, timeout=TIMEOUT)
         assert resp.status_code == 200, f"Delete failed for item {item_id} with status {resp.status_code}"
 
     categories = ["medications", "labs", "imaging", "clinical-terms"]
@@ -66,4 +65,5 @@ def test_validate_autocomplete_api_for_medical_terms():
                 pass
 
 
-test_validate_autocomplete_api_for_medical_terms()
+if __name__ == "__main__":
+    test_validate_autocomplete_api_for_medical_terms()
@@ -1,16 +1,8 @@
-import requests
 import uuid
 
-BASE_URL = "http://localhost:5002"
-TIMEOUT = 30
+from harness import BASE_URL, HEADERS, TIMEOUT, get_client
 
-# Mock token for testing
-AUTH_TOKEN = "test-token"
-HEADERS = {
-    "Content-Type": "application/json",
-}
-if AUTH_TOKEN:
-    HEADERS["Authorization"] = f"Bearer {AUTH_TOKEN}"
+http = get_client()
 
 
 def test_verify_autocomplete_system_endpoints():
@@ -23,7 +15,7 @@ def test_verify_autocomplete_system_endpoints():
             "dosage": "10mg",
             "frequency": "once daily"
         }
-        create_resp = requests.post(
+        create_resp = http.post(
             f"{BASE_URL}/api/autocomplete-items",
             json=create_payload,
             headers=HEADERS,
@@ -44,7 +36,7 @@ def test_verify_autocomplete_system_endpoints():
         time.sleep(0.5)
         
         params = {"category": "medication"}
-        get_resp_cat = requests.get(
+        get_resp_cat = http.get(
             f"{BASE_URL}/api/autocomplete-items",
             headers=HEADERS,
             params=params,
@@ -68,7 +60,7 @@ def test_verify_autocomplete_system_endpoints():
             "dosage": "20mg",
             "frequency": "twice daily"
         }
-        update_resp = requests.put(
+        update_resp = http.put(
             f"{BASE_URL}/api/autocomplete-items/{created_id}",
             json=update_payload,
             headers=HEADERS,
@@ -78,7 +70,7 @@ def test_verify_autocomplete_system_endpoints():
 
         # Step 4: Verify update by retrieving filtered by updated category
         params_updated_cat = {"category": "medication-updated"}
-        get_resp_updated_cat = requests.get(
+        get_resp_updated_cat = http.get(
             f"{BASE_URL}/api/autocomplete-items",
             headers=HEADERS,
             params=params_updated_cat,
@@ -92,7 +84,7 @@ def test_verify_autocomplete_system_endpoints():
     finally:
         # Clean up: Delete the created autocomplete entry if exists
         if created_id:
-            del_resp = requests.delete(
+            del_resp = http.delete(
                 f"{BASE_URL}/api/autocomplete-items/{created_id}",
                 headers=HEADERS,
                 timeout=TIMEOUT,
@@ -100,4 +92,5 @@ def test_verify_autocomplete_system_endpoints():
             assert del_resp.status_code == 200 or del_resp.status_code == 204, f"Delete failed: {del_resp.status_code} {del_resp.text}"
 
 
-test_verify_autocomplete_system_endpoints()
+if __name__ == "__main__":
+    test_verify_autocomplete_system_endpoints()
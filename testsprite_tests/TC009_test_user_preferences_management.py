@@ -1,14 +1,14 @@
 import requests
 
-BASE_URL = "http://localhost:5002"
-TIMEOUT = 30
-HEADERS = {"Content-Type": "application/json"}
+from harness import BASE_URL, HEADERS, TIMEOUT, get_client
+
+http = get_client()
 
 
 def test_user_preferences_management():
     # Step 1: Retrieve current user preferences
     try:
-        resp_get = requests.get(f"{BASE_URL}/api/user-preferences", headers=HEADERS, timeout=TIMEOUT)
+        resp_get = http.get(f"{BASE_URL}/api/user-preferences", headers=HEADERS, timeout=TIMEOUT)
         resp_get.raise_for_status()
         user_prefs = resp_get.json()
         assert isinstance(user_prefs, dict), "User preferences response is not an object"
@@ -39,7 +39,7 @@ def test_user_preferences_management():
 
     # Step 2: Update user preferences
     try:
-        resp_put = requests.put(f"{BASE_URL}/api/user-preferences", json=updated_prefs, headers=HEADERS, timeout=TIMEOUT)
+        resp_put = http.put(f"{BASE_URL}/api/user-preferences", json=updated_prefs, headers=HEADERS, timeout=TIMEOUT)
         resp_put.raise_for_status()
         updated_response = resp_put.json()
         assert isinstance(updated_response, dict), "Update response is not an object"
@@ -48,7 +48,7 @@ def test_user_preferences_management():
 
     # Step 3: Retrieve user preferences again and verify update persistence
     try:
-        resp_get_after = requests.get(f"{BASE_URL}/api/user-preferences", headers=HEADERS, timeout=TIMEOUT)
+        resp_get_after = http.get(f"{BASE_URL}/api/user-preferences", headers=HEADERS, timeout=TIMEOUT)
         resp_get_after.raise_for_status()
         user_prefs_after = resp_get_after.json()
         assert isinstance(user_prefs_after, dict), "User preferences response after update is not an object"
@@ -57,4 +57,5 @@ def test_user_preferences_management():
         assert False, f"Failed to GET user preferences after update: {e}"
 
 
-test_user_preferences_management()
+if __name__ == "__main__":
+    test_user_preferences_management()
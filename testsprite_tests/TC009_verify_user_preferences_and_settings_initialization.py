@@ -1,21 +1,16 @@
 import requests
 
-BASE_URL = "http://localhost:5002"
-TIMEOUT = 30
+from harness import BASE_URL, TIMEOUT, get_client
 
-def get_auth_token():
-    # For testing purpose, this function should be modified to obtain a valid bearer token.
-    # Placeholder token for illustration, replace with valid token retrieval logic.
-    return "Bearer eyJhbGciOiJIUzI1NiIsInR5cCI6IkpXVCJ9.testtoken"
+http = get_client()
 
 def test_verify_user_preferences_and_settings_initialization():
     url = f"{BASE_URL}/api/user-preferences"
     headers = {
-        "Authorization": get_auth_token(),
         "Accept": "application/json",
     }
     try:
-        response = requests.get(url, headers=headers, timeout=TIMEOUT)
+        response = http.get(url, headers=headers, timeout=TIMEOUT)
     except requests.RequestException as e:
         assert False, f"Request to /api/user-preferences failed: {e}"
 
@@ -37,4 +32,5 @@ def test_verify_user_preferences_and_settings_initialization():
     preferences_data = data.get("data")
     assert isinstance(preferences_data, dict), "preferences data should be an object"
 
-test_verify_user_preferences_and_settings_initialization()
\ No newline at end of file
+if __name__ == "__main__":
+    test_verify_user_preferences_and_settings_initialization()
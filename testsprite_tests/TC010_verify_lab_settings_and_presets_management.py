@@ -1,17 +1,10 @@
-import requests
 import uuid
 
-BASE_URL = "http://localhost:5002"
-TIMEOUT = 30
-HEADERS = {
-    "Content-Type": "application/json",
-    "Authorization": "Bearer test-token"  # Mock token for testing
-}
+from harness import BASE_URL, TIMEOUT, get_client
 
 
 def test_verify_lab_settings_and_presets_management():
-    session = requests.Session()
-    session.headers.update(HEADERS)
+    session = get_client().isolated()
 
     lab_preset_id = None
     try:
@@ -75,4 +68,5 @@ def test_verify_lab_settings_and_presets_management():
                 pass
 
 
-test_verify_lab_settings_and_presets_management()
+if __name__ == "__main__":
+    test_verify_lab_settings_and_presets_management()
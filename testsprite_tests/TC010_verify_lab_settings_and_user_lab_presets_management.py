@@ -1,13 +1,11 @@
-import requests
+from harness import BASE_URL, HEADERS, TIMEOUT, get_client
 
-BASE_URL = "http://localhost:5002"
-TIMEOUT = 30
-HEADERS = {"Content-Type": "application/json"}
+http = get_client()
 
 
 def test_verify_lab_settings_and_user_lab_presets_management():
     # 1. Retrieve lab presets (GET /api/lab-presets)
-    resp_get_presets = requests.get(f"{BASE_URL}/api/lab-presets", timeout=TIMEOUT)
+    resp_get_presets = http.get(f"{BASE_URL}/api/lab-presets", timeout=TIMEOUT)
     assert resp_get_presets.status_code == 200
     presets_list = resp_get_presets.json()
     assert isinstance(presets_list, list)
@@ -21,7 +19,7 @@ def test_verify_lab_settings_and_user_lab_presets_management():
         ]
     }
     try:
-        resp_create_preset = requests.post(
+        resp_create_preset = http.post(
             f"{BASE_URL}/api/lab-presets",
             json=new_preset_payload,
             headers=HEADERS,
@@ -33,7 +31,7 @@ def test_verify_lab_settings_and_user_lab_presets_management():
         preset_id = created_preset["id"]
 
         # 3. Retrieve user-specific lab settings (GET /api/user-lab-settings)
-        resp_get_user_settings = requests.get(f"{BASE_URL}/api/user-lab-settings", timeout=TIMEOUT)
+        resp_get_user_settings = http.get(f"{BASE_URL}/api/user-lab-settings", timeout=TIMEOUT)
         assert resp_get_user_settings.status_code == 200
         user_lab_settings = resp_get_user_settings.json()
         assert isinstance(user_lab_settings, dict)
@@ -46,7 +44,7 @@ def test_verify_lab_settings_and_user_lab_presets_management():
                 "thresholdAlerts": {"Hemoglobin": "low", "WBC": "high"}
             }
         }
-        resp_save_user_settings = requests.post(
+        resp_save_user_settings = http.post(
             f"{BASE_URL}/api/user-lab-settings",
             json=save_payload,
             headers=HEADERS,
@@ -59,7 +57,8 @@ def test_verify_lab_settings_and_user_lab_presets_management():
     finally:
         # Cleanup: delete the new lab preset if created
         if 'preset_id' in locals():
-            requests.delete(f"{BASE_URL}/api/lab-presets/{preset_id}", timeout=TIMEOUT)
+            http.delete(f"{BASE_URL}/api/lab-presets/{preset_id}", timeout=TIMEOUT)
 
 
-test_verify_lab_settings_and_user_lab_presets_management()
+if __name__ == "__main__":
+    test_verify_lab_settings_and_user_lab_presets_management()
@@ -0,0 +1,27 @@
+"""Shared client and tooling for the TestSprite backend scenarios."""
+
+from .client import (
+    AUTH_TOKEN,
+    BASE_URL,
+    HEADERS,
+    TIMEOUT,
+    ApiClient,
+    add_observer,
+    get_client,
+    make_adapter,
+    remove_observer,
+    scoped_client,
+)
+
+__all__ = [
+    "AUTH_TOKEN",
+    "BASE_URL",
+    "HEADERS",
+    "TIMEOUT",
+    "ApiClient",
+    "add_observer",
+    "get_client",
+    "make_adapter",
+    "remove_observer",
+    "scoped_client",
+]
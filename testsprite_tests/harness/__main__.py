@@ -0,0 +1,399 @@
+"""Command line entry point: ``python -m harness <command>`` from testsprite_tests/."""
+
+import argparse
+import asyncio
+import json
+import sys
+import time
+
+from . import runner
+
+
+def cmd_run(args):
+    from . import baseline
+    from .client import BASE_URL
+
+    baseline_data = baseline.load_baseline(args.compare, args.baseline_dir) if args.compare else None
+    start = time.perf_counter()
+    with baseline.TimingCollector() as collector:
+        results = runner.run_all(workers=args.workers, only=set(args.only or []), repeat=args.repeat, collector=collector)
+    wall_time = time.perf_counter() - start
+    runner.print_summary(results, wall_time)
+    report = {
+        "wallTime": wall_time,
+        "results": runner.results_as_dicts(results),
+        "timings": baseline.summarize(collector.samples),
+        "samples": collector.samples,
+    }
+    ok = all(r.passed for r in results)
+    if args.save_baseline:
+        path = baseline.save_baseline(args.save_baseline, collector.samples, args.baseline_dir, baseUrl=BASE_URL, repeat=args.repeat)
+        print(f"\nsaved baseline {args.save_baseline!r} to {path}")
+    if baseline_data:
+        rows = baseline.compare(
+            baseline_data["samples"],
+            collector.samples,
+            alpha=args.alpha,
+            min_increase=args.min_increase,
+            min_delta_ms=args.min_delta_ms,
+        )
+        baseline.print_comparison(rows, args.compare, sys.stdout)
+        report["comparison"] = {"baseline": args.compare, "rows": rows}
+        ok = ok and not any(r["verdict"] == "regressed" for r in rows)
+    write_report(report, args.json)
+    return 0 if ok else 1
+
+
+def write_report(report, path):
+    if path:
+        with open(path, "w") as fh:
+            json.dump(report, fh, indent=2)
+
+
+def cmd_load(args):
+    from .load import run_closed_loop
+    from .metrics import print_report
+    from .scenarios import parse_mix
+
+    mix = parse_mix(args.mix)
+    report = asyncio.run(
+        run_closed_loop(args.users, args.duration, mix, think_time=args.think, ramp_up=args.ramp_up, seed=args.seed)
+    )
+    print_report(report, sys.stdout)
+    write_report(report, args.json)
+    return 0
+
+
+def cmd_soak(args):
+    from .scenarios import parse_mix
+    from .soak import print_soak, run_soak
+
+    def progress(window, sample):
+        extra = f", RSS {sample['rssMb']:.0f} MB" if "rssMb" in sample else ""
+        print(f"[{window['t'] / 60:6.1f} min] p95 {window['p95']:.1f} ms, errors {window['errorRate'] * 100:.2f}%{extra}")
+
+    result = asyncio.run(
+        run_soak(
+            args.hours * 3600,
+            args.rate,
+            parse_mix(args.mix),
+            users=args.users,
+            window=args.window,
+            pid=args.pid,
+            seed=args.seed,
+            on_window=progress,
+        )
+    )
+    print_soak(result, sys.stdout)
+    write_report(result, args.json)
+    if args.csv:
+        import csv
+
+        with open(args.csv, "w", newline="") as fh:
+            rows = [{**w, **r} for w, r in zip(result["windows"], result["resources"])]
+            writer = csv.DictWriter(fh, fieldnames=sorted({k for row in rows for k in row}))
+            writer.writeheader()
+            writer.writerows(rows)
+    return 0
+
+
+def cmd_contention(args):
+    from .contention import print_contention, run_contention
+    from .metrics import print_report
+
+    report = asyncio.run(
+        run_contention(
+            patients=args.patients,
+            autosave=args.autosave,
+            ai=args.ai,
+            blind=args.blind,
+            duration=args.duration,
+            autosave_interval=args.autosave_interval,
+            ai_interval=args.ai_interval,
+            ai_latency=args.ai_latency,
+            seed=args.seed,
+            dsn=args.dsn,
+        )
+    )
+    print_report(report, sys.stdout)
+    print_contention(report, sys.stdout)
+    write_report(report, args.json)
+    return 1 if report["contention"]["lostUpdates"] else 0
+
+
+def cmd_ai_stub(args):
+    from .ai_stub import load_canned, make_server
+
+    server = make_server(
+        args.host,
+        args.port,
+        nova_latency=args.nova_latency,
+        soniox_latency=args.soniox_latency,
+        ms_per_token=args.ms_per_token,
+        ms_per_audio_mb=args.ms_per_audio_mb,
+        throttle_rate=args.throttle_rate,
+        max_concurrency=args.max_concurrency,
+        canned=load_canned(args.canned),
+        seed=args.seed,
+        verbose=args.verbose,
+    )
+    print(f"AI stub listening on http://{args.host}:{args.port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+    return 0
+
+
+def cmd_seed(args):
+    from datetime import date
+
+    from . import seed
+
+    if args.teardown:
+        removed = seed.teardown(args.tag, args.dsn)
+        print(f"removed dataset {args.tag!r}: {removed} users and everything they owned")
+        return 0
+    plan = seed.SeedPlan(
+        users=args.users,
+        phrases_per_user=args.phrases,
+        templates_per_user=args.templates,
+        autocomplete_per_user=args.autocomplete,
+        public_fraction=args.public,
+        run_list_users=args.run_list_users,
+        run_list_days=args.days,
+        patients=(args.min_patients, args.max_patients),
+        teams=args.teams,
+    )
+    anchor = date.fromisoformat(args.anchor_day) if args.anchor_day else None
+    if args.dry_run:
+        counts = seed.Seeder(args.tag, args.seed, anchor).generate(plan).counts()
+    else:
+        counts = seed.seed(args.tag, plan, args.seed, args.dsn, anchor)
+    for table, count in counts.items():
+        print(f"{table:<24} {count:>9}")
+    write_report({"tag": args.tag, "seed": args.seed, "plan": plan.as_dict(), "rows": counts}, args.json)
+    return 0
+
+
+def cmd_scale(args):
+    from .scaling import print_results, run_suite, write_csv
+
+    sizes = [int(s) for s in args.sizes.split(",")] if args.sizes else None
+
+    def progress(bench, point):
+        print(f"{bench.name}: {point['x']} {bench.units} -> p50 {point['p50']:.1f} ms")
+
+    result = run_suite(
+        args.bench,
+        sizes,
+        samples=args.samples,
+        threshold=args.threshold,
+        tag=args.tag,
+        dsn=args.dsn,
+        seed=args.seed,
+        on_point=progress,
+    )
+    print_results(result, sys.stdout)
+    write_report(result, args.json)
+    if args.csv:
+        write_csv(result, args.csv)
+    return 1 if any(b["superLinear"] for b in result["benchmarks"]) else 0
+
+
+def _open_loop_setup(args):
+    from .client import ApiClient
+    from .openloop import DEFAULT_TARGET_MIX, TARGETS, prepare_fixture
+    from .scenarios import parse_weights
+
+    targets = parse_weights(args.targets, TARGETS, DEFAULT_TARGET_MIX)
+    client = ApiClient(pool_size=args.max_inflight)
+    fixture = prepare_fixture(client, args.patients)
+    return targets, client, fixture
+
+
+def cmd_openloop(args):
+    from .metrics import print_report
+    from .openloop import run_open_loop
+
+    targets, client, fixture = _open_loop_setup(args)
+    report = asyncio.run(
+        run_open_loop(args.rate, args.duration, targets, fixture, args.process, client, args.max_inflight, args.seed)
+    )
+    print_report(report, sys.stdout)
+    print(f"service p99 {report['serviceMs']['p99']:.1f} ms, peak in-flight {report['peakInflight']}")
+    write_report(report, args.json)
+    return 0
+
+
+def cmd_sweep(args):
+    from .openloop import print_curve, sweep
+
+    targets, client, fixture = _open_loop_setup(args)
+
+    def progress(stage):
+        print(f"rate {stage['rate']:.1f}/s: p{args.slo_pct} {stage[f'p{args.slo_pct}']:.1f} ms, errors {stage['errorRate'] * 100:.2f}%")
+
+    result = asyncio.run(
+        sweep(
+            args.start_rate,
+            args.stage,
+            targets,
+            fixture,
+            args.slo_ms,
+            slo_pct=args.slo_pct,
+            max_error_rate=args.max_errors,
+            step=args.step,
+            factor=args.factor,
+            max_rate=args.max_rate,
+            process=args.process,
+            client=client,
+            max_inflight=args.max_inflight,
+            seed=args.seed,
+            on_stage=progress,
+        )
+    )
+    print()
+    print_curve(result, sys.stdout)
+    write_report(result, args.json)
+    return 0
+
+
+def _add_open_loop_args(parser):
+    parser.add_argument("--process", choices=("poisson", "fixed"), default="poisson", help="arrival process")
+    parser.add_argument("--targets", help="endpoint weights, e.g. today=3,note=2,autocomplete=5")
+    parser.add_argument("--patients", type=int, default=8, help="run-list patients to spread note writes over")
+    parser.add_argument("--max-inflight", type=int, default=512, help="cap on concurrent requests")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", help="write the JSON report to this file")
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="harness")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    run = sub.add_parser("run", help="run the TC scripts in parallel scenario groups")
+    run.add_argument("--workers", type=int, default=6, help="scenario groups to run at once")
+    run.add_argument("--only", nargs="*", help="TC ids or scenario names to run (e.g. TC002 notes)")
+    run.add_argument("--json", help="write results and per-request timings to this file")
+    run.add_argument("--repeat", type=int, default=1, help="run the whole pass this many times to gather timing samples")
+    run.add_argument("--save-baseline", metavar="NAME", help="store this run's timings as a named baseline")
+    run.add_argument("--compare", metavar="NAME", help="fail if any endpoint regressed against this baseline")
+    run.add_argument("--baseline-dir", help="where baselines live (default testsprite_tests/baselines)")
+    run.add_argument("--alpha", type=float, default=0.01, help="significance level for the Mann-Whitney test")
+    run.add_argument("--min-increase", type=float, default=0.2, help="median growth (fraction) that counts as a regression")
+    run.add_argument("--min-delta-ms", type=float, default=5.0, help="ignore median shifts smaller than this")
+    run.set_defaults(func=cmd_run)
+
+    load = sub.add_parser("load", help="closed-loop load test with weighted virtual users")
+    load.add_argument("--users", type=int, default=20, help="concurrent virtual users")
+    load.add_argument("--duration", type=float, default=60, help="seconds to run after ramp-up")
+    load.add_argument("--ramp-up", type=float, default=0, help="seconds over which users start")
+    load.add_argument("--think", type=float, default=1.0, help="mean think time between scenarios (s)")
+    load.add_argument("--mix", help="scenario weights, e.g. run-list=4,autocomplete=3,smart-phrases=2,notes=1")
+    load.add_argument("--seed", type=int, default=0)
+    load.add_argument("--json", help="write the JSON report to this file")
+    load.set_defaults(func=cmd_load)
+
+    openloop = sub.add_parser("openloop", help="constant-arrival-rate load on the hot run-list endpoints")
+    openloop.add_argument("--rate", type=float, required=True, help="requests per second")
+    openloop.add_argument("--duration", type=float, default=60, help="seconds to schedule arrivals for")
+    _add_open_loop_args(openloop)
+    openloop.set_defaults(func=cmd_openloop)
+
+    sweep = sub.add_parser("sweep", help="raise the open-loop rate until the latency SLO breaks")
+    sweep.add_argument("--start-rate", type=float, default=10, help="first stage rate (req/s)")
+    sweep.add_argument("--step", type=float, help="add this many req/s per stage")
+    sweep.add_argument("--factor", type=float, default=1.5, help="multiply the rate per stage when --step is unset")
+    sweep.add_argument("--max-rate", type=float, help="stop after this rate even if the SLO holds")
+    sweep.add_argument("--stage", type=float, default=30, help="seconds per stage")
+    sweep.add_argument("--slo-ms", type=float, default=500, help="latency objective in ms")
+    sweep.add_argument("--slo-pct", type=int, choices=(50, 90, 95, 99), default=99, help="percentile the SLO applies to")
+    sweep.add_argument("--max-errors", type=float, default=0.01, help="error-rate objective (fraction)")
+    _add_open_loop_args(sweep)
+    sweep.set_defaults(func=cmd_sweep)
+
+    soak = sub.add_parser("soak", help="hours of steady load with server RSS / event-loop / DB sampling")
+    soak.add_argument("--hours", type=float, default=4)
+    soak.add_argument("--rate", type=float, default=2.0, help="scenario iterations started per second")
+    soak.add_argument("--users", type=int, default=10, help="virtual users the iterations rotate over")
+    soak.add_argument("--window", type=float, default=60, help="seconds per latency window and resource sample")
+    soak.add_argument("--mix", help="scenario weights, e.g. run-list=4,autocomplete=3,smart-phrases=2,notes=1")
+    soak.add_argument("--pid", type=int, help="also sample /proc/<pid> of a local server process")
+    soak.add_argument("--seed", type=int, default=0)
+    soak.add_argument("--csv", help="write the per-window timeline to this CSV file")
+    soak.add_argument("--json", help="write the JSON report to this file")
+    soak.set_defaults(func=cmd_soak)
+
+    contention = sub.add_parser("contention", help="race autosave and AI-merge writers on run-list notes")
+    contention.add_argument("--patients", type=int, default=1, help="notes to spread writers over (1 = all on one)")
+    contention.add_argument("--autosave", type=int, default=4, help="autosave writers (send expectedUpdatedAt, retry on 409)")
+    contention.add_argument("--ai", type=int, default=1, help="AI-merge writers (read, wait, write)")
+    contention.add_argument("--blind", type=int, default=0, help="writers that never send expectedUpdatedAt")
+    contention.add_argument("--duration", type=float, default=30)
+    contention.add_argument("--autosave-interval", type=float, default=1.0, help="mean seconds between autosaves")
+    contention.add_argument("--ai-interval", type=float, default=3.0, help="mean seconds between AI merges")
+    contention.add_argument("--ai-latency", type=float, default=0.8, help="seconds an AI merge holds its read before writing")
+    contention.add_argument("--dsn", help="Postgres URL for counting version rows (default POSTGRES_URL / DATABASE_URL)")
+    contention.add_argument("--seed", type=int, default=0)
+    contention.add_argument("--json", help="write the JSON report to this file")
+    contention.set_defaults(func=cmd_contention)
+
+    seed = sub.add_parser("seed", help="bulk-load (or tear down) a deterministic production-sized dataset")
+    seed.add_argument("--tag", default="bench", help="dataset name; users are seed-<tag>-NNNNN")
+    seed.add_argument("--teardown", action="store_true", help="delete the tagged dataset instead of creating it")
+    seed.add_argument("--dsn", help="Postgres URL (default POSTGRES_URL / DATABASE_URL)")
+    seed.add_argument("--seed", type=int, default=0)
+    seed.add_argument("--anchor-day", help="last run-list day, YYYY-MM-DD (default today)")
+    seed.add_argument("--users", type=int, default=2000)
+    seed.add_argument("--phrases", type=int, default=8, help="smart phrases per user")
+    seed.add_argument("--templates", type=int, default=2, help="note templates per user")
+    seed.add_argument("--autocomplete", type=int, default=12, help="autocomplete items per user")
+    seed.add_argument("--public", type=float, default=0.15, help="fraction of phrases/templates shared publicly")
+    seed.add_argument("--run-list-users", type=int, default=150, help="users with run-list history")
+    seed.add_argument("--days", type=int, default=21, help="days of run-list history per user")
+    seed.add_argument("--min-patients", type=int, default=20)
+    seed.add_argument("--max-patients", type=int, default=40)
+    seed.add_argument("--teams", type=int, default=120)
+    seed.add_argument("--dry-run", action="store_true", help="generate and count rows without a database")
+    seed.add_argument("--json", help="write the row counts to this file")
+    seed.set_defaults(func=cmd_seed)
+
+    scale = sub.add_parser("scale", help="measure endpoint latency against growing data sizes")
+    scale.add_argument("--bench", nargs="*", choices=("community", "team-todos", "run-list-today", "smart-phrases-q"))
+    scale.add_argument("--sizes", help="comma-separated sizes to use for every selected benchmark")
+    scale.add_argument("--samples", type=int, default=30, help="timed requests per size")
+    scale.add_argument("--threshold", type=float, default=1.2, help="growth exponent above which a curve is flagged")
+    scale.add_argument("--tag", default="scale", help="dataset tag for the helper users")
+    scale.add_argument("--dsn", help="Postgres URL (default POSTGRES_URL / DATABASE_URL)")
+    scale.add_argument("--seed", type=int, default=0)
+    scale.add_argument("--csv", help="write the curves to this CSV file")
+    scale.add_argument("--json", help="write curves and fits to this JSON file")
+    scale.set_defaults(func=cmd_scale)
+
+    stub = sub.add_parser("ai-stub", help="serve stand-in Bedrock Nova Micro and Soniox endpoints")
+    stub.add_argument("--host", default="127.0.0.1")
+    stub.add_argument("--port", type=int, default=5099)
+    stub.add_argument("--nova-latency", default="lognormal:800:0.4", help="fixed:MS | uniform:LO:HI | normal:MEAN:SD | lognormal:MEDIAN:SIGMA")
+    stub.add_argument("--soniox-latency", default="lognormal:1500:0.3", help="same syntax as --nova-latency")
+    stub.add_argument("--ms-per-token", type=float, default=0.0, help="extra Nova latency per output token")
+    stub.add_argument("--ms-per-audio-mb", type=float, default=0.0, help="extra Soniox latency per MB of audio")
+    stub.add_argument("--throttle-rate", type=float, default=0.0, help="fraction of calls answered with ThrottlingException")
+    stub.add_argument("--max-concurrency", type=int, help="throttle calls beyond this many in flight")
+    stub.add_argument("--canned", help="JSON file overriding canned outputs (medications, labs, pmh, run-list, transcript)")
+    stub.add_argument("--seed", type=int)
+    stub.add_argument("--verbose", action="store_true", help="log every request")
+    stub.set_defaults(func=cmd_ai_stub)
+
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
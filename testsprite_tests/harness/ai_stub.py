@@ -0,0 +1,268 @@
+"""Local stand-in for Bedrock (Nova Micro InvokeModel) and Soniox batch recognize.
+
+Lets the AI routes be load-tested offline: responses have the real wire
+shapes, latency is drawn from a configurable distribution, and throttling is
+injected either at random or when more than ``--max-concurrency`` calls are
+in flight (like a Bedrock on-demand quota). Point the backend at it with:
+
+    BEDROCK_ENDPOINT_URL=http://localhost:5099
+    AWS_REGION=us-east-1 AWS_ACCESS_KEY_ID=stub AWS_SECRET_ACCESS_KEY=stub
+    SONIOX_API_KEY=stub
+    SONIOX_API_URL=http://localhost:5099/speech-recognition/v2/recognize
+
+``GET /__stub/stats`` returns call counts, throttles and peak concurrency;
+``POST /__stub/reset`` zeroes them between runs.
+"""
+
+import json
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Canned model outputs keyed by the prompt family that requested them.
+CANNED_OUTPUTS = {
+    "medications": "Lisinopril 10mg PO OD\nMetformin 500mg PO BID\nAtorvastatin 40mg PO qHS",
+    "labs": "CBC: Hb 135, WBC 7.0, Plt 250\nLytes: Na 138, K 4.1, Cl 102\nRenal: Cr 98, Urea 5.2",
+    "pmh": "1. Hypertension\n2. Type 2 diabetes mellitus\n3. Asthma",
+    "run-list": json.dumps(
+        {
+            "merged_note": (
+                "Subjective:\nFeels better, tolerating diet.\n\n"
+                "Objective:\nAfebrile, HR 82, BP 128/76.\n\n"
+                "Assessment:\nCAP improving on ceftriaxone.\n\n"
+                "Plan:\nSwitch to PO amoxicillin-clavulanate, ambulate, reassess tomorrow."
+            ),
+            "sections": {
+                "Subjective": "Feels better, tolerating diet.",
+                "Objective": "Afebrile, HR 82, BP 128/76.",
+                "Assessment": "CAP improving on ceftriaxone.",
+                "Plan": "Switch to PO amoxicillin-clavulanate, ambulate, reassess tomorrow.",
+            },
+            "structured": {
+                "vitals": {"HR": {"values": ["82"]}, "BP": {"values": ["128/76"]}},
+                "labs": {"WBC": {"values": ["9.1"]}, "CRP": {"values": ["42"]}},
+            },
+        }
+    ),
+    "transcript": (
+        "Patient seen this morning, feels better, tolerating diet, afebrile overnight. "
+        "Plan to switch to oral antibiotics."
+    ),
+}
+
+
+def classify_prompt(text):
+    """Guess which prompt family produced ``text`` so the canned output fits the route."""
+    if '"merged_note"' in text:
+        return "run-list"
+    head = text[:400].lower()
+    if "medications" in head:
+        return "medications"
+    if "lab results" in head:
+        return "labs"
+    if "past medical history" in head:
+        return "pmh"
+    return "medications"
+
+
+class LatencyModel:
+    """Latency in milliseconds drawn from ``kind:params``.
+
+    ``fixed:200``, ``uniform:100:400``, ``normal:300:50`` (mean, sd) and
+    ``lognormal:800:0.5`` (median, sigma) are supported.
+    """
+
+    def __init__(self, spec, rng):
+        self.spec = spec
+        self.rng = rng
+        kind, *params = spec.split(":")
+        self.kind = kind
+        self.params = [float(p) for p in params]
+        expected = {"fixed": 1, "uniform": 2, "normal": 2, "lognormal": 2}
+        if kind not in expected or len(self.params) != expected[kind]:
+            raise ValueError(f"bad latency spec {spec!r}")
+
+    def sample(self):
+        p = self.params
+        if self.kind == "fixed":
+            value = p[0]
+        elif self.kind == "uniform":
+            value = self.rng.uniform(p[0], p[1])
+        elif self.kind == "normal":
+            value = self.rng.gauss(p[0], p[1])
+        else:
+            value = self.rng.lognormvariate(0, p[1]) * p[0]
+        return max(0.0, value)
+
+
+class StubState:
+    def __init__(self, config):
+        self.config = config
+        self.rng = random.Random(config.get("seed"))
+        self.rng_lock = threading.Lock()
+        self.nova_latency = LatencyModel(config["nova_latency"], self.rng)
+        self.soniox_latency = LatencyModel(config["soniox_latency"], self.rng)
+        self.canned = dict(CANNED_OUTPUTS)
+        self.canned.update(config.get("canned") or {})
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self.lock:
+            self.inflight = 0
+            self.peak_inflight = 0
+            self.calls = {}
+            self.throttled = 0
+            self.bytes_in = 0
+
+    def enter(self, kind, nbytes):
+        """Count a call; return False when it should be throttled."""
+        limit = self.config.get("max_concurrency")
+        with self.lock:
+            self.calls[kind] = self.calls.get(kind, 0) + 1
+            self.bytes_in += nbytes
+            with self.rng_lock:
+                unlucky = self.rng.random() < self.config.get("throttle_rate", 0.0)
+            if unlucky or (limit and self.inflight >= limit):
+                self.throttled += 1
+                return False
+            self.inflight += 1
+            self.peak_inflight = max(self.peak_inflight, self.inflight)
+            return True
+
+    def leave(self):
+        with self.lock:
+            self.inflight -= 1
+
+    def sample(self, model):
+        with self.rng_lock:
+            return model.sample()
+
+    def stats(self):
+        with self.lock:
+            return {
+                "calls": dict(self.calls),
+                "throttled": self.throttled,
+                "inflight": self.inflight,
+                "peakInflight": self.peak_inflight,
+                "bytesIn": self.bytes_in,
+                "config": {k: v for k, v in self.config.items() if k != "canned"},
+            }
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server_version = "ai-stub/1"
+    state = None  # set by make_server
+
+    def log_message(self, fmt, *args):
+        if self.state.config.get("verbose"):
+            super().log_message(fmt, *args)
+
+    def _send_json(self, status, body, headers=None):
+        data = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        for k, v in (headers or {}).items():
+            self.send_header(k, v)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _read_body(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        return self.rfile.read(length) if length else b""
+
+    def do_GET(self):
+        if self.path == "/__stub/stats":
+            return self._send_json(200, self.state.stats())
+        self._send_json(404, {"message": "not found"})
+
+    def do_POST(self):
+        body = self._read_body()
+        if self.path == "/__stub/reset":
+            self.state.reset()
+            return self._send_json(200, {"ok": True})
+        if re.fullmatch(r"/model/[^/]+/invoke", self.path):
+            return self._invoke_model(body)
+        if self.path.endswith("/recognize"):
+            return self._recognize(body)
+        self._send_json(404, {"message": "not found"})
+
+    def _throttled(self, kind):
+        if kind == "nova":
+            # Bedrock's REST-JSON error shape: the SDK reads the type from this header.
+            return self._send_json(
+                429,
+                {"message": "Too many requests, please wait before trying again."},
+                {"x-amzn-ErrorType": "ThrottlingException"},
+            )
+        return self._send_json(429, {"error_message": "Rate limit exceeded"})
+
+    def _invoke_model(self, body):
+        state = self.state
+        if not state.enter("nova", len(body)):
+            return self._throttled("nova")
+        try:
+            try:
+                request = json.loads(body or b"{}")
+                prompt = request["messages"][0]["content"][0]["text"]
+                max_tokens = int(request.get("inferenceConfig", {}).get("max_new_tokens", 4096))
+            except (ValueError, KeyError, IndexError, TypeError):
+                return self._send_json(400, {"message": "Malformed input request"}, {"x-amzn-ErrorType": "ValidationException"})
+            text = state.canned[classify_prompt(prompt)]
+            output_tokens = min(max_tokens, max(1, len(text) // 4))
+            delay_ms = state.sample(state.nova_latency) + output_tokens * state.config.get("ms_per_token", 0.0)
+            time.sleep(delay_ms / 1000)
+            self._send_json(
+                200,
+                {
+                    "output": {"message": {"role": "assistant", "content": [{"text": text}]}},
+                    "stopReason": "end_turn",
+                    "usage": {
+                        "inputTokens": max(1, len(prompt) // 4),
+                        "outputTokens": output_tokens,
+                        "totalTokens": max(1, len(prompt) // 4) + output_tokens,
+                    },
+                },
+            )
+        finally:
+            state.leave()
+
+    def _recognize(self, body):
+        state = self.state
+        if not state.enter("soniox", len(body)):
+            return self._throttled("soniox")
+        try:
+            # The backend posts base64 audio in JSON; scale latency with audio size.
+            audio_mb = len(body) * 3 / 4 / (1024 * 1024)
+            delay_ms = state.sample(state.soniox_latency) + audio_mb * state.config.get("ms_per_audio_mb", 0.0)
+            time.sleep(delay_ms / 1000)
+            self._send_json(200, {"text": state.canned["transcript"], "words": []})
+        finally:
+            state.leave()
+
+
+def make_server(host="127.0.0.1", port=5099, **config):
+    """Build (but do not start) a stub server; ``config`` mirrors the CLI flags."""
+    config.setdefault("nova_latency", "lognormal:800:0.4")
+    config.setdefault("soniox_latency", "lognormal:1500:0.3")
+    state = StubState(config)
+    handler = type("BoundStubHandler", (StubHandler,), {"state": state})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    server.state = state
+    return server
+
+
+def load_canned(path):
+    if not path:
+        return None
+    with open(path) as fh:
+        canned = json.load(fh)
+    unknown = set(canned) - set(CANNED_OUTPUTS)
+    if unknown:
+        raise ValueError(f"unknown canned output keys: {', '.join(sorted(unknown))}")
+    return canned
@@ -0,0 +1,196 @@
+"""Per-request timings for the TC scripts, named baselines and regression checks.
+
+``TimingCollector`` hooks the pooled client and files every request's latency
+and response size under the scenario that issued it and a route template
+(ids collapsed to ``:id``). A run can be saved as a named baseline under
+``testsprite_tests/baselines/`` and later runs compared against it.
+
+Comparison is per ``(scenario, endpoint)`` with a one-sided Mann-Whitney U
+test on the latency samples: an endpoint regresses when the new samples are
+significantly slower (``p < alpha``) *and* the median grew by at least
+``min_increase`` and ``min_delta_ms``, so a statistically real but tiny shift
+does not fail a deploy. Run the suite several times (``--repeat``) so each
+endpoint has enough samples for the test to mean something.
+"""
+
+import json
+import math
+import re
+import statistics
+import threading
+import time
+from pathlib import Path
+from urllib.parse import urlsplit
+
+from .client import add_observer, remove_observer
+
+BASELINE_DIR = Path(__file__).resolve().parent.parent / "baselines"
+
+MIN_SAMPLES = 5
+
+# Numeric ids, uuids, dev-user ids and 12-char shareable ids (upper-case, at least one digit).
+_ID_SEGMENT = re.compile(
+    r"^(?:\d+|(?i:[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12})|dev-user-[\w-]+|(?=[A-Z]*\d)[A-Z0-9]{12})$"
+)
+
+
+def endpoint_name(method, url):
+    """``PUT http://host/api/notes/3f2a...`` -> ``PUT /api/notes/:id``."""
+    parts = urlsplit(url).path.split("/")
+    return f"{method.upper()} " + "/".join(":id" if _ID_SEGMENT.match(p) else p for p in parts)
+
+
+class TimingCollector:
+    """Client observer that groups samples by the scenario running on the calling thread."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self.samples = {}
+
+    def set_scenario(self, scenario):
+        self._local.scenario = scenario
+
+    def __call__(self, method, url, elapsed_ms, resp):
+        scenario = getattr(self._local, "scenario", "unscoped")
+        name = endpoint_name(method, url)
+        with self._lock:
+            entry = self.samples.setdefault(scenario, {}).setdefault(name, {"latencyMs": [], "bytes": [], "statuses": {}})
+            entry["latencyMs"].append(round(elapsed_ms, 3))
+            entry["bytes"].append(len(resp.content))
+            status = str(resp.status_code)
+            entry["statuses"][status] = entry["statuses"].get(status, 0) + 1
+
+    def __enter__(self):
+        add_observer(self)
+        return self
+
+    def __exit__(self, *exc):
+        remove_observer(self)
+
+
+def summarize(samples):
+    """Median/p95 latency and median size per scenario endpoint, for reports."""
+    out = {}
+    for scenario, endpoints in samples.items():
+        for name, entry in endpoints.items():
+            lat = sorted(entry["latencyMs"])
+            out.setdefault(scenario, {})[name] = {
+                "requests": len(lat),
+                "medianMs": round(statistics.median(lat), 3),
+                "p95Ms": lat[min(len(lat) - 1, math.ceil(len(lat) * 0.95) - 1)],
+                "medianBytes": statistics.median(entry["bytes"]),
+                "statuses": entry["statuses"],
+            }
+    return out
+
+
+def baseline_path(name, directory=None):
+    if not re.fullmatch(r"[\w.-]+", name):
+        raise ValueError(f"baseline names may only use letters, digits, '.', '_' and '-': {name!r}")
+    return Path(directory or BASELINE_DIR) / f"{name}.json"
+
+
+def save_baseline(name, samples, directory=None, **meta):
+    path = baseline_path(name, directory)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "w") as fh:
+        json.dump({"name": name, "createdAt": time.time(), **meta, "samples": samples}, fh, indent=1)
+    return path
+
+
+def load_baseline(name, directory=None):
+    path = baseline_path(name, directory)
+    if not path.exists():
+        raise FileNotFoundError(f"no baseline named {name!r} at {path}")
+    with open(path) as fh:
+        return json.load(fh)
+
+
+def mann_whitney_greater(current, baseline):
+    """One-sided Mann-Whitney U: p-value for "``current`` tends to be larger than ``baseline``".
+
+    Normal approximation with tie and continuity corrections; fine for the
+    sample sizes we deal with (5+ per side).
+    """
+    n1, n2 = len(current), len(baseline)
+    pooled = sorted([(v, 0) for v in current] + [(v, 1) for v in baseline])
+    ranks = [0.0] * len(pooled)
+    tie_term = 0
+    i = 0
+    while i < len(pooled):
+        j = i
+        while j + 1 < len(pooled) and pooled[j + 1][0] == pooled[i][0]:
+            j += 1
+        avg = (i + j) / 2 + 1
+        for k in range(i, j + 1):
+            ranks[k] = avg
+        t = j - i + 1
+        tie_term += t**3 - t
+        i = j + 1
+    r1 = sum(r for r, (_, group) in zip(ranks, pooled) if group == 0)
+    u1 = r1 - n1 * (n1 + 1) / 2
+    n = n1 + n2
+    variance = n1 * n2 / 12 * ((n + 1) - tie_term / (n * (n - 1)))
+    if variance <= 0:
+        return 1.0
+    z = (u1 - n1 * n2 / 2 - 0.5) / math.sqrt(variance)
+    return 0.5 * math.erfc(z / math.sqrt(2))
+
+
+def compare(baseline, current, alpha=0.01, min_increase=0.2, min_delta_ms=5.0):
+    """Compare two sample sets; returns one row per scenario endpoint, worst first."""
+    rows = []
+    keys = {(s, e) for s, eps in baseline.items() for e in eps} | {(s, e) for s, eps in current.items() for e in eps}
+    for scenario, name in keys:
+        before = baseline.get(scenario, {}).get(name)
+        after = current.get(scenario, {}).get(name)
+        row = {"scenario": scenario, "endpoint": name}
+        if before is None or after is None:
+            row["verdict"] = "new" if before is None else "missing"
+            rows.append(row)
+            continue
+        b, a = before["latencyMs"], after["latencyMs"]
+        row.update(
+            baselineMedianMs=round(statistics.median(b), 3),
+            currentMedianMs=round(statistics.median(a), 3),
+            baselineBytes=statistics.median(before["bytes"]),
+            currentBytes=statistics.median(after["bytes"]),
+            samples=[len(b), len(a)],
+        )
+        row["ratio"] = round(row["currentMedianMs"] / row["baselineMedianMs"], 3) if row["baselineMedianMs"] else None
+        if len(a) < MIN_SAMPLES or len(b) < MIN_SAMPLES:
+            row["verdict"] = "insufficient"
+            rows.append(row)
+            continue
+        slower = mann_whitney_greater(a, b)
+        faster = mann_whitney_greater(b, a)
+        row["pSlower"] = round(slower, 5)
+        delta = row["currentMedianMs"] - row["baselineMedianMs"]
+        if slower < alpha and delta >= min_delta_ms and (row["ratio"] or 0) >= 1 + min_increase:
+            row["verdict"] = "regressed"
+        elif faster < alpha and -delta >= min_delta_ms:
+            row["verdict"] = "improved"
+        else:
+            row["verdict"] = "unchanged"
+        rows.append(row)
+    order = {"regressed": 0, "missing": 1, "insufficient": 2, "new": 3, "improved": 4, "unchanged": 5}
+    rows.sort(key=lambda r: (order[r["verdict"]], -(r.get("ratio") or 0), r["scenario"], r["endpoint"]))
+    return rows
+
+
+def print_comparison(rows, name, out):
+    out.write(f"\nCompared with baseline {name!r}:\n")
+    width = max((len(f"{r['scenario']} {r['endpoint']}") for r in rows), default=10)
+    for r in rows:
+        label = f"{r['scenario']} {r['endpoint']}"
+        if "ratio" not in r:
+            out.write(f"{r['verdict']:<12}  {label}\n")
+            continue
+        ratio = f"x{r['ratio']:.2f}" if r["ratio"] is not None else "n/a"
+        out.write(
+            f"{r['verdict']:<12}  {label:<{width}}  {r['baselineMedianMs']:>8.1f} -> {r['currentMedianMs']:>8.1f} ms"
+            f"  {ratio:>7}  {r['baselineBytes']:>8.0f} -> {r['currentBytes']:>8.0f} B\n"
+        )
+    regressed = [r for r in rows if r["verdict"] == "regressed"]
+    out.write(f"\n{len(regressed)} endpoint(s) regressed\n")
@@ -0,0 +1,162 @@
+"""Pooled HTTP client shared by the TC scripts and the load tools.
+
+All scenarios talk to the backend through ``requests`` sessions whose shared
+adapter keeps connections alive, so a full verification pass reuses a handful
+of sockets instead of opening one per call. Configuration comes from the
+environment so the same scripts can target a local dev server or staging:
+
+    TESTSPRITE_BASE_URL    backend origin (default http://localhost:5002)
+    TESTSPRITE_TIMEOUT     per-request timeout in seconds (default 30)
+    TESTSPRITE_AUTH_TOKEN  bearer token sent on every request (optional)
+    TESTSPRITE_POOL_SIZE   max keep-alive connections per host (default 32)
+"""
+
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+import requests
+from requests.adapters import HTTPAdapter
+
+BASE_URL = os.environ.get("TESTSPRITE_BASE_URL", "http://localhost:5002").rstrip("/")
+TIMEOUT = float(os.environ.get("TESTSPRITE_TIMEOUT", "30"))
+AUTH_TOKEN = os.environ.get("TESTSPRITE_AUTH_TOKEN", "")
+POOL_SIZE = int(os.environ.get("TESTSPRITE_POOL_SIZE", "32"))
+
+HEADERS = {"Content-Type": "application/json", "Accept": "application/json"}
+
+# Callables invoked as ``fn(method, url, elapsed_ms, response)`` after every request.
+_observers = []
+
+
+def add_observer(fn):
+    _observers.append(fn)
+
+
+def remove_observer(fn):
+    _observers.remove(fn)
+
+
+def make_adapter(pool_size=POOL_SIZE):
+    """Build a keep-alive adapter that can be shared between sessions."""
+    return HTTPAdapter(pool_connections=4, pool_maxsize=pool_size, pool_block=True, max_retries=0)
+
+
+class ApiClient:
+    """Thin wrapper around ``requests.Session`` bound to one backend.
+
+    Paths may be relative (``/api/notes``) or absolute URLs. Keyword arguments
+    are passed straight to ``requests`` with the configured timeout applied
+    when the caller does not give one.
+    """
+
+    def __init__(self, base_url=BASE_URL, timeout=TIMEOUT, token=AUTH_TOKEN, adapter=None, pool_size=POOL_SIZE):
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+        self.token = token
+        self._owns_adapter = adapter is None
+        self.adapter = adapter or make_adapter(pool_size)
+        self.session = requests.Session()
+        self.session.mount("http://", self.adapter)
+        self.session.mount("https://", self.adapter)
+        self.session.headers.update(HEADERS)
+        if token:
+            self.session.headers["Authorization"] = f"Bearer {token}"
+
+    @property
+    def headers(self):
+        return self.session.headers
+
+    def url(self, path):
+        if path.startswith("http://") or path.startswith("https://"):
+            return path
+        return f"{self.base_url}/{path.lstrip('/')}"
+
+    def request(self, method, path, **kwargs):
+        kwargs.setdefault("timeout", self.timeout)
+        url = self.url(path)
+        if not _observers:
+            return self.session.request(method, url, **kwargs)
+        start = time.perf_counter()
+        resp = self.session.request(method, url, **kwargs)
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        for fn in list(_observers):
+            fn(method, url, elapsed_ms, resp)
+        return resp
+
+    def get(self, path, **kwargs):
+        return self.request("GET", path, **kwargs)
+
+    def post(self, path, **kwargs):
+        return self.request("POST", path, **kwargs)
+
+    def put(self, path, **kwargs):
+        return self.request("PUT", path, **kwargs)
+
+    def patch(self, path, **kwargs):
+        return self.request("PATCH", path, **kwargs)
+
+    def delete(self, path, **kwargs):
+        return self.request("DELETE", path, **kwargs)
+
+    def isolated(self):
+        """Return a client with its own cookie jar on the same connection pool.
+
+        Under ``NO_AUTH=1`` the backend keys the dev user off the session
+        cookie, so an isolated client is also a distinct user. Use it for
+        scenarios that log out or must not see each other's data.
+        """
+        return ApiClient(self.base_url, self.timeout, self.token, adapter=self.adapter)
+
+    def warm(self):
+        """Create this client's dev user before it is used concurrently.
+
+        Under ``NO_AUTH=1`` every request without a session cookie creates a
+        new dev user, so parallel first requests would each get a different
+        one. One ``/api/init-user`` call fixes the cookie first.
+        """
+        resp = self.post("/api/init-user")
+        resp.raise_for_status()
+        return resp
+
+    def close(self):
+        # Closing a session closes its adapters; leave a shared pool to its owner.
+        if self._owns_adapter:
+            self.session.close()
+        else:
+            self.session.cookies.clear()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+_default_client = None
+_default_lock = threading.Lock()
+_scoped = threading.local()
+
+
+@contextmanager
+def scoped_client(client):
+    """Make ``get_client()`` return ``client`` on this thread while active."""
+    previous = getattr(_scoped, "client", None)
+    _scoped.client = client
+    try:
+        yield client
+    finally:
+        _scoped.client = previous
+
+
+def get_client():
+    """Return this thread's scoped client, else the process-wide one."""
+    scoped = getattr(_scoped, "client", None)
+    if scoped is not None:
+        return scoped
+    global _default_client
+    with _default_lock:
+        if _default_client is None:
+            _default_client = ApiClient()
+        return _default_client
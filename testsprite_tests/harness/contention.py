@@ -0,0 +1,277 @@
+"""Contention stress for optimistic locking on ``PUT /api/run-list/notes/:listPatientId``.
+
+Several writers share one clinician's run list and race on its notes:
+
+``autosave``  the editor's dictation autosave. Sends its last known text plus
+              a new line with ``expectedUpdatedAt``; on 409 it re-reads the
+              note and retries the same line.
+``ai``        an AI merge. Reads the note, "thinks" for ``ai_latency``
+              seconds, then writes the merged text with the ``updatedAt`` it
+              read. On 409 the merge is dropped and retried next cycle.
+``blind``     a client that never sends ``expectedUpdatedAt`` (last write wins).
+
+Every write appends a unique token line, so after the run each acknowledged
+(200) write must still be visible in the final note; any token that is not
+was silently overwritten, i.e. a lost update. The server checks
+``expectedUpdatedAt`` and then updates in separate statements, so two writers
+can both pass the check; this mode measures how often that happens.
+
+Version-row growth is counted from the database when a DSN is available
+(``POSTGRES_URL``/``DATABASE_URL`` or ``--dsn``); every acknowledged write
+should add exactly one row.
+"""
+
+import asyncio
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
+from functools import partial
+
+from .client import ApiClient
+from .metrics import Recorder
+
+ENDPOINT = "PUT /api/run-list/notes/:listPatientId"
+
+
+class Writer:
+    def __init__(self, writer_id, kind, patient_id):
+        self.writer_id = writer_id
+        self.kind = kind
+        self.patient_id = patient_id
+        self.seq = 0
+        self.text = ""
+        self.updated_at = None
+        self.acked = []
+        self.attempts = 0
+        self.conflicts = 0
+        self.errors = 0
+
+    def next_token(self):
+        self.seq += 1
+        return f"[{self.kind}-{self.writer_id}#{self.seq}]"
+
+
+class ContentionRun:
+    def __init__(self, client, executor, recorder, day, rng, ai_latency, autosave_interval, ai_interval):
+        self.client = client
+        self.executor = executor
+        self.recorder = recorder
+        self.day = day
+        self.rng = rng
+        self.ai_latency = ai_latency
+        self.autosave_interval = autosave_interval
+        self.ai_interval = ai_interval
+
+    async def _request(self, name, method, path, **kwargs):
+        loop = asyncio.get_running_loop()
+        start = time.perf_counter()
+        try:
+            resp = await loop.run_in_executor(self.executor, partial(self.client.request, method, path, **kwargs))
+        except Exception:
+            self.recorder.record(name, (time.perf_counter() - start) * 1000, 0, error=True)
+            return None
+        latency_ms = (time.perf_counter() - start) * 1000
+        # A 409 is the expected outcome of a lost race, not a server error.
+        self.recorder.record(name, latency_ms, resp.status_code, len(resp.content), error=resp.status_code not in (200, 409))
+        return resp
+
+    async def read_notes(self):
+        resp = await self._request("GET /api/run-list/today", "GET", "/api/run-list/today", params={"day": self.day})
+        if resp is None or resp.status_code != 200:
+            return None
+        return {p["id"]: p.get("note") or {} for p in resp.json().get("patients", [])}
+
+    async def refresh(self, writer):
+        notes = await self.read_notes()
+        if notes and writer.patient_id in notes:
+            note = notes[writer.patient_id]
+            writer.text = note.get("rawText") or ""
+            writer.updated_at = note.get("updatedAt")
+            return True
+        return False
+
+    async def write(self, writer, text, expected):
+        body = {"rawText": text}
+        if expected:
+            body["expectedUpdatedAt"] = expected
+        writer.attempts += 1
+        resp = await self._request(
+            f"{ENDPOINT} ({writer.kind})", "PUT", f"/api/run-list/notes/{writer.patient_id}", json=body
+        )
+        if resp is None:
+            writer.errors += 1
+            return None
+        if resp.status_code == 409:
+            writer.conflicts += 1
+            return None
+        if resp.status_code != 200:
+            writer.errors += 1
+            return None
+        return resp.json()["note"]
+
+    async def autosave(self, writer, deadline):
+        loop = asyncio.get_running_loop()
+        await self.refresh(writer)
+        while loop.time() < deadline:
+            token = writer.next_token()
+            for _ in range(5):
+                note = await self.write(writer, f"{writer.text}\n{token}".lstrip("\n"), writer.updated_at)
+                if note is not None:
+                    writer.acked.append(token)
+                    writer.text, writer.updated_at = note["rawText"], note["updatedAt"]
+                    break
+                if not await self.refresh(writer):
+                    break
+            await asyncio.sleep(self.rng.expovariate(1.0 / self.autosave_interval))
+
+    async def ai_merge(self, writer, deadline):
+        loop = asyncio.get_running_loop()
+        while loop.time() < deadline:
+            if await self.refresh(writer):
+                await asyncio.sleep(self.ai_latency)
+                token = writer.next_token()
+                note = await self.write(writer, f"{writer.text}\n{token}".lstrip("\n"), writer.updated_at)
+                if note is not None:
+                    writer.acked.append(token)
+            await asyncio.sleep(self.rng.expovariate(1.0 / self.ai_interval))
+
+    async def blind(self, writer, deadline):
+        loop = asyncio.get_running_loop()
+        await self.refresh(writer)
+        while loop.time() < deadline:
+            token = writer.next_token()
+            note = await self.write(writer, f"{writer.text}\n{token}".lstrip("\n"), None)
+            if note is not None:
+                writer.acked.append(token)
+                writer.text = note["rawText"]
+            await asyncio.sleep(self.rng.expovariate(1.0 / self.autosave_interval))
+
+
+def prepare_patients(client, count, day):
+    """Add ``count`` fresh patients with empty notes to the session user's list for ``day``."""
+    resp = client.get("/api/run-list/today", params={"day": day})
+    resp.raise_for_status()
+    run_list_id = resp.json()["runList"]["id"]
+    ids = []
+    for i in range(count):
+        added = client.post(f"/api/run-list/{run_list_id}/patients", json={"alias": f"Contention {i + 1}"})
+        added.raise_for_status()
+        ids.append(added.json()["patient"]["id"])
+    return ids
+
+
+def count_versions(patient_ids, dsn=None):
+    """Version rows for these patients' notes, or ``None`` without database access."""
+    from .seed import connect
+
+    try:
+        conn = connect(dsn)
+    except Exception:
+        return None
+    with conn, conn.cursor() as cur:
+        cur.execute(
+            "SELECT count(*) FROM run_list_note_versions v JOIN run_list_notes n ON n.id = v.note_id"
+            " WHERE n.list_patient_id = ANY(%s)",
+            (patient_ids,),
+        )
+        return cur.fetchone()[0]
+
+
+async def run_contention(
+    patients=1,
+    autosave=4,
+    ai=1,
+    blind=0,
+    duration=30,
+    autosave_interval=1.0,
+    ai_interval=3.0,
+    ai_latency=0.8,
+    client=None,
+    seed=0,
+    dsn=None,
+):
+    """Race the writers on ``patients`` notes for ``duration`` seconds; return a report dict."""
+    writers_total = autosave + ai + blind
+    base = client or ApiClient(pool_size=writers_total + 2)
+    owner = base.isolated()
+    day = date.today().isoformat()
+    patient_ids = prepare_patients(owner, patients, day)
+    versions_before = count_versions(patient_ids, dsn)
+
+    kinds = ["autosave"] * autosave + ["ai"] * ai + ["blind"] * blind
+    writers = [Writer(i, kind, patient_ids[i % len(patient_ids)]) for i, kind in enumerate(kinds)]
+    recorder = Recorder()
+    rng = random.Random(seed)
+    loop = asyncio.get_running_loop()
+    with ThreadPoolExecutor(max_workers=writers_total + 1, thread_name_prefix="writer") as executor:
+        run = ContentionRun(owner, executor, recorder, day, rng, ai_latency, autosave_interval, ai_interval)
+        deadline = loop.time() + duration
+        loops = {"autosave": run.autosave, "ai": run.ai_merge, "blind": run.blind}
+        await asyncio.gather(*(loops[w.kind](w, deadline) for w in writers))
+        final = await run.read_notes() or {}
+    recorder.finish()
+    versions_after = count_versions(patient_ids, dsn)
+    owner.close()
+
+    by_kind = {}
+    lost_total = 0
+    for w in writers:
+        final_text = (final.get(w.patient_id) or {}).get("rawText") or ""
+        lost = [t for t in w.acked if t not in final_text]
+        lost_total += len(lost)
+        k = by_kind.setdefault(w.kind, {"writers": 0, "attempts": 0, "acked": 0, "conflicts": 0, "errors": 0, "lost": 0})
+        k["writers"] += 1
+        k["attempts"] += w.attempts
+        k["acked"] += len(w.acked)
+        k["conflicts"] += w.conflicts
+        k["errors"] += w.errors
+        k["lost"] += len(lost)
+    for k in by_kind.values():
+        k["conflictRate"] = round(k["conflicts"] / k["attempts"], 4) if k["attempts"] else 0.0
+
+    attempts = sum(w.attempts for w in writers)
+    acked = sum(len(w.acked) for w in writers)
+    conflicts = sum(w.conflicts for w in writers)
+    wall = recorder.wall_time
+    return recorder.report(
+        mode="contention",
+        config={
+            "baseUrl": base.base_url,
+            "patients": patients,
+            "writers": {"autosave": autosave, "ai": ai, "blind": blind},
+            "duration": duration,
+            "autosaveInterval": autosave_interval,
+            "aiInterval": ai_interval,
+            "aiLatency": ai_latency,
+            "seed": seed,
+        },
+        contention={
+            "attempts": attempts,
+            "acked": acked,
+            "conflicts": conflicts,
+            "conflictRate": round(conflicts / attempts, 4) if attempts else 0.0,
+            "ackedPerSecond": round(acked / wall, 3) if wall else 0.0,
+            "lostUpdates": lost_total,
+            "versionRowsAdded": None if versions_before is None or versions_after is None else versions_after - versions_before,
+            "byKind": by_kind,
+        },
+    )
+
+
+def print_contention(report, out):
+    c = report["contention"]
+    out.write(
+        f"\n{c['attempts']} writes, {c['acked']} acknowledged ({c['ackedPerSecond']:.1f}/s), "
+        f"{c['conflicts']} conflicts ({c['conflictRate'] * 100:.1f}%), {c['lostUpdates']} lost updates\n"
+    )
+    added = c["versionRowsAdded"]
+    if added is None:
+        out.write("version rows: not measured (no database access)\n")
+    else:
+        out.write(f"version rows added: {added} (expected {c['acked']})\n")
+    for kind, k in c["byKind"].items():
+        out.write(
+            f"  {kind:<9} writers {k['writers']:>3}  attempts {k['attempts']:>6}  acked {k['acked']:>6}"
+            f"  409 {k['conflictRate'] * 100:>5.1f}%  errors {k['errors']:>4}  lost {k['lost']:>5}\n"
+        )
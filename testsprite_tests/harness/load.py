@@ -0,0 +1,104 @@
+"""Closed-loop load generator.
+
+N virtual users each loop: pick a scenario by weight, run it, think, repeat.
+Every user has its own cookie jar (a distinct dev user under ``NO_AUTH=1``)
+on one shared keep-alive pool. Requests run on a thread pool sized to the
+number of users, driven from a single asyncio event loop.
+
+A closed loop measures what a fixed population of clinicians experiences; it
+cannot push the server past the point where users are all waiting, so use the
+open-loop mode to find the saturation point.
+"""
+
+import asyncio
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+
+from .client import ApiClient
+from .metrics import Recorder
+from .scenarios import SCENARIOS, ScenarioAbort
+
+
+class VirtualUser:
+    """One simulated clinician: a client, an RNG and a recorder to report to."""
+
+    def __init__(self, vu_id, client, recorder, executor, seed=None):
+        self.vu_id = vu_id
+        self.client = client
+        self.recorder = recorder
+        self.executor = executor
+        self.rng = random.Random(seed)
+        self.iteration = 0
+
+    async def call(self, method, path, name=None, expect=(200, 201, 204), **kwargs):
+        """Issue one request and record it under ``name`` (default ``METHOD path``).
+
+        Raises ``ScenarioAbort`` when the status is not in ``expect``.
+        """
+        name = name or f"{method} {path}"
+        loop = asyncio.get_running_loop()
+        start = time.perf_counter()
+        try:
+            resp = await loop.run_in_executor(self.executor, partial(self.client.request, method, path, **kwargs))
+        except Exception as exc:
+            self.recorder.record(name, (time.perf_counter() - start) * 1000, 0, error=True)
+            raise ScenarioAbort(f"{name}: {exc}") from exc
+        latency_ms = (time.perf_counter() - start) * 1000
+        ok = resp.status_code in expect
+        self.recorder.record(name, latency_ms, resp.status_code, len(resp.content), error=not ok)
+        if not ok:
+            raise ScenarioAbort(f"{name}: HTTP {resp.status_code}")
+        return resp
+
+
+async def _user_loop(vu, mix, deadline, think_time, start_delay):
+    names = list(mix)
+    weights = [mix[n] for n in names]
+    await asyncio.sleep(start_delay)
+    loop = asyncio.get_running_loop()
+    while loop.time() < deadline:
+        scenario = vu.rng.choices(names, weights)[0]
+        vu.iteration += 1
+        try:
+            await SCENARIOS[scenario](vu)
+            vu.recorder.scenario_done(scenario, True)
+        except ScenarioAbort:
+            vu.recorder.scenario_done(scenario, False)
+        except (KeyError, TypeError, ValueError):
+            # Unexpected response body shape; count it against the scenario.
+            vu.recorder.scenario_done(scenario, False)
+        if think_time > 0:
+            pause = vu.rng.expovariate(1.0 / think_time)
+            await asyncio.sleep(min(pause, max(0.0, deadline - loop.time())))
+
+
+async def run_closed_loop(users, duration, mix, think_time=1.0, ramp_up=0.0, seed=0, client=None):
+    """Run ``users`` virtual users for ``duration`` seconds and return a report dict."""
+    base = client or ApiClient(pool_size=users)
+    recorder = Recorder()
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + ramp_up + duration
+    with ThreadPoolExecutor(max_workers=users, thread_name_prefix="vu") as executor:
+        vus = [VirtualUser(i, base.isolated(), recorder, executor, seed=seed + i) for i in range(users)]
+        try:
+            await asyncio.gather(
+                *(_user_loop(vu, mix, deadline, think_time, ramp_up * i / users) for i, vu in enumerate(vus))
+            )
+        finally:
+            for vu in vus:
+                vu.client.close()
+    recorder.finish()
+    return recorder.report(
+        mode="closed",
+        config={
+            "baseUrl": base.base_url,
+            "users": users,
+            "duration": duration,
+            "rampUp": ramp_up,
+            "thinkTime": think_time,
+            "mix": mix,
+            "seed": seed,
+        },
+    )
@@ -0,0 +1,181 @@
+"""Latency histograms and per-endpoint counters for the load tools."""
+
+import math
+import threading
+import time
+
+# Buckets grow by 2% so any reported percentile is within 2% of the true value.
+_MIN_MS = 0.01
+_GROWTH = 1.02
+_LOG_GROWTH = math.log(_GROWTH)
+
+PERCENTILES = (50, 90, 95, 99)
+
+
+class Histogram:
+    """Log-bucketed latency histogram in milliseconds.
+
+    Memory is bounded by the number of distinct buckets (a few hundred for
+    anything between 10 µs and an hour), independent of sample count.
+    """
+
+    def __init__(self):
+        self.buckets = {}
+        self.count = 0
+        self.total = 0.0
+        self.min = math.inf
+        self.max = 0.0
+
+    @staticmethod
+    def _index(value):
+        return int(math.log(max(value, _MIN_MS) / _MIN_MS) / _LOG_GROWTH)
+
+    @staticmethod
+    def _upper(index):
+        return _MIN_MS * _GROWTH ** (index + 1)
+
+    def record(self, value):
+        idx = self._index(value)
+        self.buckets[idx] = self.buckets.get(idx, 0) + 1
+        self.count += 1
+        self.total += value
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+
+    def merge(self, other):
+        for idx, n in other.buckets.items():
+            self.buckets[idx] = self.buckets.get(idx, 0) + n
+        self.count += other.count
+        self.total += other.total
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+
+    def percentile(self, pct):
+        if not self.count:
+            return 0.0
+        rank = math.ceil(self.count * pct / 100.0)
+        seen = 0
+        for idx in sorted(self.buckets):
+            seen += self.buckets[idx]
+            if seen >= rank:
+                return min(self._upper(idx), self.max)
+        return self.max
+
+    @property
+    def mean(self):
+        return self.total / self.count if self.count else 0.0
+
+    def to_dict(self):
+        out = {
+            "count": self.count,
+            "mean": round(self.mean, 3),
+            "min": round(self.min, 3) if self.count else 0.0,
+            "max": round(self.max, 3),
+        }
+        for pct in PERCENTILES:
+            out[f"p{pct}"] = round(self.percentile(pct), 3)
+        out["buckets"] = [[round(self._upper(idx), 3), self.buckets[idx]] for idx in sorted(self.buckets)]
+        return out
+
+
+class EndpointStats:
+    def __init__(self, name):
+        self.name = name
+        self.latency = Histogram()
+        self.statuses = {}
+        self.errors = 0
+        self.bytes = 0
+
+    def record(self, latency_ms, status, nbytes, error):
+        self.latency.record(latency_ms)
+        self.statuses[status] = self.statuses.get(status, 0) + 1
+        self.bytes += nbytes
+        if error:
+            self.errors += 1
+
+    def to_dict(self, wall_time):
+        count = self.latency.count
+        return {
+            "requests": count,
+            "errors": self.errors,
+            "errorRate": round(self.errors / count, 4) if count else 0.0,
+            "throughput": round(count / wall_time, 3) if wall_time else 0.0,
+            "bytes": self.bytes,
+            "statuses": {str(k): v for k, v in sorted(self.statuses.items())},
+            "latencyMs": self.latency.to_dict(),
+        }
+
+
+class Recorder:
+    """Thread-safe collector shared by every virtual user in a run."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.endpoints = {}
+        self.scenarios = {}
+        self.started = time.time()
+        self.finished = None
+
+    def record(self, name, latency_ms, status, nbytes=0, error=False):
+        with self._lock:
+            stats = self.endpoints.get(name)
+            if stats is None:
+                stats = self.endpoints[name] = EndpointStats(name)
+            stats.record(latency_ms, status, nbytes, error)
+
+    def scenario_done(self, name, ok):
+        with self._lock:
+            runs, failures = self.scenarios.get(name, (0, 0))
+            self.scenarios[name] = (runs + 1, failures + (0 if ok else 1))
+
+    def finish(self):
+        self.finished = time.time()
+
+    @property
+    def wall_time(self):
+        return (self.finished or time.time()) - self.started
+
+    def report(self, **extra):
+        wall = self.wall_time
+        with self._lock:
+            total = Histogram()
+            for stats in self.endpoints.values():
+                total.merge(stats.latency)
+            errors = sum(s.errors for s in self.endpoints.values())
+            return {
+                **extra,
+                "startedAt": self.started,
+                "wallTime": round(wall, 3),
+                "totals": {
+                    "requests": total.count,
+                    "errors": errors,
+                    "errorRate": round(errors / total.count, 4) if total.count else 0.0,
+                    "throughput": round(total.count / wall, 3) if wall else 0.0,
+                    "latencyMs": total.to_dict(),
+                },
+                "endpoints": {name: s.to_dict(wall) for name, s in sorted(self.endpoints.items())},
+                "scenarios": {
+                    name: {"runs": runs, "failures": failures}
+                    for name, (runs, failures) in sorted(self.scenarios.items())
+                },
+            }
+
+
+def print_report(report, out):
+    """Write a fixed-width per-endpoint summary of ``report`` to ``out``."""
+    rows = [(name, ep) for name, ep in report["endpoints"].items()]
+    width = max((len(name) for name, _ in rows), default=8)
+    header = f"{'endpoint':<{width}}  {'reqs':>7}  {'rps':>8}  {'err%':>6}  {'p50':>8}  {'p95':>8}  {'p99':>8}  {'max':>8}\n"
+    out.write(header)
+    out.write("-" * (len(header) - 1) + "\n")
+    for name, ep in rows + [("TOTAL", report["totals"])]:
+        lat = ep["latencyMs"]
+        out.write(
+            f"{name:<{width}}  {ep['requests']:>7}  {ep['throughput']:>8.2f}  {ep['errorRate'] * 100:>6.2f}"
+            f"  {lat['p50']:>8.1f}  {lat['p95']:>8.1f}  {lat['p99']:>8.1f}  {lat['max']:>8.1f}\n"
+        )
+    if report.get("scenarios"):
+        out.write("\n")
+        for name, sc in report["scenarios"].items():
+            out.write(f"scenario {name}: {sc['runs']} runs, {sc['failures']} failed\n")
+    out.write(f"\nwall time {report['wallTime']:.1f}s (latencies in ms)\n")
@@ -0,0 +1,269 @@
+"""Open-loop, constant-arrival-rate load against the hot run-list endpoints.
+
+Requests are scheduled on a fixed or Poisson arrival timeline that does not
+wait for earlier responses. Latency is measured from each request's
+*intended* send time, so when the server stalls the queued-up requests show
+the stall in their latency instead of silently not being sent (coordinated
+omission). The time from actual send to response is kept separately as
+service time.
+
+``sweep`` steps the arrival rate upward until a latency percentile or the
+error rate breaks the SLO, producing a saturation curve.
+"""
+
+import asyncio
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
+
+from .client import ApiClient
+from .metrics import Histogram, Recorder
+from .scenarios import parse_weights
+
+TARGETS = {
+    "today": "GET /api/run-list/today",
+    "note": "PUT /api/run-list/notes/:listPatientId",
+    "autocomplete": "GET /api/autocomplete-items",
+}
+
+# Roughly what the editor generates: lookups on keystrokes, autosaves, list refreshes.
+DEFAULT_TARGET_MIX = {"today": 3, "note": 2, "autocomplete": 5}
+
+AUTOCOMPLETE_CATEGORIES = ("medications", "past-medical-history", "allergies")
+
+
+class Fixture:
+    """Run-list state the targets need: the day and some list patient ids."""
+
+    def __init__(self, day, patient_ids):
+        self.day = day
+        self.patient_ids = patient_ids
+
+
+def prepare_fixture(client, patients=8):
+    """Make sure today's run list for ``client``'s user has ``patients`` patients."""
+    day = date.today().isoformat()
+    resp = client.get("/api/run-list/today", params={"day": day})
+    resp.raise_for_status()
+    data = resp.json()
+    ids = [p["id"] for p in data.get("patients", []) if p.get("active", True)]
+    while len(ids) < patients:
+        added = client.post(f"/api/run-list/{data['runList']['id']}/patients", json={"alias": f"Bed {len(ids) + 1}"})
+        added.raise_for_status()
+        ids.append(added.json()["patient"]["id"])
+    return Fixture(day, ids[:patients])
+
+
+def build_request(target, fixture, rng, seq):
+    """Return ``(method, path, kwargs)`` for one request to ``target``."""
+    if target == "today":
+        return "GET", "/api/run-list/today", {"params": {"day": fixture.day}}
+    if target == "note":
+        patient_id = rng.choice(fixture.patient_ids)
+        return "PUT", f"/api/run-list/notes/{patient_id}", {"json": {"rawText": f"Autosave {seq}: stable, plan unchanged."}}
+    if target == "autocomplete":
+        return "GET", "/api/autocomplete-items", {"params": {"category": rng.choice(AUTOCOMPLETE_CATEGORIES)}}
+    raise ValueError(f"unknown target {target!r}")
+
+
+def arrival_offsets(rate, duration, process, rng):
+    """Yield send offsets in seconds for ``rate`` requests/s over ``duration``."""
+    if rate <= 0:
+        return
+    if process == "fixed":
+        n = int(rate * duration)
+        for i in range(n):
+            yield i / rate
+        return
+    if process != "poisson":
+        raise ValueError(f"unknown arrival process {process!r}")
+    t = rng.expovariate(rate)
+    while t < duration:
+        yield t
+        t += rng.expovariate(rate)
+
+
+async def run_open_loop(
+    rate,
+    duration,
+    targets,
+    fixture,
+    process="poisson",
+    client=None,
+    max_inflight=512,
+    seed=0,
+    timeout=None,
+):
+    """Drive ``rate`` requests/s for ``duration`` seconds and return a report dict."""
+    client = client or ApiClient(pool_size=max_inflight)
+    rng = random.Random(seed)
+    names = list(targets)
+    weights = [targets[n] for n in names]
+    recorder = Recorder()
+    service = Histogram()
+    loop = asyncio.get_running_loop()
+    pending = set()
+    state = {"inflight": 0, "peak": 0}
+
+    def send(method, path, kwargs):
+        sent = time.monotonic()
+        if timeout is not None:
+            kwargs.setdefault("timeout", timeout)
+        return client.request(method, path, **kwargs), sent
+
+    async def fire(intended, target, seq):
+        method, path, kwargs = build_request(target, fixture, rng, seq)
+        state["inflight"] += 1
+        state["peak"] = max(state["peak"], state["inflight"])
+        try:
+            resp, sent = await loop.run_in_executor(executor, send, method, path, kwargs)
+        except Exception:
+            recorder.record(TARGETS[target], (loop.time() - intended) * 1000, 0, error=True)
+            return
+        finally:
+            state["inflight"] -= 1
+        done = loop.time()
+        service.record((done - sent) * 1000)
+        recorder.record(
+            TARGETS[target],
+            (done - intended) * 1000,
+            resp.status_code,
+            len(resp.content),
+            error=resp.status_code >= 400,
+        )
+
+    with ThreadPoolExecutor(max_workers=max_inflight, thread_name_prefix="open") as executor:
+        start = loop.time() + 0.05
+        scheduled = 0
+        late = 0.0
+        for seq, offset in enumerate(arrival_offsets(rate, duration, process, rng)):
+            intended = start + offset
+            delay = intended - loop.time()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            else:
+                late = max(late, -delay)
+            target = rng.choices(names, weights)[0]
+            task = asyncio.create_task(fire(intended, target, seq))
+            pending.add(task)
+            task.add_done_callback(pending.discard)
+            scheduled += 1
+        if pending:
+            await asyncio.gather(*pending)
+    recorder.finish()
+    return recorder.report(
+        mode="open",
+        config={
+            "baseUrl": client.base_url,
+            "rate": rate,
+            "duration": duration,
+            "process": process,
+            "targets": targets,
+            "maxInflight": max_inflight,
+            "seed": seed,
+        },
+        scheduled=scheduled,
+        peakInflight=state["peak"],
+        maxSchedulerLagMs=round(late * 1000, 3),
+        serviceMs=service.to_dict(),
+    )
+
+
+def stage_summary(report, pct):
+    totals = report["totals"]
+    return {
+        "rate": report["config"]["rate"],
+        "scheduled": report["scheduled"],
+        "throughput": totals["throughput"],
+        "errorRate": totals["errorRate"],
+        "p50": totals["latencyMs"]["p50"],
+        "p95": totals["latencyMs"]["p95"],
+        "p99": totals["latencyMs"]["p99"],
+        f"p{pct}": totals["latencyMs"][f"p{pct}"],
+        "serviceP99": report["serviceMs"]["p99"],
+        "peakInflight": report["peakInflight"],
+    }
+
+
+def sweep_rates(start, step=None, factor=None, max_rate=None):
+    """Yield increasing arrival rates, additively by ``step`` or geometrically by ``factor``."""
+    rate = start
+    while max_rate is None or rate <= max_rate:
+        yield rate
+        rate = rate + step if step else rate * (factor or 1.5)
+
+
+async def sweep(
+    start_rate,
+    stage_duration,
+    targets,
+    fixture,
+    slo_ms,
+    slo_pct=99,
+    max_error_rate=0.01,
+    step=None,
+    factor=None,
+    max_rate=None,
+    process="poisson",
+    client=None,
+    max_inflight=512,
+    seed=0,
+    on_stage=None,
+):
+    """Raise the rate stage by stage until the SLO breaks; return the curve."""
+    if slo_pct not in (50, 90, 95, 99):
+        raise ValueError("slo_pct must be one of 50, 90, 95, 99")
+    client = client or ApiClient(pool_size=max_inflight)
+    curve = []
+    stages = []
+    breaking_rate = None
+    for rate in sweep_rates(start_rate, step, factor, max_rate):
+        report = await run_open_loop(
+            rate, stage_duration, targets, fixture, process, client, max_inflight, seed + len(stages)
+        )
+        summary = stage_summary(report, slo_pct)
+        summary["sloBreached"] = summary[f"p{slo_pct}"] > slo_ms or summary["errorRate"] > max_error_rate
+        curve.append(summary)
+        stages.append(report)
+        if on_stage:
+            on_stage(summary)
+        if summary["sloBreached"]:
+            breaking_rate = rate
+            break
+    passing = [s["rate"] for s in curve if not s["sloBreached"]]
+    return {
+        "mode": "sweep",
+        "config": {
+            "baseUrl": client.base_url,
+            "startRate": start_rate,
+            "step": step,
+            "factor": factor,
+            "maxRate": max_rate,
+            "stageDuration": stage_duration,
+            "sloMs": slo_ms,
+            "sloPercentile": slo_pct,
+            "maxErrorRate": max_error_rate,
+            "process": process,
+            "targets": targets,
+        },
+        "maxSustainableRate": max(passing) if passing else None,
+        "breakingRate": breaking_rate,
+        "curve": curve,
+        "stages": stages,
+    }
+
+
+def print_curve(result, out):
+    pct = result["config"]["sloPercentile"]
+    out.write(f"{'rate':>8}  {'thru':>8}  {'err%':>6}  {'p50':>8}  {'p95':>8}  {'p99':>8}  {'svc p99':>8}  {'inflight':>8}\n")
+    for s in result["curve"]:
+        flag = "  <- SLO breached" if s["sloBreached"] else ""
+        out.write(
+            f"{s['rate']:>8.1f}  {s['throughput']:>8.1f}  {s['errorRate'] * 100:>6.2f}  {s['p50']:>8.1f}"
+            f"  {s['p95']:>8.1f}  {s['p99']:>8.1f}  {s['serviceP99']:>8.1f}  {s['peakInflight']:>8}{flag}\n"
+        )
+    out.write(
+        f"\nSLO p{pct} <= {result['config']['sloMs']} ms: max sustainable rate "
+        f"{result['maxSustainableRate']} req/s, breaks at {result['breakingRate']}\n"
+    )
@@ -0,0 +1,113 @@
+"""Parallel runner for the TC scripts.
+
+Scripts that exercise the same feature (the TC00x pairs) share fixtures such
+as triggers and team names, so they run one after another inside a scenario
+group. Independent groups run concurrently on a thread pool. Each group gets
+its own isolated client (own cookie jar, so its own dev user under
+``NO_AUTH``) on the shared connection pool, warmed up before its first
+script; ``get_client()`` returns it inside the group's thread.
+"""
+
+import runpy
+import sys
+import time
+import traceback
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import asdict, dataclass
+from pathlib import Path
+
+from .client import get_client, scoped_client
+
+TESTS_DIR = Path(__file__).resolve().parent.parent
+
+SCENARIOS = {
+    "TC001": "auth",
+    "TC002": "notes",
+    "TC003": "templates",
+    "TC004": "smart-phrases",
+    "TC005": "ai",
+    "TC006": "run-list",
+    "TC007": "teams",
+    "TC008": "autocomplete",
+    "TC009": "preferences",
+    "TC010": "lab-presets",
+}
+
+
+@dataclass
+class ScriptResult:
+    scenario: str
+    script: str
+    passed: bool
+    duration: float
+    error: str = ""
+
+
+def discover(only=None):
+    """Group TC scripts by scenario name, optionally filtered by TC id or name."""
+    groups = {}
+    for path in sorted(TESTS_DIR.glob("TC[0-9][0-9][0-9]_*.py")):
+        tc_id = path.name.split("_", 1)[0]
+        scenario = SCENARIOS.get(tc_id, tc_id)
+        if only and tc_id not in only and scenario not in only:
+            continue
+        groups.setdefault(scenario, []).append(path)
+    return groups
+
+
+def run_script(scenario, path, collector=None):
+    if collector is not None:
+        collector.set_scenario(scenario)
+    start = time.perf_counter()
+    try:
+        runpy.run_path(str(path), run_name="__main__")
+    except BaseException as exc:  # assertion failures and SystemExit from scripts alike
+        error = "".join(traceback.format_exception_only(type(exc), exc)).strip()
+        return ScriptResult(scenario, path.name, False, time.perf_counter() - start, error)
+    return ScriptResult(scenario, path.name, True, time.perf_counter() - start)
+
+
+def run_group(scenario, paths, collector=None):
+    # A requests.Session is not thread-safe, and concurrent cookie-less
+    # requests would each create a different dev user.
+    with get_client().isolated() as client, scoped_client(client):
+        try:
+            client.warm()
+        except Exception as exc:
+            error = "warm-up failed: " + "".join(traceback.format_exception_only(type(exc), exc)).strip()
+            return [ScriptResult(scenario, path.name, False, 0.0, error) for path in paths]
+        return [run_script(scenario, path, collector) for path in paths]
+
+
+def run_all(workers=6, only=None, repeat=1, collector=None):
+    """Run every scenario group on ``workers`` threads and return the results.
+
+    With ``repeat`` > 1 the whole pass runs that many times (one result per
+    script per pass), which is how timing baselines get enough samples.
+    """
+    if str(TESTS_DIR) not in sys.path:
+        sys.path.insert(0, str(TESTS_DIR))
+    groups = discover(only)
+    results = []
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        for _ in range(max(1, repeat)):
+            futures = [pool.submit(run_group, scenario, paths, collector) for scenario, paths in groups.items()]
+            for future in as_completed(futures):
+                results.extend(future.result())
+    results.sort(key=lambda r: r.script)
+    return results
+
+
+def print_summary(results, wall_time, out=sys.stdout):
+    width = max((len(r.script) for r in results), default=10)
+    for r in results:
+        status = "PASS" if r.passed else "FAIL"
+        out.write(f"{status}  {r.script:<{width}}  {r.duration * 1000:8.0f} ms\n")
+        if r.error:
+            out.write(f"      {r.error}\n")
+    passed = sum(r.passed for r in results)
+    out.write(f"\n{passed}/{len(results)} passed in {wall_time:.2f}s\n")
+
+
+def results_as_dicts(results):
+    return [asdict(r) for r in results]
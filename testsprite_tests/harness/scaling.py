@@ -0,0 +1,284 @@
+"""Latency-vs-data-size benchmarks for endpoints whose cost grows with row counts.
+
+Each benchmark owns a fresh API session (a distinct dev user under
+``NO_AUTH=1``), grows the data behind one endpoint step by step with the
+seeder's ``COPY`` loader, and times the endpoint at every size. The result is
+a curve per endpoint plus a log-log growth exponent: about 1 means cost is
+linear in the data, well above 1 is the O(N^2) or N+1 pattern we keep finding
+only after a busy unit grows.
+
+Rows are written straight to the database because the API cannot create
+thousands of rows quickly; the dev users behind the sessions and the
+``seed-<tag>-*`` helper users are deleted again when the run ends.
+"""
+
+import csv
+import math
+import time
+from datetime import date, datetime
+
+from .client import ApiClient
+from .metrics import Histogram
+from .seed import Seeder, connect, load, user_prefix
+
+DEFAULT_THRESHOLD = 1.2
+
+
+class Context:
+    """What a benchmark needs while it grows: a session, its user, a DB connection, a row generator."""
+
+    def __init__(self, client, conn, seeder, user_id):
+        self.client = client
+        self.conn = conn
+        self.seeder = seeder
+        self.user_id = user_id
+        self.size = 0
+        self.state = {}
+
+    def flush(self):
+        load(self.conn, self.seeder)
+        self.seeder.clear()
+
+    def helper_users(self, count):
+        """Seeded users (publishers, teammates) that teardown removes with the tag."""
+        users = self.state.setdefault("helpers", [])
+        while len(users) < count:
+            users.append(self.seeder.user(len(users)))
+        return users
+
+
+class Benchmark:
+    """One endpoint: ``grow(ctx, n)`` brings the data to size ``n``, ``request(ctx)`` builds the call."""
+
+    units = "rows"
+    sizes = ()
+
+    def setup(self, ctx):
+        pass
+
+    def grow(self, ctx, n):
+        raise NotImplementedError
+
+    def request(self, ctx):
+        raise NotImplementedError
+
+    def x(self, ctx):
+        return ctx.size
+
+
+class CommunityBenchmark(Benchmark):
+    name = "community"
+    endpoint = "GET /api/community"
+    units = "public items"
+    sizes = (100, 300, 1000, 3000, 10000)
+
+    def setup(self, ctx):
+        ctx.helper_users(50)
+        ctx.flush()
+
+    def grow(self, ctx, n):
+        publishers = ctx.state["helpers"]
+        rng = ctx.seeder.rng
+        for i in range(ctx.size, n):
+            user_id = publishers[i % len(publishers)]
+            kind = rng.random()
+            if kind < 0.5:
+                ctx.seeder.phrase(user_id, 1000 + i, True)
+            elif kind < 0.7:
+                ctx.seeder.template(user_id, True)
+            else:
+                ctx.seeder.autocomplete(user_id, 1, public_fraction=1.0)
+        ctx.flush()
+
+    def request(self, ctx):
+        return "GET", "/api/community", {"params": {"tab": "all", "type": "all", "page": 1, "pageSize": 20}}
+
+
+class TeamTodosBenchmark(Benchmark):
+    name = "team-todos"
+    endpoint = "GET /api/teams/:teamId/todos"
+    units = "todos x assignees"
+    sizes = (10, 30, 100, 300, 1000)
+    assignees = 3
+
+    def setup(self, ctx):
+        resp = ctx.client.post("/api/teams/create", json={"name": "Scaling bench"})
+        resp.raise_for_status()
+        team_id = resp.json()["id"]
+        members = ctx.helper_users(7)
+        for member in members:
+            ctx.seeder.add("team_members", ctx.seeder.uuid(), team_id, member, "member", datetime.now())
+        ctx.state["team"] = team_id
+        ctx.state["members"] = [ctx.user_id] + members
+        ctx.flush()
+
+    def grow(self, ctx, n):
+        for _ in range(ctx.size, n):
+            ctx.seeder.todo(ctx.state["team"], ctx.state["members"], self.assignees)
+        ctx.flush()
+
+    def request(self, ctx):
+        return "GET", f"/api/teams/{ctx.state['team']}/todos", {}
+
+    def x(self, ctx):
+        return ctx.size * self.assignees
+
+
+class RunListTodayBenchmark(Benchmark):
+    name = "run-list-today"
+    endpoint = "GET /api/run-list/today"
+    units = "patients"
+    sizes = (5, 10, 20, 40, 80, 160)
+    versions = 3
+
+    def setup(self, ctx):
+        ctx.state["list"] = ctx.state["today"]["runList"]["id"]
+
+    def grow(self, ctx, n):
+        day = datetime.combine(date.today(), datetime.min.time())
+        for position in range(ctx.size, n):
+            ctx.seeder.list_patient(ctx.state["list"], position, day, self.versions)
+        ctx.flush()
+
+    def request(self, ctx):
+        return "GET", "/api/run-list/today", {"params": {"day": date.today().isoformat()}}
+
+
+class SmartPhraseSearchBenchmark(Benchmark):
+    name = "smart-phrases-q"
+    endpoint = "GET /api/smart-phrases?q="
+    units = "phrases per user"
+    sizes = (10, 30, 100, 300, 1000, 3000)
+
+    def grow(self, ctx, n):
+        for i in range(ctx.size, n):
+            ctx.seeder.phrase(ctx.user_id, i, False)
+        ctx.flush()
+
+    def request(self, ctx):
+        return "GET", "/api/smart-phrases", {"params": {"q": "hp"}}
+
+
+BENCHMARKS = {
+    b.name: b
+    for b in (CommunityBenchmark(), TeamTodosBenchmark(), RunListTodayBenchmark(), SmartPhraseSearchBenchmark())
+}
+
+
+def growth_exponent(points, noise_ms=1.0):
+    """Log-log slope of the latency *added* over the smallest size.
+
+    The smallest size's median stands in for fixed per-request overhead
+    (routing, auth, the network); subtracting it keeps that constant from
+    dragging the slope towards zero. About 1 is linear, 2 is quadratic. A
+    curve that never rises more than ``noise_ms`` above the floor is flat (0).
+    """
+    usable = sorted((p["x"], p["p50"]) for p in points if p["x"] > 0)
+    if len(usable) < 3:
+        return None
+    floor = usable[0][1]
+    added = [(x, y - floor) for x, y in usable[1:] if y - floor > noise_ms]
+    if len(added) < 2:
+        return 0.0
+    xs = [math.log(x) for x, _ in added]
+    ys = [math.log(y) for _, y in added]
+    mx, my = sum(xs) / len(xs), sum(ys) / len(ys)
+    var = sum((x - mx) ** 2 for x in xs)
+    if var == 0:
+        return None
+    return sum((x - mx) * (y - my) for x, y in zip(xs, ys)) / var
+
+
+def measure(ctx, bench, samples, warmup=3):
+    method, path, kwargs = bench.request(ctx)
+    hist = Histogram()
+    nbytes = 0
+    for i in range(warmup + samples):
+        start = time.perf_counter()
+        resp = ctx.client.request(method, path, **kwargs)
+        elapsed = (time.perf_counter() - start) * 1000
+        resp.raise_for_status()
+        if i >= warmup:
+            hist.record(elapsed)
+            nbytes = len(resp.content)
+    stats = hist.to_dict()
+    return {
+        "size": ctx.size,
+        "x": bench.x(ctx),
+        "p50": stats["p50"],
+        "p95": stats["p95"],
+        "p99": stats["p99"],
+        "mean": stats["mean"],
+        "bytes": nbytes,
+        "samples": samples,
+    }
+
+
+def run_benchmark(bench, conn, base, tag, sizes=None, samples=30, threshold=DEFAULT_THRESHOLD, seed=0, on_point=None):
+    client = base.isolated()
+    created_users = []
+    try:
+        today = client.get("/api/run-list/today", params={"day": date.today().isoformat()})
+        today.raise_for_status()
+        user_id = today.json()["runList"]["userId"]
+        created_users.append(user_id)
+        ctx = Context(client, conn, Seeder(f"{tag}-{bench.name}", seed), user_id)
+        ctx.state["today"] = today.json()
+        bench.setup(ctx)
+        points = []
+        for n in sorted(sizes or bench.sizes):
+            bench.grow(ctx, n)
+            ctx.size = n
+            point = measure(ctx, bench, samples)
+            points.append(point)
+            if on_point:
+                on_point(bench, point)
+        exponent = growth_exponent(points)
+        return {
+            "benchmark": bench.name,
+            "endpoint": bench.endpoint,
+            "units": bench.units,
+            "points": points,
+            "exponent": exponent,
+            "superLinear": exponent is not None and exponent > threshold,
+        }
+    finally:
+        client.close()
+        cleanup(conn, f"{tag}-{bench.name}", created_users)
+
+
+def cleanup(conn, tag, user_ids):
+    with conn.transaction(), conn.cursor() as cur:
+        cur.execute("DELETE FROM users WHERE id LIKE %s OR id = ANY(%s)", (user_prefix(tag) + "%", user_ids))
+
+
+def run_suite(names=None, sizes=None, samples=30, threshold=DEFAULT_THRESHOLD, tag="scale", dsn=None, seed=0, on_point=None):
+    base = ApiClient()
+    results = []
+    with connect(dsn) as conn:
+        for name in names or BENCHMARKS:
+            results.append(run_benchmark(BENCHMARKS[name], conn, base, tag, sizes, samples, threshold, seed, on_point))
+    return {"threshold": threshold, "samples": samples, "baseUrl": base.base_url, "benchmarks": results}
+
+
+def write_csv(result, path):
+    with open(path, "w", newline="") as fh:
+        writer = csv.writer(fh)
+        writer.writerow(["benchmark", "endpoint", "units", "size", "x", "p50_ms", "p95_ms", "p99_ms", "mean_ms", "bytes", "samples"])
+        for bench in result["benchmarks"]:
+            for p in bench["points"]:
+                writer.writerow(
+                    [bench["benchmark"], bench["endpoint"], bench["units"], p["size"], p["x"], p["p50"], p["p95"], p["p99"], p["mean"], p["bytes"], p["samples"]]
+                )
+
+
+def print_results(result, out):
+    for bench in result["benchmarks"]:
+        out.write(f"\n{bench['endpoint']}  ({bench['units']})\n")
+        out.write(f"{'x':>8}  {'p50':>8}  {'p95':>8}  {'p99':>8}  {'bytes':>10}\n")
+        for p in bench["points"]:
+            out.write(f"{p['x']:>8}  {p['p50']:>8.1f}  {p['p95']:>8.1f}  {p['p99']:>8.1f}  {p['bytes']:>10}\n")
+        exponent = bench["exponent"]
+        shown = "n/a" if exponent is None else f"{exponent:.2f}"
+        flag = "  <- SUPER-LINEAR" if bench["superLinear"] else ""
+        out.write(f"growth exponent {shown} (threshold {result['threshold']}){flag}\n")
@@ -0,0 +1,133 @@
+"""TC flows rewritten as async scenarios for the load tools.
+
+Each scenario takes a virtual user (see ``harness.load.VirtualUser``) and
+issues its requests through ``await vu.call(...)``. Endpoint names use route
+templates (``/api/notes/:id``) so statistics aggregate across ids. A step
+that returns an unexpected status raises ``ScenarioAbort`` and the rest of
+that iteration is skipped.
+"""
+
+from datetime import date
+
+
+class ScenarioAbort(Exception):
+    pass
+
+
+RUN_LIST_SIZE = 6
+
+AUTOCOMPLETE_CATEGORIES = (
+    "medications",
+    "past-medical-history",
+    "allergies",
+    "consultation-reasons",
+)
+
+PHRASE_PREFIXES = ("h", "hp", "hpi", "r", "ro", "ros", "p", "pe")
+
+
+async def run_list_flow(vu):
+    """TC006: open today's list, keep it at a ward-sized census, autosave a note."""
+    params = {"day": date.today().isoformat()}
+    data = (await vu.call("GET", "/api/run-list/today", params=params)).json()
+    run_list_id = data["runList"]["id"]
+    patients = [p for p in data.get("patients", []) if p.get("active", True)]
+
+    if len(patients) < RUN_LIST_SIZE:
+        added = (
+            await vu.call(
+                "POST",
+                f"/api/run-list/{run_list_id}/patients",
+                name="POST /api/run-list/:id/patients",
+                json={"alias": f"Bed {len(patients) + 1}"},
+            )
+        ).json()
+        patients.append({"id": added["patient"]["id"]})
+
+    patient = vu.rng.choice(patients)
+    await vu.call(
+        "PUT",
+        f"/api/run-list/notes/{patient['id']}",
+        name="PUT /api/run-list/notes/:listPatientId",
+        json={"rawText": f"S: feels better overnight. O: afebrile. Iteration {vu.iteration}."},
+    )
+    await vu.call("GET", "/api/run-list/today", params=params)
+
+
+async def notes_crud(vu):
+    """TC002: create, read, update, list and delete a note."""
+    payload = {
+        "title": f"Load note {vu.vu_id}-{vu.iteration}",
+        "content": {"subjective": "Headache x2 days.", "plan": "Hydration, reassess."},
+        "tags": ["load"],
+    }
+    note = (await vu.call("POST", "/api/notes", json=payload)).json()
+    note_id = note["id"]
+    try:
+        await vu.call("GET", f"/api/notes/{note_id}", name="GET /api/notes/:id")
+        payload["content"]["plan"] = "Hydration, reassess in AM."
+        await vu.call("PUT", f"/api/notes/{note_id}", name="PUT /api/notes/:id", json=payload)
+        await vu.call("GET", "/api/notes", params={"limit": 20})
+    finally:
+        await vu.call("DELETE", f"/api/notes/{note_id}", name="DELETE /api/notes/:id")
+
+
+async def autocomplete_lookup(vu):
+    """TC008: open a few note sections, each fetching its autocomplete list."""
+    for category in vu.rng.sample(AUTOCOMPLETE_CATEGORIES, 2):
+        await vu.call(
+            "GET",
+            "/api/autocomplete-items",
+            params={"category": category},
+            name="GET /api/autocomplete-items?category",
+        )
+
+
+async def smart_phrases_flow(vu):
+    """TC004: list phrases, type a trigger, and occasionally author a new one."""
+    await vu.call("GET", "/api/smart-phrases")
+    prefix = vu.rng.choice(PHRASE_PREFIXES)
+    for i in range(1, len(prefix) + 1):
+        await vu.call("GET", "/api/smart-phrases", params={"q": prefix[:i]}, name="GET /api/smart-phrases?q")
+
+    if vu.rng.random() < 0.2:
+        phrase = (
+            await vu.call(
+                "POST",
+                "/api/smart-phrases",
+                json={"trigger": f"load{vu.vu_id}x{vu.iteration}", "content": "Load test phrase", "type": "text"},
+            )
+        ).json()
+        await vu.call("DELETE", f"/api/smart-phrases/{phrase['id']}", name="DELETE /api/smart-phrases/:id")
+
+
+SCENARIOS = {
+    "run-list": run_list_flow,
+    "notes": notes_crud,
+    "autocomplete": autocomplete_lookup,
+    "smart-phrases": smart_phrases_flow,
+}
+
+# Pre-round peak: mostly run-list work and lookups while writing.
+DEFAULT_MIX = {"run-list": 4, "autocomplete": 3, "smart-phrases": 2, "notes": 1}
+
+
+def parse_weights(spec, known, default):
+    """Parse ``"a=4,b=1"`` into a weight mapping over the names in ``known``."""
+    if not spec:
+        return dict(default)
+    weights = {}
+    for part in spec.split(","):
+        name, _, weight = part.partition("=")
+        name = name.strip()
+        if name not in known:
+            raise ValueError(f"unknown name {name!r}; choose from {', '.join(known)}")
+        weights[name] = float(weight) if weight else 1.0
+    if not any(w > 0 for w in weights.values()):
+        raise ValueError("weights need at least one positive entry")
+    return weights
+
+
+def parse_mix(spec):
+    """Parse a scenario mix such as ``"run-list=4,notes=1"``."""
+    return parse_weights(spec, SCENARIOS, DEFAULT_MIX)
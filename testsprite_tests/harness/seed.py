@@ -0,0 +1,426 @@
+"""Deterministic bulk seeder for production-sized datasets.
+
+The TC scripts create one row and delete it again, so nothing ever runs
+against a busy unit's data volumes. This module generates users, public
+community content (smart phrases, note templates and autocomplete items with
+download counts), multi-week run lists of 20-40 patients with note version
+history, and teams with todos and assignees, then loads them straight into
+Postgres with ``COPY``. Going through the API would take hours at these
+volumes and could not create thousands of distinct users.
+
+Every generated id comes from one ``random.Random(seed)``, so the same
+``seed``, ``tag``, plan and anchor day produce the same rows. All users are
+named ``seed-<tag>-NNNNN`` and everything else hangs off them with
+``ON DELETE CASCADE``, so ``teardown`` removes a dataset with one delete.
+
+Needs ``psycopg`` 3 (``pip install "psycopg[binary]"``) and the same
+``POSTGRES_URL``/``DATABASE_URL`` the server uses.
+"""
+
+import json
+import os
+import random
+import string
+import uuid
+from datetime import date, datetime, time, timedelta
+
+SPECIALTIES = (
+    "Internal Medicine",
+    "Emergency Medicine",
+    "Family Medicine",
+    "Cardiology",
+    "Nephrology",
+    "Geriatrics",
+    "Hospital Medicine",
+)
+
+FIRST_NAMES = ("Alex", "Sam", "Jordan", "Taylor", "Morgan", "Casey", "Riley", "Jamie", "Avery", "Quinn")
+LAST_NAMES = ("Nguyen", "Tremblay", "Roy", "Singh", "Garcia", "Smith", "Cohen", "Okafor", "Kim", "Martin")
+
+PHRASE_TRIGGERS = (
+    "hpi", "ros", "pe", "plan", "dispo", "cp", "sob", "abdo", "neuro", "sepsis",
+    "aki", "dka", "chf", "copd", "pna", "uti", "cellulitis", "syncope", "gi-bleed", "afib",
+)
+
+PHRASE_BODIES = (
+    "Patient is a {{age}} year old presenting with {{picker1}} for {{duration}}.",
+    "ROS negative except as noted in HPI.",
+    "Vitals reviewed. Alert and oriented x3. No acute distress.",
+    "Continue current management, reassess in AM, disposition pending.",
+    "Chest pain: onset {{date1}}, character {{picker1}}, radiation {{picker2}}.",
+)
+
+TEMPLATE_TYPES = ("admission", "progress", "consult")
+TEMPLATE_SECTIONS = ("Reason for admission", "HPI", "PMH", "Medications", "Allergies", "Exam", "Labs", "Impression", "Plan")
+
+AUTOCOMPLETE = {
+    "medications": ("Apixaban", "Metoprolol", "Furosemide", "Pantoprazole", "Ceftriaxone", "Insulin glargine", "Atorvastatin", "Heparin"),
+    "past-medical-history": ("Hypertension", "Type 2 diabetes", "CKD stage 3", "COPD", "Atrial fibrillation", "Heart failure", "Cirrhosis"),
+    "allergies": ("Penicillin", "Sulfa", "Codeine", "Latex", "Contrast dye", "NKDA"),
+    "consultation-reasons": ("Chest pain", "Shortness of breath", "Syncope", "Fever", "Delirium", "GI bleed", "AKI"),
+}
+
+NOTE_LINES = (
+    "S: feels better overnight, tolerating diet.",
+    "S: ongoing dyspnea on exertion, no chest pain.",
+    "O: afebrile, HR 84, BP 126/78, sat 95% RA.",
+    "O: bibasilar crackles, mild pedal edema.",
+    "A: CAP improving on ceftriaxone day {day}.",
+    "A: ADHF, net negative 1.2 L.",
+    "P: switch to PO antibiotics, PT/OT, dispo planning.",
+    "P: continue IV diuresis, repeat lytes in AM.",
+)
+
+TODO_TITLES = (
+    "Follow up CT read",
+    "Call family re: goals of care",
+    "Order echo",
+    "Reconcile home meds",
+    "Discharge summary",
+    "Book GI consult",
+    "Repeat lactate",
+)
+
+# Load order respects foreign keys; teardown relies on the cascades instead.
+TABLES = {
+    "users": ("id", "email", "first_name", "last_name", "specialty", "created_at", "updated_at"),
+    "smart_phrases": (
+        "id", "trigger", "content", "description", "category", "is_public", "download_count",
+        "user_id", "created_at", "updated_at",
+    ),
+    "note_templates": (
+        "id", "name", "type", "description", "sections", "is_public", "download_count",
+        "user_id", "created_at", "updated_at",
+    ),
+    "autocomplete_items": (
+        "id", "text", "category", "is_priority", "is_public", "download_count",
+        "user_id", "created_at", "updated_at",
+    ),
+    "run_lists": ("id", "user_id", "day", "mode", "carry_forward_defaults", "created_at", "updated_at"),
+    "list_patients": ("id", "run_list_id", "position", "alias", "active", "created_at", "updated_at"),
+    "run_list_notes": (
+        "id", "list_patient_id", "raw_text", "structured_sections", "status", "version_head_id",
+        "created_at", "updated_at",
+    ),
+    "run_list_note_versions": ("id", "note_id", "raw_text", "structured_sections", "source", "created_at"),
+    "teams": (
+        "id", "name", "description", "group_code", "max_members", "created_by_id",
+        "created_at", "updated_at", "expires_at",
+    ),
+    "team_members": ("id", "team_id", "user_id", "role", "joined_at"),
+    "team_todos": (
+        "id", "title", "description", "completed", "priority", "due_date", "status",
+        "assigned_to_id", "team_id", "created_by_id", "created_at", "updated_at",
+    ),
+    "team_todo_assignees": ("id", "todo_id", "user_id", "created_at"),
+}
+
+
+class SeedPlan:
+    """How much of everything to generate. Defaults approximate a busy hospital."""
+
+    def __init__(
+        self,
+        users=2000,
+        phrases_per_user=8,
+        templates_per_user=2,
+        autocomplete_per_user=12,
+        public_fraction=0.15,
+        run_list_users=150,
+        run_list_days=21,
+        patients=(20, 40),
+        versions_per_note=(1, 4),
+        teams=120,
+        team_size=(4, 8),
+        todos_per_team=(10, 60),
+        assignees_per_todo=(1, 3),
+    ):
+        self.users = users
+        self.phrases_per_user = phrases_per_user
+        self.templates_per_user = templates_per_user
+        self.autocomplete_per_user = autocomplete_per_user
+        self.public_fraction = public_fraction
+        self.run_list_users = min(run_list_users, users)
+        self.run_list_days = run_list_days
+        self.patients = patients
+        self.versions_per_note = versions_per_note
+        self.teams = teams
+        self.team_size = team_size
+        self.todos_per_team = todos_per_team
+        self.assignees_per_todo = assignees_per_todo
+
+    def as_dict(self):
+        return dict(vars(self))
+
+
+def user_prefix(tag):
+    return f"seed-{tag}-"
+
+
+class Seeder:
+    """Generates rows for one tagged dataset; ``rows[table]`` holds tuples in ``TABLES`` column order."""
+
+    def __init__(self, tag, seed=0, anchor_day=None):
+        self.tag = tag
+        self.rng = random.Random(f"{tag}:{seed}")
+        self.anchor_day = anchor_day or date.today()
+        self.now = datetime.combine(self.anchor_day, time(7, 0))
+        self.rows = {table: [] for table in TABLES}
+        self.autocomplete_seen = {}
+
+    def uuid(self):
+        return str(uuid.UUID(int=self.rng.getrandbits(128), version=4))
+
+    def ago(self, days_max):
+        """A timestamp up to ``days_max`` days before the anchor."""
+        return self.now - timedelta(seconds=self.rng.randint(0, int(days_max * 86400)))
+
+    def popularity(self):
+        # Community downloads are heavy-tailed: most items are never imported.
+        return int(self.rng.paretovariate(1.2)) - 1 if self.rng.random() < 0.6 else 0
+
+    def add(self, table, *values):
+        self.rows[table].append(values)
+
+    def user(self, index):
+        rng = self.rng
+        user_id = f"{user_prefix(self.tag)}{index:05d}"
+        created = self.ago(365)
+        first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+        self.add("users", user_id, f"{user_id}@example.test", first, last, rng.choice(SPECIALTIES), created, created)
+        return user_id
+
+    def phrase(self, user_id, i, public):
+        rng = self.rng
+        created = self.ago(180)
+        trigger = f"{rng.choice(PHRASE_TRIGGERS)}{i}" if i >= len(PHRASE_TRIGGERS) else PHRASE_TRIGGERS[i]
+        self.add(
+            "smart_phrases",
+            self.uuid(),
+            trigger,
+            rng.choice(PHRASE_BODIES),
+            f"{trigger} shortcut",
+            rng.choice(("history", "exam", "plan", None)),
+            public,
+            self.popularity() if public else 0,
+            user_id,
+            created,
+            created,
+        )
+
+    def template(self, user_id, public):
+        rng = self.rng
+        created = self.ago(180)
+        kind = rng.choice(TEMPLATE_TYPES)
+        sections = [
+            {"id": f"s{n}", "name": name, "type": "text", "content": ""}
+            for n, name in enumerate(rng.sample(TEMPLATE_SECTIONS, rng.randint(4, len(TEMPLATE_SECTIONS))))
+        ]
+        self.add(
+            "note_templates",
+            self.uuid(),
+            f"{kind.title()} note {rng.randint(1, 999)}",
+            kind,
+            f"Shared {kind} template",
+            json.dumps(sections),
+            public,
+            self.popularity() if public else 0,
+            user_id,
+            created,
+            created,
+        )
+
+    def autocomplete(self, user_id, count, public_fraction=0.05):
+        rng = self.rng
+        seen = self.autocomplete_seen.setdefault(user_id, set())
+        for _ in range(count):
+            category = rng.choice(tuple(AUTOCOMPLETE))
+            text = f"{rng.choice(AUTOCOMPLETE[category])} {rng.randint(1, 500)}"
+            # (user_id, category, text) is unique.
+            if (category, text) in seen:
+                continue
+            seen.add((category, text))
+            public = rng.random() < public_fraction
+            created = self.ago(180)
+            self.add(
+                "autocomplete_items",
+                self.uuid(),
+                text,
+                category,
+                rng.random() < 0.1,
+                public,
+                self.popularity() if public else 0,
+                user_id,
+                created,
+                created,
+            )
+
+    def run_lists(self, user_id, days, patients, versions):
+        rng = self.rng
+        census = rng.randint(*patients)
+        for back in range(days - 1, -1, -1):
+            day = datetime.combine(self.anchor_day - timedelta(days=back), time())
+            list_id = self.uuid()
+            self.add("run_lists", list_id, user_id, day, "prepost", "{}", day, day)
+            # Census drifts a little day to day, like a real service.
+            census = max(patients[0], min(patients[1], census + rng.randint(-3, 3)))
+            for position in range(census):
+                self.list_patient(list_id, position, day, rng.randint(*versions))
+
+    def list_patient(self, list_id, position, day, versions):
+        rng = self.rng
+        patient_id = self.uuid()
+        note_id = self.uuid()
+        stamp = day + timedelta(hours=7, minutes=rng.randint(0, 600))
+        self.add("list_patients", patient_id, list_id, position, f"Bed {position + 1}", True, stamp, stamp)
+        text = ""
+        head = None
+        history = []
+        for v in range(versions):
+            text = "\n".join(line.format(day=v + 1) for line in rng.sample(NOTE_LINES, 4))
+            head = self.uuid()
+            history.append((head, note_id, text, "{}", rng.choice(("user_edit", "user_edit", "ai_merge")), stamp))
+            stamp += timedelta(minutes=rng.randint(5, 90))
+        self.add(
+            "run_list_notes",
+            note_id,
+            patient_id,
+            text,
+            "{}",
+            rng.choice(("draft", "preround", "postround", "complete")),
+            head,
+            day,
+            stamp,
+        )
+        for row in history:
+            self.add("run_list_note_versions", *row)
+
+    def team(self, members, plan):
+        rng = self.rng
+        team_id = self.uuid()
+        created = self.ago(6)
+        code = "".join(rng.choice(string.ascii_uppercase + string.digits) for _ in range(6))
+        owner = members[0]
+        self.add(
+            "teams",
+            team_id,
+            f"Ward {rng.randint(1, 12)}{rng.choice('ABCDEF')}",
+            "Seeded team",
+            code,
+            max(8, len(members)),
+            owner,
+            created,
+            created,
+            created + timedelta(days=7),
+        )
+        for n, member in enumerate(members):
+            self.add("team_members", self.uuid(), team_id, member, "admin" if n == 0 else "member", created)
+        for _ in range(rng.randint(*plan.todos_per_team)):
+            self.todo(team_id, members, rng.randint(*plan.assignees_per_todo))
+
+    def todo(self, team_id, members, assignee_count):
+        rng = self.rng
+        todo_id = self.uuid()
+        assignees = rng.sample(members, min(len(members), assignee_count))
+        status = rng.choice(("backlog", "in_progress", "ready_to_review", "completed"))
+        stamp = self.ago(6)
+        self.add(
+            "team_todos",
+            todo_id,
+            rng.choice(TODO_TITLES),
+            None,
+            status == "completed",
+            rng.choice(("low", "medium", "medium", "high", "urgent")),
+            stamp + timedelta(days=rng.randint(0, 5)),
+            status,
+            assignees[0],
+            team_id,
+            rng.choice(members),
+            stamp,
+            stamp,
+        )
+        for user_id in assignees:
+            self.add("team_todo_assignees", self.uuid(), todo_id, user_id, stamp)
+
+    def generate(self, plan):
+        rng = self.rng
+        user_ids = [self.user(i) for i in range(plan.users)]
+        for user_id in user_ids:
+            for i in range(plan.phrases_per_user):
+                self.phrase(user_id, i, rng.random() < plan.public_fraction)
+            for _ in range(plan.templates_per_user):
+                self.template(user_id, rng.random() < plan.public_fraction)
+            self.autocomplete(user_id, plan.autocomplete_per_user)
+        for user_id in user_ids[: plan.run_list_users]:
+            self.run_lists(user_id, plan.run_list_days, plan.patients, plan.versions_per_note)
+        for _ in range(plan.teams):
+            size = min(len(user_ids), rng.randint(*plan.team_size))
+            self.team(rng.sample(user_ids, size), plan)
+        return self
+
+    def counts(self):
+        return {table: len(rows) for table, rows in self.rows.items()}
+
+    def clear(self):
+        for rows in self.rows.values():
+            rows.clear()
+
+
+def database_url():
+    url = os.environ.get("POSTGRES_URL") or os.environ.get("DATABASE_URL")
+    if not url:
+        raise RuntimeError("set POSTGRES_URL or DATABASE_URL (or pass --dsn)")
+    return url
+
+
+def connect(dsn=None):
+    try:
+        import psycopg
+    except ImportError as exc:
+        raise RuntimeError('the seeder needs psycopg 3: pip install "psycopg[binary]"') from exc
+    return psycopg.connect(dsn or database_url())
+
+
+def copy_rows(conn, table, rows):
+    columns = TABLES[table]
+    with conn.cursor() as cur:
+        with cur.copy(f"COPY {table} ({', '.join(columns)}) FROM STDIN") as copy:
+            for row in rows:
+                copy.write_row(row)
+
+
+def load(conn, seeder):
+    """COPY every generated table in one transaction."""
+    with conn.transaction():
+        for table in TABLES:
+            if seeder.rows[table]:
+                copy_rows(conn, table, seeder.rows[table])
+        with conn.cursor() as cur:
+            # Statistics matter for the plans we are about to benchmark.
+            for table in TABLES:
+                cur.execute(f"ANALYZE {table}")
+    return seeder.counts()
+
+
+def seed(tag, plan=None, seed=0, dsn=None, anchor_day=None):
+    """Generate and load a dataset; returns rows inserted per table."""
+    seeder = Seeder(tag, seed, anchor_day).generate(plan or SeedPlan())
+    with connect(dsn) as conn:
+        if existing(conn, tag):
+            raise RuntimeError(f"dataset {tag!r} already exists; tear it down first")
+        return load(conn, seeder)
+
+
+def existing(conn, tag):
+    with conn.cursor() as cur:
+        cur.execute("SELECT count(*) FROM users WHERE id LIKE %s", (user_prefix(tag) + "%",))
+        return cur.fetchone()[0]
+
+
+def teardown(tag, dsn=None):
+    """Delete every row belonging to the ``tag`` dataset; returns users removed."""
+    with connect(dsn) as conn:
+        with conn.transaction(), conn.cursor() as cur:
+            # Everything else cascades from the users rows.
+            cur.execute("DELETE FROM users WHERE id LIKE %s", (user_prefix(tag) + "%",))
+            return cur.rowcount
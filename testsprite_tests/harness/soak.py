@@ -0,0 +1,234 @@
+"""Soak mode: hours of moderate, steady load with server resource sampling.
+
+Scenario iterations start at a fixed rate, spread round-robin over a small
+pool of virtual users, so the data each user owns stays bounded and any
+growth in latency or memory comes from the server, not from the workload.
+Latency is cut into windows (one histogram per ``window`` seconds); between
+windows the server is sampled:
+
+* ``GET /api/__diagnostics`` (server started with ``ENABLE_DIAGNOSTICS=1``)
+  gives RSS, heap, event-loop delay, active resources and DB connections
+  by state.
+* ``--pid`` of a server on this machine adds RSS, threads and open fds from
+  ``/proc/<pid>``, which works even without the diagnostics endpoint.
+
+At the end each series gets a least-squares slope per hour, so a leak shows
+up as steady RSS growth and a creeping p95 rather than as one bad sample.
+"""
+
+import asyncio
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+from .client import ApiClient
+from .load import VirtualUser
+from .metrics import Recorder
+from .scenarios import SCENARIOS, ScenarioAbort
+
+SPARK = " ▁▂▃▄▅▆▇█"
+
+
+def read_proc(pid):
+    """RSS (bytes), thread count and open fds of a local process, or ``None``."""
+    try:
+        with open(f"/proc/{pid}/status") as fh:
+            fields = dict(line.split(":", 1) for line in fh if ":" in line)
+        fds = len(os.listdir(f"/proc/{pid}/fd"))
+    except OSError:
+        return None
+    return {
+        "rss": int(fields["VmRSS"].split()[0]) * 1024,
+        "threads": int(fields["Threads"]),
+        "fds": fds,
+    }
+
+
+def read_diagnostics(client):
+    try:
+        resp = client.get("/api/__diagnostics", timeout=10)
+    except Exception:
+        return None
+    if resp.status_code != 200:
+        return None
+    try:
+        return resp.json()
+    except ValueError:
+        return None
+
+
+def flatten_sample(elapsed, diag, proc):
+    """One row of the resource timeline."""
+    row = {"t": round(elapsed, 1)}
+    if diag:
+        row["rssMb"] = round(diag["memory"]["rss"] / 2**20, 2)
+        row["heapMb"] = round(diag["memory"]["heapUsed"] / 2**20, 2)
+        row["loopP99Ms"] = diag["eventLoopDelayMs"]["p99"]
+        row["loopMaxMs"] = diag["eventLoopDelayMs"]["max"]
+        row["activeResources"] = diag.get("activeResources")
+        if diag.get("dbConnections") is not None:
+            row["dbConnections"] = sum(diag["dbConnections"].values())
+    if proc:
+        row["procRssMb"] = round(proc["rss"] / 2**20, 2)
+        row["threads"] = proc["threads"]
+        row["fds"] = proc["fds"]
+    return row
+
+
+def slope_per_hour(points):
+    """Least-squares slope of ``(seconds, value)`` points, in units per hour."""
+    points = [(t, v) for t, v in points if v is not None]
+    if len(points) < 3:
+        return None
+    n = len(points)
+    mt = sum(t for t, _ in points) / n
+    mv = sum(v for _, v in points) / n
+    var = sum((t - mt) ** 2 for t, _ in points)
+    if var == 0:
+        return None
+    return sum((t - mt) * (v - mv) for t, v in points) / var * 3600
+
+
+def sparkline(values):
+    values = [v for v in values if v is not None]
+    if not values:
+        return ""
+    lo, hi = min(values), max(values)
+    span = (hi - lo) or 1.0
+    return "".join(SPARK[1 + int((v - lo) / span * (len(SPARK) - 2))] for v in values)
+
+
+async def run_soak(
+    duration,
+    rate,
+    mix,
+    users=10,
+    window=60.0,
+    pid=None,
+    client=None,
+    seed=0,
+    on_window=None,
+):
+    """Start ``rate`` scenario iterations/s for ``duration`` seconds; return timeline and drift."""
+    base = client or ApiClient(pool_size=max(users, 8))
+    loop = asyncio.get_running_loop()
+    names = list(mix)
+    weights = [mix[n] for n in names]
+    windows = []
+    resources = []
+    pending = set()
+    started = loop.time()
+    deadline = started + duration
+
+    async def iteration(vu, scenario, recorder):
+        vu.iteration += 1
+        vu.recorder = recorder
+        try:
+            await SCENARIOS[scenario](vu)
+            recorder.scenario_done(scenario, True)
+        except (ScenarioAbort, KeyError, TypeError, ValueError):
+            recorder.scenario_done(scenario, False)
+
+    def close_window(recorder, index):
+        recorder.finish()
+        report = recorder.report()
+        lat = report["totals"]["latencyMs"]
+        elapsed = loop.time() - started
+        row = {
+            "window": index,
+            "t": round(elapsed, 1),
+            "requests": report["totals"]["requests"],
+            "errorRate": report["totals"]["errorRate"],
+            "p50": lat["p50"],
+            "p95": lat["p95"],
+            "p99": lat["p99"],
+        }
+        windows.append(row)
+        sample = flatten_sample(elapsed, read_diagnostics(base), read_proc(pid) if pid else None)
+        resources.append(sample)
+        if on_window:
+            on_window(row, sample)
+
+    with ThreadPoolExecutor(max_workers=max(users * 2, 8), thread_name_prefix="soak") as executor:
+        vus = [VirtualUser(i, base.isolated(), None, executor, seed=seed + i) for i in range(users)]
+        recorder = Recorder()
+        window_end = started + window
+        index = 0
+        seq = 0
+        try:
+            while loop.time() < deadline:
+                now = loop.time()
+                if now >= window_end:
+                    await loop.run_in_executor(executor, close_window, recorder, index)
+                    index += 1
+                    recorder = Recorder()
+                    window_end += window
+                next_start = started + seq / rate
+                if next_start > now:
+                    await asyncio.sleep(min(next_start - now, max(0.0, window_end - now)))
+                    continue
+                vu = vus[seq % users]
+                scenario = vu.rng.choices(names, weights)[0]
+                task = asyncio.create_task(iteration(vu, scenario, recorder))
+                pending.add(task)
+                task.add_done_callback(pending.discard)
+                seq += 1
+            if pending:
+                await asyncio.gather(*pending)
+            await loop.run_in_executor(executor, close_window, recorder, index)
+        finally:
+            for vu in vus:
+                vu.client.close()
+
+    drift = {
+        "p50MsPerHour": slope_per_hour([(w["t"], w["p50"]) for w in windows]),
+        "p95MsPerHour": slope_per_hour([(w["t"], w["p95"]) for w in windows]),
+        "p99MsPerHour": slope_per_hour([(w["t"], w["p99"]) for w in windows]),
+    }
+    for key in ("rssMb", "heapMb", "loopP99Ms", "dbConnections", "activeResources", "procRssMb", "fds"):
+        drift[f"{key}PerHour"] = slope_per_hour([(r["t"], r.get(key)) for r in resources])
+    return {
+        "mode": "soak",
+        "config": {
+            "baseUrl": base.base_url,
+            "duration": duration,
+            "rate": rate,
+            "users": users,
+            "window": window,
+            "mix": mix,
+            "pid": pid,
+            "seed": seed,
+        },
+        "iterations": seq,
+        "windows": windows,
+        "resources": resources,
+        "drift": drift,
+    }
+
+
+def print_soak(result, out):
+    windows, resources = result["windows"], result["resources"]
+    out.write(f"\n{result['iterations']} scenario iterations over {len(windows)} windows\n\n")
+    series = [
+        ("p50 ms", [w["p50"] for w in windows], "p50MsPerHour"),
+        ("p95 ms", [w["p95"] for w in windows], "p95MsPerHour"),
+        ("p99 ms", [w["p99"] for w in windows], "p99MsPerHour"),
+        ("error %", [w["errorRate"] * 100 for w in windows], None),
+    ]
+    for key, label in (
+        ("rssMb", "RSS MB"),
+        ("heapMb", "heap MB"),
+        ("loopP99Ms", "loop p99 ms"),
+        ("dbConnections", "db conns"),
+        ("procRssMb", "proc RSS MB"),
+        ("fds", "open fds"),
+    ):
+        values = [r.get(key) for r in resources]
+        if any(v is not None for v in values):
+            series.append((label, values, f"{key}PerHour"))
+    for label, values, drift_key in series:
+        present = [v for v in values if v is not None]
+        slope = result["drift"].get(drift_key) if drift_key else None
+        trend = f"  {slope:+.2f}/h" if slope is not None else ""
+        out.write(f"{label:<12} {present[0]:>9.1f} -> {present[-1]:>9.1f}  {sparkline(values)}{trend}\n")
+    if not any("rssMb" in r or "procRssMb" in r for r in resources):
+        out.write("\nno server resource samples: start the server with ENABLE_DIAGNOSTICS=1 or pass --pid\n")
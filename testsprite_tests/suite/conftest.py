@@ -0,0 +1,129 @@
+"""Shared fixtures for the TC suite.
+
+One pytest suite covers what the TestSprite-generated TC script pairs do,
+with the data every area needs created once per session instead of once per
+script:
+
+    cd testsprite_tests
+    python -m pytest suite -q            # one process
+    python -m pytest suite -q -n auto    # pytest-xdist, one dev user per worker
+
+Start the backend with ``NO_AUTH=1`` (``npm run dev``, not the single-user
+``dev-server-no-auth``): the dev user is keyed off the session cookie, so
+every worker's client, and every ``other_api`` client, is its own user and
+workers never see each other's notes, run lists or teams. Session fixtures
+are per worker process under xdist, so each worker seeds its data once.
+
+Tests skip when ``requests`` is missing or the backend at
+``TESTSPRITE_BASE_URL`` does not answer.
+"""
+
+import os
+import sys
+import uuid
+from datetime import date
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+try:
+    from harness.client import BASE_URL, ApiClient
+except ImportError as exc:  # requests is not installed
+    ApiClient = None
+    MISSING = str(exc)
+
+WORKER = os.environ.get("PYTEST_XDIST_WORKER", "main")
+
+RUN_LIST_PATIENTS = 3
+
+
+def unique(label):
+    """Names that cannot collide between workers or reruns."""
+    return f"{label} {WORKER}-{uuid.uuid4().hex[:8]}"
+
+
+@pytest.fixture(scope="session")
+def pool():
+    if ApiClient is None:
+        pytest.skip(MISSING)
+    import requests
+
+    client = ApiClient()
+    try:
+        client.get("/api/auth/user", timeout=5)
+    except requests.ConnectionError:
+        pytest.skip(f"backend not reachable at {BASE_URL}")
+    yield client
+    client.close()
+
+
+@pytest.fixture(scope="session")
+def api(pool):
+    """This worker's user: one session on the shared connection pool."""
+    client = pool.isolated()
+    resp = client.post("/api/init-user")
+    assert resp.status_code == 200, resp.text
+    yield client
+    client.close()
+
+
+@pytest.fixture(scope="session")
+def other_api(pool):
+    """A second user for imports and team joins."""
+    client = pool.isolated()
+    resp = client.post("/api/init-user")
+    assert resp.status_code == 200, resp.text
+    yield client
+    client.close()
+
+
+@pytest.fixture(scope="session")
+def today():
+    return date.today().isoformat()
+
+
+@pytest.fixture(scope="session")
+def run_list(api, today):
+    """Today's run list for the worker's user, with a few patients added once."""
+    resp = api.get("/api/run-list/today", params={"day": today})
+    assert resp.status_code == 200, resp.text
+    run_list = resp.json()["runList"]
+    patients = []
+    for i in range(RUN_LIST_PATIENTS):
+        added = api.post(f"/api/run-list/{run_list['id']}/patients", json={"alias": f"Bed {i + 1}"})
+        assert added.status_code == 200, added.text
+        patients.append(added.json()["patient"])
+    yield {"id": run_list["id"], "patients": patients}
+    for patient in patients:
+        api.delete(f"/api/run-list/patients/{patient['id']}")
+
+
+@pytest.fixture(scope="session")
+def team(api):
+    """A team owned by the worker's user; a user can only be in one team."""
+    resp = api.post("/api/teams/create", json={"name": unique("Suite team"), "description": "pytest suite"})
+    assert resp.status_code == 200, resp.text
+    team = resp.json()
+    yield team
+    api.post(f"/api/teams/{team['id']}/disband")
+
+
+@pytest.fixture(scope="session")
+def published(other_api):
+    """A public smart phrase and template owned by ``other_api``, for the import tests."""
+    phrase = other_api.post(
+        "/api/smart-phrases",
+        json={"trigger": unique("shared").replace(" ", "-"), "content": "Shared phrase", "elements": [], "isPublic": True},
+    )
+    assert phrase.status_code == 200, phrase.text
+    template = other_api.post(
+        "/api/note-templates",
+        json={"name": unique("Shared template"), "type": "progress", "sections": [], "isPublic": True},
+    )
+    assert template.status_code == 200, template.text
+    data = {"phrase": phrase.json(), "template": template.json()}
+    yield data
+    other_api.delete(f"/api/smart-phrases/{data['phrase']['id']}")
+    other_api.delete(f"/api/note-templates/{data['template']['id']}")
@@ -0,0 +1,20 @@
+"""TC005: dictation processing for medications, labs and past medical history.
+
+Point the server at ``python -m harness ai-stub`` (``BEDROCK_ENDPOINT_URL``)
+to run these without Bedrock credentials.
+"""
+
+import pytest
+
+DICTATIONS = {
+    "medications": "Patient takes metformin 500 mg twice daily and lisinopril 10 mg daily.",
+    "labs": "Hemoglobin 12.5, white count 7.2, sodium 138, potassium 4.1.",
+    "pmh": "History of type 2 diabetes, hypertension and prior appendectomy.",
+}
+
+
+@pytest.mark.parametrize("kind", DICTATIONS)
+def test_ai_processing(api, kind):
+    resp = api.post(f"/api/ai/{kind}", json={"dictation": DICTATIONS[kind]})
+    assert resp.status_code == 200, resp.text
+    assert isinstance(resp.json(), dict)
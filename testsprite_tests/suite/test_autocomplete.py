@@ -0,0 +1,28 @@
+"""TC008: autocomplete items for medical terms."""
+
+import pytest
+
+from conftest import unique
+
+ITEMS = {
+    "medications": {"dosage": "500 mg", "frequency": "BID"},
+    "past-medical-history": {},
+}
+
+
+@pytest.mark.parametrize("category", ITEMS)
+def test_autocomplete_crud(api, category):
+    payload = {"text": unique("Term"), "category": category, **ITEMS[category]}
+    resp = api.post("/api/autocomplete-items", json=payload)
+    assert resp.status_code == 200, resp.text
+    item = resp.json()
+    try:
+        listed = api.get("/api/autocomplete-items", params={"category": category})
+        assert listed.status_code == 200, listed.text
+        assert any(i["id"] == item["id"] for i in listed.json())
+
+        updated = api.put(f"/api/autocomplete-items/{item['id']}", json={"text": payload["text"] + " (upd)"})
+        assert updated.status_code == 200, updated.text
+    finally:
+        deleted = api.delete(f"/api/autocomplete-items/{item['id']}")
+    assert deleted.status_code in (200, 204), deleted.text
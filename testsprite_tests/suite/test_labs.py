@@ -0,0 +1,42 @@
+"""TC010: lab display settings and lab presets."""
+
+import pytest
+
+from conftest import unique
+
+SETTINGS = [
+    {"panelId": "hematology", "labId": "hemoglobin", "trendingCount": 5, "isVisible": True},
+    {"panelId": "chemistry", "labId": "sodium", "trendingCount": 3, "isVisible": False},
+]
+
+
+@pytest.mark.parametrize("setting", SETTINGS, ids=lambda s: f"{s['panelId']}-{s['labId']}")
+def test_lab_setting_upsert_and_delete(api, setting):
+    resp = api.post("/api/user-lab-settings", json=setting)
+    assert resp.status_code == 200, resp.text
+    listed = api.get("/api/user-lab-settings")
+    assert listed.status_code == 200, listed.text
+    assert any(s["panelId"] == setting["panelId"] and s["labId"] == setting["labId"] for s in listed.json())
+    deleted = api.delete("/api/user-lab-settings", params={"panelId": setting["panelId"], "labId": setting["labId"]})
+    assert deleted.status_code == 200, deleted.text
+
+
+def test_lab_preset_crud(api):
+    settings = {"customVisibility": {"hematology.hemoglobin": True}, "customTrendCounts": {"hematology.hemoglobin": 5}}
+    resp = api.post("/api/lab-presets", json={"name": unique("Preset"), "settings": settings})
+    assert resp.status_code in (200, 201), resp.text
+    preset = resp.json()
+    try:
+        updated = api.put(f"/api/lab-presets/{preset['id']}", json={"name": preset["name"] + " v2", "settings": settings})
+        assert updated.status_code == 200, updated.text
+        listed = api.get("/api/lab-presets")
+        assert listed.status_code == 200, listed.text
+        assert any(p["id"] == preset["id"] for p in listed.json())
+    finally:
+        deleted = api.delete(f"/api/lab-presets/{preset['id']}")
+    assert deleted.status_code in (200, 204), deleted.text
+
+
+def test_lab_preset_requires_settings(api):
+    resp = api.post("/api/lab-presets", json={"name": unique("Preset")})
+    assert resp.status_code == 400, resp.text
@@ -0,0 +1,41 @@
+"""TC002: medical notes CRUD."""
+
+import pytest
+
+from conftest import unique
+
+CONTENT = {
+    "text": "Patient seen on rounds, stable.",
+    "soap": {
+        "subjective": "Patient complains of headache.",
+        "objective": "Blood pressure normal.",
+        "assessment": "Tension headache.",
+        "plan": "Rest and hydration.",
+    },
+}
+
+
+@pytest.mark.parametrize("kind", CONTENT)
+def test_note_crud(api, kind):
+    payload = {"title": unique("Note"), "patientName": "John Doe", "content": CONTENT[kind], "tags": ["suite"]}
+    resp = api.post("/api/notes", json=payload)
+    assert resp.status_code in (200, 201), resp.text
+    note = resp.json()
+    try:
+        assert note["content"] == CONTENT[kind]
+
+        fetched = api.get(f"/api/notes/{note['id']}")
+        assert fetched.status_code == 200, fetched.text
+        assert fetched.json()["title"] == payload["title"]
+
+        updated = api.put(f"/api/notes/{note['id']}", json={"title": payload["title"] + " (edited)"})
+        assert updated.status_code == 200, updated.text
+        assert api.get(f"/api/notes/{note['id']}").json()["title"].endswith("(edited)")
+
+        listed = api.get("/api/notes")
+        assert listed.status_code == 200, listed.text
+        assert any(n["id"] == note["id"] for n in listed.json())
+    finally:
+        deleted = api.delete(f"/api/notes/{note['id']}")
+    assert deleted.status_code in (200, 204), deleted.text
+    assert all(n["id"] != note["id"] for n in api.get("/api/notes").json())
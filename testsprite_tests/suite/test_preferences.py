@@ -0,0 +1,24 @@
+"""TC009: user preferences."""
+
+import pytest
+
+PREFERENCES = {
+    "theme": {"theme": "dark"},
+    "nested": {"editor": {"fontSize": 14, "autosave": True}, "labs": ["cbc", "bmp"]},
+}
+
+
+def test_preferences_shape(api):
+    resp = api.get("/api/user-preferences")
+    assert resp.status_code == 200, resp.text
+    assert isinstance(resp.json().get("data", {}), dict)
+
+
+@pytest.mark.parametrize("kind", PREFERENCES)
+def test_preferences_round_trip(api, kind):
+    resp = api.put("/api/user-preferences", json={"data": PREFERENCES[kind]})
+    assert resp.status_code == 200, resp.text
+    # Tests on this worker share one user; only check the keys this one wrote.
+    data = api.get("/api/user-preferences").json()["data"]
+    for key, value in PREFERENCES[kind].items():
+        assert data.get(key) == value
@@ -0,0 +1,63 @@
+"""TC006: run-list management for clinical rounds."""
+
+import pytest
+
+
+def today_patients(api, day):
+    resp = api.get("/api/run-list/today", params={"day": day})
+    assert resp.status_code == 200, resp.text
+    return resp.json()["patients"]
+
+
+@pytest.mark.parametrize("alias", ["John Doe", "Bed 12 - Smith"])
+def test_add_update_archive_patient(api, run_list, today, alias):
+    added = api.post(f"/api/run-list/{run_list['id']}/patients", json={"alias": alias})
+    assert added.status_code == 200, added.text
+    patient_id = added.json()["patient"]["id"]
+    try:
+        assert any(p["id"] == patient_id for p in today_patients(api, today))
+        updated = api.put(f"/api/run-list/patients/{patient_id}", json={"alias": alias + " (upd)"})
+        assert updated.status_code == 200, updated.text
+    finally:
+        archived = api.delete(f"/api/run-list/patients/{patient_id}")
+    assert archived.status_code == 200, archived.text
+    assert all(p["id"] != patient_id for p in today_patients(api, today))
+
+
+def test_reorder_patients(api, run_list):
+    order = [p["id"] for p in reversed(run_list["patients"])]
+    resp = api.put(f"/api/run-list/{run_list['id']}/patients/reorder", json={"order": order})
+    assert resp.status_code == 200, resp.text
+
+
+@pytest.mark.parametrize("optimistic", [False, True], ids=["blind", "expected-updated-at"])
+def test_update_note(api, run_list, today, optimistic):
+    patient_id = run_list["patients"][int(optimistic)]["id"]
+    body = {"rawText": "Initial assessment completed."}
+    if optimistic:
+        note = next(p["note"] for p in today_patients(api, today) if p["id"] == patient_id) or {}
+        if note.get("updatedAt"):
+            body["expectedUpdatedAt"] = note["updatedAt"]
+    resp = api.put(f"/api/run-list/notes/{patient_id}", json=body)
+    assert resp.status_code == 200, resp.text
+    assert resp.json()["note"]["rawText"] == body["rawText"]
+
+
+def test_stale_note_write_conflicts(api, run_list):
+    patient_id = run_list["patients"][-1]["id"]
+    first = api.put(f"/api/run-list/notes/{patient_id}", json={"rawText": "first"})
+    assert first.status_code == 200, first.text
+    stale = "2000-01-01T00:00:00.000Z"
+    resp = api.put(f"/api/run-list/notes/{patient_id}", json={"rawText": "second", "expectedUpdatedAt": stale})
+    assert resp.status_code == 409, resp.text
+
+
+def test_ai_generate(api, run_list):
+    body = {
+        "listPatientId": run_list["patients"][0]["id"],
+        "transcript": "Patient is recovering well with no new symptoms.",
+        "mode": "progress",
+    }
+    resp = api.post("/api/run-list/ai/generate", json=body)
+    assert resp.status_code == 200, resp.text
+    assert "note" in resp.json()
@@ -0,0 +1,52 @@
+"""TC004: smart phrases CRUD and import by shareable id."""
+
+import pytest
+
+from conftest import unique
+
+ELEMENTS = {
+    "plain": [],
+    "picker": [
+        {"type": "text", "value": "History of present illness "},
+        {"type": "variable", "name": "detail", "options": ["mild", "moderate", "severe"]},
+    ],
+}
+
+
+def phrase_ids(api):
+    resp = api.get("/api/smart-phrases")
+    assert resp.status_code == 200, resp.text
+    return {p["id"] for p in resp.json()}
+
+
+@pytest.mark.parametrize("kind", ELEMENTS)
+def test_smart_phrase_crud(api, kind):
+    payload = {"trigger": unique(kind).replace(" ", "-"), "content": "History of present illness", "elements": ELEMENTS[kind]}
+    resp = api.post("/api/smart-phrases", json=payload)
+    assert resp.status_code in (200, 201), resp.text
+    phrase = resp.json()
+    try:
+        assert phrase["id"] in phrase_ids(api)
+        updated = api.put(f"/api/smart-phrases/{phrase['id']}", json={"content": "Updated content"})
+        assert updated.status_code == 200, updated.text
+        assert updated.json()["content"] == "Updated content"
+    finally:
+        deleted = api.delete(f"/api/smart-phrases/{phrase['id']}")
+    assert deleted.status_code in (200, 204), deleted.text
+    assert phrase["id"] not in phrase_ids(api)
+
+
+def test_import_public_phrase(api, published):
+    phrase = published["phrase"]
+    if not phrase.get("isPublic"):
+        pytest.skip("server does not publish smart phrases on create")
+    resp = api.post(f"/api/smart-phrases/import/{phrase['shareableId']}")
+    assert resp.status_code == 200, resp.text
+    imported = resp.json().get("phrase") or {}
+    if imported.get("id"):
+        api.delete(f"/api/smart-phrases/{imported['id']}")
+
+
+def test_import_unknown_phrase(api):
+    resp = api.post("/api/smart-phrases/import/ZZZZZZZZZZZ0")
+    assert resp.status_code in (400, 404), resp.text
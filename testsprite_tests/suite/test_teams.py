@@ -0,0 +1,54 @@
+"""TC007: team collaboration - membership, todos and the shared calendar."""
+
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+
+def test_team_is_listed(api, team):
+    resp = api.get("/api/teams")
+    assert resp.status_code == 200, resp.text
+    assert any(t["id"] == team["id"] for t in resp.json())
+
+
+def test_join_by_group_code(other_api, team):
+    resp = other_api.post("/api/teams/join", json={"groupCode": team["groupCode"]})
+    assert resp.status_code == 200, resp.text
+    members = other_api.get(f"/api/teams/{team['id']}/members")
+    assert members.status_code == 200, members.text
+
+
+@pytest.mark.parametrize(
+    "extra",
+    [{}, {"description": "Follow up on cultures", "priority": "high", "dueDate": "2030-12-31T00:00:00Z"}],
+    ids=["minimal", "detailed"],
+)
+def test_create_todo(api, team, extra):
+    payload = {"title": "Suite todo", **extra}
+    resp = api.post(f"/api/teams/{team['id']}/todos", json=payload)
+    assert resp.status_code == 200, resp.text
+    todo = resp.json()
+    assert todo["title"] == payload["title"]
+    listed = api.get(f"/api/teams/{team['id']}/todos")
+    assert listed.status_code == 200, listed.text
+    assert any(t["id"] == todo["id"] for t in listed.json())
+
+
+@pytest.mark.parametrize("all_day", [False, True], ids=["timed", "all-day"])
+def test_create_calendar_event(api, team, all_day):
+    # Events must fall inside the team's active week, which started when it was created.
+    start = datetime.now(timezone.utc) + timedelta(hours=1)
+    payload = {
+        "title": "Suite rounds",
+        "description": "Team collaboration test calendar event",
+        "startDate": start.isoformat(),
+        "endDate": (start + timedelta(hours=1)).isoformat(),
+        "allDay": all_day,
+        "type": "rounds",
+    }
+    resp = api.post(f"/api/teams/{team['id']}/calendar", json=payload)
+    assert resp.status_code == 200, resp.text
+    event = resp.json()
+    listed = api.get(f"/api/teams/{team['id']}/calendar")
+    assert listed.status_code == 200, listed.text
+    assert any(e["id"] == event["id"] for e in listed.json())
@@ -0,0 +1,46 @@
+"""TC003: note templates CRUD and import by shareable id."""
+
+import pytest
+
+from conftest import unique
+
+SECTIONS = {
+    "empty": [],
+    "soap": [
+        {"id": "subjective", "name": "Subjective", "type": "text", "required": True},
+        {"id": "plan", "name": "Plan", "type": "text", "required": False},
+    ],
+}
+
+
+@pytest.mark.parametrize("kind", SECTIONS)
+def test_template_crud(api, kind):
+    payload = {"name": unique("Template"), "type": "progress", "description": "pytest suite", "sections": SECTIONS[kind]}
+    resp = api.post("/api/note-templates", json=payload)
+    assert resp.status_code in (200, 201), resp.text
+    template = resp.json()
+    try:
+        updated = api.put(f"/api/note-templates/{template['id']}", json={**payload, "name": payload["name"] + " v2"})
+        assert updated.status_code == 200, updated.text
+
+        listed = api.get("/api/note-templates")
+        assert listed.status_code == 200, listed.text
+        names = {t["id"]: t["name"] for t in listed.json()}
+        assert names.get(template["id"]) == payload["name"] + " v2"
+    finally:
+        deleted = api.delete(f"/api/note-templates/{template['id']}")
+    assert deleted.status_code in (200, 204), deleted.text
+
+
+def test_import_public_template(api, published):
+    template = published["template"]
+    if not template.get("isPublic"):
+        pytest.skip("server does not publish templates on create")
+    resp = api.post("/api/note-templates/import", json={"shareableId": template["shareableId"]})
+    assert resp.status_code == 200, resp.text
+
+
+@pytest.mark.parametrize("shareable_id", ["", "ZZZZZZZZZZZ0"], ids=["blank", "unknown"])
+def test_import_rejects_bad_ids(api, shareable_id):
+    resp = api.post("/api/note-templates/import", json={"shareableId": shareable_id})
+    assert resp.status_code in (400, 404), resp.text